@@ -212,6 +212,73 @@ SERVER_EMAIL = "server@localhost"
 # Threshold in seconds for logging slow requests
 SLOW_REQUEST_THRESHOLD = 1.0
 
+# Shared directory for aggregating metrics across worker processes (gunicorn).
+# Leave unset for single-process servers; metrics are then kept in memory.
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR") or None
+
+# Clients allowed to scrape /metrics/: comma-separated addresses or networks
+# (CIDR), matched against REMOTE_ADDR.
+METRICS_ALLOWED_IPS = [
+    ip.strip() for ip in os.getenv("METRICS_ALLOWED_IPS", "127.0.0.1,::1").split(",") if ip.strip()
+]
+
+# Bearer token that grants /metrics/ access from any address (unset: disabled).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN") or None
+
+# Lifetime in seconds of cached template fragments (sidebar, allocation and
+# holdings tables). Fragments are keyed on the portfolio data version, so this
+# only bounds how long superseded entries linger in the cache.
+FRAGMENT_CACHE_TIMEOUT = int(os.getenv("FRAGMENT_CACHE_TIMEOUT", "600"))
+
+# ============================================================================
+# ASYNC VIEWS
+# ============================================================================
+
+# Route the dashboard, holdings and rebalancing pages to their async variants.
+# Only useful when served through the ASGI entry point (config/asgi.py).
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "False") == "True"
+
+# Worker processes for rebalancing solves started by async views. 0 runs the
+# solve in the request's worker thread instead of a process pool.
+REBALANCING_SOLVER_PROCESSES = int(os.getenv("REBALANCING_SOLVER_PROCESSES", "2"))
+
+# Generate rebalancing plans in the background job queue instead of inline on
+# the request. Requires a running `manage.py run_rebalancing_worker`.
+REBALANCING_JOB_QUEUE = os.getenv("REBALANCING_JOB_QUEUE", "False") == "True"
+
+# ============================================================================
+# REFERENCE DATA CACHE
+# ============================================================================
+
+# Seconds before the in-process cache of asset classes, categories and account
+# types is reloaded. Saves invalidate it immediately in the saving process;
+# this bounds how long other worker processes may serve the old data.
+REFERENCE_DATA_TTL = int(os.getenv("REFERENCE_DATA_TTL", "300"))
+
+# ============================================================================
+# PORTFOLIO SNAPSHOTS
+# ============================================================================
+
+# Keep a precomputed per-account allocation table (PortfolioSnapshot) up to date
+# on every write and serve the dashboard and sidebar from it. Run
+# `manage.py rebuild_portfolio_snapshots` after enabling on existing data.
+PORTFOLIO_SNAPSHOTS = os.getenv("PORTFOLIO_SNAPSHOTS", "False") == "True"
+
+# Cache the calculated presentation DataFrame per data version and patch it in
+# place when a single holding is added, edited or deleted, instead of
+# recalculating every account column on the next dashboard view.
+PRESENTATION_FRAME_CACHE = os.getenv("PRESENTATION_FRAME_CACHE", "False") == "True"
+
+# Pre-format the dashboard allocation and holdings tables a column at a time
+# in the formatter, so templates emit ready-made display strings and CSS
+# classes instead of calling the money/percent/number filters for every cell.
+DISPLAY_PREFORMAT = os.getenv("DISPLAY_PREFORMAT", "False") == "True"
+
+# Allocation calculator backend: "pandas" (default) or "polars", which runs the
+# presentation and holdings groupbys as multi-threaded Polars lazy queries for
+# large portfolios and batch runs. "polars" requires the [polars] extra.
+ALLOCATION_CALCULATOR = os.getenv("ALLOCATION_CALCULATOR", "pandas")
+
 # Logging Configuration
 # Using structlog for structured logging with Django's logging system
 LOGGING = get_logging_config(debug=DEBUG)
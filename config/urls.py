@@ -20,6 +20,7 @@ from django.contrib import admin
 from django.urls import include, path
 
 from portfolio.views.health import HealthCheckView
+from portfolio.views.metrics import MetricsView
 
 # Admin site customization
 admin.site.site_header = "CB3 Portfolio Administration"
@@ -28,6 +29,7 @@ admin.site.index_title = "Portfolio Management"
 
 urlpatterns = [
     path("health/", HealthCheckView.as_view(), name="health"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
     path("admin/", admin.site.urls),
     path("accounts/", include("django.contrib.auth.urls")),
     path("", include("portfolio.urls")),
@@ -12,6 +12,8 @@ from .models import (
     Holding,
     Institution,
     Portfolio,
+    PortfolioSnapshot,
+    RebalancingJob,
     RebalancingRecommendation,
     Security,
     SecurityPrice,
@@ -182,6 +184,36 @@ admin.site.register(Institution, InstitutionAdmin)
 admin.site.register(Account, AccountAdmin)
 admin.site.register(AccountType, AccountTypeAdmin)
 admin.site.register(AccountGroup, AccountGroupAdmin)
+
+
+class RebalancingJobAdmin(admin.ModelAdmin):
+    """Admin for background rebalancing jobs."""
+
+    list_display = ["id", "account", "status", "progress", "stage", "created_at", "finished_at"]
+    list_filter = ["status"]
+    search_fields = ["account__name"]
+    readonly_fields = ["created_at", "started_at", "finished_at", "stage_timings", "result"]
+    ordering = ["-created_at"]
+
+
+class PortfolioSnapshotAdmin(admin.ModelAdmin):
+    """Read-mostly view of the precomputed allocation snapshot."""
+
+    list_display = [
+        "account",
+        "asset_class",
+        "actual_value",
+        "target_pct",
+        "variance",
+        "account_total",
+        "built_at",
+    ]
+    list_filter = ["user"]
+    search_fields = ["account__name", "asset_class__name"]
+    readonly_fields = ["built_at"]
+    ordering = ["account", "asset_class"]
+
+
 admin.site.register(Portfolio, PortfolioAdmin)
 admin.site.register(AllocationStrategy, AllocationStrategyAdmin)
 admin.site.register(AccountTypeStrategyAssignment, AccountTypeStrategyAssignmentAdmin)
@@ -189,4 +221,6 @@ admin.site.register(Security, SecurityAdmin)
 admin.site.register(SecurityPrice, SecurityPriceAdmin)
 admin.site.register(Holding, HoldingAdmin)
 admin.site.register(TargetAllocation, TargetAllocationAdmin)
+admin.site.register(PortfolioSnapshot, PortfolioSnapshotAdmin)
+admin.site.register(RebalancingJob, RebalancingJobAdmin)
 admin.site.register(RebalancingRecommendation)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
-from dataclasses import dataclass, field
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
 from decimal import Decimal
+from functools import cached_property
 from typing import TYPE_CHECKING
 
 from portfolio.domain.allocation import AssetAllocation
@@ -12,12 +13,69 @@ if TYPE_CHECKING:
     from users.models import CustomUser
 
 
-@dataclass
+@dataclass(frozen=True)
+class HoldingsTable:
+    """Columnar, preloaded view of a portfolio's holdings (one entry per holding).
+
+    Market values are captured once, so every aggregate is computed in memory.
+    """
+
+    account_ids: tuple[int, ...] = ()
+    account_type_codes: tuple[str, ...] = ()
+    asset_class_names: tuple[str, ...] = ()
+    market_values: tuple[Decimal, ...] = ()
+
+    @classmethod
+    def from_accounts(cls, accounts: Iterable[Account]) -> HoldingsTable:
+        """Build the table from accounts.
+
+        Query-free when accounts were loaded with
+        ``Account.objects.with_priced_holdings()``.
+        """
+
+        rows = [
+            (account.id, account.account_type.code, h.security.asset_class.name, h.market_value)
+            for account in accounts
+            for h in account.holdings.all()
+        ]
+        if not rows:
+            return cls()
+        account_ids, type_codes, ac_names, values = zip(*rows, strict=True)
+        return cls(account_ids, type_codes, ac_names, values)
+
+    def __len__(self) -> int:
+        return len(self.market_values)
+
+    def total(self) -> Decimal:
+        return sum(self.market_values, Decimal("0.00"))
+
+    def sum_by(self, keys: tuple) -> dict:
+        """Sum market values grouped by a key column."""
+
+        result: dict = {}
+        for key, value in zip(keys, self.market_values, strict=True):
+            result[key] = result.get(key, Decimal("0.00")) + value
+        return result
+
+
+@dataclass(frozen=True)
 class Portfolio:
-    """Aggregate root representing a user's complete portfolio."""
+    """Aggregate root representing a user's complete portfolio.
+
+    Aggregates are computed from a ``HoldingsTable`` built once from the
+    accounts' holdings; ``load_for_user`` preloads holdings with prices so
+    none of them issue further queries.
+
+    A portfolio is immutable: ``accounts`` is stored as a tuple and the
+    dataclass is frozen, so the cached ``holdings_table`` cannot go stale.
+    Build a new ``Portfolio`` to reflect changed accounts or holdings.
+    """
 
     user_id: int
-    accounts: list[Account] = field(default_factory=list)
+    accounts: tuple[Account, ...] = ()
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "accounts", tuple(self.accounts))
 
     def __iter__(self) -> Iterator[Account]:
         return iter(self.accounts)
@@ -25,29 +83,29 @@ class Portfolio:
     def __len__(self) -> int:
         return len(self.accounts)
 
+    @cached_property
+    def holdings_table(self) -> HoldingsTable:
+        """Columnar snapshot of all holdings (built on first use)."""
+
+        return HoldingsTable.from_accounts(self.accounts)
+
     @property
     def total_value(self) -> Decimal:
         """Total value across all accounts."""
 
-        return sum((acc.total_value() for acc in self.accounts), Decimal("0.00"))
+        return self.holdings_table.total()
 
     def value_by_account_type(self) -> dict[str, Decimal]:
         """Aggregate values by account type code."""
 
-        result: dict[str, Decimal] = {}
-        for account in self.accounts:
-            code = account.account_type.code
-            result[code] = result.get(code, Decimal("0.00")) + account.total_value()
+        result = {acc.account_type.code: Decimal("0.00") for acc in self.accounts}
+        result.update(self.holdings_table.sum_by(self.holdings_table.account_type_codes))
         return result
 
     def value_by_asset_class(self) -> dict[str, Decimal]:
         """Aggregate values by asset class across all accounts."""
 
-        result: dict[str, Decimal] = {}
-        for account in self.accounts:
-            for ac_name, value in account.holdings_by_asset_class().items():
-                result[ac_name] = result.get(ac_name, Decimal("0.00")) + value
-        return result
+        return self.holdings_table.sum_by(self.holdings_table.asset_class_names)
 
     def allocation_by_asset_class(self) -> dict[str, Decimal]:
         """Current allocation percentages by asset class."""
@@ -75,7 +133,9 @@ class Portfolio:
     def get_account_totals(self) -> dict[int, Decimal]:
         """Get total value for each account by account ID."""
 
-        return {acc.id: acc.total_value() for acc in self.accounts}
+        result = {acc.id: Decimal("0.00") for acc in self.accounts}
+        result.update(self.holdings_table.sum_by(self.holdings_table.account_ids))
+        return result
 
     def get_account_type_map(self) -> dict[int, str]:
         """Get mapping of account ID to account type code."""
@@ -98,9 +158,10 @@ class Portfolio:
         """
 
         target_by_ac: dict[str, Decimal] = {}
+        account_totals = self.get_account_totals()
 
         for account in self.accounts:
-            account_total = account.total_value()
+            account_total = account_totals[account.id]
             allocations = effective_allocations.get(account.id, [])
 
             for alloc in allocations:
@@ -120,10 +181,14 @@ class Portfolio:
 
     @classmethod
     def load_for_user(cls, user: CustomUser) -> Portfolio:
-        """Factory method to load a complete portfolio for a user."""
+        """Factory method to load a complete portfolio for a user.
+
+        Accounts, holdings and latest prices are fetched up front (a fixed
+        number of queries), so the domain aggregates need no further queries.
+        """
 
         from portfolio.models import Account
 
-        accounts = list(Account.objects.get_summary_data(user))
+        accounts = tuple(Account.objects.get_summary_data(user))
         user_id = user.id
         return cls(user_id=user_id, accounts=accounts)
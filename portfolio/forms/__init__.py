@@ -1,4 +1,4 @@
 from .allocations import TargetAllocationForm
-from .holdings import AddHoldingForm
+from .holdings import AddHoldingForm, HoldingsImportForm
 
-__all__ = ["TargetAllocationForm", "AddHoldingForm"]
+__all__ = ["TargetAllocationForm", "AddHoldingForm", "HoldingsImportForm"]
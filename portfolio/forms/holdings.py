@@ -17,3 +17,11 @@ class AddHoldingForm(forms.Form):
         if not Security.objects.filter(id=security_id).exists():
             raise ValidationError("Security not found.")
         return security_id
+
+
+class HoldingsImportForm(forms.Form):
+    file = forms.FileField(help_text="CSV (Ticker, Shares) or OFX/QFX broker statement.")
+    replace = forms.BooleanField(
+        required=False,
+        help_text="Remove holdings that are not in the file.",
+    )
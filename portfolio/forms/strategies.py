@@ -5,7 +5,8 @@ from typing import Any
 
 from django import forms
 
-from portfolio.models import AllocationStrategy, AssetClass
+from portfolio.models import AllocationStrategy
+from portfolio.services.reference_data import get_reference_data
 
 
 class AllocationStrategyForm(forms.ModelForm):
@@ -21,12 +22,11 @@ class AllocationStrategyForm(forms.ModelForm):
     def __init__(self, *args: Any, **kwargs: Any) -> None:
         super().__init__(*args, **kwargs)
 
-        # Get all asset classes including Cash
-        all_asset_classes = (
-            AssetClass.objects.select_related("category")
-            .all()
-            .order_by("category__sort_order", "category__label", "name")
-        )
+        # Get all asset classes including Cash (ordered by category, then name)
+        all_asset_classes = get_reference_data().asset_classes
+
+        # Existing targets when editing, loaded in one query
+        current_targets = self.instance.get_allocations_dict() if self.instance.pk else {}
 
         # Separate cash from other asset classes
         self.asset_classes = []
@@ -43,11 +43,7 @@ class AllocationStrategyForm(forms.ModelForm):
             field_name = f"target_{ac.id}"
 
             # If we're editing an existing strategy, pre-populate values
-            initial_value = 0
-            if self.instance.pk:
-                target = self.instance.target_allocations.filter(asset_class=ac).first()
-                if target:
-                    initial_value = target.target_percent
+            initial_value = current_targets.get(ac.id, 0)
 
             self.fields[field_name] = forms.DecimalField(
                 label=ac.name,
@@ -62,13 +58,7 @@ class AllocationStrategyForm(forms.ModelForm):
         # Add optional Cash field
         if self.cash_asset_class:
             field_name = f"target_{self.cash_asset_class.id}"
-            initial_value = 0
-            if self.instance.pk:
-                target = self.instance.target_allocations.filter(
-                    asset_class=self.cash_asset_class
-                ).first()
-                if target:
-                    initial_value = target.target_percent
+            initial_value = current_targets.get(self.cash_asset_class.id, 0)
 
             self.fields[field_name] = forms.DecimalField(
                 label="Cash (Optional)",
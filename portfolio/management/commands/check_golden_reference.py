@@ -603,7 +603,8 @@ class Command(BaseCommand):
 
         for account in portfolio.accounts:
             self.stdout.write(self.style.MIGRATE_HEADING(f"\nAccount: {account.name}"))
-            holdings = account.holdings.select_related("security__asset_class").all()
+            # Prefetched with latest prices by DomainPortfolio.load_for_user
+            holdings = account.holdings.all()
 
             data = []
             for h in holdings:
@@ -0,0 +1,86 @@
+from datetime import date
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.services.synthetic_data import SyntheticDataGenerator, SyntheticShape
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk-create a deterministic synthetic data set (users x accounts x holdings, "
+        "with daily price history) for benchmarks and load tests."
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        defaults = SyntheticShape()
+        parser.add_argument("--users", type=int, default=defaults.users)
+        parser.add_argument(
+            "--accounts", type=int, default=defaults.accounts_per_user, help="Accounts per user."
+        )
+        parser.add_argument(
+            "--holdings",
+            type=int,
+            default=defaults.holdings_per_account,
+            help="Holdings per account.",
+        )
+        parser.add_argument(
+            "--securities",
+            type=int,
+            default=defaults.securities,
+            help="Size of the shared security universe.",
+        )
+        parser.add_argument(
+            "--years",
+            type=float,
+            default=defaults.price_years,
+            help="Years of daily prices per security.",
+        )
+        parser.add_argument(
+            "--price-end",
+            type=date.fromisoformat,
+            default=None,
+            help="Last price date (YYYY-MM-DD, default: today).",
+        )
+        parser.add_argument("--seed", type=int, default=defaults.seed)
+        parser.add_argument(
+            "--prefix",
+            default=defaults.username_prefix,
+            help="Username prefix of the generated users.",
+        )
+        parser.add_argument(
+            "--password",
+            default=None,
+            help="Login password for all generated users (default: unusable).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        class CommandLogger:
+            def __init__(self, command: BaseCommand) -> None:
+                self.command = command
+
+            def write(self, msg: str) -> None:
+                self.command.stdout.write(msg)
+
+            def success(self, msg: str) -> None:
+                self.command.stdout.write(self.command.style.SUCCESS(msg))
+
+        try:
+            shape = SyntheticShape(
+                users=options["users"],
+                accounts_per_user=options["accounts"],
+                holdings_per_account=options["holdings"],
+                securities=options["securities"],
+                price_years=options["years"],
+                price_end=options["price_end"],
+                seed=options["seed"],
+                username_prefix=options["prefix"],
+                password=options["password"],
+            )
+            self.stdout.write(
+                f"Generating {shape.users} users, {shape.total_holdings} holdings, "
+                f"{shape.total_prices} prices (seed {shape.seed})"
+            )
+            SyntheticDataGenerator(shape, logger=CommandLogger(self)).run()
+        except ValueError as e:
+            raise CommandError(str(e)) from e
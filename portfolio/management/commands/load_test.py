@@ -0,0 +1,109 @@
+import json
+from pathlib import Path
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.services.load_test import (
+    DEFAULT_MIX,
+    LoadTest,
+    LoadTestError,
+    PageStats,
+    load_users,
+    parse_mix,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay a weighted page mix (dashboard, holdings, targets, ticker details, "
+        "rebalancing) as logged-in users against a running server and report latency "
+        "percentiles, throughput and the server-side X-Request-Duration distribution."
+    )
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--url", default="http://127.0.0.1:8000", help="Base URL of the server under test."
+        )
+        parser.add_argument(
+            "--prefix",
+            default="synthetic_",
+            help="Username prefix of the users to log in (see generate_synthetic_data).",
+        )
+        parser.add_argument("--password", required=True, help="Login password of the users.")
+        parser.add_argument(
+            "--users", type=int, default=None, help="Log in at most this many users."
+        )
+        parser.add_argument("--concurrency", type=int, default=4, help="Concurrent worker threads.")
+        parser.add_argument(
+            "--duration", type=float, default=30.0, help="Seconds to run (0: no limit)."
+        )
+        parser.add_argument(
+            "--requests", type=int, default=None, help="Stop after this many requests."
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join(f"{page}={weight}" for page, weight in DEFAULT_MIX.items()),
+            help="Page weights as <page>=<weight>,... (default: %(default)s).",
+        )
+        parser.add_argument("--timeout", type=float, default=30.0, help="Per-request timeout.")
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--json", type=Path, default=None, help="Also write the report here.")
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        try:
+            users = load_users(options["prefix"], limit=options["users"])
+            load_test = LoadTest(
+                base_url=options["url"],
+                users=users,
+                password=options["password"],
+                mix=parse_mix(options["mix"]),
+                concurrency=options["concurrency"],
+                duration=options["duration"] or None,
+                requests=options["requests"],
+                timeout=options["timeout"],
+                seed=options["seed"],
+            )
+            self.stdout.write(
+                f"Load testing {options['url']} with {load_test.concurrency} workers "
+                f"({len(users)} users)"
+            )
+            report = load_test.run()
+        except LoadTestError as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(
+            f"{'page':<16}{'requests':>10}{'errors':>8}{'req/s':>9}"
+            f"{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'srv p50':>9}{'srv p95':>9}"
+        )
+        for stats in [*report.pages, report.overall]:
+            self.stdout.write(self._row(stats))
+        overall = report.overall
+        self.stdout.write(
+            f"{overall.requests} requests in {report.elapsed:.1f}s: "
+            f"{overall.requests_per_second:.1f} req/s, "
+            f"{overall.requests_per_second / report.concurrency:.1f} req/s per worker "
+            "(latencies in ms)"
+        )
+
+        if options["json"]:
+            options["json"].write_text(json.dumps(report.as_dict(), indent=2) + "\n")
+            self.stdout.write(f"Report written to {options['json']}")
+
+        if overall.errors:
+            self.stdout.write(self.style.WARNING(f"{overall.errors} requests failed"))
+        else:
+            self.stdout.write(self.style.SUCCESS("All requests succeeded"))
+
+    @staticmethod
+    def _row(stats: PageStats) -> str:
+        def ms(values: dict[int, float], p: int) -> str:
+            return f"{values[p]:>9.1f}" if p in values else f"{'-':>9}"
+
+        return (
+            f"{stats.page:<16}{stats.requests:>10}{stats.errors:>8}"
+            f"{stats.requests_per_second:>9.1f}"
+            + "".join(ms(stats.latency_ms, p) for p in (50, 90, 95, 99))
+            + ms(stats.server_ms, 50)
+            + ms(stats.server_ms, 95)
+        )
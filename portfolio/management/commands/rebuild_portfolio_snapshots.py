@@ -0,0 +1,46 @@
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from portfolio.models import Account
+from portfolio.services.allocations.batch import make_batch_executor
+from portfolio.services.portfolio_snapshots import rebuild_users
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed portfolio snapshot table from holdings and targets."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--user",
+            help="Only rebuild this user's accounts (username).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Compute user shards in this many worker processes (default: inline).",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        accounts = Account.objects.all()
+        if options["user"]:
+            User = get_user_model()  # noqa: N806
+            try:
+                user = User.objects.get(username=options["user"])
+            except User.DoesNotExist as e:
+                raise CommandError(f"User '{options['user']}' not found") from e
+            accounts = accounts.filter(user=user)
+
+        user_ids = list(accounts.values_list("user_id", flat=True).distinct().order_by("user_id"))
+
+        if options["workers"] > 0:
+            with make_batch_executor(options["workers"]) as executor:
+                total_rows = rebuild_users(user_ids, executor=executor)
+        else:
+            total_rows = rebuild_users(user_ids)
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {total_rows} snapshot rows for {len(user_ids)} users")
+        )
@@ -0,0 +1,117 @@
+import signal
+import time
+from datetime import timedelta
+from typing import Any
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from portfolio.services.rebalancing.jobs import (
+    DEFAULT_KEEP_FINISHED,
+    DEFAULT_STALE_AFTER,
+    claim_next_job,
+    prune_finished_jobs,
+    requeue_stale_jobs,
+    run_job,
+)
+from portfolio.services.rebalancing.solver import get_solver_executor
+
+
+class Command(BaseCommand):
+    help = "Generate queued rebalancing plans in the background (database job queue)."
+
+    def add_arguments(self, parser: Any) -> None:
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Process the jobs currently queued, then exit.",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=None,
+            help="Exit after processing this many jobs.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds to wait between polls when the queue is empty (default: 1).",
+        )
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=int(DEFAULT_STALE_AFTER.total_seconds()),
+            help="Requeue jobs left running longer than this many seconds (default: 600).",
+        )
+        parser.add_argument(
+            "--keep-finished",
+            type=int,
+            default=int(DEFAULT_KEEP_FINISHED.total_seconds()),
+            help=(
+                "Delete finished jobs older than this many seconds, except each account's "
+                "latest plan (default: 604800)."
+            ),
+        )
+        parser.add_argument(
+            "--use-solver-pool",
+            action="store_true",
+            help="Run optimization solves in the solver process pool.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        self._stopping = False
+        previous_handlers = {
+            sig: signal.signal(sig, self._request_stop) for sig in (signal.SIGTERM, signal.SIGINT)
+        }
+        try:
+            processed = self.run(options)
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebalancing worker stopped after {processed} jobs."))
+
+    def run(self, options: dict[str, Any]) -> int:
+        """Claim and run jobs until stopped; returns the number processed."""
+        executor = get_solver_executor() if options["use_solver_pool"] else None
+        stale_after = timedelta(seconds=options["stale_after"])
+        keep_finished = timedelta(seconds=options["keep_finished"])
+        max_jobs = options["max_jobs"]
+        processed = 0
+        # Prune on startup and each time the queue drains, not on every idle poll
+        prune_pending = True
+
+        self.stdout.write("Rebalancing worker started.")
+        requeue_stale_jobs(stale_after)
+
+        while not self._stopping and (max_jobs is None or processed < max_jobs):
+            close_old_connections()
+            job = claim_next_job()
+
+            if job is None:
+                if prune_pending:
+                    prune_finished_jobs(keep_finished)
+                    prune_pending = False
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+                requeue_stale_jobs(stale_after)
+                continue
+
+            job = run_job(job, solver_executor=executor)
+            processed += 1
+            prune_pending = True
+            style = self.style.SUCCESS if job.status == job.SUCCEEDED else self.style.ERROR
+            self.stdout.write(
+                style(
+                    f"Job {job.id} (account {job.account_id}): {job.status}"
+                    f" in {job.duration_seconds or 0:.2f}s"
+                )
+            )
+
+        return processed
+
+    def _request_stop(self, signum: int, frame: Any) -> None:
+        # Finish the current job before exiting
+        self._stopping = True
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 from django.db import models
 
 from users.models import CustomUser
 
+if TYPE_CHECKING:
+    from portfolio.models import Portfolio  # noqa: F401 - used in the QuerySet base subscript
+
 
 class AccountQuerySet(models.QuerySet):
     def for_user(self, user: CustomUser) -> AccountQuerySet:
@@ -14,6 +19,30 @@ class AccountQuerySet(models.QuerySet):
             "holdings__security__asset_class"
         )
 
+    def with_priced_holdings(self) -> AccountQuerySet:
+        """
+        Prefetch holdings with their latest price annotated.
+
+        Holdings carry ``_annotated_latest_price`` (read by Holding.latest_price),
+        so ``market_value``, ``Account.total_value()`` and
+        ``Account.holdings_by_asset_class()`` run without further queries.
+        """
+        from portfolio.models import Holding, SecurityPrice
+
+        latest_price = models.Subquery(
+            SecurityPrice.objects.filter(security_id=models.OuterRef("security_id"))
+            .order_by("-price_datetime")
+            .values("price")[:1]
+        )
+        return self.select_related("institution", "account_type__group").prefetch_related(
+            models.Prefetch(
+                "holdings",
+                queryset=Holding.objects.select_related("security__asset_class").annotate(
+                    _annotated_latest_price=latest_price
+                ),
+            )
+        )
+
 
 class AccountManager(models.Manager):
     def get_queryset(self) -> AccountQuerySet:
@@ -23,7 +52,28 @@ class AccountManager(models.Manager):
         return self.get_queryset().for_user(user)
 
     def get_summary_data(self, user: CustomUser) -> AccountQuerySet:
-        return self.for_user(user).with_details()
+        return self.for_user(user).with_priced_holdings()
+
+
+class PortfolioQuerySet(models.QuerySet["Portfolio"]):
+    def for_user(self, user: CustomUser) -> PortfolioQuerySet:
+        return self.filter(user=user)
+
+    def bump_version(self) -> int:
+        """
+        Increment the data version of every portfolio in the queryset.
+
+        Used to invalidate ETags and cached fragments after holdings, accounts
+        or targets change. Issues a single UPDATE and fires no signals.
+        """
+        from django.utils import timezone
+
+        return self.update(version=models.F("version") + 1, modified_at=timezone.now())
+
+
+# Built from the queryset so its methods (``for_user``, ``bump_version``) are
+# available, and typed, on ``Portfolio.objects``.
+PortfolioManager = models.Manager.from_queryset(PortfolioQuerySet)
 
 
 class HoldingQuerySet(models.QuerySet):
@@ -6,11 +6,13 @@ log entries across the entire request lifecycle.
 """
 
 import uuid
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
+from typing import cast
 
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponseBase
 
 import structlog
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
 
 
 class RequestIDMiddleware:
@@ -24,13 +26,57 @@ class RequestIDMiddleware:
     - Added to the response headers as X-Request-ID
     - Added to structlog context for automatic inclusion in all logs
 
-    This enables tracing a single request through all log entries.
+    This enables tracing a single request through all log entries. Runs
+    natively in both sync (WSGI) and async (ASGI) stacks.
     """
 
-    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(
+        self,
+        get_response: (
+            Callable[[HttpRequest], HttpResponseBase]
+            | Callable[[HttpRequest], Awaitable[HttpResponseBase]]
+        ),
+    ) -> None:
         self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        get_response = self.get_response
+        if iscoroutinefunction(get_response):
+            return self._acall(request, get_response)
+
+        request_id = self._bind_request_id(request)
+        try:
+            # A sync get_response returns the response itself
+            response = cast(HttpResponseBase, get_response(request))
+        finally:
+            # Clean up context after request completes
+            structlog.contextvars.clear_contextvars()
+
+        # Add request ID to response headers for debugging
+        response["X-Request-ID"] = request_id
+        return response
+
+    async def _acall(
+        self,
+        request: HttpRequest,
+        get_response: Callable[[HttpRequest], Awaitable[HttpResponseBase]],
+    ) -> HttpResponseBase:
+        request_id = self._bind_request_id(request)
+        try:
+            response = await get_response(request)
+        finally:
+            structlog.contextvars.clear_contextvars()
+
+        response["X-Request-ID"] = request_id
+        return response
 
-    def __call__(self, request: HttpRequest) -> HttpResponse:
+    def _bind_request_id(self, request: HttpRequest) -> str:
+        """Set the request's ID and bind it to the structlog context."""
         # Check if request already has an ID (e.g., from load balancer)
         request_id = request.headers.get("X-Request-ID")
 
@@ -44,14 +90,4 @@ class RequestIDMiddleware:
         # Bind to structlog context for this request
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=request_id)
-
-        try:
-            response = self.get_response(request)
-        finally:
-            # Clean up context after request completes
-            structlog.contextvars.clear_contextvars()
-
-        # Add request ID to response headers for debugging
-        response["X-Request-ID"] = request_id
-
-        return response
+        return request_id
@@ -1,16 +1,21 @@
 """
 Performance timing middleware for identifying slow requests.
 
-Logs warning for requests that exceed configured threshold.
+Logs warning for requests that exceed configured threshold and records
+request latency in the metrics registry.
 """
 
 import time
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
+from typing import cast
 
 from django.conf import settings
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponseBase
 
 import structlog
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from portfolio.services.metrics import REQUEST_LATENCY, registry
 
 logger = structlog.get_logger(__name__)
 
@@ -22,24 +27,63 @@ class PerformanceTimingMiddleware:
     Logs a warning if request processing time exceeds the threshold
     defined in settings.SLOW_REQUEST_THRESHOLD (default: 1.0 seconds).
 
-    The request duration is also added to response headers for debugging.
+    The request duration is also added to response headers for debugging and
+    observed in the request latency histogram, labelled by resolved view name
+    (not path) to keep label cardinality bounded. Runs natively in both sync
+    (WSGI) and async (ASGI) stacks.
     """
 
-    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(
+        self,
+        get_response: (
+            Callable[[HttpRequest], HttpResponseBase]
+            | Callable[[HttpRequest], Awaitable[HttpResponseBase]]
+        ),
+    ) -> None:
         self.get_response = get_response
         # Threshold in seconds for what constitutes a "slow" request
         self.slow_threshold = getattr(settings, "SLOW_REQUEST_THRESHOLD", 1.0)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
 
-    def __call__(self, request: HttpRequest) -> HttpResponse:
-        start_time = time.time()
+    def __call__(self, request: HttpRequest) -> HttpResponseBase | Awaitable[HttpResponseBase]:
+        get_response = self.get_response
+        if iscoroutinefunction(get_response):
+            return self._acall(request, get_response)
 
-        response = self.get_response(request)
+        start_time = time.time()
+        # A sync get_response returns the response itself
+        response = cast(HttpResponseBase, get_response(request))
+        self._record(request, response, time.time() - start_time)
+        return response
 
-        duration = time.time() - start_time
+    async def _acall(
+        self,
+        request: HttpRequest,
+        get_response: Callable[[HttpRequest], Awaitable[HttpResponseBase]],
+    ) -> HttpResponseBase:
+        start_time = time.time()
+        response = await get_response(request)
+        self._record(request, response, time.time() - start_time)
+        return response
 
+    def _record(self, request: HttpRequest, response: HttpResponseBase, duration: float) -> None:
+        """Add the timing header, observe the latency and log slow requests."""
         # Add timing header to response
         response["X-Request-Duration"] = f"{duration:.3f}s"
 
+        match = getattr(request, "resolver_match", None)
+        REQUEST_LATENCY.observe(
+            duration,
+            view=(match.view_name if match else None) or "unresolved",
+            method=request.method or "",
+            status=response.status_code,
+        )
+        registry.flush()
+
         # Log slow requests
         if duration > self.slow_threshold:
             logger.warning(
@@ -49,5 +93,3 @@ class PerformanceTimingMiddleware:
                 method=request.method,
                 threshold=self.slow_threshold,
             )
-
-        return response
@@ -0,0 +1,49 @@
+# Generated by Django 6.0.9 on 2026-10-18 22:03
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0008_portfolio_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RebalancingJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('RUNNING', 'Running'), ('SUCCEEDED', 'Succeeded'), ('FAILED', 'Failed')], default='PENDING', max_length=10)),
+                ('data_version', models.CharField(help_text='Portfolio data version the plan is generated from', max_length=64)),
+                ('progress', models.PositiveSmallIntegerField(default=0)),
+                ('stage', models.CharField(blank=True, max_length=50)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('stage_timings', models.JSONField(blank=True, default=dict, help_text='Seconds spent in each generation stage')),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('result', models.JSONField(blank=True, help_text='Serialized RebalancingPlan', null=True)),
+                ('account', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rebalancing_jobs', to='portfolio.account')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='rebalancingrecommendation',
+            name='job',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='recommendations', to='portfolio.rebalancingjob'),
+        ),
+        migrations.AddIndex(
+            model_name='rebalancingjob',
+            index=models.Index(fields=['status', 'created_at'], name='rebal_job_status_created'),
+        ),
+        migrations.AddIndex(
+            model_name='rebalancingjob',
+            index=models.Index(fields=['account', 'data_version'], name='rebal_job_account_version'),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 6.0.9 on 2026-10-18 22:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0009_rebalancing_job"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PortfolioSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "held",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Account holds this asset class (total row: account has holdings)",
+                    ),
+                ),
+                ("actual_value", models.FloatField(default=0.0)),
+                ("target_pct", models.FloatField(default=0.0, help_text="Effective target (%)")),
+                ("target_value", models.FloatField(default=0.0)),
+                ("variance", models.FloatField(default=0.0, help_text="Actual minus target value")),
+                (
+                    "variance_pct",
+                    models.FloatField(
+                        default=0.0,
+                        help_text="Variance as % of the account (total row: absolute deviation %)",
+                    ),
+                ),
+                ("account_total", models.FloatField(default=0.0)),
+                ("built_at", models.DateTimeField(default=django.utils.timezone.now)),
+                (
+                    "account",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="snapshot_rows",
+                        to="portfolio.account",
+                    ),
+                ),
+                (
+                    "asset_class",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Empty for the account total row",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="portfolio.assetclass",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="portfolio_snapshots",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["user", "account"], name="snapshot_user_account")],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("account", "asset_class"),
+                        name="unique_snapshot_account_asset_class",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("asset_class__isnull", True)),
+                        fields=("account",),
+                        name="unique_snapshot_account_total",
+                    ),
+                ],
+            },
+        ),
+    ]
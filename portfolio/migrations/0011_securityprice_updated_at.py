@@ -0,0 +1,23 @@
+# Generated by Django 6.0.9 on 2026-10-19 09:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0010_portfolio_snapshot"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="securityprice",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                default=django.utils.timezone.now,
+                help_text="Last write, including in-place corrections (data versioning)",
+            ),
+            preserve_default=False,
+        ),
+    ]
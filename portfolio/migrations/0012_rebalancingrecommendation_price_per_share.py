@@ -0,0 +1,23 @@
+# Generated by Django 6.0.9 on 2026-10-19 00:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("portfolio", "0011_securityprice_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="rebalancingrecommendation",
+            name="price_per_share",
+            field=models.DecimalField(
+                blank=True,
+                decimal_places=4,
+                help_text="Price the order was estimated at (empty for rows saved before it was recorded)",
+                max_digits=15,
+                null=True,
+            ),
+        ),
+    ]
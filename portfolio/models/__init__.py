@@ -7,7 +7,7 @@ Organized by domain:
 - securities.py: Securities and holdings
 - strategies.py: Allocation strategies and targets
 - portfolio.py: Portfolio container
-- rebalancing.py: Rebalancing recommendations
+- rebalancing.py: Rebalancing jobs and recommendations
 """
 
 from __future__ import annotations
@@ -27,6 +27,8 @@ __all__ = [
     "TargetAllocation",
     "AccountTypeStrategyAssignment",
     "Portfolio",
+    "PortfolioSnapshot",
+    "RebalancingJob",
     "RebalancingRecommendation",
     "signals",
 ]
@@ -34,8 +36,8 @@ from .accounts import Account, AccountGroup, AccountType, Institution
 
 # Import in dependency order (models with no FKs first)
 from .assets import AssetClass, AssetClassCategory
-from .portfolio import Portfolio
-from .rebalancing import RebalancingRecommendation
+from .portfolio import Portfolio, PortfolioSnapshot
+from .rebalancing import RebalancingJob, RebalancingRecommendation
 from .securities import Holding, Security, SecurityPrice
 from .strategies import (
     AccountTypeStrategyAssignment,
@@ -63,6 +65,8 @@ __all__ = [
     "TargetAllocation",
     # Portfolio
     "Portfolio",
+    "PortfolioSnapshot",
     # Rebalancing
+    "RebalancingJob",
     "RebalancingRecommendation",
 ]
@@ -287,8 +287,14 @@ class Account(models.Model):
     def holdings_by_asset_class(self) -> dict[str, Decimal]:
         """Group holdings by asset class name and sum market values."""
 
+        # Reuse prefetched holdings (see AccountQuerySet.with_priced_holdings)
+        if "holdings" in getattr(self, "_prefetched_objects_cache", {}):
+            holdings = self.holdings.all()
+        else:
+            holdings = self.holdings.select_related("security__asset_class").all()
+
         result: dict[str, Decimal] = {}
-        for holding in self.holdings.select_related("security__asset_class").all():
+        for holding in holdings:
             ac_name = holding.security.asset_class.name
             result[ac_name] = result.get(ac_name, Decimal("0.00")) + holding.market_value
         return result
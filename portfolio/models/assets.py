@@ -1,7 +1,5 @@
 from __future__ import annotations
 
-from functools import lru_cache
-
 from django.db import models
 
 
@@ -106,10 +104,10 @@ class AssetClass(models.Model):
     @classmethod
     def get_cash(cls) -> AssetClass | None:
         """
-        Get the Cash asset class from database (cached).
+        Get the Cash asset class (cached).
 
-        This method uses caching to avoid repeated database queries for the
-        same Cash asset class within a single process lifetime.
+        Served from the process-wide reference data cache, which is reloaded
+        whenever an asset class changes (see services/reference_data.py).
 
         Returns:
             AssetClass instance for Cash, or None if not found
@@ -119,12 +117,6 @@ class AssetClass(models.Model):
             >>> if cash:
             ...     print(f"Cash ID: {cash.id}")
         """
+        from portfolio.services.reference_data import get_reference_data
 
-        @lru_cache(maxsize=1)
-        def _get_cash() -> AssetClass | None:
-            try:
-                return cls.objects.get(name=cls.CASH_NAME)
-            except cls.DoesNotExist:
-                return None
-
-        return _get_cash()
+        return get_reference_data().cash
@@ -5,9 +5,11 @@ from typing import Any
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 import pandas as pd
 
+from portfolio.managers import PortfolioManager
 from portfolio.models.securities import Holding
 from portfolio.models.strategies import AllocationStrategy
 
@@ -26,6 +28,12 @@ class Portfolio(models.Model):
         blank=True,
         related_name="portfolio_assignments",
     )
+    # Data version, bumped whenever holdings, accounts or targets change.
+    # Drives API ETags and cached fragments (see portfolio.services.versioning).
+    version = models.PositiveBigIntegerField(default=0, editable=False)
+    modified_at = models.DateTimeField(default=timezone.now, editable=False)
+
+    objects = PortfolioManager()
 
     class Meta:
         constraints = [
@@ -139,3 +147,69 @@ class Portfolio(models.Model):
         df = df.sort_index(axis=0).sort_index(axis=1)
 
         return df
+
+
+class PortfolioSnapshot(models.Model):
+    """
+    Denormalized allocation numbers for one account, precomputed on write.
+
+    Each account has one row per asset class it holds or targets (actual
+    value, effective target and variance) plus one total row with
+    ``asset_class`` NULL (account total and absolute deviation). Every
+    account has a total row, including accounts without holdings. Rows are
+    rebuilt per account whenever holdings, prices or strategies change (see
+    portfolio.services.portfolio_snapshots), so the dashboard and sidebar read
+    a user's allocations with one indexed query.
+
+    Values are floats because they mirror AllocationCalculator's float64
+    output exactly; the snapshot is a cache, not the system of record.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="portfolio_snapshots",
+    )
+    account = models.ForeignKey("Account", on_delete=models.CASCADE, related_name="snapshot_rows")
+    asset_class = models.ForeignKey(
+        "AssetClass",
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="+",
+        help_text="Empty for the account total row",
+    )
+    held = models.BooleanField(
+        default=False,
+        help_text="Account holds this asset class (total row: account has holdings)",
+    )
+    actual_value = models.FloatField(default=0.0)
+    target_pct = models.FloatField(default=0.0, help_text="Effective target (%)")
+    target_value = models.FloatField(default=0.0)
+    variance = models.FloatField(default=0.0, help_text="Actual minus target value")
+    variance_pct = models.FloatField(
+        default=0.0,
+        help_text="Variance as % of the account (total row: absolute deviation %)",
+    )
+    account_total = models.FloatField(default=0.0)
+    built_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["account", "asset_class"],
+                name="unique_snapshot_account_asset_class",
+            ),
+            models.UniqueConstraint(
+                fields=["account"],
+                condition=models.Q(asset_class__isnull=True),
+                name="unique_snapshot_account_total",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["user", "account"], name="snapshot_user_account"),
+        ]
+
+    def __str__(self) -> str:
+        target = self.asset_class.name if self.asset_class else "Total"
+        return f"{self.account.name} / {target}: {self.actual_value:.2f}"
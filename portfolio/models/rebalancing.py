@@ -3,11 +3,81 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 
 from django.db import models
+from django.utils import timezone
 
 if TYPE_CHECKING:
     pass
 
 
+class RebalancingJob(models.Model):
+    """
+    Background generation of a rebalancing plan for one account.
+
+    Jobs are queued by the rebalancing page and claimed by the
+    ``run_rebalancing_worker`` management command. The finished plan is stored
+    in ``result`` with its orders saved as RebalancingRecommendation rows.
+    ``data_version`` records the account data version the plan was built
+    from, so a plan is only reused while the underlying data is unchanged.
+    """
+
+    PENDING = "PENDING"
+    RUNNING = "RUNNING"
+    SUCCEEDED = "SUCCEEDED"
+    FAILED = "FAILED"
+
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (SUCCEEDED, "Succeeded"),
+        (FAILED, "Failed"),
+    ]
+
+    account = models.ForeignKey(
+        "Account", on_delete=models.CASCADE, related_name="rebalancing_jobs"
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    data_version = models.CharField(
+        max_length=64, help_text="Portfolio data version the plan is generated from"
+    )
+
+    # Progress (0-100) and current stage, updated by the worker
+    progress = models.PositiveSmallIntegerField(default=0)
+    stage = models.CharField(max_length=50, blank=True)
+
+    # Timing
+    created_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    stage_timings = models.JSONField(
+        default=dict, blank=True, help_text="Seconds spent in each generation stage"
+    )
+
+    attempts = models.PositiveSmallIntegerField(default=0)
+    error = models.TextField(blank=True)
+    result = models.JSONField(null=True, blank=True, help_text="Serialized RebalancingPlan")
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="rebal_job_status_created"),
+            models.Index(fields=["account", "data_version"], name="rebal_job_account_version"),
+        ]
+
+    def __str__(self) -> str:
+        return f"Rebalancing job {self.pk} ({self.status}) for {self.account.name}"
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
+    @property
+    def duration_seconds(self) -> float | None:
+        """Wall-clock run time, or None if the job has not finished."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return (self.finished_at - self.started_at).total_seconds()
+
+
 class RebalancingRecommendation(models.Model):
     """Recommended trade to rebalance portfolio."""
 
@@ -17,10 +87,24 @@ class RebalancingRecommendation(models.Model):
     ]
 
     account = models.ForeignKey("Account", on_delete=models.CASCADE, related_name="recommendations")
+    job = models.ForeignKey(
+        RebalancingJob,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="recommendations",
+    )
     security = models.ForeignKey("Security", on_delete=models.CASCADE)
     action = models.CharField(max_length=4, choices=ACTIONS)
     shares = models.DecimalField(max_digits=15, decimal_places=4)
     estimated_amount = models.DecimalField(max_digits=15, decimal_places=2)
+    price_per_share = models.DecimalField(
+        max_digits=15,
+        decimal_places=4,
+        null=True,
+        blank=True,
+        help_text="Price the order was estimated at (empty for rows saved before it was recorded)",
+    )
     reason = models.CharField(max_length=255, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -46,6 +46,7 @@ class SecurityPrice(models.Model):
     - One record per security per market timestamp
     - price_datetime: Actual market time from data provider (used for lookups)
     - fetched_at: When we retrieved the price (audit trail only)
+    - updated_at: Last write, so in-place corrections change the data version
     - Tracks price source (yfinance, manual, etc.)
     - Audit trail via fetched_at timestamp
     - Supports time-travel queries for historical analysis
@@ -76,6 +77,9 @@ class SecurityPrice(models.Model):
     fetched_at = models.DateTimeField(
         auto_now_add=True, help_text="When we fetched this price from data source (audit trail)"
     )
+    updated_at = models.DateTimeField(
+        auto_now=True, help_text="Last write, including in-place corrections (data versioning)"
+    )
     # Source tracking
     YFINANCE = "yfinance"
     MANUAL = "manual"
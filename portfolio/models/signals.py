@@ -1,23 +1,54 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
 from typing import Any
 
+from django.db import transaction
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from portfolio.models.strategies import TargetAllocation
+from portfolio.models.accounts import Account, AccountGroup, AccountType
+from portfolio.models.assets import AssetClass, AssetClassCategory
+from portfolio.models.portfolio import Portfolio
+from portfolio.models.securities import Holding, Security, SecurityPrice
+from portfolio.models.strategies import (
+    AccountTypeStrategyAssignment,
+    AllocationStrategy,
+    TargetAllocation,
+)
 
 logger = logging.getLogger(__name__)
 
+_target_signals_suppressed: ContextVar[bool] = ContextVar(
+    "target_signals_suppressed", default=False
+)
+
+
+@contextmanager
+def suppress_target_allocation_signals() -> Iterator[None]:
+    """
+    Skip the per-row TargetAllocation receivers inside the block.
+
+    For bulk writes of a strategy's allocations: the caller validates the
+    strategy and bumps the portfolio version once instead of once per row.
+    """
+    token = _target_signals_suppressed.set(True)
+    try:
+        yield
+    finally:
+        _target_signals_suppressed.reset(token)
+
 
 @receiver([post_save, post_delete], sender=TargetAllocation)
 def validate_strategy_allocations_on_change(
     sender: type[TargetAllocation], instance: TargetAllocation, **kwargs: Any
 ) -> None:
     """Validate strategy allocations after any allocation change."""
-    if kwargs.get("raw", False):
-        # Skip validation during fixture loading
+    if kwargs.get("raw", False) or _target_signals_suppressed.get():
+        # Skip validation during fixture loading and bulk saves
         return
 
     # Validate the strategy's allocations
@@ -27,3 +58,220 @@ def validate_strategy_allocations_on_change(
         # Log warning but don't raise - this allows gradual fixes
         # In production, you might want to raise ValidationError instead
         logger.warning(f"Strategy '{strategy.name}' has invalid allocations: {error_msg}")
+
+
+# ============================================================================
+# Portfolio data version
+# ============================================================================
+# Any change that affects computed allocations bumps Portfolio.version so API
+# ETags and cached fragments are invalidated. Bulk operations (bulk_create,
+# bulk_update, QuerySet.update) do not send signals and must call
+# Portfolio.objects...bump_version() themselves.
+
+
+def _is_cascade(instance: Any, kwargs: dict[str, Any]) -> bool:
+    """True when a delete was cascaded from another object (its origin bumps)."""
+    origin = kwargs.get("origin")
+    return origin is not None and origin is not instance
+
+
+@receiver([post_save, post_delete], sender=Holding)
+def bump_version_on_holding_change(sender: type[Holding], instance: Holding, **kwargs: Any) -> None:
+    if kwargs.get("raw", False) or _is_cascade(instance, kwargs):
+        return
+    Portfolio.objects.filter(accounts__id=instance.account_id).bump_version()
+
+
+@receiver([post_save, post_delete], sender=Account)
+def bump_version_on_account_change(sender: type[Account], instance: Account, **kwargs: Any) -> None:
+    if kwargs.get("raw", False) or _is_cascade(instance, kwargs):
+        return
+    Portfolio.objects.filter(id=instance.portfolio_id).bump_version()
+
+
+@receiver([post_save, post_delete], sender=TargetAllocation)
+def bump_version_on_target_change(
+    sender: type[TargetAllocation], instance: TargetAllocation, **kwargs: Any
+) -> None:
+    if (
+        kwargs.get("raw", False)
+        or _is_cascade(instance, kwargs)
+        or _target_signals_suppressed.get()
+    ):
+        return
+    Portfolio.objects.filter(user__allocation_strategies__id=instance.strategy_id).bump_version()
+
+
+@receiver([post_save, post_delete], sender=AllocationStrategy)
+@receiver([post_save, post_delete], sender=AccountTypeStrategyAssignment)
+def bump_version_on_strategy_change(
+    sender: type[AllocationStrategy] | type[AccountTypeStrategyAssignment],
+    instance: AllocationStrategy | AccountTypeStrategyAssignment,
+    **kwargs: Any,
+) -> None:
+    if kwargs.get("raw", False) or _is_cascade(instance, kwargs):
+        return
+    Portfolio.objects.filter(user_id=instance.user_id).bump_version()
+
+
+@receiver(post_save, sender=Portfolio)
+def bump_version_on_portfolio_change(
+    sender: type[Portfolio], instance: Portfolio, created: bool, **kwargs: Any
+) -> None:
+    if kwargs.get("raw", False) or created:
+        return
+    Portfolio.objects.filter(id=instance.id).bump_version()
+
+
+# ============================================================================
+# Reference data cache
+# ============================================================================
+# Asset classes, categories, account groups/types and securities are cached
+# per process (see portfolio.services.reference_data); reload on any change.
+# They feed every user's allocations but are not part of any portfolio, so a
+# change also bumps every Portfolio.version once the transaction commits.
+
+
+def _reference_data_committed() -> None:
+    from portfolio.services.reference_data import invalidate_reference_data
+
+    # Drop snapshots other threads loaded from pre-commit data
+    invalidate_reference_data()
+    Portfolio.objects.all().bump_version()
+
+
+@receiver([post_save, post_delete], sender=AssetClass)
+@receiver([post_save, post_delete], sender=AssetClassCategory)
+@receiver([post_save, post_delete], sender=AccountGroup)
+@receiver([post_save, post_delete], sender=AccountType)
+@receiver([post_save, post_delete], sender=Security)
+def invalidate_reference_data_on_change(sender: type[Any], **kwargs: Any) -> None:
+    from portfolio.services.reference_data import invalidate_reference_data
+
+    # Invalidate now too, so later reads in this transaction see the change
+    invalidate_reference_data()
+    transaction.on_commit(_reference_data_committed)
+
+
+# ============================================================================
+# Portfolio snapshots
+# ============================================================================
+# Rebuild the precomputed allocation rows of the accounts a change affects
+# (see portfolio.services.portfolio_snapshots). Scheduling is a no-op unless
+# settings.PORTFOLIO_SNAPSHOTS is on, and account-id querysets passed to it
+# are only evaluated then. Bulk writes call schedule_refresh() themselves.
+
+
+@receiver([post_save, post_delete], sender=Holding)
+def refresh_snapshot_on_holding_change(
+    sender: type[Holding], instance: Holding, **kwargs: Any
+) -> None:
+    # Cascaded deletes are included: deleting a security removes holdings
+    # from accounts that still exist
+    if kwargs.get("raw", False):
+        return
+    from portfolio.services.portfolio_snapshots import schedule_refresh
+
+    schedule_refresh([instance.account_id])
+
+
+@receiver([post_save, post_delete], sender=SecurityPrice)
+def refresh_snapshot_on_price_change(
+    sender: type[SecurityPrice], instance: SecurityPrice, **kwargs: Any
+) -> None:
+    if kwargs.get("raw", False) or _is_cascade(instance, kwargs):
+        return
+    from portfolio.services.portfolio_snapshots import schedule_refresh
+
+    schedule_refresh(
+        Holding.objects.filter(security_id=instance.security_id)
+        .values_list("account_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=Security)
+def refresh_snapshot_on_security_change(
+    sender: type[Security], instance: Security, created: bool, **kwargs: Any
+) -> None:
+    # A reassigned asset class moves the holders' value to another row. Held
+    # securities cannot be deleted (Holding.security is PROTECT)
+    if kwargs.get("raw", False) or created:
+        return
+    from portfolio.services.portfolio_snapshots import schedule_refresh
+
+    schedule_refresh(
+        Holding.objects.filter(security_id=instance.id)
+        .values_list("account_id", flat=True)
+        .distinct()
+    )
+
+
+@receiver(post_save, sender=Account)
+def refresh_snapshot_on_account_change(
+    sender: type[Account], instance: Account, **kwargs: Any
+) -> None:
+    # Deleted accounts lose their snapshot rows by cascade
+    if kwargs.get("raw", False):
+        return
+    from portfolio.services.portfolio_snapshots import schedule_refresh
+
+    schedule_refresh([instance.id])
+
+
+@receiver([post_save, post_delete], sender=TargetAllocation)
+def refresh_snapshot_on_target_change(
+    sender: type[TargetAllocation], instance: TargetAllocation, **kwargs: Any
+) -> None:
+    if (
+        kwargs.get("raw", False)
+        or _is_cascade(instance, kwargs)
+        or _target_signals_suppressed.get()
+    ):
+        return
+    from portfolio.services.portfolio_snapshots import accounts_using_strategy, schedule_refresh
+
+    schedule_refresh(accounts_using_strategy(instance.strategy_id))
+
+
+@receiver(post_delete, sender=AllocationStrategy)
+def refresh_snapshot_on_strategy_delete(
+    sender: type[AllocationStrategy], instance: AllocationStrategy, **kwargs: Any
+) -> None:
+    # References to the strategy are already nulled, so any of the user's
+    # accounts may have fallen back to another strategy
+    if _is_cascade(instance, kwargs):
+        return
+    from portfolio.services.portfolio_snapshots import schedule_refresh
+
+    schedule_refresh(Account.objects.filter(user_id=instance.user_id).values_list("id", flat=True))
+
+
+@receiver([post_save, post_delete], sender=AccountTypeStrategyAssignment)
+def refresh_snapshot_on_assignment_change(
+    sender: type[AccountTypeStrategyAssignment],
+    instance: AccountTypeStrategyAssignment,
+    **kwargs: Any,
+) -> None:
+    if kwargs.get("raw", False) or _is_cascade(instance, kwargs):
+        return
+    from portfolio.services.portfolio_snapshots import schedule_refresh
+
+    schedule_refresh(
+        Account.objects.filter(
+            user_id=instance.user_id,
+            account_type_id=instance.account_type_id,
+            allocation_strategy__isnull=True,
+        ).values_list("id", flat=True)
+    )
+
+
+@receiver(post_save, sender=Portfolio)
+def refresh_snapshot_on_portfolio_change(
+    sender: type[Portfolio], instance: Portfolio, created: bool, **kwargs: Any
+) -> None:
+    if kwargs.get("raw", False) or created:
+        return
+    from portfolio.services.portfolio_snapshots import schedule_refresh
+
+    schedule_refresh(instance.accounts.values_list("id", flat=True))
@@ -154,18 +154,39 @@ class AllocationStrategy(models.Model):
         logger.info(
             f"Saving {len(final_allocations)} allocations for strategy '{self.name}' (user {self.user_id})"
         )
-        with transaction.atomic():
+        from portfolio.models.portfolio import Portfolio
+        from portfolio.models.signals import suppress_target_allocation_signals
+        from portfolio.services.portfolio_snapshots import (
+            accounts_using_strategy,
+            schedule_refresh,
+        )
+
+        # Bulk write: per-row signals would re-validate the whole strategy and
+        # bump the portfolio version once per row, so validate and bump once.
+        with transaction.atomic(), suppress_target_allocation_signals():
             # Clear existing allocations
             self.target_allocations.all().delete()
 
             # Create all allocations (only non-zero values)
-            for asset_class_id, target_percent in final_allocations.items():
-                if target_percent > Decimal("0.00"):
-                    TargetAllocation.objects.create(
-                        strategy=self,
-                        asset_class_id=asset_class_id,
-                        target_percent=target_percent,
-                    )
+            TargetAllocation.objects.bulk_create(
+                TargetAllocation(
+                    strategy=self,
+                    asset_class_id=asset_class_id,
+                    target_percent=target_percent,
+                )
+                for asset_class_id, target_percent in final_allocations.items()
+                if target_percent > Decimal("0.00")
+            )
+
+            Portfolio.objects.filter(user_id=self.user_id).bump_version()
+            schedule_refresh(accounts_using_strategy(self.id))
+            transaction.on_commit(self._validate_saved_allocations)
+
+    def _validate_saved_allocations(self) -> None:
+        """Re-check the stored allocations once the save has committed."""
+        is_valid, error_msg = self.validate_allocations()
+        if not is_valid:
+            logger.warning(f"Strategy '{self.name}' has invalid allocations: {error_msg}")
 
     def calculate_cash_allocation(self, non_cash_allocations: dict[int, Decimal]) -> Decimal:
         """
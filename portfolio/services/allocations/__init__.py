@@ -3,36 +3,48 @@ Modern allocation calculations module.
 
 Public API:
     - AllocationEngine - Main engine class
-    - get_presentation_rows(user) -> list[dict]
-    - get_holdings_rows(user, account_id) -> list[dict]
-    - get_aggregated_holdings_rows(user, target_mode) -> list[dict]
+    - AssetLocationOptimizer - Tax-aware asset location targets
+    - BatchAllocationEngine - Many users per query batch (nightly reporting)
+    - get_presentation_rows(user, display) -> list[dict]
+    - get_holdings_rows(user, account_id, display) -> list[dict]
+    - get_aggregated_holdings_rows(user, target_mode, display) -> list[dict]
     - get_sidebar_data(user) -> SidebarData
     - get_account_totals(user) -> dict[int, Decimal]
 """
 
 from typing import Any
 
+from .batch import BatchAllocationEngine
 from .engine import AllocationEngine
-from .types import HierarchyLevel, HoldingRow, PresentationRow, SidebarData
+from .location import AssetLocationDataProvider, AssetLocationOptimizer
+from .snapshot import HoldingsSnapshot
+from .types import HierarchyLevel, HoldingDelta, HoldingRow, PresentationRow, SidebarData
 
 __all__ = [
     "AllocationEngine",
+    "AssetLocationDataProvider",
+    "AssetLocationOptimizer",
+    "BatchAllocationEngine",
     "HierarchyLevel",
+    "HoldingDelta",
     "HoldingRow",
+    "HoldingsSnapshot",
     "PresentationRow",
     "SidebarData",
 ]
 
 
 # Convenience functions
-def get_presentation_rows(user: Any) -> list[dict]:
+def get_presentation_rows(user: Any, display: bool = False) -> list[dict]:
     """Get allocation presentation data."""
-    return AllocationEngine().get_presentation_rows(user)
+    return AllocationEngine().get_presentation_rows(user, display=display)
 
 
-def get_holdings_rows(user: Any, account_id: int | None = None) -> list[dict]:
+def get_holdings_rows(
+    user: Any, account_id: int | None = None, display: bool = False
+) -> list[dict]:
     """Get holdings detail data."""
-    return AllocationEngine().get_holdings_rows(user, account_id)
+    return AllocationEngine().get_holdings_rows(user, account_id, display=display)
 
 
 def get_sidebar_data(user: Any) -> SidebarData:
@@ -45,9 +57,11 @@ def get_account_totals(user: Any) -> dict[int, Any]:
     return AllocationEngine().get_account_totals(user)
 
 
-def get_aggregated_holdings_rows(user: Any, target_mode: str = "effective") -> list[dict]:
+def get_aggregated_holdings_rows(
+    user: Any, target_mode: str = "effective", display: bool = False
+) -> list[dict]:
     """Get aggregated holdings across all accounts."""
-    return AllocationEngine().get_aggregated_holdings_rows(user, target_mode)
+    return AllocationEngine().get_aggregated_holdings_rows(user, target_mode, display=display)
 
 
 # Add convenience functions to __all__
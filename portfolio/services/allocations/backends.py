@@ -0,0 +1,43 @@
+"""
+Calculator backend selection.
+
+``settings.ALLOCATION_CALCULATOR`` picks the ``AllocationCalculator``
+implementation the engines build by default:
+
+- ``pandas`` (default): ``AllocationCalculator``
+- ``polars``: ``PolarsAllocationCalculator``, which needs the optional
+  ``polars`` package (``pip install portfolio-management[polars]``)
+"""
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .calculations import AllocationCalculator
+
+CALCULATOR_BACKENDS = ("pandas", "polars")
+
+
+def make_calculator(backend: str | None = None) -> AllocationCalculator:
+    """
+    Build the calculator for ``backend`` (default: ``settings.ALLOCATION_CALCULATOR``).
+
+    Raises:
+        ImproperlyConfigured: If the backend is unknown, or is ``polars`` and
+            polars is not installed.
+    """
+    backend = (backend or settings.ALLOCATION_CALCULATOR).lower()
+    if backend == "pandas":
+        return AllocationCalculator()
+    if backend == "polars":
+        try:
+            from .polars_calculations import PolarsAllocationCalculator
+        except ImportError as e:
+            raise ImproperlyConfigured(
+                "ALLOCATION_CALCULATOR=polars requires the polars package "
+                "(pip install portfolio-management[polars])."
+            ) from e
+        return PolarsAllocationCalculator()
+    raise ImproperlyConfigured(
+        f"Unknown ALLOCATION_CALCULATOR {backend!r}; "
+        f"expected one of {', '.join(CALCULATOR_BACKENDS)}."
+    )
@@ -0,0 +1,393 @@
+"""
+Multi-user batch allocation engine.
+
+``AllocationEngine`` loads and computes one user at a time. For nightly
+reporting across every user, ``BatchAllocationEngine`` loads holdings,
+targets and account metadata for a shard of users in a fixed handful of
+queries, then runs the same ``AllocationCalculator`` over a holdings frame
+that carries an extra ``user_id`` column:
+
+- snapshot rows (``PortfolioSnapshot`` format) are computed in one calculator
+  call per shard, since account ids are unique across users
+- presentation rows are computed per user from groups of the shard frame
+
+Shards are processed inline, or in parallel when an executor (usually from
+``make_batch_executor()``) is passed. Workers build their own engine with the
+calculator configured by ``ALLOCATION_CALCULATOR`` and the default formatter.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+from collections import defaultdict
+from collections.abc import Callable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any
+
+import django
+from django.db.models import F, OuterRef, Subquery
+
+import pandas as pd
+import structlog
+
+from portfolio.services.metrics import ENGINE_STAGE_DURATION
+
+from .backends import make_calculator
+from .calculations import AllocationCalculator
+from .data_providers import HOLDINGS_LABEL_COLUMNS, categorize_labels
+from .formatters import AllocationFormatter
+from .snapshot import HOLDINGS_COLUMNS
+from .types import TargetMap
+
+logger = structlog.get_logger(__name__)
+
+# Users per shard: bounds the size of each shard's queries and frames
+DEFAULT_SHARD_SIZE = 200
+
+
+@dataclass(frozen=True)
+class BatchInputs:
+    """Allocation inputs for a set of users, keyed by user id."""
+
+    holdings_df: pd.DataFrame
+    """``get_holdings_df`` columns preceded by ``user_id``."""
+    accounts: dict[int, list[dict[str, Any]]]
+    """Account metadata in ``get_accounts_metadata`` list format."""
+    accounts_by_type: dict[int, dict[int, list[dict[str, Any]]]]
+    targets_maps: dict[int, TargetMap]
+    policy_targets: dict[int, dict[str, Decimal]]
+    target_strategies: dict[int, dict[str, dict[int, int]]]
+
+    @property
+    def user_by_account(self) -> dict[int, int]:
+        return {acc["id"]: user_id for user_id, accs in self.accounts.items() for acc in accs}
+
+
+class BatchDataProvider:
+    """
+    Loads allocation inputs for many users at once.
+
+    Mirrors ``DjangoDataProvider``'s per-user methods, including the effective
+    target hierarchy of ``Account.get_effective_allocation_strategy`` (account
+    override, then account type assignment, then portfolio strategy).
+    """
+
+    def load(self, user_ids: Sequence[int]) -> BatchInputs:
+        """Load everything the batch engine needs for ``user_ids``."""
+        from portfolio.models import (
+            Account,
+            AccountTypeStrategyAssignment,
+            Portfolio,
+            TargetAllocation,
+        )
+
+        accounts = list(
+            Account.objects.filter(user_id__in=user_ids)
+            .order_by("id")
+            .values(
+                "id",
+                "user_id",
+                "name",
+                "account_type__id",
+                "account_type__code",
+                "account_type__label",
+                "account_type__group__name",
+                "institution__name",
+                "allocation_strategy_id",
+                "portfolio__allocation_strategy_id",
+            )
+        )
+        type_assignments = {
+            (user_id, type_id): strategy_id
+            for user_id, type_id, strategy_id in AccountTypeStrategyAssignment.objects.filter(
+                user_id__in=user_ids
+            ).values_list("user_id", "account_type_id", "allocation_strategy_id")
+        }
+        # First portfolio by name per user, as DjangoDataProvider.get_policy_targets
+        policy_strategies: dict[int, int | None] = {}
+        for user_id, strategy_id in (
+            Portfolio.objects.filter(user_id__in=user_ids)
+            .order_by("user_id", "name")
+            .values_list("user_id", "allocation_strategy_id")
+        ):
+            policy_strategies.setdefault(user_id, strategy_id)
+
+        effective: dict[int, int | None] = {}
+        for acc in accounts:
+            effective[acc["id"]] = (
+                acc["allocation_strategy_id"]
+                or type_assignments.get((acc["user_id"], acc["account_type__id"]))
+                or acc["portfolio__allocation_strategy_id"]
+            )
+
+        strategy_ids = {s for s in effective.values() if s} | {
+            s for s in policy_strategies.values() if s
+        }
+        allocations: dict[int, dict[str, Decimal]] = defaultdict(dict)
+        for strategy_id, name, pct in TargetAllocation.objects.filter(
+            strategy_id__in=strategy_ids
+        ).values_list("strategy_id", "asset_class__name", "target_percent"):
+            allocations[strategy_id][name] = pct
+
+        accounts_meta: dict[int, list[dict[str, Any]]] = {user_id: [] for user_id in user_ids}
+        accounts_by_type: dict[int, dict[int, list[dict[str, Any]]]] = {
+            user_id: defaultdict(list) for user_id in user_ids
+        }
+        targets_maps: dict[int, TargetMap] = {user_id: {} for user_id in user_ids}
+        target_strategies: dict[int, dict[str, dict[int, int]]] = {
+            user_id: {
+                "at_strategy_map": {},
+                "acc_strategy_map": {},
+            }
+            for user_id in user_ids
+        }
+        for (user_id, type_id), strategy_id in type_assignments.items():
+            target_strategies[user_id]["at_strategy_map"][type_id] = strategy_id
+
+        for acc in accounts:
+            user_id = acc["user_id"]
+            accounts_meta[user_id].append(
+                {
+                    key: acc[key]
+                    for key in (
+                        "id",
+                        "name",
+                        "account_type__id",
+                        "account_type__code",
+                        "account_type__label",
+                        "account_type__group__name",
+                        "institution__name",
+                    )
+                }
+            )
+            accounts_by_type[user_id][acc["account_type__id"]].append(
+                {
+                    "id": acc["id"],
+                    "name": acc["name"],
+                    "type_code": acc["account_type__code"],
+                    "type_label": acc["account_type__label"],
+                    "institution": acc["institution__name"],
+                }
+            )
+            effective_id = effective[acc["id"]]
+            if effective_id and allocations.get(effective_id):
+                targets_maps[user_id][acc["id"]] = dict(allocations[effective_id])
+            if acc["allocation_strategy_id"]:
+                target_strategies[user_id]["acc_strategy_map"][acc["id"]] = acc[
+                    "allocation_strategy_id"
+                ]
+
+        policy_targets = {
+            user_id: dict(allocations.get(policy_strategies.get(user_id) or 0, {}))
+            for user_id in user_ids
+        }
+
+        return BatchInputs(
+            holdings_df=self.get_holdings_df(user_ids),
+            accounts=accounts_meta,
+            accounts_by_type={k: dict(v) for k, v in accounts_by_type.items()},
+            targets_maps=targets_maps,
+            policy_targets=policy_targets,
+            target_strategies=target_strategies,
+        )
+
+    def get_holdings_df(self, user_ids: Sequence[int]) -> pd.DataFrame:
+        """Holdings of all ``user_ids`` in ``get_holdings_df`` format plus ``user_id``."""
+        from portfolio.models import Holding, SecurityPrice
+
+        latest_price = Subquery(
+            SecurityPrice.objects.filter(security_id=OuterRef("security_id"))
+            .order_by("-price_datetime")
+            .values("price")[:1]
+        )
+        qs = (
+            Holding.objects.filter(account__portfolio__user_id__in=user_ids)
+            .annotate(price=latest_price, value=F("shares") * F("price"))
+            .values_list(
+                "account__portfolio__user_id",
+                "account_id",
+                "account__name",
+                "account__account_type__code",
+                "security__asset_class__name",
+                "security__asset_class__id",
+                "security__asset_class__category__code",
+                "security__ticker",
+                "shares",
+                "price",
+                "value",
+            )
+        )
+        df = pd.DataFrame.from_records(
+            list(qs), columns=["user_id", *HOLDINGS_COLUMNS], coerce_float=True
+        )
+        return categorize_labels(df, HOLDINGS_LABEL_COLUMNS)
+
+
+class BatchAllocationEngine:
+    """
+    Allocation results for many users per query batch.
+
+    Usage:
+        engine = BatchAllocationEngine()
+        with make_batch_executor(4) as executor:
+            rows_by_user = engine.get_presentation_rows(user_ids, executor=executor)
+    """
+
+    def __init__(
+        self,
+        calculator: AllocationCalculator | None = None,
+        data_provider: BatchDataProvider | None = None,
+        formatter: AllocationFormatter | None = None,
+    ):
+        self.calculator = calculator or make_calculator()
+        self.data_provider = data_provider or BatchDataProvider()
+        self.formatter = formatter or AllocationFormatter()
+
+    def get_presentation_rows(
+        self,
+        user_ids: Sequence[int],
+        executor: Executor | None = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+    ) -> dict[int, list[dict[str, Any]]]:
+        """
+        Presentation rows (as ``AllocationEngine.get_presentation_rows``) per user.
+
+        Users without holdings map to an empty list.
+        """
+        result: dict[int, list[dict[str, Any]]] = {}
+        for shard in _run_shards(
+            self._presentation_rows, _presentation_rows_shard, user_ids, executor, shard_size
+        ):
+            result.update(shard)
+        return result
+
+    def get_snapshot_rows(
+        self,
+        user_ids: Sequence[int],
+        executor: Executor | None = None,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        ``AllocationCalculator.calculate_account_snapshot`` rows for all accounts.
+
+        Returns:
+            (class_rows, account_rows), each with a leading ``user_id`` column
+        """
+        shards = _run_shards(
+            self._snapshot_rows, _snapshot_rows_shard, user_ids, executor, shard_size
+        )
+        if not shards:
+            return pd.DataFrame(), pd.DataFrame()
+        class_frames, account_frames = zip(*shards, strict=True)
+        return (
+            pd.concat(class_frames, ignore_index=True),
+            pd.concat(account_frames, ignore_index=True),
+        )
+
+    def _presentation_rows(self, user_ids: Sequence[int]) -> dict[int, list[dict[str, Any]]]:
+        from portfolio.services.reference_data import get_reference_data
+
+        with ENGINE_STAGE_DURATION.time(operation="batch_presentation", stage="load"):
+            inputs = self.data_provider.load(user_ids)
+            asset_classes_df = get_reference_data().asset_classes_df
+
+        result: dict[int, list[dict[str, Any]]] = {user_id: [] for user_id in user_ids}
+        for user_id, holdings_df in inputs.holdings_df.groupby("user_id", sort=False):
+            user_id = int(user_id)
+            try:
+                account_totals = (
+                    holdings_df.groupby("account_id")["value"]
+                    .sum()
+                    .apply(lambda x: Decimal(str(x)))
+                    .to_dict()
+                )
+                with ENGINE_STAGE_DURATION.time(operation="batch_presentation", stage="calculate"):
+                    presentation_df = self.calculator.build_presentation_dataframe(
+                        holdings_df=holdings_df.drop(columns="user_id").reset_index(drop=True),
+                        asset_classes_df=asset_classes_df,
+                        targets_map=inputs.targets_maps[user_id],
+                        account_totals=account_totals,
+                        policy_targets=inputs.policy_targets[user_id],
+                    )
+                if presentation_df.empty:
+                    continue
+                with ENGINE_STAGE_DURATION.time(operation="batch_presentation", stage="format"):
+                    result[user_id] = self.formatter.to_presentation_rows(
+                        df=presentation_df,
+                        accounts_by_type=inputs.accounts_by_type[user_id],
+                        target_strategies=inputs.target_strategies[user_id],
+                    )
+            except Exception as e:
+                # One user's bad data must not fail the whole report
+                logger.error(
+                    "batch_presentation_rows_failed",
+                    user_id=user_id,
+                    error=str(e),
+                    exc_info=True,
+                )
+
+        logger.info("batch_presentation_rows_built", users=len(user_ids))
+        return result
+
+    def _snapshot_rows(self, user_ids: Sequence[int]) -> tuple[pd.DataFrame, pd.DataFrame]:
+        with ENGINE_STAGE_DURATION.time(operation="batch_snapshot", stage="load"):
+            inputs = self.data_provider.load(user_ids)
+
+        targets_map: TargetMap = {}
+        for user_targets in inputs.targets_maps.values():
+            targets_map.update(user_targets)
+        user_by_account = inputs.user_by_account
+
+        with ENGINE_STAGE_DURATION.time(operation="batch_snapshot", stage="calculate"):
+            class_rows, account_rows = self.calculator.calculate_account_snapshot(
+                inputs.holdings_df, targets_map, list(user_by_account)
+            )
+        for frame in (class_rows, account_rows):
+            frame.insert(0, "user_id", frame["account_id"].map(user_by_account).astype("int64"))
+
+        logger.info("batch_snapshot_rows_built", users=len(user_ids), accounts=len(account_rows))
+        return class_rows, account_rows
+
+
+def make_batch_executor(workers: int) -> ProcessPoolExecutor:
+    """
+    Process pool for batch shards.
+
+    Workers are spawned and run ``django.setup()`` first, as the solver pool
+    (see rebalancing/solver.py). The caller owns the pool and shuts it down.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=django.setup,
+    )
+
+
+def _run_shards[T](
+    inline: Callable[[Sequence[int]], T],
+    worker: Callable[[list[int]], T],
+    user_ids: Sequence[int],
+    executor: Executor | None,
+    shard_size: int,
+) -> list[T]:
+    """Split users into shards and run them inline or in ``executor``."""
+    ids = list(user_ids)
+    shards = [ids[i : i + shard_size] for i in range(0, len(ids), shard_size)]
+    if executor is None:
+        return [inline(shard) for shard in shards]
+
+    logger.info("batch_shards_submitted", users=len(ids), shards=len(shards))
+    return list(executor.map(worker, shards))
+
+
+# Module-level shard entry points so they can be pickled to worker processes
+
+
+def _presentation_rows_shard(user_ids: list[int]) -> dict[int, list[dict[str, Any]]]:
+    return BatchAllocationEngine()._presentation_rows(user_ids)
+
+
+def _snapshot_rows_shard(user_ids: list[int]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    return BatchAllocationEngine()._snapshot_rows(user_ids)
@@ -2,10 +2,12 @@
 
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import structlog
 
-from portfolio.services.allocations.types import HierarchyLevel
+from portfolio.services.allocations.snapshot import HoldingsSnapshot
+from portfolio.services.allocations.types import HierarchyLevel, SidebarMetrics
 
 logger = structlog.get_logger(__name__)
 
@@ -156,8 +158,10 @@ class AllocationCalculator:
         return result
 
     def calculate_sidebar_metrics(
-        self, holdings_df: pd.DataFrame, targets_map: dict[int, dict[str, Any]]
-    ) -> dict[str, Any]:
+        self,
+        holdings_df: pd.DataFrame | HoldingsSnapshot,
+        targets_map: dict[int, dict[str, Any]],
+    ) -> SidebarMetrics:
         """
         Calculate sidebar metrics using vectorized operations.
 
@@ -165,7 +169,7 @@ class AllocationCalculator:
 
         Args:
             holdings_df: Long-format DataFrame with columns:
-                account_id, asset_class, value
+                account_id, asset_class, value; or a HoldingsSnapshot
             targets_map: {account_id: {asset_class_name: target_pct}}
 
         Returns:
@@ -176,6 +180,9 @@ class AllocationCalculator:
         """
         from decimal import Decimal
 
+        if isinstance(holdings_df, HoldingsSnapshot):
+            return self._calculate_sidebar_metrics_from_snapshot(holdings_df, targets_map)
+
         if holdings_df.empty:
             return {
                 "account_totals": {},
@@ -205,7 +212,12 @@ class AllocationCalculator:
                 )
 
         if targets_records:
-            targets_df = pd.DataFrame(targets_records)
+            # Same asset_class dtype as the holdings (categorical codes join)
+            targets_df = (
+                pd.DataFrame(targets_records)
+                .astype({"asset_class": holdings_df["asset_class"].dtype})
+                .dropna(subset=["asset_class"])
+            )
 
             # Step 2: Merge holdings with targets (true vectorization)
             holdings_with_targets = holdings_df.merge(
@@ -249,6 +261,155 @@ class AllocationCalculator:
             "grand_total": grand_total,
         }
 
+    def _calculate_sidebar_metrics_from_snapshot(
+        self, snapshot: HoldingsSnapshot, targets_map: dict[int, dict[str, Any]]
+    ) -> SidebarMetrics:
+        """
+        Sidebar metrics computed directly on snapshot arrays.
+
+        Targets are looked up through a dense (account × asset class) matrix
+        indexed by the snapshot's codes instead of a string-keyed merge.
+        """
+        from decimal import Decimal
+
+        if snapshot.is_empty:
+            return {
+                "account_totals": {},
+                "account_variances": {},
+                "grand_total": Decimal("0.00"),
+            }
+
+        totals = snapshot.account_totals()
+        account_totals = {int(k): Decimal(str(v)) for k, v in totals.items()}
+
+        # Per-row account total and target percentage via code lookups
+        totals_by_code = totals.reindex(snapshot.account_ids).to_numpy()
+        row_account_total = totals_by_code[snapshot.account_codes]
+        row_target_pct = snapshot.target_matrix(targets_map)[
+            snapshot.account_codes, snapshot.asset_class_codes
+        ]
+        deviation = np.abs(snapshot.values - row_account_total * (row_target_pct / 100.0))
+
+        deviation_sum = pd.Series(deviation).groupby(snapshot.account_codes).sum()
+        deviation_sum.index = pd.Index(snapshot.account_ids[deviation_sum.index])
+        deviation_sum = deviation_sum.sort_index()
+        totals_aligned = totals.reindex(deviation_sum.index).to_numpy()
+        variance_values = np.where(
+            totals_aligned > 0,
+            deviation_sum.to_numpy() / np.where(totals_aligned > 0, totals_aligned, 1.0) * 100,
+            0.0,
+        )
+        variances = {
+            int(k): float(v) for k, v in zip(deviation_sum.index, variance_values, strict=True)
+        }
+
+        return {
+            "account_totals": account_totals,
+            "account_variances": variances,
+            "grand_total": sum(account_totals.values(), Decimal("0.00")),
+        }
+
+    def calculate_account_snapshot(
+        self,
+        holdings_df: pd.DataFrame,
+        targets_map: dict[int, dict[str, Any]],
+        account_ids: list[int],
+    ) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Per-account allocation rows for the precomputed portfolio snapshot.
+
+        Account totals and absolute deviations come from
+        ``calculate_sidebar_metrics`` so the stored numbers match what the
+        sidebar computes live.
+
+        Args:
+            holdings_df: Long-format holdings (``get_holdings_df`` format)
+            targets_map: {account_id: {asset_class_name: target_pct}}
+            account_ids: Accounts to build rows for (including accounts
+                without holdings)
+
+        Returns:
+            (class_rows, account_rows):
+            - class_rows: one row per (account, asset class) held or targeted
+              with columns account_id, asset_class, held, actual, target_pct,
+              target_value, variance, variance_pct, account_total
+            - account_rows: one row per account with columns account_id,
+              held, total, variance_pct
+        """
+        class_columns = [
+            "account_id",
+            "asset_class",
+            "held",
+            "actual",
+            "target_pct",
+            "target_value",
+            "variance",
+            "variance_pct",
+            "account_total",
+        ]
+
+        if not holdings_df.empty:
+            holdings_df = holdings_df[holdings_df["account_id"].isin(account_ids)]
+        metrics = self.calculate_sidebar_metrics(
+            HoldingsSnapshot.from_dataframe(holdings_df), targets_map
+        )
+        totals = pd.Series(
+            {acc_id: float(total) for acc_id, total in metrics["account_totals"].items()},
+            dtype="float64",
+        )
+
+        account_rows = pd.DataFrame({"account_id": pd.Series(account_ids, dtype="int64")})
+        account_rows["held"] = account_rows["account_id"].isin(totals.index)
+        account_rows["total"] = account_rows["account_id"].map(totals).fillna(0.0)
+        account_rows["variance_pct"] = (
+            account_rows["account_id"].map(metrics["account_variances"]).fillna(0.0).astype(float)
+        )
+
+        if holdings_df.empty:
+            actual = pd.DataFrame(
+                {
+                    "account_id": pd.Series(dtype="int64"),
+                    "asset_class": pd.Series(dtype="object"),
+                    "actual": pd.Series(dtype="float64"),
+                }
+            )
+        else:
+            actual = (
+                holdings_df.groupby(["account_id", "asset_class"], as_index=False, observed=True)[
+                    "value"
+                ]
+                .sum()
+                .rename(columns={"value": "actual"})
+            )
+        actual["held"] = True
+
+        targets = pd.DataFrame(
+            [
+                (acc_id, name, float(pct))
+                for acc_id in account_ids
+                for name, pct in targets_map.get(acc_id, {}).items()
+            ],
+            columns=["account_id", "asset_class", "target_pct"],
+        )
+
+        if actual.empty and targets.empty:
+            return pd.DataFrame(columns=class_columns), account_rows
+
+        rows = actual.merge(targets, on=["account_id", "asset_class"], how="outer")
+        rows = rows.astype({"account_id": "int64"})
+        rows["held"] = rows["held"].astype("boolean").fillna(False).astype(bool)
+        rows["actual"] = rows["actual"].astype(float).fillna(0.0)
+        rows["target_pct"] = rows["target_pct"].astype(float).fillna(0.0)
+        rows["account_total"] = rows["account_id"].map(totals).fillna(0.0)
+        rows["target_value"] = rows["account_total"] * rows["target_pct"] / 100.0
+        rows["variance"] = rows["actual"] - rows["target_value"]
+        total = rows["account_total"].to_numpy()
+        rows["variance_pct"] = np.where(
+            total > 0, rows["variance"].to_numpy() / np.where(total > 0, total, 1.0) * 100, 0.0
+        )
+
+        return rows[class_columns], account_rows
+
     def _empty_allocations(self) -> dict[str, pd.DataFrame]:
         """Return empty DataFrames for empty portfolio."""
         return {
@@ -328,15 +489,18 @@ class AllocationCalculator:
             assert level_column is not None, "level_column required for non-portfolio levels"
             group_cols = [level_column, "asset_class_id"]
 
-        # Aggregate values
-        aggregated = holdings_df.groupby(group_cols)["value"].sum().to_frame(name="value")
+        # Aggregate values. Label columns are categorical: observed=True keeps
+        # unheld combinations out (pandas < 3 defaults to observed=False)
+        aggregated = (
+            holdings_df.groupby(group_cols, observed=True)["value"].sum().to_frame(name="value")
+        )
 
         # Calculate percentages
         if level == "portfolio":
             total = aggregated["value"].sum()
             aggregated["pct"] = aggregated["value"] / total * 100 if total > 0 else 0.0
         else:
-            aggregated["pct"] = aggregated.groupby(level=0)["value"].transform(
+            aggregated["pct"] = aggregated.groupby(level=0, observed=True)["value"].transform(
                 lambda x: x / x.sum() * 100 if x.sum() > 0 else 0.0
             )
 
@@ -402,7 +566,7 @@ class AllocationCalculator:
         8. Sort by hierarchy
 
         Args:
-            holdings_df: Long-format holdings
+            holdings_df: Long-format holdings (``get_holdings_df()`` schema)
             asset_classes_df: Asset class metadata
             targets_map: {account_id: {asset_class_name: target_pct}}
             account_totals: {account_id: total_value}
@@ -922,6 +1086,105 @@ class AllocationCalculator:
 
         return df
 
+    def apply_holding_delta(
+        self,
+        df: pd.DataFrame,
+        account_id: int,
+        account_type_code: str,
+        asset_class_id: int,
+        delta: float,
+    ) -> pd.DataFrame | None:
+        """
+        Patch a presentation DataFrame for a change in one account's holding.
+
+        Equivalent to rebuilding with ``build_presentation_dataframe`` after the
+        account's value in ``asset_class_id`` changed by ``delta``:
+
+        - dollar actuals change only on the rows along the hierarchy path
+          (asset class, category subtotal, group total, grand total)
+        - percentages, effective targets and account/portfolio policy values
+          are rescaled column-wise from the new totals; every subtotal stays
+          the sum of its rows because these are linear in the row values
+        - variances are recomputed and asset classes re-sorted within their
+          category, since the effective target drives the order
+
+        Args:
+            df: Presentation DataFrame from ``build_presentation_dataframe``
+            account_id: Account whose holding changed
+            account_type_code: Code of the account's type
+            asset_class_id: Asset class of the changed holding
+            delta: Change in market value
+
+        Returns:
+            The patched copy, or None when the change can't be applied
+            incrementally (the account, its type or the asset class has no
+            column/row yet, or a total drops to zero) and the frame must be
+            rebuilt.
+        """
+        portfolio_col = "portfolio_actual"
+        type_col = f"{account_type_code}_actual"
+        account_col = f"account_{account_id}_actual"
+        if df.empty or not {portfolio_col, type_col, account_col} <= set(df.columns):
+            return None
+
+        level = df["hierarchy_level"]
+        holding_rows = level == HierarchyLevel.HOLDING
+        class_row = holding_rows & (df["asset_class_id"] == asset_class_id)
+        if not class_row.any():
+            return None
+
+        grand = df.loc[level == HierarchyLevel.GRAND_TOTAL].iloc[0]
+        old_totals = {col: float(grand[col]) for col in (portfolio_col, type_col, account_col)}
+        new_totals = {col: total + delta for col, total in old_totals.items()}
+        if min(new_totals.values()) <= 0:
+            return None
+
+        df = df.copy()
+        if not delta:
+            return df
+
+        # Dollar actuals: only the rows on the asset class's hierarchy path
+        category_code = df.loc[class_row, "category_code"].iloc[0]
+        group_code = df.loc[class_row, "group_code"].iloc[0]
+        path = (
+            class_row
+            | ((level == HierarchyLevel.CATEGORY_SUBTOTAL) & (df["category_code"] == category_code))
+            | ((level == HierarchyLevel.GROUP_TOTAL) & (df["group_code"] == group_code))
+            | (level == HierarchyLevel.GRAND_TOTAL)
+        )
+        for col in (portfolio_col, type_col, account_col):
+            df.loc[path, col] += delta
+            df[f"{col}_pct"] = df[col] / new_totals[col] * 100
+
+        portfolio_total = new_totals[portfolio_col]
+        type_total = new_totals[type_col]
+
+        # Effective targets weight each account's target % by its total
+        policy_pct_col = f"account_{account_id}_policy_pct"
+        if policy_pct_col in df.columns:
+            weighted_delta = df[policy_pct_col] * delta / 100
+            df["portfolio_effective"] += weighted_delta
+            df[f"account_{account_id}_policy"] = df[policy_pct_col] * new_totals[account_col] / 100
+            if f"{account_type_code}_effective" in df.columns:
+                df[f"{account_type_code}_effective"] += weighted_delta
+
+        df["portfolio_effective_pct"] = df["portfolio_effective"] / portfolio_total * 100
+        if f"{account_type_code}_effective" in df.columns:
+            df[f"{account_type_code}_effective_pct"] = (
+                df[f"{account_type_code}_effective"] / type_total * 100
+            )
+        if "portfolio_policy_pct" in df.columns:
+            df["portfolio_policy"] = df["portfolio_policy_pct"] * portfolio_total / 100
+
+        df = self._calculate_variances_presentation(df)
+
+        # Re-sort asset classes; category and group blocks keep their positions
+        holding_positions = np.flatnonzero(holding_rows.to_numpy())
+        order = self._sort_presentation_dataframe(df.iloc[holding_positions]).index
+        positions = np.arange(len(df))
+        positions[holding_positions] = df.index.get_indexer(order)
+        return df.iloc[positions].reset_index(drop=True)
+
     # ========================================================================
     # Holdings Calculation Pipeline
     # ========================================================================
@@ -968,7 +1231,16 @@ class AllocationCalculator:
                 )
 
         if targets_records:
+            # Match the holdings' Asset_Class dtype so a categorical column is
+            # joined on its codes; targets outside its categories match nothing,
+            # so they are dropped before the cast rather than cast to NaN
+            asset_class_dtype = df["Asset_Class"].dtype
             targets_df = pd.DataFrame(targets_records)
+            if isinstance(asset_class_dtype, pd.CategoricalDtype):
+                targets_df = targets_df[
+                    targets_df["Asset_Class"].isin(asset_class_dtype.categories)
+                ]
+            targets_df = targets_df.astype({"Asset_Class": asset_class_dtype})
             df = df.merge(targets_df, on=["Account_ID", "Asset_Class"], how="left")
         else:
             df["Target_Pct"] = 0.0
@@ -980,7 +1252,9 @@ class AllocationCalculator:
         df["Account_Total"] = df["Account_ID"].map(account_totals)
 
         # Count securities per asset class per account (for splitting target across holdings)
-        sec_counts = df.groupby(["Account_ID", "Asset_Class"])["Ticker"].transform("count")
+        sec_counts = df.groupby(["Account_ID", "Asset_Class"], observed=True)["Ticker"].transform(
+            "count"
+        )
         df["Sec_Count"] = sec_counts
 
         # Calculate target value (split across securities in same asset class)
@@ -1057,7 +1331,7 @@ class AllocationCalculator:
         # Only include columns that exist
         agg_dict = {k: v for k, v in agg_dict.items() if k in holdings_df.columns}
 
-        df_aggregated = holdings_df.groupby("Ticker", as_index=False).agg(agg_dict)
+        df_aggregated = holdings_df.groupby("Ticker", as_index=False, observed=True).agg(agg_dict)
 
         # Set synthetic portfolio account ID
         df_aggregated["Account_ID"] = 0
@@ -1066,6 +1340,57 @@ class AllocationCalculator:
 
         return df_aggregated
 
+    def calculate_ticker_account_breakdown(
+        self, positions_df: pd.DataFrame, ticker: str
+    ) -> pd.DataFrame:
+        """
+        Break a single ticker's position down by account.
+
+        Args:
+            positions_df: All holdings of the accounts holding ``ticker``
+                (see DjangoDataProvider.get_ticker_positions_df)
+            ticker: Ticker to break down
+
+        Returns:
+            One row per account holding the ticker, sorted by account type, with
+            columns account_name, account_type_id, account_type_label, shares,
+            value, pct_of_account and pct_of_position
+        """
+        columns = [
+            "account_name",
+            "account_type_id",
+            "account_type_label",
+            "shares",
+            "value",
+            "pct_of_account",
+            "pct_of_position",
+        ]
+        if positions_df.empty:
+            return pd.DataFrame(columns=columns)
+
+        account_totals = positions_df.groupby("account_id")["value"].transform("sum")
+        df = positions_df.assign(account_total=account_totals)
+        df = df[df["ticker"] == ticker]
+
+        # Ticker rows per account are unique, but sum defensively
+        df = df.groupby(
+            ["account_id", "account_name", "account_type_id", "account_type_label"],
+            as_index=False,
+            sort=False,
+        ).agg(
+            shares=("shares", "sum"),
+            value=("value", "sum"),
+            account_total=("account_total", "first"),
+        )
+
+        position_total = df["value"].sum()
+        df["pct_of_account"] = (df["value"] / df["account_total"] * 100).where(
+            df["account_total"] > 0, 0.0
+        )
+        df["pct_of_position"] = df["value"] / position_total * 100 if position_total > 0 else 0.0
+
+        return df.sort_values("account_type_id", kind="stable")[columns].reset_index(drop=True)
+
     # ========================================================================
     # Holdings Aggregation Methods
     # ========================================================================
@@ -1128,7 +1453,7 @@ class AllocationCalculator:
             return pd.DataFrame()
 
         # Group by category
-        result = df.groupby(["Asset_Category", "Category_Code"])[agg_cols].sum()
+        result = df.groupby(["Asset_Category", "Category_Code"], observed=True)[agg_cols].sum()
         result = result.reset_index()
 
         # Add metadata columns
@@ -1136,7 +1461,9 @@ class AllocationCalculator:
 
         # Copy sort order from first item in group
         if "Category_Sort_Order" in df.columns:
-            category_metadata = df.groupby("Asset_Category")[["Category_Sort_Order"]].first()
+            category_metadata = df.groupby("Asset_Category", observed=True)[
+                ["Category_Sort_Order"]
+            ].first()
             result = result.merge(category_metadata, on="Asset_Category", how="left")
 
         return result
@@ -1168,14 +1495,14 @@ class AllocationCalculator:
             return pd.DataFrame()
 
         # Group by group code
-        result = df.groupby(["Asset_Group", "Group_Code"])[agg_cols].sum()
+        result = df.groupby(["Asset_Group", "Group_Code"], observed=True)[agg_cols].sum()
         result = result.reset_index()
 
         result["hierarchy_level"] = HierarchyLevel.GROUP_TOTAL
 
         # Copy sort order
         if "Group_Sort_Order" in df.columns:
-            group_metadata = df.groupby("Asset_Group")[["Group_Sort_Order"]].first()
+            group_metadata = df.groupby("Asset_Group", observed=True)[["Group_Sort_Order"]].first()
             result = result.merge(group_metadata, on="Asset_Group", how="left")
 
         return result
@@ -7,26 +7,190 @@ from typing import TYPE_CHECKING, Any
 
 from django.db.models import F
 
+import numpy as np
 import pandas as pd
 import structlog
 
+from .snapshot import HoldingsSnapshot
+
 if TYPE_CHECKING:
+    from collections.abc import Mapping
+    from typing import TypedDict
+
+    from django.db.models import QuerySet
+
+    from django_stubs_ext import WithAnnotations
+
     from portfolio.models import AssetClass, Holding, Security
 
+    class _LatestPrice(TypedDict):
+        price: Decimal | None
+        value: Decimal | None
+
+    # Holdings annotated by DjangoDataProvider._priced_holdings()
+    type PricedHoldings = QuerySet[WithAnnotations[Holding, _LatestPrice]]
+
 logger = structlog.get_logger(__name__)
 
+# Label columns of get_holdings_df() frames, with the ReferenceData.label_dtypes
+# entry holding each one's categories (None: the frame's own labels)
+HOLDINGS_LABEL_COLUMNS: dict[str, str | None] = {
+    "account_name": None,
+    "account_type_code": "account_type_code",
+    "asset_class": "asset_class",
+    "category_code": "category_code",
+    "ticker": None,
+}
+
+# Label columns of get_holdings_df_detailed() frames
+DETAILED_LABEL_COLUMNS: dict[str, str | None] = {
+    "Account_Name": None,
+    "Account_Type": "account_type_label",
+    "Ticker": None,
+    "Security_Name": None,
+    "Asset_Class": "asset_class",
+    "Asset_Category": "category_label",
+    "Asset_Group": "category_label",
+    "Group_Code": "category_code",
+    "Category_Code": "category_code",
+}
+
+
+def categorize_labels(df: pd.DataFrame, columns: Mapping[str, str | None]) -> pd.DataFrame:
+    """
+    Convert the repeated string columns of a holdings frame to categoricals.
+
+    Groupbys, merges and pivots on categorical columns work on integer codes
+    instead of hashing every string, and each distinct label is stored once.
+    Categories come from reference data where there is a stable list, so
+    frames of different users share dtypes; they are sorted, so sorting a
+    column is unchanged. A label missing from the reference data (a stale
+    snapshot in another process) falls back to the frame's own labels rather
+    than becoming NaN.
+
+    Converts ``df`` in place and returns it.
+    """
+    from portfolio.services.reference_data import get_reference_data
+
+    dtypes = get_reference_data().label_dtypes
+    for column, dtype_name in columns.items():
+        labels = df[column]
+        if dtype_name is not None:
+            dtype = dtypes[dtype_name]
+            if (labels.isin(dtype.categories) | labels.isna()).all():
+                df[column] = labels.astype(dtype)
+                continue
+        df[column] = labels.astype("category")
+    return df
+
 
 class DjangoDataProvider:
     """Optimized Django ORM data provider using pandas DataFrames."""
 
-    def get_holdings_df(self, user: Any) -> pd.DataFrame:
+    def get_holdings_df(self, user: Any, account_ids: list[int] | None = None) -> pd.DataFrame:
         """
         Get all holdings as long-format DataFrame.
 
+        Args:
+            user: User object
+            account_ids: Optional accounts to restrict the holdings to
+
         Returns DataFrame with columns:
             account_id, account_name, account_type_code, asset_class,
             asset_class_id, category_code, ticker, shares, price, value
         """
+        qs = self._priced_holdings(user, account_ids).values(
+            "account_id",
+            "account__name",
+            "account__account_type__code",
+            "security__asset_class__name",
+            "security__asset_class__id",
+            "security__asset_class__category__code",
+            "security__ticker",
+            "shares",
+            "price",
+            "value",
+        )
+
+        if not qs.exists():
+            return pd.DataFrame()
+
+        # Pandas 2.3: Direct DataFrame construction
+        df = pd.DataFrame.from_records(qs, coerce_float=True)
+
+        # Standardize column names
+        df.columns = [
+            "account_id",
+            "account_name",
+            "account_type_code",
+            "asset_class",
+            "asset_class_id",
+            "category_code",
+            "ticker",
+            "shares",
+            "price",
+            "value",
+        ]
+
+        return categorize_labels(df, HOLDINGS_LABEL_COLUMNS)
+
+    def get_holdings_snapshot(
+        self, user: Any, account_ids: list[int] | None = None
+    ) -> HoldingsSnapshot:
+        """
+        Get the holdings of ``get_holdings_df()`` as a HoldingsSnapshot.
+
+        Built straight from the query rows, with no intermediate DataFrame.
+        Securities are keyed by id.
+        """
+        rows = list(
+            self._priced_holdings(user, account_ids).values_list(
+                "account_id",
+                "account__name",
+                "account__account_type__code",
+                "security__asset_class__name",
+                "security__asset_class__id",
+                "security__asset_class__category__code",
+                "security_id",
+                "security__ticker",
+                "shares",
+                "price",
+                "value",
+            )
+        )
+        if not rows:
+            return HoldingsSnapshot.empty()
+
+        (
+            account_id,
+            account_name,
+            account_type_code,
+            asset_class,
+            asset_class_id,
+            category_code,
+            security_id,
+            ticker,
+            shares,
+            price,
+            value,
+        ) = zip(*rows, strict=True)
+        # Holdings without a price have a None price and value (NaN, as in the frame)
+        return HoldingsSnapshot.from_columns(
+            account_id=account_id,
+            asset_class_id=asset_class_id,
+            security_id=security_id,
+            shares=np.array(shares, dtype=np.float64),
+            price=np.array(price, dtype=np.float64),
+            value=np.array(value, dtype=np.float64),
+            account_name=account_name,
+            account_type_code=account_type_code,
+            asset_class=asset_class,
+            category_code=category_code,
+            ticker=ticker,
+        )
+
+    def _priced_holdings(self, user: Any, account_ids: list[int] | None) -> PricedHoldings:
+        """A user's holdings annotated with their latest ``price`` and ``value``."""
         from django.db.models import OuterRef, Subquery
 
         from portfolio.models import Holding, SecurityPrice
@@ -38,92 +202,80 @@ class DjangoDataProvider:
             .values("price")[:1]
         )
 
+        holdings: QuerySet[Holding] = Holding.objects.filter(account__portfolio__user=user)
+        if account_ids is not None:
+            holdings = holdings.filter(account_id__in=account_ids)
+
         # Django 6.0: Optimized query with annotations
+        return holdings.select_related(
+            "account__account_type",
+            "security__asset_class__category__parent",
+        ).annotate(
+            price=latest_price,
+            value=F("shares") * F("price"),
+        )
+
+    def get_ticker_positions_df(self, user: Any, ticker: str) -> pd.DataFrame:
+        """
+        Get every holding in the accounts that hold ``ticker`` in one query.
+
+        All holdings of those accounts are returned (not just the ticker's) so
+        account totals can be computed with a groupby instead of per-account
+        ``total_value()`` calls.
+
+        Returns DataFrame with columns:
+            account_id, account_name, account_type_id, account_type_label,
+            ticker, shares, value
+        """
+        from django.db.models import OuterRef, Subquery
+
+        from portfolio.models import Holding, SecurityPrice
+
+        latest_price = Subquery(
+            SecurityPrice.objects.filter(security_id=OuterRef("security_id"))
+            .order_by("-price_datetime")
+            .values("price")[:1]
+        )
+
+        accounts_with_ticker = Holding.objects.filter(
+            account__user=user, security__ticker=ticker
+        ).values("account_id")
+
         qs = (
-            Holding.objects.filter(account__portfolio__user=user)
-            .select_related(
-                "account__account_type",
-                "security__asset_class__category__parent",
-            )
-            .annotate(
-                price=latest_price,
-                value=F("shares") * F("price"),
-            )
-            .values(
+            Holding.objects.filter(account__user=user, account_id__in=accounts_with_ticker)
+            .annotate(value=F("shares") * latest_price)
+            .values_list(
                 "account_id",
                 "account__name",
-                "account__account_type__code",
-                "security__asset_class__name",
-                "security__asset_class__id",
-                "security__asset_class__category__code",
+                "account__account_type_id",
+                "account__account_type__label",
                 "security__ticker",
                 "shares",
-                "price",
                 "value",
             )
         )
 
-        if not qs.exists():
-            return pd.DataFrame()
-
-        # Pandas 2.3: Direct DataFrame construction
-        df = pd.DataFrame.from_records(qs, coerce_float=True)
-
-        # Standardize column names
-        df.columns = [
+        columns = [
             "account_id",
             "account_name",
-            "account_type_code",
-            "asset_class",
-            "asset_class_id",
-            "category_code",
+            "account_type_id",
+            "account_type_label",
             "ticker",
             "shares",
-            "price",
             "value",
         ]
-
-        return df
-
-    def get_asset_classes_df(self, user: Any) -> pd.DataFrame:
-        """Get asset class metadata as DataFrame."""
-        from portfolio.models import AssetClass
-
-        qs = AssetClass.objects.select_related("category", "category__parent").values(
-            "id",
-            "name",
-            "category__parent__code",
-            "category__parent__label",
-            "category__parent__sort_order",
-            "category__code",
-            "category__label",
-            "category__sort_order",
-        )
-
-        df = pd.DataFrame(list(qs))
+        df = pd.DataFrame.from_records(list(qs), columns=columns, coerce_float=True)
         if df.empty:
             return df
 
-        df.columns = [
-            "asset_class_id",
-            "asset_class_name",
-            "group_code",
-            "group_label",
-            "group_sort_order",
-            "category_code",
-            "category_label",
-            "category_sort_order",
-        ]
-
-        # Pandas 2.3: nullable boolean dtype
-        df["is_cash"] = (
-            (df["category_code"] == "CASH") | (df["asset_class_name"] == "Cash")
-        ).astype("boolean")
+        df[["shares", "value"]] = df[["shares", "value"]].astype(float).fillna(0.0)
+        return df
 
-        # Set row_type for individual asset class rows
-        df["row_type"] = "asset_class"
+    def get_asset_classes_df(self, user: Any) -> pd.DataFrame:
+        """Get asset class metadata as DataFrame (from the reference data cache)."""
+        from portfolio.services.reference_data import get_reference_data
 
-        return df
+        return get_reference_data().asset_classes_df.copy()
 
     def get_accounts_metadata(self, user: Any) -> tuple[list[dict], dict[int, list[dict]]]:
         """
@@ -166,10 +318,16 @@ class DjangoDataProvider:
 
         return accounts, dict(by_type)
 
-    def get_targets_map(self, user: Any) -> dict[int, dict[str, Decimal]]:
+    def get_targets_map(
+        self, user: Any, account_ids: list[int] | None = None
+    ) -> dict[int, dict[str, Decimal]]:
         """
         Get effective target allocations for all accounts.
 
+        Args:
+            user: User object
+            account_ids: Optional accounts to restrict the map to
+
         Returns dict: {account_id: {asset_class_name: target_pct}}
         """
         from portfolio.models import Account
@@ -179,6 +337,8 @@ class DjangoDataProvider:
             "account_type",
             "portfolio__allocation_strategy",
         )
+        if account_ids is not None:
+            accounts = accounts.filter(id__in=account_ids)
 
         result = {}
         for account in accounts:
@@ -333,7 +493,7 @@ class DjangoDataProvider:
         df["Group_Code"] = df["Group_Code"].fillna(df["Category_Code"])
         df["Group_Sort_Order"] = df["Group_Sort_Order"].fillna(df["Category_Sort_Order"])
 
-        return df
+        return categorize_labels(df, DETAILED_LABEL_COLUMNS)
 
     def _create_zero_holding_dict(
         self,
@@ -398,7 +558,7 @@ class DjangoDataProvider:
         Returns:
             DataFrame with zero-holding rows for missing asset classes
         """
-        from portfolio.models import AssetClass
+        from portfolio.services.reference_data import get_reference_data
 
         account_targets = targets_map.get(account_id, {})
         if not account_targets:
@@ -416,34 +576,31 @@ class DjangoDataProvider:
 
         # Build zero holdings using helper method
         zero_holdings = []
+        reference = get_reference_data()
 
         for ac_name in missing_asset_classes:
-            try:
-                asset_class = AssetClass.objects.select_related(
-                    "primary_security", "category", "category__parent"
-                ).get(name=ac_name)
-
-                security = asset_class.primary_security
-                if not security:
-                    logger.warning(
-                        "no_primary_security_for_asset_class",
-                        asset_class=ac_name,
-                        account_id=account_id,
-                    )
-                    continue
-
-                # Use helper to create zero holding dict
-                zero_holding = self._create_zero_holding_dict(
-                    asset_class=asset_class,
-                    security=security,
+            asset_class = reference.asset_classes_by_name.get(ac_name)
+            if asset_class is None:
+                logger.warning("asset_class_not_found", name=ac_name)
+                continue
+
+            security = reference.primary_securities.get(asset_class.id)
+            if not security:
+                logger.warning(
+                    "no_primary_security_for_asset_class",
+                    asset_class=ac_name,
                     account_id=account_id,
                 )
-                zero_holdings.append(zero_holding)
-
-            except AssetClass.DoesNotExist:
-                logger.warning("asset_class_not_found", name=ac_name)
                 continue
 
+            # Use helper to create zero holding dict
+            zero_holding = self._create_zero_holding_dict(
+                asset_class=asset_class,
+                security=security,
+                account_id=account_id,
+            )
+            zero_holdings.append(zero_holding)
+
         if not zero_holdings:
             return pd.DataFrame()
 
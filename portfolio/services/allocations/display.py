@@ -0,0 +1,48 @@
+"""
+Column-at-a-time display formatting.
+
+Vectorized equivalents of the ``money``, ``percent`` and ``number`` template
+filters and of ``variance_css_class``: each takes a whole column of values
+and returns its display strings, identical to what the filter would render
+for each value. Used by ``AllocationFormatter`` to pre-format large tables so
+templates only emit strings.
+"""
+
+from collections.abc import Sequence
+from typing import cast
+
+import numpy as np
+
+
+def format_money(values: Sequence[float] | np.ndarray, decimals: int = 0) -> list[str]:
+    """``$1,234`` or ``($1,234)`` for negatives, as ``|money``."""
+    return _format_signed(values, f"${{:,.{decimals}f}}")
+
+
+def format_percent(values: Sequence[float] | np.ndarray, decimals: int = 1) -> list[str]:
+    """``12.5%`` or ``(12.5%)`` for negatives, as ``|percent``."""
+    return _format_signed(values, f"{{:.{decimals}f}}%")
+
+
+def format_number(values: Sequence[float] | np.ndarray, decimals: int = 0) -> list[str]:
+    """``1,234`` or ``(1,234)`` for negatives, as ``|number``."""
+    return _format_signed(values, f"{{:,.{decimals}f}}")
+
+
+def variance_css_classes(values: Sequence[float] | np.ndarray) -> list[str]:
+    """``variance-positive`` / ``variance-negative`` / ``""``, as ``|variance_css_class``."""
+    array = np.asarray(values, dtype=float)
+    classes = np.select(
+        [array > 0, array < 0], ["variance-positive", "variance-negative"], default=""
+    )
+    return cast(list[str], classes.tolist())
+
+
+def _format_signed(values: Sequence[float] | np.ndarray, template: str) -> list[str]:
+    """Format magnitudes with ``template``, wrapping negatives in parentheses."""
+    array = np.asarray(values, dtype=float)
+    text = np.array(list(map(template.format, np.abs(array).tolist())), dtype=object)
+    negative = array < 0
+    if negative.any():
+        text[negative] = "(" + text[negative] + ")"
+    return cast(list[str], text.tolist())
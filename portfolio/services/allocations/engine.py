@@ -1,19 +1,37 @@
 """Main allocation calculation engine using composition."""
 
 from collections import OrderedDict
+from collections.abc import Iterable
 from decimal import Decimal
-from typing import Any
+from functools import partial
+from typing import TYPE_CHECKING, Any
 
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+import pandas as pd
 import structlog
 
+from portfolio.services.metrics import ENGINE_STAGE_DURATION
+
+from .backends import make_calculator
 from .calculations import AllocationCalculator
 from .data_providers import DjangoDataProvider
 from .formatters import AllocationFormatter
-from .types import SidebarData
+from .types import HoldingDelta, SidebarData, SidebarMetrics
+
+if TYPE_CHECKING:
+    from portfolio.services.versioning import PortfolioVersion
 
 logger = structlog.get_logger(__name__)
 
 
+def presentation_frame_key(version_key: str) -> str:
+    """Cache key of the presentation DataFrame for a portfolio data version."""
+    return f"presentation_frame:{version_key}"
+
+
 class AllocationEngine:
     """
     Main engine for allocation calculations.
@@ -26,59 +44,62 @@ class AllocationEngine:
         calculator: AllocationCalculator | None = None,
         data_provider: DjangoDataProvider | None = None,
         formatter: AllocationFormatter | None = None,
+        use_snapshots: bool | None = None,
+        cache_frames: bool | None = None,
     ):
-        self.calculator = calculator or AllocationCalculator()
+        """
+        Args:
+            use_snapshots: Read holdings and targets from the precomputed
+                PortfolioSnapshot table. Defaults to
+                ``settings.PORTFOLIO_SNAPSHOTS`` unless a custom data provider
+                is injected (the snapshot reflects the default provider).
+            cache_frames: Cache the presentation DataFrame per data version
+                and patch it on holding changes. Defaults to
+                ``settings.PRESENTATION_FRAME_CACHE`` unless a custom data
+                provider is injected.
+        """
+        if use_snapshots is None:
+            use_snapshots = settings.PORTFOLIO_SNAPSHOTS and data_provider is None
+        if cache_frames is None:
+            cache_frames = settings.PRESENTATION_FRAME_CACHE and data_provider is None
+
+        self.calculator = calculator or make_calculator()
         self.data_provider = data_provider or DjangoDataProvider()
         self.formatter = formatter or AllocationFormatter()
+        self.use_snapshots = use_snapshots
+        self.cache_frames = cache_frames
 
-    def get_presentation_rows(self, user: Any) -> list[dict[str, Any]]:
+    def get_presentation_rows(self, user: Any, display: bool = False) -> list[dict[str, Any]]:
         """
         Calculate and format allocation data for dashboard/targets views.
 
         Replaces old AllocationCalculationEngine.get_presentation_rows()
         with clean, testable architecture.
+
+        With ``display``, rows also carry pre-formatted display strings (see
+        ``AllocationFormatter.to_presentation_rows``).
         """
         logger.info("building_presentation_rows", user_id=user.id)
 
         try:
-            # Step 1: Get all required data
-            holdings_df = self.data_provider.get_holdings_df(user)
-            if holdings_df.empty:
-                logger.info("no_holdings_for_presentation", user_id=user.id)
-                return []
-
-            asset_classes_df = self.data_provider.get_asset_classes_df(user)
-            targets_map = self.data_provider.get_targets_map(user)
-            policy_targets = self.data_provider.get_policy_targets(user)
-            accounts_list, accounts_by_type = self.data_provider.get_accounts_metadata(user)
-            target_strategies = self.data_provider.get_target_strategies(user)
-
-            # Step 2: Calculate account totals
-            account_totals = (
-                holdings_df.groupby("account_id")["value"]
-                .sum()
-                .apply(lambda x: Decimal(str(x)))
-                .to_dict()
-            )
-
-            # Step 3: Run calculation pipeline
-            presentation_df = self.calculator.build_presentation_dataframe(
-                holdings_df=holdings_df,
-                asset_classes_df=asset_classes_df,
-                targets_map=targets_map,
-                account_totals=account_totals,
-                policy_targets=policy_targets,
-            )
+            presentation_df, accounts_by_type = self._get_presentation_df(user)
 
             if presentation_df.empty:
                 return []
 
+            with ENGINE_STAGE_DURATION.time(operation="presentation", stage="load"):
+                if accounts_by_type is None:
+                    _, accounts_by_type = self.data_provider.get_accounts_metadata(user)
+                target_strategies = self.data_provider.get_target_strategies(user)
+
             # Step 4: Format for templates
-            rows = self.formatter.to_presentation_rows(
-                df=presentation_df,
-                accounts_by_type=accounts_by_type,
-                target_strategies=target_strategies,
-            )
+            with ENGINE_STAGE_DURATION.time(operation="presentation", stage="format"):
+                rows = self.formatter.to_presentation_rows(
+                    df=presentation_df,
+                    accounts_by_type=accounts_by_type,
+                    target_strategies=target_strategies,
+                    display=display,
+                )
 
             logger.info(
                 "presentation_rows_built",
@@ -97,13 +118,165 @@ class AllocationEngine:
             )
             return []
 
-    def get_holdings_rows(self, user: Any, account_id: int | None = None) -> list[dict]:
+    def _get_presentation_df(self, user: Any) -> tuple[pd.DataFrame, dict[int, list] | None]:
+        """
+        Presentation DataFrame from the frame cache, calculating it on a miss.
+
+        Returns:
+            (presentation_df, accounts_by_type), the latter only when it was
+            loaded along the way
+        """
+        from portfolio.services.versioning import get_portfolio_version
+
+        cache_key = None
+        if self.cache_frames:
+            cache_key = presentation_frame_key(get_portfolio_version(user).key)
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached, None
+
+        presentation_df, accounts_by_type = self._calculate_presentation_df(user)
+
+        if cache_key is not None:
+            cache.set(cache_key, presentation_df, settings.FRAGMENT_CACHE_TIMEOUT)
+        return presentation_df, accounts_by_type
+
+    def _calculate_presentation_df(self, user: Any) -> tuple[pd.DataFrame, dict[int, list] | None]:
+        """Load holdings and targets and run the presentation pipeline."""
+        # Step 1: Get all required data
+        with ENGINE_STAGE_DURATION.time(operation="presentation", stage="load"):
+            accounts_by_type = None
+            if self.use_snapshots:
+                from portfolio.services.portfolio_snapshots import load_portfolio_snapshot
+
+                snapshot = load_portfolio_snapshot(user)
+                holdings_df = snapshot.holdings_df
+                targets_map = snapshot.targets_map
+                accounts_by_type = snapshot.accounts_by_type
+            else:
+                holdings_df = self.data_provider.get_holdings_df(user)
+
+            if holdings_df.empty:
+                logger.info("no_holdings_for_presentation", user_id=user.id)
+                return pd.DataFrame(), accounts_by_type
+
+            if not self.use_snapshots:
+                targets_map = self.data_provider.get_targets_map(user)
+            asset_classes_df = self.data_provider.get_asset_classes_df(user)
+            policy_targets = self.data_provider.get_policy_targets(user)
+
+        # Step 2: Calculate account totals
+        account_totals = (
+            holdings_df.groupby("account_id")["value"]
+            .sum()
+            .apply(lambda x: Decimal(str(x)))
+            .to_dict()
+        )
+
+        # Step 3: Run calculation pipeline
+        with ENGINE_STAGE_DURATION.time(operation="presentation", stage="calculate"):
+            presentation_df = self.calculator.build_presentation_dataframe(
+                holdings_df=holdings_df,
+                asset_classes_df=asset_classes_df,
+                targets_map=targets_map,
+                account_totals=account_totals,
+                policy_targets=policy_targets,
+            )
+
+        return presentation_df, accounts_by_type
+
+    def apply_holding_changes(
+        self,
+        user: Any,
+        version: "PortfolioVersion",
+        changes: Iterable[HoldingDelta],
+        security_ids: Iterable[int] = (),
+    ) -> bool:
+        """
+        Patch the cached presentation frame for holding changes.
+
+        Call inside the transaction that writes the holdings (one version
+        bump), after the write, with the data version read before it. The
+        frame cached for that version is patched with
+        ``AllocationCalculator.apply_holding_delta`` and stored under the new
+        version once the transaction commits, so the next dashboard view
+        skips the full calculation.
+
+        The patch only covers ``changes``, so it is stored only if the new
+        version directly follows ``version``: a concurrent holding edit or a
+        new price in between means the patched frame would miss changes.
+
+        Args:
+            security_ids: Securities whose holdings changed. ``version`` must
+                have been read with the same ``include_securities``, so a
+                security entering or leaving the holdings does not count as
+                a price change.
+
+        Returns:
+            Whether the frame was patched. If not (frame cache disabled, no
+            frame cached for ``version``, other changes since ``version``, or
+            a change that needs a rebuild) the next read calculates the frame
+            as usual.
+        """
+        from portfolio.services.versioning import get_portfolio_version
+
+        if not self.cache_frames:
+            return False
+
+        security_ids = list(security_ids)
+        new_version = get_portfolio_version(user, include_securities=security_ids)
+        if not new_version.follows(version):
+            logger.info(
+                "presentation_frame_patch_skipped",
+                user_id=user.id,
+                reason="concurrent_change",
+                old_version=version.key,
+                new_version=new_version.key,
+            )
+            return False
+
+        presentation_df = cache.get(presentation_frame_key(version.key))
+        if presentation_df is None:
+            return False
+
+        changes = list(changes)
+        for change in changes:
+            presentation_df = self.calculator.apply_holding_delta(
+                presentation_df,
+                account_id=change.account_id,
+                account_type_code=change.account_type_code,
+                asset_class_id=change.asset_class_id,
+                delta=change.value,
+            )
+            if presentation_df is None:
+                logger.info(
+                    "presentation_frame_patch_skipped",
+                    user_id=user.id,
+                    reason="needs_rebuild",
+                    account_id=change.account_id,
+                    asset_class_id=change.asset_class_id,
+                )
+                return False
+
+        if security_ids:
+            new_version = get_portfolio_version(user)
+        new_key = presentation_frame_key(new_version.key)
+        transaction.on_commit(
+            partial(cache.set, new_key, presentation_df, settings.FRAGMENT_CACHE_TIMEOUT)
+        )
+        logger.info("presentation_frame_patched", user_id=user.id, changes=len(changes))
+        return True
+
+    def get_holdings_rows(
+        self, user: Any, account_id: int | None = None, display: bool = False
+    ) -> list[dict]:
         """
         Calculate and format holdings data for holdings view.
 
         Args:
             user: User object
             account_id: Optional account ID to filter to single account
+            display: Also pre-format display strings for the holdings table
 
         Returns:
             List of row dicts with holdings, subtotals, group totals, and grand total
@@ -134,19 +307,22 @@ class AllocationEngine:
                     holdings_df = pd.concat([holdings_df, df_zero], ignore_index=True)
 
             # Step 4: Calculate targets and variances
-            holdings_with_targets = self.calculator.calculate_holdings_with_targets(
-                holdings_df=holdings_df,
-                targets_map=targets_map,
-            )
+            with ENGINE_STAGE_DURATION.time(operation="holdings", stage="calculate"):
+                holdings_with_targets = self.calculator.calculate_holdings_with_targets(
+                    holdings_df=holdings_df,
+                    targets_map=targets_map,
+                )
 
             if holdings_with_targets.empty:
                 return []
 
             # Step 5: Format for template (pass calculator for aggregations)
-            rows = self.formatter.format_holdings_rows(
-                holdings_with_targets,
-                calculator=self.calculator,
-            )
+            with ENGINE_STAGE_DURATION.time(operation="holdings", stage="format"):
+                rows = self.formatter.format_holdings_rows(
+                    holdings_with_targets,
+                    calculator=self.calculator,
+                    display=display,
+                )
 
             logger.info(
                 "holdings_rows_built",
@@ -167,13 +343,16 @@ class AllocationEngine:
             )
             return []
 
-    def get_aggregated_holdings_rows(self, user: Any, target_mode: str = "effective") -> list[dict]:
+    def get_aggregated_holdings_rows(
+        self, user: Any, target_mode: str = "effective", display: bool = False
+    ) -> list[dict]:
         """
         Calculate and format aggregated holdings across all accounts.
 
         Args:
             user: User object
             target_mode: Either "effective" or "policy"
+            display: Also pre-format display strings for the holdings table
 
         Returns:
             List of row dicts with aggregated holdings by ticker
@@ -214,19 +393,22 @@ class AllocationEngine:
                 aggregated_df = pd.concat([aggregated_df, df_zero], ignore_index=True)
 
             # Step 5: Calculate targets and variances
-            holdings_with_targets = self.calculator.calculate_holdings_with_targets(
-                holdings_df=aggregated_df,
-                targets_map=targets_map,
-            )
+            with ENGINE_STAGE_DURATION.time(operation="aggregated_holdings", stage="calculate"):
+                holdings_with_targets = self.calculator.calculate_holdings_with_targets(
+                    holdings_df=aggregated_df,
+                    targets_map=targets_map,
+                )
 
             if holdings_with_targets.empty:
                 return []
 
             # Step 6: Format for template (pass calculator for aggregations)
-            rows = self.formatter.format_holdings_rows(
-                holdings_with_targets,
-                calculator=self.calculator,
-            )
+            with ENGINE_STAGE_DURATION.time(operation="aggregated_holdings", stage="format"):
+                rows = self.formatter.format_holdings_rows(
+                    holdings_with_targets,
+                    calculator=self.calculator,
+                    display=display,
+                )
 
             logger.info(
                 "aggregated_holdings_rows_built",
@@ -262,12 +444,28 @@ class AllocationEngine:
 
         try:
             # Get data
-            holdings_df = self.data_provider.get_holdings_df(user)
-            accounts_list, _ = self.data_provider.get_accounts_metadata(user)
-            targets_map = self.data_provider.get_targets_map(user)
+            metrics: SidebarMetrics
+            if self.use_snapshots:
+                # Totals and deviations were computed when the snapshot was built
+                from portfolio.services.portfolio_snapshots import load_portfolio_snapshot
+
+                with ENGINE_STAGE_DURATION.time(operation="sidebar", stage="load"):
+                    snapshot = load_portfolio_snapshot(user)
+                accounts_list = snapshot.accounts
+                metrics = {
+                    "account_totals": snapshot.account_totals,
+                    "account_variances": snapshot.account_variances,
+                    "grand_total": snapshot.grand_total,
+                }
+            else:
+                with ENGINE_STAGE_DURATION.time(operation="sidebar", stage="load"):
+                    holdings = self.data_provider.get_holdings_snapshot(user)
+                    accounts_list, _ = self.data_provider.get_accounts_metadata(user)
+                    targets_map = self.data_provider.get_targets_map(user)
 
-            # Calculate metrics (vectorized)
-            metrics = self.calculator.calculate_sidebar_metrics(holdings_df, targets_map)
+                # Calculate metrics (vectorized over snapshot arrays)
+                with ENGINE_STAGE_DURATION.time(operation="sidebar", stage="calculate"):
+                    metrics = self.calculator.calculate_sidebar_metrics(holdings, targets_map)
 
             # Build groups structure
             groups = self._build_account_groups(
@@ -336,9 +534,9 @@ class AllocationEngine:
         variances: dict[int, float],
     ) -> dict[str, dict]:
         """Build account groups structure for sidebar."""
-        from portfolio.models import AccountGroup
+        from portfolio.services.reference_data import get_reference_data
 
-        all_groups = AccountGroup.objects.all().order_by("sort_order", "name")
+        all_groups = get_reference_data().account_groups
 
         # Initialize groups structure
         groups: OrderedDict[str, dict[str, Any]] = OrderedDict()
@@ -1,14 +1,119 @@
 """Formatting layer for converting DataFrames to template-ready dicts."""
 
-from typing import TYPE_CHECKING, Any
+from collections.abc import Callable
+from functools import partial
+from itertools import repeat
+from typing import TYPE_CHECKING, Any, cast
 
 import pandas as pd
 
+from portfolio.services.allocations.display import (
+    format_money,
+    format_number,
+    format_percent,
+    variance_css_classes,
+)
 from portfolio.services.allocations.types import HierarchyLevel
 
 if TYPE_CHECKING:
     from portfolio.services.allocations.calculations import AllocationCalculator
 
+_HOLDING_FIELDS = (
+    "value",
+    "target_value",
+    "value_variance",
+    "shares",
+    "target_shares",
+    "shares_variance",
+)
+
+
+def _values(df: pd.DataFrame, column: str, default: Any) -> list[Any]:
+    """A column as a list of Python scalars, or ``default`` per row when it is missing."""
+    if column in df.columns:
+        return cast(list[Any], df[column].tolist())
+    return [default] * len(df)
+
+
+class _FloatColumns:
+    """
+    The columns of a frame as lists of Python floats.
+
+    All numeric columns are converted in one pass, which is much cheaper than
+    selecting hundreds of account columns one at a time on a wide frame.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        numeric = df.select_dtypes(include="number")
+        self.df = df
+        self.columns: dict[str, list[float]] = dict(
+            zip(numeric.columns, numeric.to_numpy(dtype=float).T.tolist(), strict=True)
+        )
+        self.zeros = [0.0] * len(df)
+
+    def get(self, column: str) -> list[float]:
+        """A column's values as floats; 0.0 per row when it is missing."""
+        if column in self.columns:
+            return self.columns[column]
+        if column in self.df.columns:
+            # Non-numeric dtype, e.g. Decimal objects
+            return cast(list[float], self.df[column].to_numpy(dtype=float).tolist())
+        return self.zeros
+
+
+def _float_records(
+    columns: _FloatColumns,
+    fields: dict[str, str],
+    head: dict[str, Any] | None = None,
+    tail: dict[str, Any] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    One dict per row mapping each key of ``fields`` to its column as a float.
+
+    The constant ``head`` and ``tail`` items go before and after the values,
+    so key order matches a literal dict.
+    """
+    head = head or {}
+    tail = tail or {}
+    keys = (*head, *fields, *tail)
+    value_columns = [
+        *(repeat(value) for value in head.values()),
+        *(columns.get(column) for column in fields.values()),
+        *(repeat(value) for value in tail.values()),
+    ]
+    # map() keeps the per-row work in C
+    return list(map(dict, map(partial(zip, keys), zip(*value_columns))))  # noqa: B905
+
+
+def _display_records(
+    columns: _FloatColumns,
+    fields: dict[str, str],
+    formats: dict[str, Callable[[list[float]], list[str]]] | None = None,
+) -> list[dict[str, str]]:
+    """
+    Display strings for each row's ``fields``, formatted a column at a time.
+
+    Keys are formatted as the templates render them: ``_pct`` keys with
+    ``|percent``, other keys with ``|money``, unless ``formats`` gives a
+    formatter for the key. Variance keys also get their
+    ``|variance_css_class`` as ``<key>_css``.
+    """
+    formats = formats or {}
+    display_columns: dict[str, list[str]] = {}
+    for key, column in fields.items():
+        values = columns.get(column)
+        formatter = formats.get(key) or (format_percent if key.endswith("_pct") else format_money)
+        display_columns[key] = formatter(values)
+        if "variance" in key:
+            display_columns[f"{key}_css"] = variance_css_classes(values)
+    keys = tuple(display_columns)
+    return list(map(dict, map(partial(zip, keys), zip(*display_columns.values()))))  # noqa: B905
+
+
+def _attach_display(rows: list[dict[str, Any]], display: list[dict[str, str]]) -> None:
+    for row, row_display in zip(rows, display, strict=True):
+        row["display"] = row_display
+
 
 class AllocationFormatter:
     """Format DataFrames into template-ready dictionary structures."""
@@ -18,6 +123,7 @@ class AllocationFormatter:
         df: pd.DataFrame,
         accounts_by_type: dict[int, list[dict[str, Any]]],
         target_strategies: dict[str, Any] | None = None,
+        display: bool = False,
     ) -> list[dict[str, Any]]:
         """
         Transform presentation DataFrame to template-ready rows.
@@ -29,6 +135,9 @@ class AllocationFormatter:
             df: Presentation DataFrame from calculator
             accounts_by_type: Metadata about accounts grouped by type
             target_strategies: Strategy assignments map for dropdowns
+            display: Also pre-format the portfolio and account type values
+                into a ``display`` dict of strings and CSS classes (see
+                ``_display_records``), so templates skip the filters
 
         Returns:
             List of row dicts ready for template rendering
@@ -40,140 +149,211 @@ class AllocationFormatter:
         at_strategy_map = target_strategies.get("at_strategy_map", {})
         acc_strategy_map = target_strategies.get("acc_strategy_map", {})
 
-        rows = []
+        # Columns are converted to lists once and the row dicts zipped
+        # together from them; per-row Series access (iterrows + row.get)
+        # dominated this method on wide frames.
+        floats = _FloatColumns(df)
+        portfolio_fields = {
+            "actual": "portfolio_actual",
+            "actual_pct": "portfolio_actual_pct",
+            "effective": "portfolio_effective",
+            "effective_pct": "portfolio_effective_pct",
+            # Policy target = portfolio's allocation_strategy target
+            "explicit_target": "portfolio_policy",
+            "explicit_target_pct": "portfolio_policy_pct",
+            # Effective variance = actual - effective (for rebalancing)
+            "effective_variance": "portfolio_variance",
+            "effective_variance_pct": "portfolio_variance_pct",
+            # Policy variance = actual - policy (for policy adherence)
+            "policy_variance": "portfolio_policy_variance",
+            "policy_variance_pct": "portfolio_policy_variance_pct",
+        }
+        portfolio = _float_records(floats, portfolio_fields)
+        if display:
+            _attach_display(portfolio, _display_records(floats, portfolio_fields))
+
+        # Per account type: the per-row type dicts (without their account
+        # lists) and the per-row dicts of each of its accounts
+        type_columns = []
+        for type_id, accounts in accounts_by_type.items():
+            if not accounts:
+                continue
 
-        for _idx, row in df.iterrows():
-            # Base row structure
-            row_dict = {
-                "asset_class_name": row["asset_class_name"],
-                "asset_class_id": int(row["asset_class_id"]),
-                "group_code": row.get("group_code", ""),
-                "group_label": row.get("group_label", ""),
-                "category_code": row.get("category_code", ""),
-                "category_label": row.get("category_label", ""),
-                "is_cash": bool(row.get("is_cash", False)),
-                "hierarchy_level": int(row.get("hierarchy_level", HierarchyLevel.HOLDING)),
-                # Portfolio metrics (raw numerics only)
-                "portfolio": {
-                    "actual": float(row.get("portfolio_actual", 0.0)),
-                    "actual_pct": float(row.get("portfolio_actual_pct", 0.0)),
-                    "effective": float(row.get("portfolio_effective", 0.0)),
-                    "effective_pct": float(row.get("portfolio_effective_pct", 0.0)),
-                    # Policy target = portfolio's allocation_strategy target
-                    "explicit_target": float(row.get("portfolio_policy", 0.0)),
-                    "explicit_target_pct": float(row.get("portfolio_policy_pct", 0.0)),
-                    # Effective variance = actual - effective (for rebalancing)
-                    "effective_variance": float(row.get("portfolio_variance", 0.0)),
-                    "effective_variance_pct": float(row.get("portfolio_variance_pct", 0.0)),
-                    # Policy variance = actual - policy (for policy adherence)
-                    "policy_variance": float(row.get("portfolio_policy_variance", 0.0)),
-                    "policy_variance_pct": float(row.get("portfolio_policy_variance_pct", 0.0)),
-                },
+            # Get type_code from first account in this type
+            type_code = accounts[0].get("type_code", "")
+            type_label = accounts[0].get("type_label", type_code)
+            type_fields = {
+                "actual": f"{type_code}_actual",
+                "actual_pct": f"{type_code}_actual_pct",
+                "effective": f"{type_code}_effective",
+                "effective_pct": f"{type_code}_effective_pct",
+                # Policy = same as effective for now (no separate policy targets)
+                "policy": f"{type_code}_effective",
+                "policy_pct": f"{type_code}_effective_pct",
+                "effective_variance": f"{type_code}_variance",
+                "effective_variance_pct": f"{type_code}_variance_pct",
+                # Policy variance = same as effective variance for now
+                "policy_variance": f"{type_code}_variance",
+                "policy_variance_pct": f"{type_code}_variance_pct",
             }
+            type_rows = _float_records(
+                floats,
+                type_fields,
+                head={"id": type_id, "code": type_code, "label": type_label},
+                tail={"active_strategy_id": at_strategy_map.get(type_id)},
+            )
+            if display:
+                _attach_display(type_rows, _display_records(floats, type_fields))
+            account_rows = [
+                self._type_account_rows(floats, meta, acc_strategy_map.get(meta["id"]))
+                for meta in accounts
+            ]
+            type_columns.append((type_rows, account_rows))
+
+        # Individual account data
+        account_columns = [
+            self._account_rows(floats, account, acc_strategy_map.get(account["id"]))
+            for type_accounts in accounts_by_type.values()
+            for account in type_accounts
+        ]
+
+        base_columns = zip(
+            df["asset_class_name"].tolist(),
+            df["asset_class_id"].tolist(),
+            _values(df, "group_code", ""),
+            _values(df, "group_label", ""),
+            _values(df, "category_code", ""),
+            _values(df, "category_label", ""),
+            _values(df, "is_cash", False),
+            _values(df, "hierarchy_level", HierarchyLevel.HOLDING),
+            strict=True,
+        )
 
-            # Add account type data
+        rows = []
+        for i, (
+            name,
+            ac_id,
+            group_code,
+            group_label,
+            cat_code,
+            cat_label,
+            is_cash,
+            level,
+        ) in enumerate(base_columns):
             account_types = []
-            for type_id, accounts in accounts_by_type.items():
-                if not accounts:
-                    continue
-
-                # Get type_code from first account in this type
-                type_code = accounts[0].get("type_code", "")
-                type_label = accounts[0].get("type_label", type_code)
-
-                # Collect accounts for this type to populate active_accounts
-                type_accounts_data = []
-                for account_meta in accounts:
-                    acc_id = account_meta["id"]
-
-                    acc_data = {
-                        "id": acc_id,
-                        "name": account_meta["name"],
-                        "actual": float(row.get(f"account_{acc_id}_actual", 0.0)),
-                        "actual_pct": float(row.get(f"account_{acc_id}_actual_pct", 0.0)),
-                        "policy": float(row.get(f"account_{acc_id}_policy", 0.0)),
-                        "policy_pct": float(row.get(f"account_{acc_id}_policy_pct", 0.0)),
-                        "policy_variance": float(row.get(f"account_{acc_id}_policy_variance", 0.0)),
-                        "policy_variance_pct": float(
-                            row.get(f"account_{acc_id}_policy_variance_pct", 0.0)
-                        ),
-                        "allocation_strategy_id": acc_strategy_map.get(acc_id),
+            for type_rows, account_rows in type_columns:
+                type_accounts_data = [rows_of_account[i] for rows_of_account in account_rows]
+                account_types.append(
+                    {
+                        **type_rows[i],
+                        # Populate active_accounts and accounts list for template
+                        "active_accounts": type_accounts_data,
+                        "accounts": type_accounts_data,
                     }
-                    type_accounts_data.append(acc_data)
+                )
 
-                type_data = {
-                    "id": type_id,
-                    "code": type_code,
-                    "label": type_label,
-                    "actual": float(row.get(f"{type_code}_actual", 0.0)),
-                    "actual_pct": float(row.get(f"{type_code}_actual_pct", 0.0)),
-                    "effective": float(row.get(f"{type_code}_effective", 0.0)),
-                    "effective_pct": float(row.get(f"{type_code}_effective_pct", 0.0)),
-                    # Policy = same as effective for now (no separate policy targets)
-                    "policy": float(row.get(f"{type_code}_effective", 0.0)),
-                    "policy_pct": float(row.get(f"{type_code}_effective_pct", 0.0)),
-                    "effective_variance": float(row.get(f"{type_code}_variance", 0.0)),
-                    "effective_variance_pct": float(row.get(f"{type_code}_variance_pct", 0.0)),
-                    # Policy variance = same as effective variance for now
-                    "policy_variance": float(row.get(f"{type_code}_variance", 0.0)),
-                    "policy_variance_pct": float(row.get(f"{type_code}_variance_pct", 0.0)),
-                    "active_strategy_id": at_strategy_map.get(type_id),
-                    "active_accounts": type_accounts_data,  # Populate active_accounts for template
-                    "accounts": type_accounts_data,  # Populate accounts list for template
+            rows.append(
+                {
+                    "asset_class_name": name,
+                    "asset_class_id": int(ac_id),
+                    "group_code": group_code,
+                    "group_label": group_label,
+                    "category_code": cat_code,
+                    "category_label": cat_label,
+                    "is_cash": bool(is_cash),
+                    "hierarchy_level": int(level),
+                    # Portfolio metrics (raw numerics only)
+                    "portfolio": portfolio[i],
+                    "account_types": account_types,
+                    "accounts": [rows_of_account[i] for rows_of_account in account_columns],
                 }
-                account_types.append(type_data)
-
-            row_dict["account_types"] = account_types
-
-            # Add individual account data
-            accounts = []
-            for _type_id, type_accounts in accounts_by_type.items():
-                for account in type_accounts:
-                    acc_id = account["id"]
-                    type_code = account.get("type_code", "")
-                    account_data = {
-                        "id": acc_id,
-                        "name": account["name"],
-                        "type_code": type_code,
-                        "actual": float(row.get(f"account_{acc_id}_actual", 0.0)),
-                        "actual_pct": float(row.get(f"account_{acc_id}_actual_pct", 0.0)),
-                        "target": float(row.get(f"account_{acc_id}_target", 0.0)),
-                        "target_pct": float(row.get(f"account_{acc_id}_target_pct", 0.0)),
-                        "variance": float(row.get(f"account_{acc_id}_variance", 0.0)),
-                        "variance_pct": float(row.get(f"account_{acc_id}_variance_pct", 0.0)),
-                        "allocation_strategy_id": acc_strategy_map.get(acc_id),
-                    }
-                    accounts.append(account_data)
-
-            row_dict["accounts"] = accounts
-            rows.append(row_dict)
+            )
 
         return rows
 
+    @staticmethod
+    def _type_account_rows(
+        floats: _FloatColumns, account: dict[str, Any], strategy_id: int | None
+    ) -> list[dict[str, Any]]:
+        """Per-row dicts of an account within its account type (policy metrics)."""
+        acc_id = account["id"]
+        name = account["name"]
+        # Dict literals over zipped columns: the bulk of the presentation
+        # output is these per-account dicts
+        return [
+            {
+                "id": acc_id,
+                "name": name,
+                "actual": actual,
+                "actual_pct": actual_pct,
+                "policy": policy,
+                "policy_pct": policy_pct,
+                "policy_variance": policy_variance,
+                "policy_variance_pct": policy_variance_pct,
+                "allocation_strategy_id": strategy_id,
+            }
+            for actual, actual_pct, policy, policy_pct, policy_variance, policy_variance_pct in zip(
+                floats.get(f"account_{acc_id}_actual"),
+                floats.get(f"account_{acc_id}_actual_pct"),
+                floats.get(f"account_{acc_id}_policy"),
+                floats.get(f"account_{acc_id}_policy_pct"),
+                floats.get(f"account_{acc_id}_policy_variance"),
+                floats.get(f"account_{acc_id}_policy_variance_pct"),
+                strict=True,
+            )
+        ]
+
+    @staticmethod
+    def _account_rows(
+        floats: _FloatColumns, account: dict[str, Any], strategy_id: int | None
+    ) -> list[dict[str, Any]]:
+        """Per-row dicts of an individual account (target metrics)."""
+        acc_id = account["id"]
+        name = account["name"]
+        type_code = account.get("type_code", "")
+        return [
+            {
+                "id": acc_id,
+                "name": name,
+                "type_code": type_code,
+                "actual": actual,
+                "actual_pct": actual_pct,
+                "target": target,
+                "target_pct": target_pct,
+                "variance": variance,
+                "variance_pct": variance_pct,
+                "allocation_strategy_id": strategy_id,
+            }
+            for actual, actual_pct, target, target_pct, variance, variance_pct in zip(
+                floats.get(f"account_{acc_id}_actual"),
+                floats.get(f"account_{acc_id}_actual_pct"),
+                floats.get(f"account_{acc_id}_target"),
+                floats.get(f"account_{acc_id}_target_pct"),
+                floats.get(f"account_{acc_id}_variance"),
+                floats.get(f"account_{acc_id}_variance_pct"),
+                strict=True,
+            )
+        ]
+
     def to_holdings_rows(self, df: pd.DataFrame) -> list[dict[str, Any]]:
         """Transform holdings DataFrame to rows."""
         if df.empty:
             return []
 
-        rows = []
-        for _, row in df.iterrows():
-            rows.append(
-                {
-                    "row_type": "holding",
-                    "ticker": row.get("ticker", ""),
-                    "name": row.get("name", ""),
-                    "value": float(row.get("value", 0.0)),
-                    "target_value": float(row.get("target_value", 0.0)),
-                    "value_variance": float(row.get("value_variance", 0.0)),
-                    "shares": float(row.get("shares", 0.0)),
-                    "target_shares": float(row.get("target_shares", 0.0)),
-                    "shares_variance": float(row.get("shares_variance", 0.0)),
-                    "is_holding": True,
-                    "is_subtotal": False,
-                }
+        values = _float_records(_FloatColumns(df), {field: field for field in _HOLDING_FIELDS})
+        return [
+            {
+                "row_type": "holding",
+                "ticker": ticker,
+                "name": name,
+                **row_values,
+                "is_holding": True,
+                "is_subtotal": False,
+            }
+            for ticker, name, row_values in zip(
+                _values(df, "ticker", ""), _values(df, "name", ""), values, strict=True
             )
-
-        return rows
+        ]
 
     def _format_account_types(
         self, row: pd.Series, accounts_by_type: dict[int, list[dict[str, Any]]]
@@ -209,6 +389,7 @@ class AllocationFormatter:
         self,
         holdings_df: pd.DataFrame,
         calculator: "AllocationCalculator | None" = None,
+        display: bool = False,
     ) -> list[dict[str, Any]]:
         """
         Format holdings DataFrame into display-ready rows with aggregations.
@@ -220,6 +401,8 @@ class AllocationFormatter:
                 Target_Shares, Shares_Variance, Target_Value, Value_Variance,
                 Allocation_Pct, Target_Allocation_Pct, Allocation_Variance_Pct
             calculator: Optional calculator instance (creates new if not provided)
+            display: Also pre-format the values the holdings table shows into
+                a ``display`` dict of strings per row
 
         Returns:
             List of row dicts with holdings, subtotals, group totals, and grand total
@@ -231,16 +414,16 @@ class AllocationFormatter:
             return []
 
         # Step 1: Build individual holding rows
-        holding_rows = self._holdings_to_dicts(holdings_df)
+        holding_rows = self._holdings_to_dicts(holdings_df, display=display)
 
         # Step 2: Calculate aggregations using Calculator
         calc = calculator or AllocationCalculator()
         aggregations = calc.calculate_holdings_aggregations(holdings_df)
 
         # Step 3: Convert aggregation DataFrames to dicts
-        subtotal_rows = self._aggregation_df_to_dicts(aggregations["subtotals"])
-        group_rows = self._aggregation_df_to_dicts(aggregations["group_totals"])
-        grand_row = self._aggregation_df_to_dicts(aggregations["grand_total"])
+        subtotal_rows = self._aggregation_df_to_dicts(aggregations["subtotals"], display=display)
+        group_rows = self._aggregation_df_to_dicts(aggregations["group_totals"], display=display)
+        grand_row = self._aggregation_df_to_dicts(aggregations["grand_total"], display=display)
 
         # Step 4: Interleave hierarchically
         result = self._interleave_holdings_hierarchical(
@@ -249,51 +432,102 @@ class AllocationFormatter:
 
         return result
 
-    def _holdings_to_dicts(self, df: pd.DataFrame) -> list[dict[str, Any]]:
+    def _holdings_to_dicts(self, df: pd.DataFrame, display: bool = False) -> list[dict[str, Any]]:
         """Convert holdings DataFrame rows to display dictionaries."""
-        rows = []
-
-        for _, row in df.iterrows():
-            # Build parent_id for collapse functionality
-            parent_id = f"cat-{row['Category_Code']}"
-
-            is_zero_holding = float(row["Shares"]) == 0.0 and float(row["Value"]) == 0.0
+        tickers = df["Ticker"].tolist()
+        security_names = _values(df, "Security_Name", "")
+        floats = _FloatColumns(df)
+        values = _float_records(
+            floats,
+            {
+                "price": "Price",
+                "shares": "Shares",
+                "target_shares": "Target_Shares",
+                "shares_variance": "Shares_Variance",
+                "value": "Value",
+                "target_value": "Target_Value",
+                "value_variance": "Value_Variance",
+                "allocation": "Allocation_Pct",
+                "target_allocation": "Target_Allocation_Pct",
+                "allocation_variance": "Allocation_Variance_Pct",
+            },
+        )
+        columns = zip(
+            tickers,
+            security_names,
+            security_names if "Security_Name" in df.columns else tickers,
+            df["Asset_Class"].tolist(),
+            _values(df, "Asset_Category", ""),
+            _values(df, "Asset_Group", ""),
+            _values(df, "Group_Code", ""),
+            df["Category_Code"].tolist(),
+            _values(df, "Account_ID", 0),
+            _values(df, "Account_Name", ""),
+            values,
+            _values(df, "holding_id", None),
+            strict=True,
+        )
 
+        rows = []
+        for (
+            ticker,
+            security_name,
+            name,
+            asset_class,
+            asset_category,
+            asset_group,
+            group_code,
+            category_code,
+            account_id,
+            account_name,
+            row_values,
+            holding_id,
+        ) in columns:
             rows.append(
                 {
                     "hierarchy_level": HierarchyLevel.HOLDING,
-                    "ticker": row["Ticker"],
-                    "security_name": row.get("Security_Name", ""),
-                    "name": row.get("Security_Name", row["Ticker"]),
-                    "asset_class": row["Asset_Class"],
-                    "asset_category": row.get("Asset_Category", ""),
-                    "asset_group": row.get("Asset_Group", ""),
-                    "group_code": row.get("Group_Code", ""),
-                    "category_code": row.get("Category_Code", ""),
-                    "account_id": int(row.get("Account_ID", 0)),
-                    "account_name": row.get("Account_Name", ""),
+                    "ticker": ticker,
+                    "security_name": security_name,
+                    "name": name,
+                    "asset_class": asset_class,
+                    "asset_category": asset_category,
+                    "asset_group": asset_group,
+                    "group_code": group_code,
+                    "category_code": category_code,
+                    "account_id": int(account_id),
+                    "account_name": account_name,
                     # Raw values
-                    "price": float(row.get("Price", 0.0)),
-                    "shares": float(row.get("Shares", 0.0)),
-                    "target_shares": float(row.get("Target_Shares", 0.0)),
-                    "shares_variance": float(row.get("Shares_Variance", 0.0)),
-                    "value": float(row.get("Value", 0.0)),
-                    "target_value": float(row.get("Target_Value", 0.0)),
-                    "value_variance": float(row.get("Value_Variance", 0.0)),
-                    "allocation": float(row.get("Allocation_Pct", 0.0)),
-                    "target_allocation": float(row.get("Target_Allocation_Pct", 0.0)),
-                    "allocation_variance": float(row.get("Allocation_Variance_Pct", 0.0)),
+                    **row_values,
                     # UI metadata
-                    "is_zero_holding": is_zero_holding,
-                    "parent_id": parent_id,
-                    "row_id": f"holding-{row['Ticker']}",
-                    "holding_id": row.get("holding_id", None),
+                    "is_zero_holding": row_values["shares"] == 0.0 and row_values["value"] == 0.0,
+                    # parent_id drives the collapse functionality
+                    "parent_id": f"cat-{category_code}",
+                    "row_id": f"holding-{ticker}",
+                    "holding_id": holding_id,
                 }
             )
 
+        if display:
+            _attach_display(
+                rows,
+                _display_records(
+                    floats,
+                    {
+                        "shares": "Shares",
+                        "price": "Price",
+                        "value": "Value",
+                        "allocation": "Allocation_Pct",
+                    },
+                    formats={
+                        "shares": partial(format_number, decimals=4),
+                        "price": partial(format_money, decimals=2),
+                        "allocation": format_percent,
+                    },
+                ),
+            )
         return rows
 
-    def _aggregation_df_to_dicts(self, df: pd.DataFrame) -> list[dict]:
+    def _aggregation_df_to_dicts(self, df: pd.DataFrame, display: bool = False) -> list[dict]:
         """
         Convert aggregation DataFrame to list of dicts for display.
 
@@ -302,48 +536,81 @@ class AllocationFormatter:
         if df.empty:
             return []
 
+        floats = _FloatColumns(df)
+        values = _float_records(
+            floats,
+            {
+                "value": "Value",
+                "target_value": "Target_Value",
+                "value_variance": "Value_Variance",
+                "allocation": "Allocation",
+                "target_allocation": "Target_Allocation",
+                "allocation_variance": "Allocation_Variance",
+            },
+        )
+        columns = zip(
+            _values(df, "hierarchy_level", HierarchyLevel.HOLDING),
+            _values(df, "Asset_Category", ""),
+            _values(df, "Asset_Group", ""),
+            _values(df, "Category_Code", ""),
+            _values(df, "Group_Code", ""),
+            _values(df, "name", "Grand Total"),
+            values,
+            (
+                _display_records(
+                    floats,
+                    {"value": "Value", "allocation": "Allocation"},
+                    formats={"allocation": format_percent},
+                )
+                if display
+                else [None] * len(df)
+            ),
+            strict=True,
+        )
+
         rows = []
-        for _, row in df.iterrows():
-            hierarchy_level = int(row.get("hierarchy_level", HierarchyLevel.HOLDING))
+        for (
+            level,
+            category,
+            group,
+            category_code,
+            group_code,
+            name,
+            row_values,
+            row_display,
+        ) in columns:
+            hierarchy_level = int(level)
 
             # Build row dict based on hierarchy level
             if hierarchy_level == HierarchyLevel.CATEGORY_SUBTOTAL:
                 row_dict = {
                     "hierarchy_level": hierarchy_level,
-                    "name": f"{row.get('Asset_Category', '')} Total",
-                    "category_code": row.get("Category_Code", ""),
-                    "group_code": row.get("Group_Code", ""),
-                    "row_id": f"cat-{row.get('Category_Code', '')}",
-                    "parent_id": f"grp-{row.get('Group_Code', '')}",
+                    "name": f"{category} Total",
+                    "category_code": category_code,
+                    "group_code": group_code,
+                    "row_id": f"cat-{category_code}",
+                    "parent_id": f"grp-{group_code}",
                 }
             elif hierarchy_level == HierarchyLevel.GROUP_TOTAL:
                 row_dict = {
                     "hierarchy_level": hierarchy_level,
-                    "name": f"{row.get('Asset_Group', '')} Total",
-                    "group_code": row.get("Group_Code", ""),
-                    "row_id": f"grp-{row.get('Group_Code', '')}",
+                    "name": f"{group} Total",
+                    "group_code": group_code,
+                    "row_id": f"grp-{group_code}",
                 }
             elif hierarchy_level == HierarchyLevel.GRAND_TOTAL:
                 row_dict = {
                     "hierarchy_level": hierarchy_level,
-                    "name": row.get("name", "Grand Total"),
+                    "name": name,
                     "row_id": "grand-total",
                 }
             else:
                 continue  # Skip unknown hierarchy levels
 
             # Add financial values (if they exist)
-            row_dict.update(
-                {
-                    "value": float(row.get("Value", 0.0)),
-                    "target_value": float(row.get("Target_Value", 0.0)),
-                    "value_variance": float(row.get("Value_Variance", 0.0)),
-                    "allocation": float(row.get("Allocation", 0.0)),
-                    "target_allocation": float(row.get("Target_Allocation", 0.0)),
-                    "allocation_variance": float(row.get("Allocation_Variance", 0.0)),
-                }
-            )
-
+            row_dict.update(row_values)
+            if row_display is not None:
+                row_dict["display"] = row_display
             rows.append(row_dict)
 
         return rows
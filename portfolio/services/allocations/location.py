@@ -0,0 +1,192 @@
+"""
+Tax-aware asset location.
+
+Decides *where* the portfolio's policy allocation should be held. One linear
+program over the (account x asset class) dollar allocation maximises
+after-tax expected return, subject to every account keeping its current total
+and every asset class summing to its policy target across the portfolio.
+
+The result is expressed as per-account target percentages, the same shape as
+``DjangoDataProvider.get_targets_map``, so ``AssetLocationDataProvider`` can be
+dropped into ``AllocationEngine`` to compare holdings against location-aware
+targets.
+"""
+
+from __future__ import annotations
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any, cast
+
+import cvxpy as cp
+import numpy as np
+import scipy.sparse as sp
+import structlog
+
+from .data_providers import DjangoDataProvider
+from .types import TargetMap
+
+logger = structlog.get_logger(__name__)
+
+# Fraction of expected return lost to tax, by AccountType.tax_treatment.
+# Tax-free growth keeps everything; deferred accounts pay income tax on
+# withdrawal; taxable accounts also lose returns to tax drag every year.
+DEFAULT_TAX_DRAG: dict[str, float] = {
+    "TAX_FREE": 0.0,
+    "TAX_DEFERRED": 0.15,
+    "TAXABLE": 0.25,
+}
+
+
+def solve_asset_location(
+    account_totals: np.ndarray,
+    class_weights: np.ndarray,
+    expected_returns: np.ndarray,
+    tax_drag: np.ndarray,
+) -> np.ndarray:
+    """
+    Dollar allocation per (account, asset class) maximising after-tax return.
+
+    The allocation ``x`` is flattened row-major (account-major), so the
+    account-total and class-total constraints are the sparse Kronecker
+    products ``I_a (x) 1_c'`` and ``1_a' (x) I_c``.
+
+    Args:
+        account_totals: Current value of each account (length A)
+        class_weights: Portfolio policy weight of each asset class (length C,
+            summing to 1)
+        expected_returns: Expected return of each asset class (length C)
+        tax_drag: Fraction of return lost to tax in each account (length A)
+
+    Returns:
+        (A, C) array of dollar allocations
+
+    Raises:
+        ValueError: If the solver does not reach an optimal solution
+    """
+    n_accounts, n_classes = len(account_totals), len(class_weights)
+    portfolio_total = float(account_totals.sum())
+
+    # After-tax return of holding each class in each account: outer product
+    after_tax = np.outer(1.0 - tax_drag, expected_returns).ravel()
+
+    account_rows = sp.kron(sp.eye(n_accounts), np.ones((1, n_classes)), format="csr")
+    class_rows = sp.kron(np.ones((1, n_accounts)), sp.eye(n_classes), format="csr")
+
+    x = cp.Variable(n_accounts * n_classes, nonneg=True)
+    problem = cp.Problem(
+        cp.Maximize(after_tax @ x),
+        [
+            account_rows @ x == account_totals,
+            class_rows @ x == class_weights * portfolio_total,
+        ],
+    )
+    problem.solve()  # type: ignore[no-untyped-call]
+
+    if problem.status not in ["optimal", "optimal_inaccurate"] or x.value is None:
+        raise ValueError(f"Asset location failed with status: {problem.status}")
+
+    allocation = cast(np.ndarray, np.clip(x.value, 0.0, None))
+    return allocation.reshape(n_accounts, n_classes)
+
+
+class AssetLocationOptimizer:
+    """
+    Location-aware effective targets for a user's accounts.
+
+    Uses the portfolio policy targets (the portfolio's allocation strategy),
+    ``AssetClass.expected_return`` and ``AccountType.tax_treatment``. Asset
+    classes without an expected return are treated as returning nothing.
+    """
+
+    def __init__(
+        self,
+        data_provider: DjangoDataProvider | None = None,
+        tax_drag: dict[str, float] | None = None,
+    ):
+        self.data_provider = data_provider or DjangoDataProvider()
+        self.tax_drag = tax_drag or DEFAULT_TAX_DRAG
+
+    def get_targets_map(self, user: Any) -> TargetMap:
+        """
+        Recommended targets: {account_id: {asset_class_name: target_pct}}.
+
+        Returns an empty map if the user has no policy targets or no holdings.
+        """
+        from portfolio.models import Account, AssetClass
+
+        policy_targets = {
+            name: float(pct)
+            for name, pct in self.data_provider.get_policy_targets(user).items()
+            if pct > 0
+        }
+        if not policy_targets:
+            return {}
+
+        holdings_df = self.data_provider.get_holdings_df(user)
+        if holdings_df.empty:
+            return {}
+        totals = holdings_df.groupby("account_id")["value"].sum()
+        totals = totals[totals > 0]
+        if totals.empty:
+            return {}
+
+        account_ids = totals.index.to_list()
+        treatments = dict(
+            Account.objects.filter(id__in=account_ids).values_list(
+                "id", "account_type__tax_treatment"
+            )
+        )
+        returns = dict(
+            AssetClass.objects.filter(name__in=policy_targets).values_list(
+                "name", "expected_return"
+            )
+        )
+
+        class_names = list(policy_targets)
+        weights = np.array([policy_targets[name] for name in class_names])
+        allocation = solve_asset_location(
+            account_totals=totals.to_numpy(dtype=float),
+            class_weights=weights / weights.sum(),
+            expected_returns=np.array([float(returns.get(name) or 0) for name in class_names]),
+            tax_drag=np.array([self.tax_drag.get(treatments.get(i, ""), 0.0) for i in account_ids]),
+        )
+
+        percents = allocation / totals.to_numpy(dtype=float)[:, None] * 100
+        result: TargetMap = {}
+        for account_id, row in zip(account_ids, percents, strict=True):
+            targets = {
+                name: Decimal(str(pct)).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+                for name, pct in zip(class_names, row, strict=True)
+            }
+            result[int(account_id)] = {name: pct for name, pct in targets.items() if pct > 0}
+
+        logger.info(
+            "asset_location_optimized",
+            accounts=len(account_ids),
+            asset_classes=len(class_names),
+        )
+        return result
+
+
+class AssetLocationDataProvider(DjangoDataProvider):
+    """
+    Data provider whose effective targets come from the asset location optimizer.
+
+    Accounts the optimizer does not place (no holdings, or no portfolio policy
+    targets) keep their strategy-based targets.
+
+    Usage:
+        engine = AllocationEngine(data_provider=AssetLocationDataProvider())
+    """
+
+    def __init__(self, tax_drag: dict[str, float] | None = None):
+        super().__init__()
+        self.optimizer = AssetLocationOptimizer(data_provider=self, tax_drag=tax_drag)
+
+    def get_targets_map(self, user: Any, account_ids: list[int] | None = None) -> TargetMap:
+        targets = super().get_targets_map(user, account_ids)
+        located = self.optimizer.get_targets_map(user)
+        if account_ids is not None:
+            located = {k: v for k, v in located.items() if k in account_ids}
+        targets.update(located)
+        return targets
@@ -4,6 +4,7 @@ from typing import Any, Protocol
 
 import pandas as pd
 
+from .snapshot import HoldingsSnapshot
 from .types import TargetMap
 
 
@@ -14,6 +15,10 @@ class DataProvider(Protocol):
         """Get holdings as long-format DataFrame."""
         ...
 
+    def get_holdings_snapshot(self, user: Any) -> HoldingsSnapshot:
+        """Get holdings as an array-backed snapshot."""
+        ...
+
     def get_accounts_metadata(self, user: Any) -> tuple[list[dict], dict[int, list[dict]]]:
         """Get account metadata."""
         ...
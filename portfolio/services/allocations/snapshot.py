@@ -0,0 +1,263 @@
+"""Compact, array-backed holdings snapshot for hot calculation paths."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from numpy.typing import ArrayLike
+
+# Column order of DjangoDataProvider.get_holdings_df()
+HOLDINGS_COLUMNS = [
+    "account_id",
+    "account_name",
+    "account_type_code",
+    "asset_class",
+    "asset_class_id",
+    "category_code",
+    "ticker",
+    "shares",
+    "price",
+    "value",
+]
+
+
+def _factorize(ids: Sequence[Any]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return (codes, unique ids, index of first occurrence of each unique id)."""
+    codes, uniques = pd.factorize(pd.Series(ids, dtype="int64"), sort=False)
+    # Codes are 0..k-1 in order of first appearance, so return_index aligns with uniques
+    _, first_index = np.unique(codes, return_index=True)
+    return codes.astype(np.int32), np.asarray(uniques, dtype=np.int64), first_index
+
+
+@dataclass(frozen=True, eq=False)
+class HoldingsSnapshot:
+    """
+    Immutable, columnar holdings snapshot.
+
+    Row data lives in parallel NumPy arrays (one entry per holding); repeated
+    entities (accounts, asset classes, securities) are stored once in small
+    lookup tables and referenced by int32 codes. No model instances or object
+    columns are held, so the snapshot is small and cheap to pickle into a cache.
+
+    Lookup tables:
+        account_ids / account_names / account_type_codes
+        asset_class_ids / asset_class_names / category_codes
+        security_ids / tickers
+
+    Row arrays:
+        account_codes, asset_class_codes, security_codes (int32 codes)
+        shares, prices, values (float64)
+    """
+
+    account_ids: np.ndarray
+    account_names: tuple[str, ...]
+    account_type_codes: tuple[str, ...]
+    asset_class_ids: np.ndarray
+    asset_class_names: tuple[str, ...]
+    category_codes: tuple[str, ...]
+    security_ids: np.ndarray
+    tickers: tuple[str, ...]
+    account_codes: np.ndarray
+    asset_class_codes: np.ndarray
+    security_codes: np.ndarray
+    shares: np.ndarray
+    prices: np.ndarray
+    values: np.ndarray
+
+    @classmethod
+    def from_columns(
+        cls,
+        *,
+        account_id: Sequence[int],
+        asset_class_id: Sequence[int],
+        security_id: Sequence[int],
+        shares: ArrayLike,
+        price: ArrayLike,
+        value: ArrayLike | None = None,
+        account_name: Sequence[str] | None = None,
+        account_type_code: Sequence[str] | None = None,
+        asset_class: Sequence[str] | None = None,
+        category_code: Sequence[str] | None = None,
+        ticker: Sequence[str] | None = None,
+    ) -> HoldingsSnapshot:
+        """
+        Build a snapshot from per-holding columns.
+
+        Label columns are optional; labels for each entity are taken from its
+        first occurrence. ``value`` defaults to ``shares * price``.
+        """
+        n = len(account_id)
+
+        def labels(column: Sequence[str] | None, first: np.ndarray) -> tuple[str, ...]:
+            if column is None:
+                return ("",) * len(first)
+            return tuple(str(column[i]) for i in first)
+
+        account_codes, account_ids, account_first = _factorize(account_id)
+        ac_codes, ac_ids, ac_first = _factorize(asset_class_id)
+        sec_codes, sec_ids, sec_first = _factorize(security_id)
+
+        shares_arr = np.asarray(shares, dtype=np.float64).reshape(n)
+        prices_arr = np.asarray(price, dtype=np.float64).reshape(n)
+        values_arr = (
+            shares_arr * prices_arr
+            if value is None
+            else np.asarray(value, dtype=np.float64).reshape(n)
+        )
+
+        return cls(
+            account_ids=account_ids,
+            account_names=labels(account_name, account_first),
+            account_type_codes=labels(account_type_code, account_first),
+            asset_class_ids=ac_ids,
+            asset_class_names=labels(asset_class, ac_first),
+            category_codes=labels(category_code, ac_first),
+            security_ids=sec_ids,
+            tickers=labels(ticker, sec_first),
+            account_codes=account_codes,
+            asset_class_codes=ac_codes,
+            security_codes=sec_codes,
+            shares=shares_arr,
+            prices=prices_arr,
+            values=values_arr,
+        )
+
+    @classmethod
+    def from_dataframe(cls, holdings_df: pd.DataFrame) -> HoldingsSnapshot:
+        """
+        Build a snapshot from a ``get_holdings_df()`` long-format DataFrame.
+
+        Securities are keyed by ticker (the holdings frame carries no security id).
+        """
+        if holdings_df.empty:
+            return cls.empty()
+
+        ticker_codes, _ = pd.factorize(holdings_df["ticker"], sort=False)
+        return cls.from_columns(
+            account_id=holdings_df["account_id"].to_numpy(),
+            asset_class_id=holdings_df["asset_class_id"].to_numpy(),
+            security_id=ticker_codes,
+            shares=holdings_df["shares"].to_numpy(),
+            price=holdings_df["price"].to_numpy(),
+            value=holdings_df["value"].to_numpy(),
+            account_name=holdings_df["account_name"].to_numpy(),
+            account_type_code=holdings_df["account_type_code"].to_numpy(),
+            asset_class=holdings_df["asset_class"].to_numpy(),
+            category_code=holdings_df["category_code"].to_numpy(),
+            ticker=holdings_df["ticker"].to_numpy(),
+        )
+
+    @classmethod
+    def empty(cls) -> HoldingsSnapshot:
+        """Snapshot with no holdings."""
+        return cls.from_columns(
+            account_id=[], asset_class_id=[], security_id=[], shares=[], price=[]
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.values) == 0
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory used by the array data."""
+        arrays = (
+            self.account_ids,
+            self.asset_class_ids,
+            self.security_ids,
+            self.account_codes,
+            self.asset_class_codes,
+            self.security_codes,
+            self.shares,
+            self.prices,
+            self.values,
+        )
+        return sum(a.nbytes for a in arrays)
+
+    # ------------------------------------------------------------------
+    # Per-row views
+    # ------------------------------------------------------------------
+
+    @property
+    def row_account_ids(self) -> np.ndarray:
+        return self.account_ids.take(self.account_codes)
+
+    @property
+    def row_asset_class_ids(self) -> np.ndarray:
+        return self.asset_class_ids.take(self.asset_class_codes)
+
+    @property
+    def row_security_ids(self) -> np.ndarray:
+        return self.security_ids.take(self.security_codes)
+
+    # ------------------------------------------------------------------
+    # Aggregations
+    # ------------------------------------------------------------------
+
+    def account_totals(self) -> pd.Series:
+        """Total value per account id (NaN values are skipped)."""
+        totals = pd.Series(self.values).groupby(self.account_codes).sum()
+        totals.index = pd.Index(self.account_ids[totals.index], name="account_id")
+        return totals.sort_index()
+
+    def asset_class_totals(self) -> np.ndarray:
+        """Total value per asset class, aligned with ``asset_class_ids``."""
+        return np.bincount(
+            self.asset_class_codes,
+            weights=np.nan_to_num(self.values),
+            minlength=len(self.asset_class_ids),
+        )
+
+    def target_matrix(self, targets_map: dict[int, dict[str, Any]]) -> np.ndarray:
+        """
+        Dense (account × asset class) matrix of target percentages.
+
+        Args:
+            targets_map: {account_id: {asset_class_name: target_pct}}
+        """
+        matrix = np.zeros((len(self.account_ids), len(self.asset_class_ids)), dtype=np.float64)
+        ac_index = {name: j for j, name in enumerate(self.asset_class_names)}
+        for i, account_id in enumerate(self.account_ids.tolist()):
+            for ac_name, target_pct in targets_map.get(account_id, {}).items():
+                j = ac_index.get(ac_name)
+                if j is not None:
+                    matrix[i, j] = float(target_pct)
+        return matrix
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """
+        Expand to the long-format ``get_holdings_df()`` schema.
+
+        Label columns are categorical, as in ``get_holdings_df()``.
+        """
+        if self.is_empty:
+            return pd.DataFrame()
+
+        def expand(labels: tuple[str, ...], codes: np.ndarray) -> pd.Categorical:
+            # Categorical straight from the entity codes: sorted distinct labels
+            # as categories, with no per-row string hashing
+            label_codes, categories = pd.factorize(np.asarray(labels, dtype=object), sort=True)
+            return pd.Categorical.from_codes(label_codes[codes], categories=categories)
+
+        return pd.DataFrame(
+            {
+                "account_id": self.row_account_ids,
+                "account_name": expand(self.account_names, self.account_codes),
+                "account_type_code": expand(self.account_type_codes, self.account_codes),
+                "asset_class": expand(self.asset_class_names, self.asset_class_codes),
+                "asset_class_id": self.row_asset_class_ids,
+                "category_code": expand(self.category_codes, self.asset_class_codes),
+                "ticker": expand(self.tickers, self.security_codes),
+                "shares": self.shares,
+                "price": self.prices,
+                "value": self.values,
+            },
+            columns=HOLDINGS_COLUMNS,
+        )
@@ -2,7 +2,7 @@
 
 from decimal import Decimal
 from enum import IntEnum
-from typing import Any, TypedDict
+from typing import Any, NamedTuple, TypedDict
 
 # Type aliases (Python 3.12+ syntax)
 type AllocationDict = dict[str, Decimal]  # {asset_class_name: target_pct}
@@ -25,6 +25,15 @@ class HierarchyLevel(IntEnum):
     GRAND_TOTAL = -1  # Portfolio-wide total
 
 
+class HoldingDelta(NamedTuple):
+    """Change in one account's market value of one asset class."""
+
+    account_id: int
+    account_type_code: str
+    asset_class_id: int
+    value: float
+
+
 class AccountTypeMetrics(TypedDict):
     """Metrics for a single account type."""
 
@@ -73,6 +82,14 @@ class HoldingRow(TypedDict):
     is_grand_total: bool
 
 
+class SidebarMetrics(TypedDict):
+    """Per-account totals and target deviations behind the sidebar."""
+
+    grand_total: Decimal
+    account_totals: dict[int, Decimal]
+    account_variances: dict[int, float]
+
+
 class SidebarData(TypedDict):
     """Sidebar aggregated data."""
 
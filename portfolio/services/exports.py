@@ -0,0 +1,263 @@
+"""
+Streaming export of holdings, allocation and rebalancing data.
+
+Rows are produced lazily and serialized one at a time so exports can be sent
+with ``StreamingHttpResponse`` without buffering the whole file in memory.
+
+Columns carry their type, so values stay numeric until serialization: the
+CSV writer applies each column's fixed decimal places, and the Parquet schema
+is built from the column types up front rather than inferred per row group.
+
+CSV is always available. Parquet requires the optional ``pyarrow`` package
+(``pip install portfolio-management[export]``); rows are written in row groups
+and flushed to the client as each group completes.
+"""
+
+from __future__ import annotations
+
+import csv
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Literal
+
+import structlog
+
+from portfolio.services.allocations.types import HierarchyLevel
+
+if TYPE_CHECKING:
+    from portfolio.services.rebalancing import RebalancingPlan
+
+logger = structlog.get_logger(__name__)
+
+PARQUET_ROW_GROUP_SIZE = 5000
+
+ColumnKind = Literal["string", "int", "float"]
+
+
+@dataclass(frozen=True)
+class ExportColumn:
+    """A named, typed export column and how to extract it from a source row."""
+
+    header: str
+    getter: Callable[[Any], Any]
+    kind: ColumnKind = "string"
+    decimals: int | None = None
+    """Fixed decimal places in CSV output; other formats keep full precision."""
+
+
+def _key(name: str, default: Any = "") -> Callable[[Mapping[str, Any]], Any]:
+    return lambda row: row.get(name, default)
+
+
+def _portfolio_metric(key: str) -> Callable[[Mapping[str, Any]], Any]:
+    return lambda row: row["portfolio"].get(key, 0.0)
+
+
+def _account_type_metric(index: int, key: str) -> Callable[[Mapping[str, Any]], Any]:
+    return lambda row: row["account_types"][index].get(key, 0.0)
+
+
+# ============================================================================
+# Column specifications
+# ============================================================================
+
+HOLDINGS_COLUMNS = [
+    ExportColumn("Account", _key("account_name")),
+    ExportColumn("Ticker", _key("ticker")),
+    ExportColumn("Security Name", _key("security_name")),
+    ExportColumn("Asset Class", _key("asset_class")),
+    ExportColumn("Category", _key("asset_category")),
+    ExportColumn("Group", _key("asset_group")),
+    ExportColumn("Shares", _key("shares", 0.0), "float"),
+    ExportColumn("Price", _key("price", 0.0), "float"),
+    ExportColumn("Value", _key("value", 0.0), "float"),
+    ExportColumn("Target Value", _key("target_value", 0.0), "float"),
+    ExportColumn("Value Variance", _key("value_variance", 0.0), "float"),
+    ExportColumn("Allocation %", _key("allocation", 0.0), "float"),
+    ExportColumn("Target Allocation %", _key("target_allocation", 0.0), "float"),
+    ExportColumn("Allocation Variance %", _key("allocation_variance", 0.0), "float"),
+]
+
+ORDER_COLUMNS = [
+    ExportColumn("Action", lambda o: o.action),
+    ExportColumn("Ticker", lambda o: o.security.ticker),
+    ExportColumn("Security Name", lambda o: o.security.name),
+    ExportColumn("Asset Class", lambda o: o.asset_class.name),
+    ExportColumn("Shares", lambda o: o.shares, "int"),
+    ExportColumn("Price", lambda o: o.price_per_share, "float", decimals=2),
+    ExportColumn("Estimated Amount", lambda o: o.estimated_amount, "float", decimals=2),
+]
+
+_PRESENTATION_LEVEL_LABELS = {
+    HierarchyLevel.HOLDING: "Asset Class",
+    HierarchyLevel.CATEGORY_SUBTOTAL: "Category Total",
+    HierarchyLevel.GROUP_TOTAL: "Group Total",
+    HierarchyLevel.GRAND_TOTAL: "Grand Total",
+}
+
+_PRESENTATION_METRICS = [
+    ("Actual", "actual"),
+    ("Actual %", "actual_pct"),
+    ("Target", "effective"),
+    ("Target %", "effective_pct"),
+    ("Variance", "effective_variance"),
+    ("Variance %", "effective_variance_pct"),
+]
+
+
+def presentation_columns(rows: list[dict[str, Any]]) -> list[ExportColumn]:
+    """
+    Build presentation export columns.
+
+    Portfolio-level metrics come first, followed by the same metrics for each
+    account type present in the rows (taken from the first row).
+    """
+    columns = [
+        ExportColumn("Row Type", lambda r: _PRESENTATION_LEVEL_LABELS.get(r["hierarchy_level"])),
+        ExportColumn("Group", _key("group_label")),
+        ExportColumn("Category", _key("category_label")),
+        ExportColumn("Asset Class", _key("asset_class_name")),
+    ]
+
+    for label, key in _PRESENTATION_METRICS:
+        columns.append(ExportColumn(f"Portfolio {label}", _portfolio_metric(key), "float"))
+    columns.append(
+        ExportColumn("Portfolio Policy %", _portfolio_metric("explicit_target_pct"), "float")
+    )
+
+    account_types = rows[0].get("account_types", []) if rows else []
+    for index, account_type in enumerate(account_types):
+        for label, key in _PRESENTATION_METRICS:
+            columns.append(
+                ExportColumn(
+                    f"{account_type['label']} {label}", _account_type_metric(index, key), "float"
+                )
+            )
+
+    return columns
+
+
+# ============================================================================
+# Row sources
+# ============================================================================
+
+
+def holding_level_rows(rows: Iterable[dict[str, Any]]) -> Iterator[dict[str, Any]]:
+    """Yield only individual holding rows (skip subtotals and totals)."""
+    return (row for row in rows if row.get("hierarchy_level") == HierarchyLevel.HOLDING)
+
+
+def rebalancing_orders(plan: RebalancingPlan) -> Iterator[Any]:
+    """Yield the orders of a rebalancing plan."""
+    yield from plan.orders
+
+
+# ============================================================================
+# Serializers
+# ============================================================================
+
+
+class _Echo:
+    """Pseudo-buffer whose ``write`` returns the value instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def _csv_value(column: ExportColumn, value: Any) -> Any:
+    if column.decimals is None or value is None:
+        return value
+    return f"{value:.{column.decimals}f}"
+
+
+def stream_csv(columns: list[ExportColumn], rows: Iterable[Any]) -> Iterator[str]:
+    """Serialize rows to CSV lazily, one line per yield."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow([c.header for c in columns])
+    for row in rows:
+        yield writer.writerow([_csv_value(c, c.getter(row)) for c in columns])
+
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class _ChunkSink:
+    """Write-only file object that hands written bytes back to a generator.
+
+    Tracks its own position so the Parquet writer's offsets stay valid after
+    buffered chunks are drained.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_parquet(
+    columns: list[ExportColumn],
+    rows: Iterable[Any],
+    row_group_size: int = PARQUET_ROW_GROUP_SIZE,
+) -> Iterator[bytes]:
+    """
+    Serialize rows to Parquet, yielding bytes after each row group.
+
+    Raises:
+        ImportError: If pyarrow is not installed (check ``parquet_available()``)
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {"string": pa.string(), "int": pa.int64(), "float": pa.float64()}
+    converters: dict[ColumnKind, Callable[[Any], Any]] = {"string": str, "int": int, "float": float}
+    schema = pa.schema([pa.field(c.header, arrow_types[c.kind]) for c in columns])
+    convert = [converters[c.kind] for c in columns]
+    sink = _ChunkSink()
+
+    def to_table(batch: list[list[Any]]) -> pa.Table:
+        arrays = [
+            pa.array([None if r[i] is None else convert[i](r[i]) for r in batch], type=field.type)
+            for i, field in enumerate(schema)
+        ]
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    with pq.ParquetWriter(sink, schema) as writer:
+        batch: list[list[Any]] = []
+        for row in rows:
+            batch.append([c.getter(row) for c in columns])
+            if len(batch) >= row_group_size:
+                writer.write_table(to_table(batch))
+                batch = []
+                yield sink.drain()
+
+        if batch:
+            writer.write_table(to_table(batch))
+    yield sink.drain()
@@ -0,0 +1,408 @@
+"""
+HTTP load generator replaying a realistic page mix against a running server.
+
+``LoadTest`` logs seeded users in through the regular login form and has a
+pool of worker threads request a weighted mix of pages (dashboard, holdings,
+targets, ticker details, rebalancing) until a request budget or a deadline
+is reached. The report gives per-page and overall latency percentiles,
+throughput and the distribution of the server-side ``X-Request-Duration``
+header set by ``PerformanceTimingMiddleware``; the gap between client and
+server latency is time spent queueing in front of the workers.
+
+Only the standard library is used for HTTP, so the harness runs wherever the
+project does. Users usually come from ``manage.py generate_synthetic_data
+--password ...``, which gives every user the same login password.
+"""
+
+from __future__ import annotations
+
+import http.cookiejar
+import random
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from portfolio.models import Account, Holding
+
+# Relative weights of the default page mix, modelled on a typical session
+DEFAULT_MIX: dict[str, int] = {
+    "dashboard": 35,
+    "holdings": 25,
+    "targets": 15,
+    "ticker_details": 15,
+    "rebalancing": 10,
+}
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+class LoadTestError(Exception):
+    """The load test could not start (bad configuration or failed login)."""
+
+
+@dataclass(frozen=True)
+class LoadTestUser:
+    """A login and the objects its requests are drawn from."""
+
+    username: str
+    account_ids: tuple[int, ...]
+    tickers: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class RequestSample:
+    page: str
+    status: int
+    """HTTP status, or 0 when the request failed without a response."""
+    seconds: float
+    """Client-side latency."""
+    server_seconds: float | None
+    """Server-side duration from ``X-Request-Duration``, when present."""
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 400
+
+
+@dataclass(frozen=True)
+class PageStats:
+    """Aggregated samples of one page (or of all pages)."""
+
+    page: str
+    requests: int
+    errors: int
+    requests_per_second: float
+    latency_ms: dict[int, float]
+    """Client latency percentiles in milliseconds, keyed by percentile."""
+    server_ms: dict[int, float]
+    """Server duration percentiles in milliseconds, keyed by percentile."""
+
+    @classmethod
+    def from_samples(cls, page: str, samples: list[RequestSample], elapsed: float) -> PageStats:
+        return cls(
+            page=page,
+            requests=len(samples),
+            errors=sum(1 for s in samples if not s.ok),
+            requests_per_second=len(samples) / elapsed if elapsed > 0 else 0.0,
+            latency_ms=percentiles([s.seconds * 1000 for s in samples]),
+            server_ms=percentiles(
+                [s.server_seconds * 1000 for s in samples if s.server_seconds is not None]
+            ),
+        )
+
+
+@dataclass
+class LoadTestReport:
+    samples: list[RequestSample] = field(default_factory=list)
+    elapsed: float = 0.0
+    """Wall time of the measured phase (after login) in seconds."""
+    concurrency: int = 1
+
+    @property
+    def overall(self) -> PageStats:
+        return PageStats.from_samples("all", self.samples, self.elapsed)
+
+    @property
+    def pages(self) -> list[PageStats]:
+        by_page: dict[str, list[RequestSample]] = {}
+        for sample in self.samples:
+            by_page.setdefault(sample.page, []).append(sample)
+        return [
+            PageStats.from_samples(page, samples, self.elapsed)
+            for page, samples in sorted(by_page.items())
+        ]
+
+    def as_dict(self) -> dict[str, Any]:
+        def stats(s: PageStats) -> dict[str, Any]:
+            return {
+                "requests": s.requests,
+                "errors": s.errors,
+                "requests_per_second": round(s.requests_per_second, 2),
+                "latency_ms": {f"p{p}": round(v, 2) for p, v in s.latency_ms.items()},
+                "server_ms": {f"p{p}": round(v, 2) for p, v in s.server_ms.items()},
+            }
+
+        return {
+            "elapsed_seconds": round(self.elapsed, 3),
+            "concurrency": self.concurrency,
+            "overall": stats(self.overall),
+            "pages": {s.page: stats(s) for s in self.pages},
+        }
+
+
+def percentiles(values: list[float]) -> dict[int, float]:
+    """``PERCENTILES`` of ``values`` (empty when there are none)."""
+    if not values:
+        return {}
+    if len(values) == 1:
+        return dict.fromkeys(PERCENTILES, values[0])
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {p: cuts[p - 1] for p in PERCENTILES}
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    """
+    Parse a page mix like ``"dashboard=50,holdings=50"``.
+
+    Pages left out are not requested.
+
+    Raises:
+        LoadTestError: If a page is unknown or a weight is not a
+            non-negative integer, or all weights are zero
+    """
+    mix: dict[str, int] = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        page, sep, weight = part.partition("=")
+        page = page.strip()
+        if not sep or page not in DEFAULT_MIX:
+            raise LoadTestError(
+                f"Invalid mix entry '{part}'; expected <page>=<weight> with page in "
+                f"{', '.join(DEFAULT_MIX)}"
+            )
+        try:
+            mix[page] = int(weight)
+        except ValueError:
+            raise LoadTestError(f"Invalid weight in mix entry '{part}'") from None
+        if mix[page] < 0:
+            raise LoadTestError(f"Negative weight in mix entry '{part}'")
+    if not any(mix.values()):
+        raise LoadTestError("The page mix has no positive weights")
+    return mix
+
+
+def load_users(username_prefix: str, limit: int | None = None) -> list[LoadTestUser]:
+    """Users whose username starts with ``username_prefix``, with their accounts and tickers."""
+    user_model = get_user_model()
+    users = user_model.objects.filter(username__startswith=username_prefix).order_by("username")
+    if limit is not None:
+        users = users[:limit]
+    by_id = {user.pk: user.get_username() for user in users}
+
+    account_ids: dict[int, list[int]] = {}
+    for account_id, user_id in Account.objects.filter(user_id__in=by_id).values_list(
+        "id", "user_id"
+    ):
+        account_ids.setdefault(user_id, []).append(account_id)
+    tickers: dict[int, set[str]] = {}
+    for user_id, ticker in Holding.objects.filter(account__user_id__in=by_id).values_list(
+        "account__user_id", "security__ticker"
+    ):
+        tickers.setdefault(user_id, set()).add(ticker)
+
+    return [
+        LoadTestUser(
+            username=username,
+            account_ids=tuple(sorted(account_ids.get(user_id, []))),
+            tickers=tuple(sorted(tickers.get(user_id, set()))),
+        )
+        for user_id, username in by_id.items()
+    ]
+
+
+class PageMix:
+    """Draws page paths for a user according to the mix weights."""
+
+    def __init__(self, weights: dict[str, int]):
+        self.pages = [page for page, weight in weights.items() if weight > 0]
+        self.weights = [weights[page] for page in self.pages]
+        self.builders: dict[str, Callable[[LoadTestUser, random.Random], str | None]] = {
+            "dashboard": lambda user, rng: reverse("portfolio:dashboard"),
+            "holdings": self._holdings,
+            "targets": lambda user, rng: reverse("portfolio:target_allocations"),
+            "ticker_details": self._ticker_details,
+            "rebalancing": self._rebalancing,
+        }
+
+    def draw(self, user: LoadTestUser, rng: random.Random) -> tuple[str, str]:
+        """A ``(page, path)`` pair; pages the user has no data for fall back to the dashboard."""
+        page = rng.choices(self.pages, weights=self.weights)[0]
+        path = self.builders[page](user, rng)
+        if path is None:
+            return "dashboard", reverse("portfolio:dashboard")
+        return page, path
+
+    @staticmethod
+    def _holdings(user: LoadTestUser, rng: random.Random) -> str:
+        # Half the holdings views are the combined page, half a single account
+        if user.account_ids and rng.random() < 0.5:
+            return reverse("portfolio:account_holdings", args=[rng.choice(user.account_ids)])
+        return reverse("portfolio:holdings")
+
+    @staticmethod
+    def _ticker_details(user: LoadTestUser, rng: random.Random) -> str | None:
+        if not user.tickers:
+            return None
+        return reverse("portfolio:ticker_details", args=[rng.choice(user.tickers)])
+
+    @staticmethod
+    def _rebalancing(user: LoadTestUser, rng: random.Random) -> str | None:
+        if not user.account_ids:
+            return None
+        return reverse("portfolio:rebalancing", args=[rng.choice(user.account_ids)])
+
+
+class Session:
+    """A logged-in HTTP session with its own cookie jar."""
+
+    def __init__(self, base_url: str, timeout: float):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.cookies = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+
+    def login(self, username: str, password: str) -> None:
+        """
+        Log in through the login form.
+
+        Raises:
+            LoadTestError: If the server is unreachable or rejects the login
+        """
+        login_url = self.base_url + reverse("login")
+        try:
+            with self.opener.open(login_url, timeout=self.timeout) as response:
+                response.read()
+            csrf_token = next((c.value for c in self.cookies if c.name == "csrftoken"), "")
+            data = urllib.parse.urlencode(
+                {"csrfmiddlewaretoken": csrf_token, "username": username, "password": password}
+            ).encode()
+            request = urllib.request.Request(login_url, data=data, headers={"Referer": login_url})
+            with self.opener.open(request, timeout=self.timeout) as response:
+                response.read()
+                final_url = response.geturl()
+        except (urllib.error.URLError, OSError) as e:
+            raise LoadTestError(f"Login of {username} at {login_url} failed: {e}") from e
+        # A successful login redirects away from the form
+        if urllib.parse.urlsplit(final_url).path == reverse("login"):
+            raise LoadTestError(f"Login of {username} was rejected; check the password")
+
+    def get(self, page: str, path: str) -> RequestSample:
+        status = 0
+        server_seconds = None
+        start = time.perf_counter()
+        try:
+            with self.opener.open(self.base_url + path, timeout=self.timeout) as response:
+                response.read()
+                status = response.status
+                server_seconds = parse_duration(response.headers.get("X-Request-Duration"))
+        except urllib.error.HTTPError as e:
+            status = e.code
+            server_seconds = parse_duration(e.headers.get("X-Request-Duration"))
+        except (urllib.error.URLError, OSError):
+            pass
+        return RequestSample(page, status, time.perf_counter() - start, server_seconds)
+
+
+def parse_duration(value: str | None) -> float | None:
+    """Seconds from an ``X-Request-Duration`` header value like ``"0.123s"``."""
+    if not value:
+        return None
+    try:
+        return float(value.removesuffix("s"))
+    except ValueError:
+        return None
+
+
+class LoadTest:
+    """
+    Replay a weighted page mix with ``concurrency`` logged-in workers.
+
+    Each worker logs in as one of ``users`` (round robin) and sends requests
+    back to back until ``requests`` have been sent in total or ``duration``
+    seconds have passed, whichever comes first.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        users: Iterable[LoadTestUser],
+        password: str,
+        mix: dict[str, int] | None = None,
+        concurrency: int = 4,
+        duration: float | None = 30.0,
+        requests: int | None = None,
+        timeout: float = 30.0,
+        seed: int = 42,
+    ):
+        self.users = list(users)
+        if not self.users:
+            raise LoadTestError("No users to log in; generate them with generate_synthetic_data")
+        if duration is None and requests is None:
+            raise LoadTestError("Either a duration or a request count is required")
+        if concurrency < 1:
+            raise LoadTestError("Concurrency must be at least 1")
+        self.base_url = base_url
+        self.password = password
+        self.mix = PageMix(mix or DEFAULT_MIX)
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.timeout = timeout
+        self.seed = seed
+
+        self._lock = threading.Lock()
+        self._sent = 0
+        self._samples: list[RequestSample] = []
+
+    def run(self) -> LoadTestReport:
+        """
+        Log the workers in, then run the measured phase.
+
+        Raises:
+            LoadTestError: If a worker cannot log in
+        """
+        sessions = []
+        for i in range(self.concurrency):
+            session = Session(self.base_url, self.timeout)
+            session.login(self.users[i % len(self.users)].username, self.password)
+            sessions.append(session)
+
+        start = time.perf_counter()
+        deadline = start + self.duration if self.duration is not None else None
+        threads = [
+            threading.Thread(
+                target=self._work,
+                args=(
+                    session,
+                    self.users[i % len(self.users)],
+                    random.Random(self.seed + i),
+                    deadline,
+                ),
+                daemon=True,
+            )
+            for i, session in enumerate(sessions)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        return LoadTestReport(
+            samples=self._samples,
+            elapsed=time.perf_counter() - start,
+            concurrency=self.concurrency,
+        )
+
+    def _claim(self) -> bool:
+        """Reserve one request from the budget."""
+        with self._lock:
+            if self.requests is not None and self._sent >= self.requests:
+                return False
+            self._sent += 1
+            return True
+
+    def _work(
+        self, session: Session, user: LoadTestUser, rng: random.Random, deadline: float | None
+    ) -> None:
+        while (deadline is None or time.perf_counter() < deadline) and self._claim():
+            sample = session.get(*self.mix.draw(user, rng))
+            with self._lock:
+                self._samples.append(sample)
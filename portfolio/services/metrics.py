@@ -0,0 +1,495 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Provides counters and histograms for request latency, engine stage durations,
+optimizer solve times, price fetch latency/errors and cache hit ratios.
+
+Two modes:
+- Single process (default): metrics live in memory and are rendered directly.
+- Multi-process (gunicorn): set METRICS_MULTIPROC_DIR to a directory shared by
+  all workers. Each process periodically writes its own samples to
+  ``metrics-<pid>.json`` in that directory (and once more at exit) and the
+  ``/metrics/`` endpoint sums every process file at scrape time.
+
+Files of processes that have exited are merged into ``metrics-dead.json`` at
+scrape time, so counters keep the totals of restarted workers without the
+directory growing. A new process whose pid matches a dead worker's file
+merges that file before writing its own, so pid reuse never makes a counter
+go backwards. Files whose histogram buckets do not match the registered
+metrics (e.g. written before a bucket change) are skipped with a warning.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Latency buckets in seconds (request and stage timings)
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Samples of exited processes, merged from their per-process files
+DEAD_PROCESSES_FILE = "metrics-dead.json"
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape_label_value(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Base class for labelled metrics."""
+
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"Metric {self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    @abstractmethod
+    def dump(self) -> dict[str, Any]:
+        """Samples keyed by JSON-encoded label values."""
+
+    @abstractmethod
+    def reset(self) -> None:
+        """Discard all samples."""
+
+    @abstractmethod
+    def accepts(self, value: Any) -> bool:
+        """Whether ``value`` is a sample of this metric's shape (from a process file)."""
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increment the counter for the given label values."""
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def get(self, **labels: Any) -> float:
+        """Return the current value for the given label values."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def dump(self) -> dict[str, Any]:
+        with self._lock:
+            return {json.dumps(list(k)): v for k, v in self._values.items()}
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, int | float)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., sum, count]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record an observation for the given label values."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall-clock duration of the wrapped block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def get_count(self, **labels: Any) -> float:
+        """Return the number of observations for the given label values."""
+        state = self._values.get(self._key(labels))
+        return state[-1] if state else 0.0
+
+    def get_sum(self, **labels: Any) -> float:
+        """Return the sum of observations for the given label values."""
+        state = self._values.get(self._key(labels))
+        return state[-2] if state else 0.0
+
+    def dump(self) -> dict[str, Any]:
+        with self._lock:
+            return {json.dumps(list(k)): list(v) for k, v in self._values.items()}
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, list) and len(value) == len(self.buckets) + 2
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics with Prometheus text rendering.
+
+    When a multi-process directory is configured, ``flush()`` writes this
+    process's samples to disk and ``render()`` aggregates all process files.
+    """
+
+    def __init__(self, multiproc_dir: str | Path | None = None, flush_interval: float = 1.0):
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+        self._multiproc_dir = Path(multiproc_dir) if multiproc_dir else None
+        self.flush_interval = flush_interval
+        self._last_flush = 0.0
+        # Pid this registry last wrote a process file for
+        self._flushed_pid: int | None = None
+
+    @property
+    def multiproc_dir(self) -> Path | None:
+        """Shared directory for multi-process aggregation (None = in-process only)."""
+        if self._multiproc_dir is not None:
+            return self._multiproc_dir
+        configured = getattr(settings, "METRICS_MULTIPROC_DIR", None)
+        return Path(configured) if configured else None
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        """Register (or return the existing) counter."""
+        return self._register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Register (or return the existing) histogram."""
+        return self._register(  # type: ignore[return-value]
+            Histogram(name, documentation, labelnames, buckets)
+        )
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def reset(self) -> None:
+        """Clear all recorded samples (metric definitions are kept)."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+    # ------------------------------------------------------------------
+    # Multi-process support
+    # ------------------------------------------------------------------
+
+    def _process_file(self, directory: Path) -> Path:
+        return directory / f"metrics-{os.getpid()}.json"
+
+    def flush(self, force: bool = False) -> None:
+        """
+        Persist this process's samples to the shared directory.
+
+        Throttled to once per ``flush_interval`` seconds unless ``force`` is set.
+        No-op in single-process mode.
+        """
+        directory = self.multiproc_dir
+        if directory is None:
+            return
+
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+
+        payload = {name: metric.dump() for name, metric in self._metrics.items()}
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            pid = os.getpid()
+            if self._flushed_pid != pid:
+                # An existing file for this pid belongs to an exited process
+                # whose pid was reused: keep its samples before overwriting
+                with _directory_lock(directory):
+                    self._merge_dead_files(directory, [self._process_file(directory)])
+                self._flushed_pid = pid
+            _write_json(self._process_file(directory), payload)
+        except OSError as e:
+            logger.warning("metrics_flush_failed", directory=str(directory), error=str(e))
+
+    def _read_samples(self, path: Path) -> dict[str, dict[str, Any]] | None:
+        """
+        Samples of registered metrics from a process file.
+
+        Returns None if the file is unreadable or any sample does not match
+        its metric's shape; the whole file is skipped then.
+        """
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError) as e:
+            logger.warning("metrics_file_unreadable", path=str(path), error=str(e))
+            return None
+
+        samples: dict[str, dict[str, Any]] = {}
+        for name, values in data.items():
+            metric = self._metrics.get(name)
+            if metric is None:
+                continue
+            if not all(metric.accepts(value) for value in values.values()):
+                logger.warning("metrics_file_mismatched", path=str(path), metric=name)
+                return None
+            samples[name] = values
+        return samples
+
+    @staticmethod
+    def _merge(target: dict[str, dict[str, Any]], samples: dict[str, dict[str, Any]]) -> None:
+        """Add ``samples`` into ``target`` (both validated by ``_read_samples``)."""
+        for name, values in samples.items():
+            merged = target.setdefault(name, {})
+            for key, value in values.items():
+                current = merged.get(key)
+                if current is None:
+                    merged[key] = list(value) if isinstance(value, list) else value
+                elif isinstance(value, list):
+                    merged[key] = [a + b for a, b in zip(current, value, strict=True)]
+                else:
+                    merged[key] = current + value
+
+    def _merge_dead_files(self, directory: Path, paths: list[Path]) -> None:
+        """Fold process files into the dead-processes file and delete them (lock held)."""
+        paths = [path for path in paths if path.exists()]
+        if not paths:
+            return
+
+        dead_path = directory / DEAD_PROCESSES_FILE
+        totals = (self._read_samples(dead_path) if dead_path.exists() else None) or {}
+        for path in paths:
+            samples = self._read_samples(path)
+            if samples is not None:
+                self._merge(totals, samples)
+        _write_json(dead_path, totals)
+        for path in paths:
+            path.unlink(missing_ok=True)
+        logger.info("metrics_dead_processes_merged", files=len(paths))
+
+    def _dead_process_files(self, directory: Path) -> list[Path]:
+        own_pid = os.getpid()
+        dead = []
+        for path in directory.glob("metrics-*.json"):
+            pid = path.stem.removeprefix("metrics-")
+            if pid.isdigit() and int(pid) != own_pid and not _pid_alive(int(pid)):
+                dead.append(path)
+        return dead
+
+    def _collect(self) -> dict[str, dict[str, Any]]:
+        """Return samples per metric, merged across processes when configured."""
+        directory = self.multiproc_dir
+        if directory is None:
+            return {name: metric.dump() for name, metric in self._metrics.items()}
+
+        self.flush(force=True)
+        merged: dict[str, dict[str, Any]] = {name: {} for name in self._metrics}
+        # Held while reading so a concurrent merge cannot count a file twice
+        with _directory_lock(directory):
+            self._merge_dead_files(directory, self._dead_process_files(directory))
+            for path in sorted(directory.glob("metrics-*.json")):
+                samples = self._read_samples(path)
+                if samples is not None:
+                    self._merge(merged, samples)
+        return merged
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        collected = self._collect()
+        lines: list[str] = []
+
+        for name, metric in sorted(self._metrics.items()):
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.metric_type}")
+            samples = collected.get(name, {})
+
+            for key in sorted(samples):
+                label_values = json.loads(key)
+                value = samples[key]
+
+                if isinstance(metric, Histogram):
+                    bucket_names = (*metric.labelnames, "le")
+                    for bound, count in zip(metric.buckets, value[:-2], strict=True):
+                        labels = _format_labels(bucket_names, (*label_values, _format_value(bound)))
+                        lines.append(f"{name}_bucket{labels} {_format_value(count)}")
+                    labels = _format_labels(bucket_names, (*label_values, "+Inf"))
+                    lines.append(f"{name}_bucket{labels} {_format_value(value[-1])}")
+                    labels = _format_labels(metric.labelnames, label_values)
+                    lines.append(f"{name}_sum{labels} {_format_value(value[-2])}")
+                    lines.append(f"{name}_count{labels} {_format_value(value[-1])}")
+                else:
+                    labels = _format_labels(metric.labelnames, label_values)
+                    lines.append(f"{name}{labels} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    """Atomically replace ``path`` with ``payload`` as JSON."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".metrics-", suffix=".tmp")
+    with os.fdopen(fd, "w") as fh:
+        json.dump(payload, fh)
+    os.replace(tmp_path, path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+@contextmanager
+def _directory_lock(directory: Path) -> Iterator[None]:
+    """Exclusive lock serializing merges of the shared directory's files."""
+    # POSIX only, like the pre-fork servers multi-process mode is for
+    import fcntl
+
+    with open(directory / ".lock", "a") as fh:
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+# ============================================================================
+# Default registry and application metrics
+# ============================================================================
+
+registry = MetricsRegistry()
+
+# Persist samples recorded since the last throttled flush when a worker exits
+atexit.register(registry.flush, force=True)
+
+REQUEST_LATENCY = registry.histogram(
+    "portfolio_request_duration_seconds",
+    "Request latency by resolved view.",
+    labelnames=("view", "method", "status"),
+)
+
+ENGINE_STAGE_DURATION = registry.histogram(
+    "portfolio_engine_stage_duration_seconds",
+    "Allocation engine stage durations.",
+    labelnames=("operation", "stage"),
+)
+
+OPTIMIZER_SOLVE_DURATION = registry.histogram(
+    "portfolio_rebalancing_solve_duration_seconds",
+    "Rebalancing optimizer solve time.",
+    labelnames=("method",),
+)
+
+PRICE_FETCH_DURATION = registry.histogram(
+    "portfolio_price_fetch_duration_seconds",
+    "Market data price fetch latency.",
+)
+
+PRICE_FETCH_ERRORS = registry.counter(
+    "portfolio_price_fetch_errors_total",
+    "Tickers that failed to return a price.",
+)
+
+CACHE_REQUESTS = registry.counter(
+    "portfolio_cache_requests_total",
+    "Cache lookups by cache name and result (hit/miss).",
+    labelnames=("cache", "result"),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    """Record a cache hit or miss for hit-ratio reporting."""
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
@@ -0,0 +1,380 @@
+"""
+Precomputed portfolio snapshots.
+
+``PortfolioSnapshot`` stores, per account, the actual value, effective target
+and variance of every asset class the account holds or targets, plus one row
+with the account total. The numbers come from ``AllocationCalculator`` over
+the same holdings and targets the live engine reads, so the snapshot is a
+cache of the engine's results rather than a second implementation.
+
+Writes keep it fresh: signals (see models/signals.py) and the bulk write
+paths call ``schedule_refresh()`` with the affected account ids, and the
+accounts are rebuilt once when the surrounding transaction commits. Reads
+(``load_portfolio_snapshot()``) are one indexed query per user, independent
+of how many holdings the accounts contain.
+
+Enabled by ``settings.PORTFOLIO_SNAPSHOTS``; when off, ``schedule_refresh()``
+does nothing and the engine computes allocations at read time.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from collections.abc import Iterable
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q, QuerySet
+from django.utils import timezone
+
+import pandas as pd
+import structlog
+
+from portfolio.models import Account, AccountTypeStrategyAssignment, PortfolioSnapshot
+from portfolio.services.allocations.calculations import AllocationCalculator
+from portfolio.services.allocations.data_providers import DjangoDataProvider
+from portfolio.services.reference_data import get_reference_data
+
+logger = structlog.get_logger(__name__)
+
+_pending = threading.local()
+
+# Columns read by load_portfolio_snapshot(), in values_list() order
+_SNAPSHOT_FIELDS = (
+    "account_id",
+    "account__name",
+    "account__account_type_id",
+    "account__account_type__code",
+    "account__account_type__label",
+    "account__account_type__group__name",
+    "account__institution__name",
+    "asset_class_id",
+    "asset_class__name",
+    "held",
+    "actual_value",
+    "target_pct",
+    "account_total",
+    "variance_pct",
+)
+
+
+@dataclass(frozen=True)
+class PortfolioSnapshotData:
+    """A user's snapshot rows, shaped like the live data provider's output."""
+
+    accounts: list[dict[str, Any]]
+    """Account metadata in ``get_accounts_metadata`` list format."""
+    accounts_by_type: dict[int, list[dict[str, Any]]]
+    """Account metadata in ``get_accounts_metadata`` by-type format."""
+    holdings_df: pd.DataFrame
+    """One row per (account, asset class) held: account_id, account_type_code,
+    asset_class, asset_class_id, value."""
+    targets_map: dict[int, dict[str, Decimal]]
+    account_totals: dict[int, Decimal]
+    """Totals of accounts with holdings."""
+    account_variances: dict[int, float]
+    """Absolute deviation % of accounts with holdings."""
+
+    @property
+    def grand_total(self) -> Decimal:
+        return sum(self.account_totals.values(), Decimal("0.00"))
+
+
+# ============================================================================
+# Write side
+# ============================================================================
+
+
+def schedule_refresh(account_ids: Iterable[int]) -> None:
+    """
+    Rebuild the snapshot of ``account_ids`` when the current transaction commits.
+
+    Ids scheduled in the same transaction are rebuilt together, once. Outside
+    a transaction the rebuild runs immediately. ``account_ids`` may be a lazy
+    queryset; it is only evaluated when snapshots are enabled.
+    """
+    if not settings.PORTFOLIO_SNAPSHOTS:
+        return
+
+    ids = {int(i) for i in account_ids}
+    if not ids:
+        return
+
+    pending: set[int] = getattr(_pending, "account_ids", set())
+    pending |= ids
+    _pending.account_ids = pending
+    # Registered on every call: a rolled-back savepoint discards its callbacks,
+    # and the first callback to run flushes everything pending
+    transaction.on_commit(_flush_pending, robust=True)
+
+
+def _flush_pending() -> None:
+    ids: set[int] = getattr(_pending, "account_ids", set())
+    if not ids:
+        return
+    _pending.account_ids = set()
+    rebuild_accounts(ids)
+
+
+def rebuild_accounts(account_ids: Iterable[int]) -> int:
+    """
+    Recompute the snapshot rows of the given accounts.
+
+    Accounts that no longer exist just lose their rows.
+
+    Returns:
+        Number of snapshot rows written
+    """
+    ids = sorted({int(i) for i in account_ids})
+    if not ids:
+        return 0
+
+    provider = DjangoDataProvider()
+    calculator = AllocationCalculator()
+    built_at = timezone.now()
+    rows: list[PortfolioSnapshot] = []
+
+    with transaction.atomic():
+        # Lock the accounts so concurrent rebuilds of the same account serialize
+        accounts_by_user: dict[int, list[int]] = defaultdict(list)
+        for account_id, user_id in (
+            Account.objects.select_for_update()
+            .filter(id__in=ids)
+            .order_by("id")
+            .values_list("id", "user_id")
+        ):
+            accounts_by_user[user_id].append(account_id)
+
+        PortfolioSnapshot.objects.filter(account_id__in=ids).delete()
+
+        for user_id, user_account_ids in accounts_by_user.items():
+            holdings_df = provider.get_holdings_df(user_id, account_ids=user_account_ids)
+            targets_map = provider.get_targets_map(user_id, account_ids=user_account_ids)
+            class_rows, account_rows = calculator.calculate_account_snapshot(
+                holdings_df, targets_map, user_account_ids
+            )
+            class_rows.insert(0, "user_id", user_id)
+            account_rows.insert(0, "user_id", user_id)
+            rows.extend(_snapshot_models(holdings_df, class_rows, account_rows, built_at))
+
+        PortfolioSnapshot.objects.bulk_create(rows)
+
+    logger.info("portfolio_snapshots_rebuilt", accounts=len(ids), rows=len(rows))
+    return len(rows)
+
+
+def rebuild_users(user_ids: Iterable[int], executor: Executor | None = None) -> int:
+    """
+    Recompute the snapshot of every account of ``user_ids`` in batches.
+
+    Uses ``BatchAllocationEngine``, so inputs are loaded a shard of users at
+    a time instead of per account; pass an executor to compute shards in
+    parallel.
+
+    Returns:
+        Number of snapshot rows written
+    """
+    from portfolio.services.allocations.batch import BatchAllocationEngine
+
+    ids = sorted({int(i) for i in user_ids})
+    if not ids:
+        return 0
+
+    class_rows, account_rows = BatchAllocationEngine().get_snapshot_rows(ids, executor=executor)
+    rows = _snapshot_models(pd.DataFrame(), class_rows, account_rows, timezone.now())
+
+    with transaction.atomic():
+        # Serialize with per-account rebuilds while the rows are replaced
+        list(Account.objects.select_for_update().filter(user_id__in=ids).values_list("id"))
+        PortfolioSnapshot.objects.filter(user_id__in=ids).delete()
+        PortfolioSnapshot.objects.bulk_create(rows, batch_size=1000)
+
+    logger.info("portfolio_snapshots_rebuilt", users=len(ids), rows=len(rows))
+    return len(rows)
+
+
+def _snapshot_models(
+    holdings_df: pd.DataFrame,
+    class_rows: pd.DataFrame,
+    account_rows: pd.DataFrame,
+    built_at: datetime,
+) -> list[PortfolioSnapshot]:
+    """Unsaved PortfolioSnapshot rows from calculator output with a ``user_id`` column."""
+    names_to_ids = {name: ac.id for name, ac in get_reference_data().asset_classes_by_name.items()}
+    if not holdings_df.empty:
+        # Holdings know the ids of classes the cache may not have seen yet
+        names_to_ids.update(
+            zip(holdings_df["asset_class"], holdings_df["asset_class_id"], strict=True)
+        )
+
+    rows: list[PortfolioSnapshot] = []
+    for row in class_rows.itertuples(index=False):
+        asset_class_id = names_to_ids.get(row.asset_class)
+        if asset_class_id is None:
+            logger.warning(
+                "portfolio_snapshot_unknown_asset_class",
+                account_id=row.account_id,
+                asset_class=row.asset_class,
+            )
+            continue
+        rows.append(
+            PortfolioSnapshot(
+                user_id=row.user_id,
+                account_id=row.account_id,
+                asset_class_id=int(asset_class_id),
+                held=bool(row.held),
+                actual_value=row.actual,
+                target_pct=row.target_pct,
+                target_value=row.target_value,
+                variance=row.variance,
+                variance_pct=row.variance_pct,
+                account_total=row.account_total,
+                built_at=built_at,
+            )
+        )
+    rows.extend(
+        PortfolioSnapshot(
+            user_id=row.user_id,
+            account_id=row.account_id,
+            asset_class_id=None,
+            held=bool(row.held),
+            actual_value=row.total,
+            variance_pct=row.variance_pct,
+            account_total=row.total,
+            built_at=built_at,
+        )
+        for row in account_rows.itertuples(index=False)
+    )
+    return rows
+
+
+def rebuild_user(user: Any) -> int:
+    """Recompute the snapshot of all of a user's accounts."""
+    return rebuild_accounts(Account.objects.filter(user=user).values_list("id", flat=True))
+
+
+# ============================================================================
+# Affected accounts
+# ============================================================================
+
+
+def accounts_using_strategy(strategy_id: int) -> QuerySet[Account, int]:
+    """
+    Ids of accounts whose effective strategy is ``strategy_id``.
+
+    Mirrors ``Account.get_effective_allocation_strategy``: an account override
+    wins, then the user's assignment for the account type, then the
+    portfolio's strategy.
+    """
+    type_assignment = AccountTypeStrategyAssignment.objects.filter(
+        user_id=OuterRef("user_id"), account_type_id=OuterRef("account_type_id")
+    )
+    return Account.objects.filter(
+        Q(allocation_strategy_id=strategy_id)
+        | Q(allocation_strategy__isnull=True)
+        & (
+            Exists(type_assignment.filter(allocation_strategy_id=strategy_id))
+            | (~Exists(type_assignment) & Q(portfolio__allocation_strategy_id=strategy_id))
+        )
+    ).values_list("id", flat=True)
+
+
+# ============================================================================
+# Read side
+# ============================================================================
+
+
+def load_portfolio_snapshot(user: Any) -> PortfolioSnapshotData:
+    """
+    Read a user's snapshot in one query, building it first if it is missing.
+    """
+    rows = _snapshot_rows(user)
+    if not rows and Account.objects.filter(user=user).exists():
+        rebuild_user(user)
+        rows = _snapshot_rows(user)
+
+    accounts: list[dict[str, Any]] = []
+    accounts_by_type: dict[int, list[dict[str, Any]]] = defaultdict(list)
+    holdings: list[tuple[int, str, str, int, float]] = []
+    targets_map: dict[int, dict[str, Decimal]] = defaultdict(dict)
+    account_totals: dict[int, Decimal] = {}
+    account_variances: dict[int, float] = {}
+
+    for (
+        account_id,
+        account_name,
+        type_id,
+        type_code,
+        type_label,
+        group_name,
+        institution,
+        asset_class_id,
+        asset_class,
+        held,
+        actual_value,
+        target_pct,
+        account_total,
+        variance_pct,
+    ) in rows:
+        if asset_class_id is None:
+            accounts.append(
+                {
+                    "id": account_id,
+                    "name": account_name,
+                    "account_type__id": type_id,
+                    "account_type__code": type_code,
+                    "account_type__label": type_label,
+                    "account_type__group__name": group_name,
+                    "institution__name": institution,
+                }
+            )
+            accounts_by_type[type_id].append(
+                {
+                    "id": account_id,
+                    "name": account_name,
+                    "type_code": type_code,
+                    "type_label": type_label,
+                    "institution": institution,
+                }
+            )
+            if held:
+                account_totals[account_id] = Decimal(str(account_total))
+                account_variances[account_id] = variance_pct
+            continue
+
+        if held:
+            holdings.append((account_id, type_code, asset_class, asset_class_id, actual_value))
+        if target_pct:
+            targets_map[account_id][asset_class] = Decimal(str(target_pct))
+
+    holdings_df = (
+        pd.DataFrame(
+            holdings,
+            columns=["account_id", "account_type_code", "asset_class", "asset_class_id", "value"],
+        )
+        if holdings
+        else pd.DataFrame()
+    )
+
+    return PortfolioSnapshotData(
+        accounts=accounts,
+        accounts_by_type=dict(accounts_by_type),
+        holdings_df=holdings_df,
+        targets_map=dict(targets_map),
+        account_totals=account_totals,
+        account_variances=account_variances,
+    )
+
+
+def _snapshot_rows(user: Any) -> list[tuple[Any, ...]]:
+    return list(
+        PortfolioSnapshot.objects.filter(user=user)
+        .order_by("account_id", "asset_class_id")
+        .values_list(*_SNAPSHOT_FIELDS)
+    )
@@ -19,6 +19,7 @@ import structlog
 
 from portfolio.models import Holding, Security, SecurityPrice
 from portfolio.services.market_data import MarketDataService
+from portfolio.services.metrics import PRICE_FETCH_DURATION, PRICE_FETCH_ERRORS
 from users.models import CustomUser
 
 logger = structlog.get_logger(__name__)
@@ -74,7 +75,7 @@ class PricingService:
             return {}
 
         # Fetch prices WITH market timestamps from data service
-        price_data = self._market_data.get_prices(tickers)
+        price_data = self._fetch_prices(tickers)
 
         if not price_data:
             logger.warning("No prices returned from market data service")
@@ -169,7 +170,7 @@ class PricingService:
         tickers = [s.ticker for s in stale_securities]
 
         # Fetch prices WITH market timestamps from data service
-        price_data = self._market_data.get_prices(tickers)
+        price_data = self._fetch_prices(tickers)
 
         if not price_data:
             logger.warning("No prices returned from market data service")
@@ -226,6 +227,17 @@ class PricingService:
             "errors": errors,
         }
 
+    def _fetch_prices(self, tickers: list[str]) -> dict[str, tuple[Decimal, datetime]]:
+        """Fetch prices from the market data service, recording latency and misses."""
+        with PRICE_FETCH_DURATION.time():
+            price_data = self._market_data.get_prices(tickers)
+
+        missing = sum(1 for t in tickers if t not in price_data)
+        if missing:
+            PRICE_FETCH_ERRORS.inc(missing)
+
+        return price_data
+
     def get_price_at_datetime(
         self, security: Security, target_datetime: datetime
     ) -> Decimal | None:
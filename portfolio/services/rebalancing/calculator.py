@@ -5,14 +5,17 @@ from __future__ import annotations
 from decimal import Decimal
 from typing import TYPE_CHECKING, Literal
 
-import cvxpy as cp
 import numpy as np
-import pandas as pd
 import structlog
 
+from portfolio.services.allocations.snapshot import HoldingsSnapshot
+from portfolio.services.metrics import OPTIMIZER_SOLVE_DURATION
 from portfolio.services.rebalancing.dataclasses import RebalancingOrder
+from portfolio.services.rebalancing.solver import run_solver
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
     from portfolio.models import Account, AssetClass, Holding, Security
 
 logger = structlog.get_logger(__name__)
@@ -27,14 +30,20 @@ class RebalancingCalculator:
     - Non-negative final positions (no shorting)
     """
 
-    def __init__(self, account: Account) -> None:
+    def __init__(self, account: Account, solver_executor: Executor | None = None) -> None:
         """Initialize calculator for given account.
 
         Args:
             account: The account to rebalance
+            solver_executor: Executor to run the optimization in (e.g. the
+                shared process pool); None solves in the calling thread
         """
         self.account = account
-        self._holdings_df: pd.DataFrame | None = None
+        self.solver_executor = solver_executor
+        self._snapshot: HoldingsSnapshot | None = None
+        # Model lookups for turning snapshot rows back into orders
+        self._securities: dict[int, Security] = {}
+        self._asset_classes: dict[int, AssetClass] = {}
         self._prices: dict[Security, Decimal] = {}
         self._target_allocations: dict[AssetClass, Decimal] = {}
 
@@ -54,17 +63,19 @@ class RebalancingCalculator:
         Returns:
             Tuple of (orders, optimization_status, method_used)
         """
-        self._holdings_df = self._prepare_holdings_data(holdings, prices, target_allocations)
+        self._snapshot = self._prepare_holdings_data(holdings, prices, target_allocations)
         self._prices = prices
         self._target_allocations = target_allocations
 
         # Try optimization first
         try:
-            orders = self._optimize_orders()
+            with OPTIMIZER_SOLVE_DURATION.time(method="optimization"):
+                orders = self._optimize_orders()
             return orders, "optimal", "optimization"
         except Exception as e:
             logger.warning(f"Optimization failed: {e}, falling back to proportional")
-            orders = self._proportional_orders()
+            with OPTIMIZER_SOLVE_DURATION.time(method="proportional"):
+                orders = self._proportional_orders()
             return orders, "fallback", "proportional"
 
     def _prepare_holdings_data(
@@ -72,34 +83,44 @@ class RebalancingCalculator:
         holdings: list[Holding],
         prices: dict[Security, Decimal],
         target_allocations: dict[AssetClass, Decimal],
-    ) -> pd.DataFrame:
-        """Prepare holdings data as DataFrame for calculations.
+    ) -> HoldingsSnapshot:
+        """Prepare holdings data as an array-backed snapshot for calculations.
 
         Includes asset classes with target allocations but no current holdings,
         using the primary security for that asset class (from the prices dict,
         which already includes primary securities).
 
+        Model instances are kept out of the snapshot; they are recorded in
+        ``_securities`` / ``_asset_classes`` keyed by id.
+
         Returns:
-            DataFrame with columns: security, asset_class, shares, price, value
+            HoldingsSnapshot with one row per security (shares, price, value)
         """
-        data = []
-        existing_asset_class_ids: set[int] = set()
+        security_ids: list[int] = []
+        asset_class_ids: list[int] = []
+        shares: list[float] = []
+        row_prices: list[float] = []
+        values: list[float] = []
+        self._securities = {}
+        self._asset_classes = {}
+
+        def add_row(
+            security: Security, asset_class: AssetClass, qty: Decimal, price: Decimal
+        ) -> None:
+            self._securities[security.id] = security
+            self._asset_classes[asset_class.id] = asset_class
+            security_ids.append(security.id)
+            asset_class_ids.append(asset_class.id)
+            shares.append(float(qty))
+            row_prices.append(float(price))
+            values.append(float(qty * price))
 
         # Add existing holdings
         for holding in holdings:
             price = prices.get(holding.security, Decimal("0"))
-            data.append(
-                {
-                    "security": holding.security,
-                    "security_id": holding.security.id,
-                    "asset_class": holding.security.asset_class,
-                    "asset_class_id": holding.security.asset_class.id,
-                    "shares": float(holding.shares),
-                    "price": float(price),
-                    "value": float(holding.shares * price),
-                }
-            )
-            existing_asset_class_ids.add(holding.security.asset_class.id)
+            add_row(holding.security, holding.security.asset_class, holding.shares, price)
+
+        existing_asset_class_ids = set(asset_class_ids)
 
         # Build map of securities by asset class from prices dict
         # This ensures we use the same Security instances that are in prices
@@ -118,24 +139,23 @@ class RebalancingCalculator:
                 if primary_security:
                     price = prices.get(primary_security, Decimal("0"))
                     if price > 0:
-                        data.append(
-                            {
-                                "security": primary_security,
-                                "security_id": primary_security.id,
-                                "asset_class": asset_class,
-                                "asset_class_id": asset_class.id,
-                                "shares": 0.0,
-                                "price": float(price),
-                                "value": 0.0,
-                            }
-                        )
+                        add_row(primary_security, asset_class, Decimal("0"), price)
                         logger.info(
                             "added_zero_holding_security",
                             ticker=primary_security.ticker,
                             asset_class=asset_class.name,
                         )
 
-        return pd.DataFrame(data)
+        return HoldingsSnapshot.from_columns(
+            account_id=[self.account.id] * len(security_ids),
+            asset_class_id=asset_class_ids,
+            security_id=security_ids,
+            shares=shares,
+            price=row_prices,
+            value=values,
+            asset_class=[self._asset_classes[i].name for i in asset_class_ids],
+            ticker=[self._securities[i].ticker for i in security_ids],
+        )
 
     def _get_primary_security_for_asset_class(self, asset_class: AssetClass) -> Security | None:
         """Get the primary security for an asset class.
@@ -172,92 +192,36 @@ class RebalancingCalculator:
     def _optimize_orders(self) -> list[RebalancingOrder]:
         """Use cvxpy to find optimal buy/sell orders.
 
-        Minimizes sum of squared deviations from target allocations.
+        Minimizes sum of squared deviations from target allocations. The solve
+        runs in ``solver_executor`` when one is set (see solver.py).
 
         Returns:
             List of rebalancing orders
         """
-        df = self._holdings_df
-        if df is None or df.empty:
-            return []
-
-        total_value = df["value"].sum()
-        if total_value == 0:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.is_empty:
             return []
 
-        # Group securities by asset class
-        securities_by_class = df.groupby("asset_class_id")["security_id"].apply(list).to_dict()
-
-        # Create variables for share changes (can be positive or negative)
-        security_ids = df["security_id"].tolist()
-        n_securities = len(security_ids)
-        share_changes = cp.Variable(n_securities, integer=True)
-
-        # Map security_id to index for variable lookup
-        sec_idx = {sec_id: i for i, sec_id in enumerate(security_ids)}
-
-        # Calculate final positions and values
-        current_shares = df["shares"].values
-        prices_arr = df["price"].values
-        final_shares = current_shares + share_changes
-        final_values = cp.multiply(final_shares, prices_arr)
-
-        # Build objective: minimize squared deviations from targets
-        deviations = []
-        final_total = cp.sum(final_values)
-
-        for asset_class, target_pct in self._target_allocations.items():
-            # Sum values for all securities in this asset class
-            sec_ids = securities_by_class.get(asset_class.id, [])
-            if not sec_ids:
-                continue
-
-            indices = [sec_idx[sid] for sid in sec_ids if sid in sec_idx]
-            if not indices:
-                continue
-
-            class_value = cp.sum([final_values[i] for i in indices])
-            class_pct = class_value / final_total
-            target_decimal = float(target_pct) / 100  # Convert to decimal
-            deviation = class_pct - target_decimal
-            deviations.append(cp.square(deviation))  # type: ignore[no-untyped-call]
+        security_ids = snapshot.row_security_ids
+        asset_class_ids = snapshot.row_asset_class_ids
 
-        if not deviations:
+        changes = run_solver(
+            self.solver_executor,
+            snapshot.shares,
+            snapshot.prices,
+            asset_class_ids,
+            # Convert target percentages to decimals
+            {ac.id: float(pct) / 100 for ac, pct in self._target_allocations.items()},
+        )
+        if changes is None:
             return []
 
-        objective = cp.Minimize(cp.sum(deviations))
-
-        # Constraints
-        constraints = [
-            final_shares >= 0,  # No shorting
-            final_total >= total_value * 0.99,  # Don't lose more than 1% to rounding
-        ]
-
-        # Solve
-        problem = cp.Problem(objective, constraints)
-        try:
-            problem.solve(solver=cp.GLPK_MI, verbose=False)  # type: ignore[no-untyped-call]
-        except cp.error.SolverError:
-            # Try alternate solver if GLPK_MI not available
-            problem.solve(verbose=False)  # type: ignore[no-untyped-call]
-
-        if problem.status not in ["optimal", "optimal_inaccurate"]:
-            raise ValueError(f"Optimization failed with status: {problem.status}")
-
         # Extract orders from solution
         orders = []
-        share_values = share_changes.value
-        if share_values is None:
-            return []
-
-        for i, sec_id in enumerate(security_ids):
-            change = int(np.round(share_values[i]))
-            if change == 0:
-                continue
-
-            row = df[df["security_id"] == sec_id].iloc[0]
-            security = row["security"]
-            price = Decimal(str(row["price"]))
+        prices = snapshot.prices.tolist()
+        for i in np.flatnonzero(changes).tolist():
+            change = int(changes[i])
+            price = Decimal(str(prices[i]))
 
             action: Literal["BUY", "SELL"] = "BUY" if change > 0 else "SELL"
             shares = abs(change)
@@ -265,12 +229,12 @@ class RebalancingCalculator:
 
             orders.append(
                 RebalancingOrder(
-                    security=security,
+                    security=self._securities[int(security_ids[i])],
                     action=action,
                     shares=shares,
                     estimated_amount=amount,
                     price_per_share=price,
-                    asset_class=row["asset_class"],
+                    asset_class=self._asset_classes[int(asset_class_ids[i])],
                 )
             )
 
@@ -287,16 +251,19 @@ class RebalancingCalculator:
         Returns:
             List of rebalancing orders
         """
-        df = self._holdings_df
-        if df is None or df.empty:
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.is_empty:
             return []
 
-        total_value = df["value"].sum()
+        total_value = snapshot.values.sum()
         if total_value == 0:
             return []
 
         # Calculate current allocations by asset class
-        current_alloc = df.groupby("asset_class_id")["value"].sum() / total_value * 100
+        class_totals = snapshot.asset_class_totals()
+        current_alloc = dict(
+            zip(snapshot.asset_class_ids.tolist(), class_totals / total_value * 100, strict=True)
+        )
 
         # Calculate adjustments needed
         adjustments: dict[int, float] = {}  # asset_class_id -> dollar amount needed
@@ -306,27 +273,30 @@ class RebalancingCalculator:
             dollar_adjustment = (diff_pct / 100) * total_value
             adjustments[asset_class.id] = dollar_adjustment
 
+        security_ids = snapshot.row_security_ids
+        asset_class_ids = snapshot.row_asset_class_ids
+        values = snapshot.values
+        prices = snapshot.prices.tolist()
+
         # Generate orders
         orders = []
         for asset_class_id, adjustment in adjustments.items():
             if abs(adjustment) < 1:  # Skip tiny adjustments
                 continue
 
-            # Get securities in this asset class
-            class_holdings = df[df["asset_class_id"] == asset_class_id]
-            if class_holdings.empty:
+            # Rows holding securities in this asset class
+            indices = np.flatnonzero(asset_class_ids == asset_class_id)
+            if not len(indices):
                 continue
 
             # Distribute proportionally by current value
-            class_total = class_holdings["value"].sum()
+            class_total = values[indices].sum()
 
-            for _, row in class_holdings.iterrows():
-                proportion = (
-                    row["value"] / class_total if class_total > 0 else 1 / len(class_holdings)
-                )
+            for i in indices.tolist():
+                proportion = values[i] / class_total if class_total > 0 else 1 / len(indices)
                 security_adjustment = adjustment * proportion
 
-                price = Decimal(str(row["price"]))
+                price = Decimal(str(prices[i]))
                 if price == 0:
                     continue
 
@@ -342,12 +312,12 @@ class RebalancingCalculator:
 
                 orders.append(
                     RebalancingOrder(
-                        security=row["security"],
+                        security=self._securities[int(security_ids[i])],
                         action=action,
                         shares=abs_shares,
                         estimated_amount=amount,
                         price_per_share=price,
-                        asset_class=row["asset_class"],
+                        asset_class=self._asset_classes[int(asset_class_ids[i])],
                     )
                 )
 
@@ -3,7 +3,7 @@
 from dataclasses import dataclass, field
 from datetime import datetime
 from decimal import Decimal
-from typing import TYPE_CHECKING, Literal
+from typing import TYPE_CHECKING, Any, Literal
 
 if TYPE_CHECKING:
     from portfolio.models import Account, AssetClass, Security
@@ -36,6 +36,18 @@ class RebalancingOrder:
         if self.estimated_amount < 0:
             raise ValueError(f"Amount must be non-negative, got {self.estimated_amount}")
 
+    def to_dict(self) -> dict[str, Any]:
+        """Plain representation for JSON APIs."""
+        return {
+            "action": self.action,
+            "ticker": self.security.ticker,
+            "security_name": self.security.name,
+            "asset_class": self.asset_class.name,
+            "shares": self.shares,
+            "price_per_share": self.price_per_share,
+            "estimated_amount": self.estimated_amount,
+        }
+
 
 @dataclass(frozen=True)
 class RebalancingPlan:
@@ -91,3 +103,24 @@ class RebalancingPlan:
         pre_max = max(abs(d) for d in self.pre_drift.values())
         post_max = max(abs(d) for d in self.post_drift.values())
         return pre_max - post_max
+
+    def to_dict(self) -> dict[str, Any]:
+        """Plain representation for JSON APIs (model references become names)."""
+        return {
+            "account_id": self.account.id,
+            "account_name": self.account.name,
+            "orders": [o.to_dict() for o in self.orders],
+            "proforma_holdings_rows": self.proforma_holdings_rows,
+            "drift_analysis_rows": self.drift_analysis_rows,
+            "current_aggregated": self.current_aggregated,
+            "proforma_aggregated": self.proforma_aggregated,
+            "pre_drift": {ac.name: drift for ac, drift in self.pre_drift.items()},
+            "post_drift": {ac.name: drift for ac, drift in self.post_drift.items()},
+            "total_buy_amount": self.total_buy_amount,
+            "total_sell_amount": self.total_sell_amount,
+            "net_cash_impact": self.net_cash_impact,
+            "max_drift_improvement": self.max_drift_improvement,
+            "generated_at": self.generated_at,
+            "optimization_status": self.optimization_status,
+            "method_used": self.method_used,
+        }
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import Callable
 from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
@@ -12,31 +13,47 @@ from portfolio.services.rebalancing.calculator import RebalancingCalculator
 from portfolio.services.rebalancing.dataclasses import RebalancingOrder, RebalancingPlan
 
 if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
     import pandas as pd
 
     from portfolio.models import Account, AssetClass, Holding, Security
 
 logger = structlog.get_logger(__name__)
 
+# Called with (stage name, percent complete) as plan generation advances
+ProgressCallback = Callable[[str, int], None]
+
 
 class RebalancingEngine:
     """Orchestrates rebalancing plan generation for an account."""
 
-    def __init__(self, account: Account) -> None:
+    def __init__(self, account: Account, solver_executor: Executor | None = None) -> None:
         """Initialize engine for given account.
 
         Args:
             account: The account to rebalance
+            solver_executor: Executor for the optimization solve (see
+                solver.get_solver_executor); None solves in the calling thread
         """
         self.account = account
-        self.calculator = RebalancingCalculator(account)
+        self.calculator = RebalancingCalculator(account, solver_executor=solver_executor)
 
-    def generate_plan(self) -> RebalancingPlan:
+    def generate_plan(self, progress: ProgressCallback | None = None) -> RebalancingPlan:
         """Generate a complete rebalancing plan.
 
+        Args:
+            progress: Optional callback ``(stage, percent)`` invoked as each
+                stage starts (used by background jobs to report progress)
+
         Returns:
             RebalancingPlan with orders and impact analysis
         """
+
+        def report(stage: str, percent: int) -> None:
+            if progress is not None:
+                progress(stage, percent)
+
         logger.info(
             "generating_rebalancing_plan",
             account_id=self.account.id,
@@ -44,6 +61,7 @@ class RebalancingEngine:
         )
 
         # Get target allocations first (needed for fetching primary security prices)
+        report("targets", 5)
         target_allocations = self._get_target_allocations()
 
         if not target_allocations:
@@ -62,6 +80,7 @@ class RebalancingEngine:
             )
 
         # Get current holdings
+        report("holdings", 15)
         holdings = list(self.account.holdings.select_related("security", "security__asset_class"))
 
         if not holdings:
@@ -80,12 +99,14 @@ class RebalancingEngine:
             )
 
         # Get current prices (includes primary securities for unheld asset classes)
+        report("prices", 25)
         prices = self._get_current_prices(holdings, target_allocations)
 
         # Calculate pre-rebalancing drift
         pre_drift = self._calculate_drift(holdings, prices, target_allocations)
 
         # Generate orders
+        report("optimization", 40)
         orders, status, method = self.calculator.calculate_orders(
             holdings=holdings,
             prices=prices,
@@ -93,6 +114,7 @@ class RebalancingEngine:
         )
 
         # Calculate post-rebalancing drift (estimated)
+        report("proforma", 70)
         post_drift = self._calculate_post_rebalance_drift(
             holdings=holdings,
             orders=orders,
@@ -111,6 +133,7 @@ class RebalancingEngine:
         )
 
         # Format drift analysis with category subtotals
+        report("drift_analysis", 90)
         drift_analysis_rows = self.get_drift_analysis_rows(
             pre_drift=pre_drift,
             post_drift=post_drift,
@@ -0,0 +1,329 @@
+"""
+Database-backed job queue for background rebalancing plan generation.
+
+There is no external broker: jobs are RebalancingJob rows. The rebalancing
+page enqueues a job for the account's current data version (reusing any job
+already queued or finished for that version) and polls it until the
+``run_rebalancing_worker`` management command has generated the plan. The
+worker also prunes finished jobs that can no longer be served.
+
+Workers claim jobs with a conditional UPDATE (``status=PENDING`` ->
+``RUNNING``), so any number of workers can share the queue without row locks.
+Finished plans are stored on the job (``result``) and their orders saved as
+RebalancingRecommendation rows.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from concurrent.futures import Executor
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from django.db import transaction
+from django.db.models import F, Max, OuterRef, Q, Subquery
+from django.utils import timezone
+
+import structlog
+
+from portfolio.models import (
+    Account,
+    AssetClass,
+    Portfolio,
+    RebalancingJob,
+    RebalancingRecommendation,
+    SecurityPrice,
+)
+from portfolio.services.metrics import ENGINE_STAGE_DURATION
+from portfolio.services.rebalancing.dataclasses import RebalancingOrder, RebalancingPlan
+from portfolio.services.rebalancing.engine import RebalancingEngine
+from portfolio.utils.serialization import dumps
+
+logger = structlog.get_logger(__name__)
+
+# Jobs still RUNNING after this long are assumed to belong to a dead worker
+DEFAULT_STALE_AFTER = timedelta(minutes=10)
+MAX_ATTEMPTS = 3
+# Finished jobs older than this are deleted unless they are the account's latest plan
+DEFAULT_KEEP_FINISHED = timedelta(days=7)
+
+
+def current_data_version(account: Account) -> str:
+    """
+    Data version a plan for ``account`` would be generated from.
+
+    Built from the account's own inputs: its portfolio's version (bumped by
+    holding, account and target changes) and the newest price id and
+    ``updated_at`` among the securities the account holds. Price refreshes
+    for securities the account does not hold leave its jobs valid.
+    """
+    portfolio_version = (
+        Portfolio.objects.filter(id=account.portfolio_id).values_list("version", flat=True).first()
+    )
+    prices = SecurityPrice.objects.filter(security__holdings__account=account).aggregate(
+        latest_id=Max("id"), updated_at=Max("updated_at")
+    )
+    updated_at = prices["updated_at"]
+    updated_micros = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+    return (
+        f"{account.portfolio_id}.{portfolio_version or 0}"
+        f".{prices['latest_id'] or 0}.{updated_micros}"
+    )
+
+
+def enqueue_plan(account: Account, *, retry: bool = False) -> RebalancingJob:
+    """
+    Queue plan generation for an account's current data.
+
+    Returns the existing job for the current data version if there is one
+    (pending, running or finished), so repeated page loads never queue
+    duplicate work. A failed job is only replaced when ``retry`` is True.
+    """
+    version = current_data_version(account)
+    job = (
+        RebalancingJob.objects.filter(account=account, data_version=version)
+        .order_by("-created_at")
+        .first()
+    )
+    if job is not None and not (retry and job.status == RebalancingJob.FAILED):
+        return job
+
+    job = RebalancingJob.objects.create(account=account, data_version=version)
+    logger.info("rebalancing_job_enqueued", job_id=job.id, account_id=account.id)
+    return job
+
+
+def claim_next_job() -> RebalancingJob | None:
+    """Atomically claim the oldest pending job, or return None if there is none."""
+    candidates = RebalancingJob.objects.filter(status=RebalancingJob.PENDING).order_by("created_at")
+    for job_id in candidates.values_list("id", flat=True)[:10]:
+        claimed = RebalancingJob.objects.filter(id=job_id, status=RebalancingJob.PENDING).update(
+            status=RebalancingJob.RUNNING,
+            started_at=timezone.now(),
+            attempts=F("attempts") + 1,
+            progress=0,
+            stage="",
+        )
+        if claimed:
+            return RebalancingJob.objects.select_related("account__user").get(id=job_id)
+        # Another worker claimed it first; try the next one
+    return None
+
+
+def requeue_stale_jobs(stale_after: timedelta = DEFAULT_STALE_AFTER) -> int:
+    """
+    Return jobs abandoned by a dead worker to the queue.
+
+    Jobs that have already been attempted ``MAX_ATTEMPTS`` times are failed
+    instead, so a job that crashes its worker cannot loop forever.
+
+    Returns:
+        Number of jobs requeued or failed
+    """
+    stale = RebalancingJob.objects.filter(
+        status=RebalancingJob.RUNNING, started_at__lt=timezone.now() - stale_after
+    )
+    failed = stale.filter(attempts__gte=MAX_ATTEMPTS).update(
+        status=RebalancingJob.FAILED,
+        finished_at=timezone.now(),
+        error="Worker stopped responding",
+    )
+    requeued = stale.update(status=RebalancingJob.PENDING)
+    if failed or requeued:
+        logger.warning("rebalancing_jobs_recovered", requeued=requeued, failed=failed)
+    return failed + requeued
+
+
+def run_job(job: RebalancingJob, solver_executor: Executor | None = None) -> RebalancingJob:
+    """
+    Generate and save the plan for a claimed job.
+
+    Progress and per-stage timings are written to the job row as the engine
+    advances. Errors mark the job FAILED rather than propagating.
+    """
+    timings: dict[str, float] = {}
+    current: dict[str, Any] = {"stage": None, "started": time.perf_counter()}
+
+    def finish_stage() -> None:
+        if current["stage"] is not None:
+            elapsed = time.perf_counter() - current["started"]
+            timings[current["stage"]] = round(elapsed, 4)
+            ENGINE_STAGE_DURATION.observe(
+                elapsed, operation="rebalancing_job", stage=current["stage"]
+            )
+            current["stage"] = None
+
+    def progress(stage: str, percent: int) -> None:
+        finish_stage()
+        current.update(stage=stage, started=time.perf_counter())
+        RebalancingJob.objects.filter(id=job.id).update(stage=stage, progress=percent)
+
+    try:
+        plan = RebalancingEngine(job.account, solver_executor=solver_executor).generate_plan(
+            progress=progress
+        )
+        progress("saving", 95)
+        with transaction.atomic():
+            RebalancingRecommendation.objects.bulk_create(
+                RebalancingRecommendation(
+                    account=job.account,
+                    job=job,
+                    security=order.security,
+                    action=order.action,
+                    shares=Decimal(order.shares),
+                    estimated_amount=order.estimated_amount,
+                    price_per_share=order.price_per_share,
+                    reason=plan.method_used,
+                )
+                for order in plan.orders
+            )
+            finish_stage()
+            job.status = RebalancingJob.SUCCEEDED
+            job.result = json.loads(dumps(plan.to_dict()))
+            job.progress = 100
+            job.stage = "done"
+            job.error = ""
+            job.stage_timings = timings
+            job.finished_at = timezone.now()
+            job.save(
+                update_fields=[
+                    "status",
+                    "result",
+                    "progress",
+                    "stage",
+                    "error",
+                    "stage_timings",
+                    "finished_at",
+                ]
+            )
+    except Exception as e:
+        finish_stage()
+        logger.exception("rebalancing_job_failed", job_id=job.id, account_id=job.account_id)
+        job.status = RebalancingJob.FAILED
+        job.error = str(e) or type(e).__name__
+        job.stage_timings = timings
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "stage_timings", "finished_at"])
+        return job
+
+    logger.info(
+        "rebalancing_job_succeeded",
+        job_id=job.id,
+        account_id=job.account_id,
+        orders=len(plan.orders),
+        duration=job.duration_seconds,
+    )
+    return job
+
+
+def prune_finished_jobs(keep_finished: timedelta = DEFAULT_KEEP_FINISHED) -> int:
+    """
+    Delete finished jobs (and their recommendations) that are no longer useful.
+
+    A finished job is kept while it is younger than ``keep_finished`` or is
+    its account's most recent successful job; everything else is deleted.
+    Pending and running jobs are never touched.
+
+    Returns:
+        Number of jobs deleted
+    """
+    latest_succeeded = (
+        RebalancingJob.objects.filter(account=OuterRef("account"), status=RebalancingJob.SUCCEEDED)
+        .order_by("-finished_at", "-id")
+        .values("id")[:1]
+    )
+    finished = (
+        RebalancingJob.objects.filter(
+            status__in=(RebalancingJob.SUCCEEDED, RebalancingJob.FAILED),
+            finished_at__lt=timezone.now() - keep_finished,
+        )
+        .annotate(latest_succeeded_id=Subquery(latest_succeeded))
+        .filter(Q(latest_succeeded_id__isnull=True) | ~Q(id=F("latest_succeeded_id")))
+    )
+    _, by_model = finished.delete()
+    jobs = by_model.get(RebalancingJob._meta.label, 0)
+    if jobs:
+        logger.info(
+            "rebalancing_jobs_pruned",
+            jobs=jobs,
+            recommendations=by_model.get(RebalancingRecommendation._meta.label, 0),
+        )
+    return jobs
+
+
+def get_saved_plan(account: Account) -> RebalancingPlan | None:
+    """
+    The stored plan for the account's current data, if a job has produced one.
+
+    Returns None when no job for the current data version has succeeded (the
+    caller should enqueue one and poll, or generate inline).
+    """
+    job = (
+        RebalancingJob.objects.filter(
+            account=account,
+            data_version=current_data_version(account),
+            status=RebalancingJob.SUCCEEDED,
+        )
+        .order_by("-finished_at")
+        .first()
+    )
+    return plan_from_job(job) if job is not None else None
+
+
+def plan_from_job(job: RebalancingJob) -> RebalancingPlan:
+    """Rebuild a RebalancingPlan from a finished job's stored result and orders."""
+    data = job.result or {}
+
+    orders = []
+    recommendations = job.recommendations.select_related("security__asset_class").order_by("id")
+    for rec in recommendations:
+        shares = int(rec.shares)
+        orders.append(
+            RebalancingOrder(
+                security=rec.security,
+                action=rec.action,  # type: ignore[arg-type]
+                shares=shares,
+                estimated_amount=rec.estimated_amount,
+                price_per_share=(
+                    rec.price_per_share
+                    if rec.price_per_share is not None
+                    else rec.estimated_amount / shares
+                ),
+                asset_class=rec.security.asset_class,
+            )
+        )
+
+    drift_names = {*data.get("pre_drift", {}), *data.get("post_drift", {})}
+    asset_classes = {ac.name: ac for ac in AssetClass.objects.filter(name__in=drift_names)}
+
+    def drift(key: str) -> dict[AssetClass, Decimal]:
+        return {
+            asset_classes[name]: Decimal(str(value))
+            for name, value in data.get(key, {}).items()
+            if name in asset_classes and value is not None
+        }
+
+    generated_at = data.get("generated_at")
+    return RebalancingPlan(
+        account=job.account,
+        orders=orders,
+        proforma_holdings_rows=data.get("proforma_holdings_rows", []),
+        drift_analysis_rows=data.get("drift_analysis_rows", []),
+        current_aggregated=data.get("current_aggregated", {}),
+        proforma_aggregated=data.get("proforma_aggregated", {}),
+        pre_drift=drift("pre_drift"),
+        post_drift=drift("post_drift"),
+        total_buy_amount=Decimal(str(data.get("total_buy_amount", 0))),
+        total_sell_amount=Decimal(str(data.get("total_sell_amount", 0))),
+        net_cash_impact=Decimal(str(data.get("net_cash_impact", 0))),
+        generated_at=(
+            datetime.fromisoformat(generated_at)
+            if generated_at
+            # Succeeded jobs always carry finished_at; created_at keeps the type total
+            else job.finished_at or job.created_at
+        ),
+        optimization_status=data.get("optimization_status", ""),
+        method_used=data.get("method_used", "proportional"),
+    )
@@ -0,0 +1,154 @@
+"""
+CVXPY share-change solver and the process pool that runs it.
+
+The solve is a pure function of NumPy arrays so it can run in a separate
+process: async views submit it to a shared ``ProcessPoolExecutor`` and a slow
+solve then holds neither the event loop nor the serving process's GIL.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import django
+from django.conf import settings
+
+import cvxpy as cp
+import numpy as np
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def solve_share_changes(
+    shares: np.ndarray,
+    prices: np.ndarray,
+    asset_class_ids: np.ndarray,
+    targets: dict[int, float],
+) -> np.ndarray | None:
+    """
+    Find whole-share changes that minimise squared deviation from targets.
+
+    Args:
+        shares: Current shares per row
+        prices: Price per share per row
+        asset_class_ids: Asset class id per row
+        targets: Target weight (0-1) by asset class id
+
+    Returns:
+        Integer share change per row, or None if there is nothing to optimize
+
+    Raises:
+        ValueError: If the solver does not reach an optimal solution
+    """
+    total_value = float((shares * prices).sum())
+    if total_value == 0:
+        return None
+
+    # Create variables for share changes (can be positive or negative)
+    share_changes = cp.Variable(len(shares), integer=True)
+
+    # Calculate final positions and values
+    final_shares = shares + share_changes
+    final_values = cp.multiply(final_shares, prices)
+    final_total = cp.sum(final_values)
+
+    # Build objective: minimize squared deviations from targets
+    deviations = []
+    for asset_class_id, target in targets.items():
+        # Rows holding securities in this asset class
+        indices = np.flatnonzero(asset_class_ids == asset_class_id)
+        if not len(indices):
+            continue
+
+        class_pct = cp.sum(final_values[indices]) / final_total
+        deviations.append(cp.square(class_pct - target))  # type: ignore[no-untyped-call]
+
+    if not deviations:
+        return None
+
+    objective = cp.Minimize(cp.sum(deviations))
+
+    # Constraints
+    constraints = [
+        final_shares >= 0,  # No shorting
+        final_total >= total_value * 0.99,  # Don't lose more than 1% to rounding
+    ]
+
+    # Solve
+    problem = cp.Problem(objective, constraints)
+    try:
+        problem.solve(solver=cp.GLPK_MI, verbose=False)  # type: ignore[no-untyped-call]
+    except cp.error.SolverError:
+        # Try alternate solver if GLPK_MI not available
+        problem.solve(verbose=False)  # type: ignore[no-untyped-call]
+
+    if problem.status not in ["optimal", "optimal_inaccurate"]:
+        raise ValueError(f"Optimization failed with status: {problem.status}")
+
+    if share_changes.value is None:
+        return None
+    return np.round(share_changes.value).astype(int)
+
+
+def get_solver_executor() -> Executor | None:
+    """
+    Shared process pool for solves, or None if disabled.
+
+    Sized by ``REBALANCING_SOLVER_PROCESSES``. Workers are spawned (not
+    forked from a threaded server) and run ``django.setup()`` first, since
+    importing the solver module loads the portfolio app.
+    """
+    global _executor
+
+    workers = settings.REBALANCING_SOLVER_PROCESSES
+    if workers <= 0:
+        return None
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+            logger.info("solver_pool_started", workers=workers)
+        return _executor
+
+
+def shutdown_solver_executor() -> None:
+    """Stop the shared pool (a new one is started on next use)."""
+    global _executor
+
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def run_solver(
+    executor: Executor | None,
+    shares: np.ndarray,
+    prices: np.ndarray,
+    asset_class_ids: np.ndarray,
+    targets: dict[int, float],
+) -> np.ndarray | None:
+    """Run ``solve_share_changes`` in ``executor``, or inline if it is None."""
+    if executor is None:
+        return solve_share_changes(shares, prices, asset_class_ids, targets)
+
+    try:
+        return executor.submit(
+            solve_share_changes, shares, prices, asset_class_ids, targets
+        ).result()
+    except BrokenProcessPool:
+        # A worker died; replace the pool so later requests can use it again
+        logger.error("solver_pool_broken")
+        shutdown_solver_executor()
+        raise
@@ -0,0 +1,202 @@
+"""
+Process-wide cache of near-static reference data.
+
+Asset classes, their categories, account groups, account types and each
+asset class's primary security change only through the admin or the seeder,
+yet nearly every request needs them. ``get_reference_data()`` loads them once
+per process into an immutable ``ReferenceData`` snapshot (lookup dicts plus
+the asset class DataFrame and label dtypes used by the allocation engine).
+
+Reads are lock-free: the current snapshot is a module global that is swapped
+atomically. Saving or deleting any of the underlying models calls
+``invalidate_reference_data()`` (see models/signals.py), immediately and
+again when the transaction commits, which bumps a version counter so the
+next read rebuilds. Other worker processes do not see
+that signal, so snapshots also expire after ``REFERENCE_DATA_TTL`` seconds.
+
+Model instances in a snapshot are shared between threads and must be treated
+as read-only.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+
+import pandas as pd
+import structlog
+
+from portfolio.services.metrics import record_cache_lookup
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Mapping
+
+    from portfolio.models import (
+        AccountGroup,
+        AccountType,
+        AssetClass,
+        AssetClassCategory,
+        Security,
+    )
+
+logger = structlog.get_logger(__name__)
+
+_version_counter = itertools.count(1)
+_version = 0
+_snapshot: ReferenceData | None = None
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    """Immutable snapshot of reference data at one version."""
+
+    version: int
+    loaded_at: float
+    asset_classes: tuple[AssetClass, ...]
+    """Ordered by category sort order, category label, then name."""
+    account_groups: tuple[AccountGroup, ...]
+    """Ordered by sort order, then name."""
+    account_types: tuple[AccountType, ...]
+    asset_classes_df: pd.DataFrame = field(repr=False)
+    """Asset class metadata in ``DjangoDataProvider.get_asset_classes_df`` format."""
+    asset_classes_by_id: Mapping[int, AssetClass] = field(repr=False)
+    asset_classes_by_name: Mapping[str, AssetClass] = field(repr=False)
+    categories_by_code: Mapping[str, AssetClassCategory] = field(repr=False)
+    account_types_by_id: Mapping[int, AccountType] = field(repr=False)
+    account_types_by_code: Mapping[str, AccountType] = field(repr=False)
+    primary_securities: Mapping[int, Security] = field(repr=False)
+    """Primary security by asset class id (classes without one are omitted)."""
+    label_dtypes: Mapping[str, pd.CategoricalDtype] = field(repr=False)
+    """
+    Categorical dtypes for the label columns of holdings frames, keyed by
+    ``asset_class``, ``category_code``, ``category_label``,
+    ``account_type_code`` and ``account_type_label``. Categories are sorted,
+    so sorting a categorical column matches sorting its strings.
+    """
+
+    @property
+    def cash(self) -> AssetClass | None:
+        """The Cash asset class, if it exists."""
+        from portfolio.models import AssetClass
+
+        return self.asset_classes_by_name.get(AssetClass.CASH_NAME)
+
+
+def get_reference_data() -> ReferenceData:
+    """Current reference data snapshot, loading it if stale or invalidated."""
+    global _snapshot
+
+    snapshot = _snapshot
+    if (
+        snapshot is not None
+        and snapshot.version == _version
+        and time.monotonic() - snapshot.loaded_at < settings.REFERENCE_DATA_TTL
+    ):
+        record_cache_lookup("reference_data", hit=True)
+        return snapshot
+
+    record_cache_lookup("reference_data", hit=False)
+    version = _version
+    snapshot = _load(version)
+    # An invalidation during the load makes this snapshot stale: serve it to
+    # this caller only and let the next read rebuild
+    if version == _version:
+        _snapshot = snapshot
+    return snapshot
+
+
+def invalidate_reference_data() -> None:
+    """Discard the cached snapshot; the next read reloads from the database."""
+    global _version, _snapshot
+
+    _version = next(_version_counter)
+    _snapshot = None
+
+
+def _load(version: int) -> ReferenceData:
+    from portfolio.models import AccountGroup, AccountType, AssetClass, AssetClassCategory
+
+    asset_classes = tuple(
+        AssetClass.objects.select_related(
+            "category__parent", "primary_security__asset_class"
+        ).order_by("category__sort_order", "category__label", "name")
+    )
+    categories = tuple(AssetClassCategory.objects.select_related("parent"))
+    account_groups = tuple(AccountGroup.objects.order_by("sort_order", "name"))
+    account_types = tuple(AccountType.objects.select_related("group").order_by("label"))
+
+    logger.debug(
+        "reference_data_loaded",
+        version=version,
+        asset_classes=len(asset_classes),
+        account_types=len(account_types),
+    )
+    return ReferenceData(
+        version=version,
+        loaded_at=time.monotonic(),
+        asset_classes=asset_classes,
+        account_groups=account_groups,
+        account_types=account_types,
+        asset_classes_df=_asset_classes_df(asset_classes),
+        asset_classes_by_id=MappingProxyType({ac.id: ac for ac in asset_classes}),
+        asset_classes_by_name=MappingProxyType({ac.name: ac for ac in asset_classes}),
+        categories_by_code=MappingProxyType({c.code: c for c in categories}),
+        account_types_by_id=MappingProxyType({at.id: at for at in account_types}),
+        account_types_by_code=MappingProxyType({at.code: at for at in account_types}),
+        primary_securities=MappingProxyType(
+            {ac.id: ac.primary_security for ac in asset_classes if ac.primary_security}
+        ),
+        label_dtypes=MappingProxyType(
+            {
+                "asset_class": _label_dtype(ac.name for ac in asset_classes),
+                "category_code": _label_dtype(c.code for c in categories),
+                "category_label": _label_dtype(c.label for c in categories),
+                "account_type_code": _label_dtype(at.code for at in account_types),
+                "account_type_label": _label_dtype(at.label for at in account_types),
+            }
+        ),
+    )
+
+
+def _label_dtype(labels: Iterable[str]) -> pd.CategoricalDtype:
+    return pd.CategoricalDtype(sorted(set(labels)))
+
+
+def _asset_classes_df(asset_classes: tuple[AssetClass, ...]) -> pd.DataFrame:
+    """Asset class metadata frame (see ``DjangoDataProvider.get_asset_classes_df``)."""
+    if not asset_classes:
+        return pd.DataFrame()
+
+    rows = []
+    for ac in sorted(asset_classes, key=lambda ac: ac.name):
+        category = ac.category
+        parent = category.parent
+        rows.append(
+            {
+                "asset_class_id": ac.id,
+                "asset_class_name": ac.name,
+                "group_code": parent.code if parent else None,
+                "group_label": parent.label if parent else None,
+                "group_sort_order": parent.sort_order if parent else None,
+                "category_code": category.code,
+                "category_label": category.label,
+                "category_sort_order": category.sort_order,
+            }
+        )
+
+    df = pd.DataFrame(rows)
+
+    # Pandas 2.3: nullable boolean dtype
+    df["is_cash"] = ((df["category_code"] == "CASH") | (df["asset_class_name"] == "Cash")).astype(
+        "boolean"
+    )
+
+    # Set row_type for individual asset class rows
+    df["row_type"] = "asset_class"
+
+    return df
@@ -0,0 +1,106 @@
+"""
+Portfolio data versions for conditional requests and fragment caching.
+
+A user's data version combines:
+- ``Portfolio.version`` of each of the user's portfolios, bumped by signals
+  whenever holdings, accounts or targets change (see models/signals.py)
+- the newest ``SecurityPrice`` id and ``updated_at`` among the securities the
+  user holds, so new prices and in-place corrections change the version,
+  while other users' price refreshes do not
+
+The version is cheap to read (two indexed queries) and changes whenever any
+computed allocation could change, so it can back ETags, ``Last-Modified``
+headers and cache keys without computing the data itself.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any
+
+from django.db.models import Count, Max, Q, Sum
+
+from portfolio.models import Holding, Portfolio, SecurityPrice
+
+
+@dataclass(frozen=True)
+class PortfolioVersion:
+    """Snapshot of a user's data version."""
+
+    user_id: int
+    portfolio_count: int
+    portfolio_version: int
+    price_version: int
+    price_updated_at: datetime | None
+    modified_at: datetime | None
+
+    @property
+    def key(self) -> str:
+        """Compact cache key component identifying this version."""
+        return (
+            f"{self.user_id}.{self.portfolio_count}.{self.portfolio_version}"
+            f".{self.price_version}.{_micros(self.price_updated_at)}.{_micros(self.modified_at)}"
+        )
+
+    def follows(self, previous: PortfolioVersion) -> bool:
+        """
+        Whether exactly one portfolio write separates ``previous`` from this version.
+
+        True when the portfolio version moved on by one and nothing else
+        (prices, portfolio count) changed: the only change between the two
+        is the caller's own write.
+        """
+        expected = replace(
+            previous,
+            portfolio_version=previous.portfolio_version + 1,
+            modified_at=self.modified_at,
+        )
+        return self == expected
+
+    def etag(self, *parts: Any) -> str:
+        """
+        Strong ETag for a resource derived from this version.
+
+        Args:
+            parts: Extra discriminators (endpoint name, query parameters)
+        """
+        raw = ":".join([self.key, *(str(p) for p in parts)])
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+
+def _micros(value: datetime | None) -> int:
+    return int(value.timestamp() * 1_000_000) if value else 0
+
+
+def get_portfolio_version(user: Any, include_securities: Iterable[int] = ()) -> PortfolioVersion:
+    """
+    Read the current data version for a user.
+
+    Args:
+        include_securities: Extra security ids whose prices count towards the
+            version, for comparing versions read before and after a write that
+            adds or removes a user's last holding of a security.
+    """
+    portfolios = Portfolio.objects.for_user(user).aggregate(
+        count=Count("id"), version=Sum("version"), modified_at=Max("modified_at")
+    )
+    held = Holding.objects.filter(account__user=user).values("security_id")
+    prices = SecurityPrice.objects.filter(
+        Q(security_id__in=held) | Q(security_id__in=list(include_securities))
+    ).aggregate(latest_id=Max("id"), updated_at=Max("updated_at"))
+    price_updated_at = prices["updated_at"]
+
+    modified_candidates = [
+        d for d in (portfolios["modified_at"], price_updated_at) if d is not None
+    ]
+    return PortfolioVersion(
+        user_id=user.id,
+        portfolio_count=portfolios["count"] or 0,
+        portfolio_version=portfolios["version"] or 0,
+        price_version=prices["latest_id"] or 0,
+        price_updated_at=price_updated_at,
+        modified_at=max(modified_candidates) if modified_candidates else None,
+    )
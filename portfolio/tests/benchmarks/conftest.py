@@ -0,0 +1,234 @@
+"""
+Benchmark harness for engine hot paths.
+
+Each benchmark times a callable over several rounds and counts the queries
+of one call, then compares both against ``baseline.json``. A benchmark fails
+when its query count exceeds the baseline by more than the tolerance.
+Benchmarks may also report the memory of the data they work on, which is
+checked the same way.
+
+Baseline timings are absolute seconds from the machine that recorded them,
+so timing regressions only warn unless ``BENCHMARK_CHECK_TIMINGS=1``. Enable
+it on the machine (or CI runner) the baseline was saved on; the best round is
+compared, as it is the least sensitive to noise.
+Results of the whole run are written to a JSON file.
+
+The suite is opt-in and should run on one process so timings are stable:
+
+    RUN_BENCHMARKS=1 pytest portfolio/tests/benchmarks -n 0 -p no:cov
+
+Environment:
+    RUN_BENCHMARKS: Set to 1 to run the suite (skipped otherwise)
+    BENCHMARK_TOLERANCE: Allowed regression in percent (default: 50)
+    BENCHMARK_CHECK_TIMINGS: Set to 1 to fail on timing regressions too
+    BENCHMARK_ROUNDS: Timed rounds per benchmark (default: 5)
+    BENCHMARK_OUTPUT: Results file (default: benchmark-results.json)
+    BENCHMARK_SAVE_BASELINE: Set to 1 to write this run's results to
+        baseline.json instead of comparing against it
+"""
+
+import gc
+import json
+import os
+import statistics
+import time
+import warnings
+from collections.abc import Callable, Generator
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+
+# Last synthetic price date. Fixed in the past so prices never carry a
+# timestamp later than now (synthetic closes are stamped 21:00 UTC), which
+# keeps staleness and query counts independent of the time of day.
+BENCHMARK_PRICE_END = date(2025, 1, 3)
+
+# Portfolio shapes benchmarks run at (SyntheticShape fields)
+BENCHMARK_SIZES: dict[str, dict[str, Any]] = {
+    "small": {"accounts_per_user": 2, "holdings_per_account": 5, "securities": 20},
+    "medium": {"accounts_per_user": 5, "holdings_per_account": 20, "securities": 100},
+    "large": {"accounts_per_user": 20, "holdings_per_account": 20, "securities": 400},
+}
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    name: str
+    seconds: float
+    """Best wall time of the timed rounds."""
+    median_seconds: float
+    rounds: int
+    queries: int
+    """Queries issued by one call."""
+    nbytes: int | None = None
+    """Memory of the benchmarked data, if the benchmark reports it."""
+
+
+class BenchmarkRecorder:
+    """Measures benchmarks and checks them against a stored baseline."""
+
+    def __init__(
+        self,
+        baseline: dict[str, dict[str, Any]],
+        tolerance_pct: float,
+        rounds: int,
+        save_baseline: bool,
+        check_timings: bool = False,
+    ) -> None:
+        self.baseline = baseline
+        self.tolerance_pct = tolerance_pct
+        self.rounds = rounds
+        self.save_baseline = save_baseline
+        self.check_timings = check_timings
+        self.results: dict[str, BenchmarkResult] = {}
+
+    def measure(
+        self, name: str, func: Callable[[], Any], nbytes: int | None = None
+    ) -> BenchmarkResult:
+        """
+        Benchmark ``func`` and fail the test if it regressed.
+
+        ``nbytes`` records the memory of the data ``func`` works on (e.g. a
+        DataFrame's deep ``memory_usage``) alongside its timings.
+
+        One untimed call warms process caches (reference data, compiled
+        queries); the next call is used to count queries. Garbage collection
+        is paused while timing, as ``timeit`` does.
+        """
+        func()
+        with CaptureQueriesContext(connection) as ctx:
+            func()
+
+        timings = []
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(self.rounds):
+                start = time.perf_counter()
+                func()
+                timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+        result = BenchmarkResult(
+            name=name,
+            seconds=min(timings),
+            median_seconds=statistics.median(timings),
+            rounds=self.rounds,
+            queries=len(ctx.captured_queries),
+            nbytes=None if nbytes is None else int(nbytes),
+        )
+        self.results[name] = result
+
+        if not self.save_baseline:
+            regressions = self.regressions(result)
+            slower = self.timing_regression(result)
+            if slower and self.check_timings:
+                regressions.append(slower)
+            elif slower:
+                warnings.warn(f"{name} slower than baseline: {slower}", stacklevel=2)
+            if regressions:
+                pytest.fail(f"{name} regressed: {'; '.join(regressions)}")
+        return result
+
+    def timing_regression(self, result: BenchmarkResult) -> str | None:
+        """Description of the slowdown if ``result`` is beyond the baseline time."""
+        base = self.baseline.get(result.name)
+        if base is None or result.seconds <= base["seconds"] * (1 + self.tolerance_pct / 100):
+            return None
+        return f"{result.seconds:.4f}s vs baseline {base['seconds']:.4f}s"
+
+    def regressions(self, result: BenchmarkResult) -> list[str]:
+        """Query count and memory of ``result`` beyond the baseline plus tolerance."""
+        base = self.baseline.get(result.name)
+        if base is None:
+            return []
+
+        limit = 1 + self.tolerance_pct / 100
+        regressions = []
+        if result.queries > base["queries"] * limit:
+            regressions.append(f"{result.queries} queries vs baseline {base['queries']}")
+        base_nbytes = base.get("nbytes")
+        if result.nbytes is not None and base_nbytes and result.nbytes > base_nbytes * limit:
+            regressions.append(f"{result.nbytes} bytes vs baseline {base_nbytes}")
+        return regressions
+
+    def write(self, path: Path) -> None:
+        payload = {
+            "tolerance_pct": self.tolerance_pct,
+            "results": {name: asdict(r) for name, r in sorted(self.results.items())},
+        }
+        path.write_text(json.dumps(payload, indent=2) + "\n")
+
+    def write_baseline(self) -> None:
+        merged = {
+            **self.baseline,
+            **{
+                name: {
+                    "seconds": round(r.seconds, 6),
+                    "queries": r.queries,
+                    **({"nbytes": r.nbytes} if r.nbytes is not None else {}),
+                }
+                for name, r in self.results.items()
+            },
+        }
+        BASELINE_PATH.write_text(json.dumps(dict(sorted(merged.items())), indent=2) + "\n")
+
+
+def pytest_collection_modifyitems(config: Any, items: list[Any]) -> None:
+    if os.getenv("RUN_BENCHMARKS") == "1":
+        return
+    skip = pytest.mark.skip(reason="benchmarks run with RUN_BENCHMARKS=1")
+    benchmarks_dir = Path(__file__).parent
+    for item in items:
+        if benchmarks_dir in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def bench() -> Generator[BenchmarkRecorder]:
+    """Session-wide benchmark recorder; writes the results file at the end."""
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    recorder = BenchmarkRecorder(
+        baseline=baseline,
+        tolerance_pct=float(os.getenv("BENCHMARK_TOLERANCE", "50")),
+        rounds=int(os.getenv("BENCHMARK_ROUNDS", "5")),
+        save_baseline=os.getenv("BENCHMARK_SAVE_BASELINE") == "1",
+        check_timings=os.getenv("BENCHMARK_CHECK_TIMINGS") == "1",
+    )
+    yield recorder
+
+    if not recorder.results:
+        return
+    output = Path(os.getenv("BENCHMARK_OUTPUT", "benchmark-results.json"))
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if worker:
+        output = output.with_stem(f"{output.stem}-{worker}")
+    recorder.write(output)
+    if recorder.save_baseline:
+        recorder.write_baseline()
+
+
+@pytest.fixture(params=list(BENCHMARK_SIZES))
+def benchmark_portfolio(request: Any, synthetic_portfolios: Any) -> dict[str, Any]:
+    """One user's synthetic portfolio at each benchmark size."""
+    from django.contrib.auth import get_user_model
+
+    result = synthetic_portfolios(
+        users=1,
+        price_years=0.02,
+        price_end=BENCHMARK_PRICE_END,
+        **BENCHMARK_SIZES[request.param],
+    )
+    return {
+        "size": request.param,
+        "user": get_user_model().objects.get(pk=result.user_ids[0]),
+    }
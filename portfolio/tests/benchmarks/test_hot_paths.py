@@ -0,0 +1,268 @@
+"""Benchmarks of the allocation, rebalancing, formatting and pricing hot paths."""
+
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
+from django.utils import timezone
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio.models import Account
+from portfolio.services.allocations import AllocationEngine
+from portfolio.services.allocations.backends import make_calculator
+from portfolio.services.allocations.data_providers import (
+    DETAILED_LABEL_COLUMNS,
+    HOLDINGS_LABEL_COLUMNS,
+)
+from portfolio.services.allocations.formatters import AllocationFormatter
+from portfolio.services.pricing import PricingService
+from portfolio.services.rebalancing import RebalancingEngine
+from portfolio.tests.benchmarks.conftest import BenchmarkRecorder
+
+
+class FakeMarketData:
+    """MarketDataService stand-in quoting every ticker at $100, now."""
+
+    @staticmethod
+    def get_prices(tickers: list[str]) -> dict[str, tuple[Decimal, datetime]]:
+        now = timezone.now()
+        return {ticker: (Decimal("100.00"), now) for ticker in tickers}
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.django_db
+class TestAllocationEngineBenchmarks:
+    def test_presentation_rows(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any]
+    ) -> None:
+        user = benchmark_portfolio["user"]
+        engine = AllocationEngine()
+
+        bench.measure(
+            f"get_presentation_rows[{benchmark_portfolio['size']}]",
+            lambda: engine.get_presentation_rows(user),
+        )
+
+    def test_holdings_rows(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any]
+    ) -> None:
+        user = benchmark_portfolio["user"]
+        engine = AllocationEngine()
+
+        bench.measure(
+            f"get_holdings_rows[{benchmark_portfolio['size']}]",
+            lambda: engine.get_holdings_rows(user),
+        )
+
+    def test_aggregated_holdings_rows(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any]
+    ) -> None:
+        user = benchmark_portfolio["user"]
+        engine = AllocationEngine()
+
+        bench.measure(
+            f"get_aggregated_holdings_rows[{benchmark_portfolio['size']}]",
+            lambda: engine.get_aggregated_holdings_rows(user),
+        )
+
+    def test_sidebar_data(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any]
+    ) -> None:
+        user = benchmark_portfolio["user"]
+        engine = AllocationEngine()
+
+        bench.measure(
+            f"get_sidebar_data[{benchmark_portfolio['size']}]",
+            lambda: engine.get_sidebar_data(user),
+        )
+
+
+def wide_presentation_frame(
+    rows: int = 60, account_types: int = 5, accounts_per_type: int = 8
+) -> tuple[pd.DataFrame, dict[int, list[dict[str, Any]]]]:
+    """A presentation frame (by default 40 accounts, ~450 columns) and its account metadata."""
+    rng = np.random.default_rng(0)
+    columns: dict[str, Any] = {
+        "asset_class_name": [f"Asset Class {i}" for i in range(rows)],
+        "asset_class_id": np.arange(rows),
+        "group_code": "EQ",
+        "category_code": "USEQ",
+        "is_cash": False,
+        "hierarchy_level": 999,
+    }
+    metrics = ["actual", "actual_pct", "effective", "effective_pct", "variance", "variance_pct"]
+    account_metrics = ["policy", "policy_pct", "policy_variance", "policy_variance_pct"]
+    account_metrics += ["actual", "actual_pct", "target", "target_pct", "variance", "variance_pct"]
+    for metric in metrics:
+        columns[f"portfolio_{metric}"] = rng.random(rows)
+
+    accounts_by_type: dict[int, list[dict[str, Any]]] = {}
+    for type_id in range(account_types):
+        code = f"TYPE{type_id}"
+        for metric in metrics:
+            columns[f"{code}_{metric}"] = rng.random(rows)
+        accounts_by_type[type_id] = []
+        for n in range(accounts_per_type):
+            account_id = type_id * 100 + n
+            accounts_by_type[type_id].append(
+                {"id": account_id, "name": f"Account {account_id}", "type_code": code}
+            )
+            for metric in account_metrics:
+                columns[f"account_{account_id}_{metric}"] = rng.random(rows)
+    return pd.DataFrame(columns), accounts_by_type
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.django_db
+class TestFormatterBenchmarks:
+    def test_presentation_rows_wide(self, bench: BenchmarkRecorder) -> None:
+        df, accounts_by_type = wide_presentation_frame()
+        formatter = AllocationFormatter()
+
+        bench.measure(
+            "to_presentation_rows[wide]",
+            lambda: formatter.to_presentation_rows(df, accounts_by_type),
+        )
+
+
+def with_labels(df: pd.DataFrame, columns: dict[str, Any], labels: str) -> pd.DataFrame:
+    """``df`` with its label columns as plain strings, or as the provider's categoricals."""
+    return df.astype(dict.fromkeys(columns, "str")) if labels == "str" else df
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.django_db
+@pytest.mark.parametrize("labels", ["str", "category"])
+class TestLabelDtypeBenchmarks:
+    """Calculator stages on string vs categorical label columns, with frame memory."""
+
+    def test_presentation_dataframe(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any], labels: str
+    ) -> None:
+        user = benchmark_portfolio["user"]
+        engine = AllocationEngine()
+        provider = engine.data_provider
+        holdings_df = with_labels(provider.get_holdings_df(user), HOLDINGS_LABEL_COLUMNS, labels)
+        totals = holdings_df.groupby("account_id")["value"].sum()
+        kwargs = {
+            "holdings_df": holdings_df,
+            "asset_classes_df": provider.get_asset_classes_df(user),
+            "targets_map": provider.get_targets_map(user),
+            "account_totals": {k: Decimal(str(v)) for k, v in totals.items()},
+            "policy_targets": provider.get_policy_targets(user),
+        }
+
+        bench.measure(
+            f"build_presentation_dataframe[{labels},{benchmark_portfolio['size']}]",
+            lambda: engine.calculator.build_presentation_dataframe(**kwargs),
+            nbytes=holdings_df.memory_usage(deep=True).sum(),
+        )
+
+    def test_holdings_with_targets(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any], labels: str
+    ) -> None:
+        user = benchmark_portfolio["user"]
+        engine = AllocationEngine()
+        holdings_df = with_labels(
+            engine.data_provider.get_holdings_df_detailed(user), DETAILED_LABEL_COLUMNS, labels
+        )
+        targets_map = engine.data_provider.get_targets_map(user)
+
+        def calculate() -> None:
+            with_targets = engine.calculator.calculate_holdings_with_targets(
+                holdings_df, targets_map
+            )
+            engine.calculator.calculate_holdings_aggregations(with_targets)
+
+        bench.measure(
+            f"holdings_with_targets[{labels},{benchmark_portfolio['size']}]",
+            calculate,
+            nbytes=holdings_df.memory_usage(deep=True).sum(),
+        )
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.django_db
+@pytest.mark.parametrize("backend", ["pandas", "polars"])
+class TestCalculatorBackendBenchmarks:
+    """Calculator stages on each ALLOCATION_CALCULATOR backend."""
+
+    def test_presentation_dataframe(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any], backend: str
+    ) -> None:
+        if backend == "polars":
+            pytest.importorskip("polars")
+        user = benchmark_portfolio["user"]
+        calculator = make_calculator(backend)
+        provider = AllocationEngine().data_provider
+        holdings_df = provider.get_holdings_df(user)
+        totals = holdings_df.groupby("account_id")["value"].sum()
+        kwargs = {
+            "holdings_df": holdings_df,
+            "asset_classes_df": provider.get_asset_classes_df(user),
+            "targets_map": provider.get_targets_map(user),
+            "account_totals": {k: Decimal(str(v)) for k, v in totals.items()},
+            "policy_targets": provider.get_policy_targets(user),
+        }
+
+        bench.measure(
+            f"build_presentation_dataframe[{backend},{benchmark_portfolio['size']}]",
+            lambda: calculator.build_presentation_dataframe(**kwargs),
+        )
+
+    def test_holdings_aggregations(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any], backend: str
+    ) -> None:
+        if backend == "polars":
+            pytest.importorskip("polars")
+        user = benchmark_portfolio["user"]
+        calculator = make_calculator(backend)
+        provider = AllocationEngine().data_provider
+        with_targets = calculator.calculate_holdings_with_targets(
+            provider.get_holdings_df_detailed(user), provider.get_targets_map(user)
+        )
+
+        bench.measure(
+            f"holdings_aggregations[{backend},{benchmark_portfolio['size']}]",
+            lambda: calculator.calculate_holdings_aggregations(with_targets),
+        )
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.django_db
+class TestRebalancingBenchmarks:
+    def test_generate_plan(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any]
+    ) -> None:
+        account = Account.objects.filter(user=benchmark_portfolio["user"]).order_by("id").first()
+        engine = RebalancingEngine(account)
+
+        bench.measure(
+            f"generate_plan[{benchmark_portfolio['size']}]",
+            engine.generate_plan,
+        )
+
+
+@pytest.mark.performance
+@pytest.mark.slow
+@pytest.mark.django_db
+class TestPricingBenchmarks:
+    def test_update_stale_prices(
+        self, bench: BenchmarkRecorder, benchmark_portfolio: dict[str, Any]
+    ) -> None:
+        user = benchmark_portfolio["user"]
+        service = PricingService(market_data=FakeMarketData())  # type: ignore[arg-type]
+
+        # max_age=0 makes every price stale, so each call fetches and stores
+        bench.measure(
+            f"update_holdings_prices_if_stale[{benchmark_portfolio['size']}]",
+            lambda: service.update_holdings_prices_if_stale(user, max_age=timedelta(0)),
+        )
@@ -11,9 +11,20 @@ Replaced: PortfolioTestMixin with golden_reference_portfolio fixture
 from decimal import Decimal
 from typing import Any
 
+import pandas as pd
 import pytest
 
 from portfolio.services.allocations import AllocationEngine
+from portfolio.services.allocations.calculations import AllocationCalculator
+
+
+@pytest.fixture(autouse=True, params=["pandas", "polars"])
+def calculator_backend(request: pytest.FixtureRequest, settings: Any) -> str:
+    """Run every golden reference test on each ALLOCATION_CALCULATOR backend."""
+    if request.param == "polars":
+        pytest.importorskip("polars")
+    settings.ALLOCATION_CALCULATOR = request.param
+    return request.param
 
 
 @pytest.mark.golden
@@ -77,3 +88,47 @@ class TestGoldenReferenceCalculations:
             # Variance should be reasonable (not infinite or NaN)
             # Note: Empty accounts with targets can have variance > 100%
             assert -200.0 <= variance_pct <= 200.0
+
+    def test_portfolio_actuals(self, golden_reference_portfolio: dict[str, Any]) -> None:
+        """Test portfolio and account actuals against the hand-calculated split.
+
+        VTI (US Equities): $200k ML Brokerage + $100k CB Roth = $300k (66.67%)
+        VXUS (Intl Developed): $150k CB IRA = $150k (33.33%)
+        """
+        setup = golden_reference_portfolio
+        df, _ = AllocationEngine()._calculate_presentation_df(setup["user"])
+        actuals = df.set_index("asset_class_name")
+
+        assert actuals.loc["US Equities", "portfolio_actual"] == pytest.approx(300_000.0)
+        assert actuals.loc["US Equities", "portfolio_actual_pct"] == pytest.approx(200 / 3)
+        assert actuals.loc["International Developed Equities", "portfolio_actual_pct"] == (
+            pytest.approx(100 / 3)
+        )
+
+        roth_id = setup["accounts"]["cb_roth"].id
+        assert actuals.loc["US Equities", f"account_{roth_id}_actual"] == pytest.approx(100_000.0)
+        assert actuals.loc["US Equities", f"account_{roth_id}_actual_pct"] == pytest.approx(100.0)
+
+    def test_calculator_backend_matches_pandas(
+        self, golden_reference_portfolio: dict[str, Any]
+    ) -> None:
+        """Test the configured calculator reproduces the pandas calculator's frames."""
+        user = golden_reference_portfolio["user"]
+        engine = AllocationEngine()
+        reference = AllocationEngine(calculator=AllocationCalculator())
+
+        pd.testing.assert_frame_equal(
+            engine._calculate_presentation_df(user)[0],
+            reference._calculate_presentation_df(user)[0],
+            check_exact=False,
+        )
+
+        holdings_df = engine.data_provider.get_holdings_df_detailed(user)
+        targets_map = engine.data_provider.get_targets_map(user)
+        with_targets = reference.calculator.calculate_holdings_with_targets(
+            holdings_df, targets_map
+        )
+        actual = engine.calculator.calculate_holdings_aggregations(with_targets)
+        expected = reference.calculator.calculate_holdings_aggregations(with_targets)
+        for level, frame in expected.items():
+            pd.testing.assert_frame_equal(actual[level], frame, check_exact=False)
@@ -44,6 +44,7 @@ from portfolio.tests import factories
 from portfolio.tests.fixtures.benchmarks import (
     large_portfolio_benchmark,
     medium_portfolio_benchmark,
+    synthetic_portfolios,
 )
 from portfolio.tests.fixtures.golden_reference import golden_reference_portfolio
 
@@ -82,6 +83,7 @@ __all__ = [
     # Benchmark fixtures
     "large_portfolio_benchmark",
     "medium_portfolio_benchmark",
+    "synthetic_portfolios",
     # Factories
     "factories",
 ]
@@ -102,6 +104,21 @@ def pytest_configure(config: Any) -> None:
     config.worker_id = worker_id
 
 
+@pytest.fixture(autouse=True)
+def reset_reference_data() -> Any:
+    """
+    Start every test with an empty reference data cache.
+
+    Rolled-back test transactions send no signals, so a snapshot cached by one
+    test could otherwise leak asset classes into the next.
+    """
+    from portfolio.services.reference_data import invalidate_reference_data
+
+    invalidate_reference_data()
+    yield
+    invalidate_reference_data()
+
+
 # ============================================================================
 # SYSTEM DATA FIXTURES
 # ============================================================================
@@ -4,6 +4,7 @@ Tests for portfolio domain model (Aggregate Root).
 Tests: portfolio/domain/portfolio.py
 """
 
+import dataclasses
 from decimal import Decimal
 
 from django.utils import timezone
@@ -103,8 +104,62 @@ class TestPortfolioDomain:
         assert portfolio.account_by_id(setup_data["roth"].id) == setup_data["roth"]
         assert portfolio.account_by_id(999999) is None
 
+    def test_portfolio_is_immutable(self, setup_data):
+        """Accounts cannot be swapped or appended once the holdings table is built."""
+        portfolio = Portfolio(user_id=setup_data["user"].id, accounts=setup_data["accounts"])
+        assert isinstance(portfolio.accounts, tuple)
+        assert portfolio.total_value == Decimal("1000")
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            portfolio.accounts = ()  # type: ignore[misc]
+        with pytest.raises(AttributeError):
+            portfolio.accounts.append(setup_data["roth"])  # type: ignore[attr-defined]
+        setup_data["accounts"].clear()
+        assert len(portfolio) == 2
+        assert portfolio.total_value == Decimal("1000")
+
     def test_accounts_by_type(self, setup_data):
         """Verify filtering accounts by type."""
         portfolio = Portfolio(user_id=setup_data["user"].id, accounts=setup_data["accounts"])
         assert portfolio.accounts_by_type("ROTH_IRA") == [setup_data["roth"]]
         assert portfolio.accounts_by_type("TAXABLE") == [setup_data["taxable"]]
+
+    def test_load_for_user_aggregates_without_further_queries(
+        self, setup_data, django_assert_num_queries
+    ):
+        """Aggregates over a loaded portfolio are served from the preloaded snapshot."""
+        portfolio = Portfolio.load_for_user(setup_data["user"])
+
+        with django_assert_num_queries(0):
+            assert portfolio.total_value == Decimal("1000")
+            assert portfolio.value_by_account_type()["TAXABLE"] == Decimal("400")
+            assert portfolio.value_by_asset_class()["US Equities"] == Decimal("600")
+            assert portfolio.get_account_totals()[setup_data["roth"].id] == Decimal("600")
+            for account in portfolio.accounts:
+                account.total_value()
+                account.holdings_by_asset_class()
+
+    def test_load_for_user_query_count_is_constant(
+        self, setup_data, base_system_data, django_assert_num_queries
+    ):
+        """Loading cost does not grow with the number of holdings."""
+        Holding.objects.create(
+            account=setup_data["roth"], security=base_system_data.bnd, shares=Decimal("5")
+        )
+
+        # Accounts (with institution/type joins) + prefetched holdings with prices
+        with django_assert_num_queries(2):
+            portfolio = Portfolio.load_for_user(setup_data["user"])
+            portfolio.value_by_asset_class()
+
+    def test_holdings_table_from_accounts(self, setup_data):
+        """HoldingsTable holds one entry per holding with its market value."""
+        portfolio = Portfolio.load_for_user(setup_data["user"])
+        table = portfolio.holdings_table
+
+        assert len(table) == 2
+        assert table.total() == Decimal("1000")
+        assert table.sum_by(table.account_ids) == {
+            setup_data["roth"].id: Decimal("600.00"),
+            setup_data["taxable"].id: Decimal("400.00"),
+        }
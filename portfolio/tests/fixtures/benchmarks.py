@@ -5,6 +5,7 @@ These create large-scale portfolio data for testing calculation performance
 and detecting regressions.
 """
 
+from collections.abc import Callable
 from decimal import Decimal
 from typing import Any
 
@@ -24,6 +25,11 @@ from portfolio.models import (
     Security,
     SecurityPrice,
 )
+from portfolio.services.synthetic_data import (
+    SyntheticDataGenerator,
+    SyntheticDataResult,
+    SyntheticShape,
+)
 
 User = get_user_model()
 
@@ -251,3 +257,22 @@ def medium_portfolio_benchmark(base_system_data: Any, db: Any) -> dict[str, Any]
         "n_holdings": len(holdings),
         "total_value": len(holdings) * Decimal("5000.00"),
     }
+
+
+@pytest.fixture
+def synthetic_portfolios(base_system_data: Any, db: Any) -> Callable[..., SyntheticDataResult]:
+    """
+    Factory for bulk-created synthetic portfolios of any shape.
+
+    Accepts ``SyntheticShape`` fields as keyword arguments:
+
+        result = synthetic_portfolios(users=50, holdings_per_account=30)
+
+    Returns:
+        Callable returning the SyntheticDataResult (user ids and row counts)
+    """
+
+    def _create(**shape: Any) -> SyntheticDataResult:
+        return SyntheticDataGenerator(SyntheticShape(**shape)).run()
+
+    return _create
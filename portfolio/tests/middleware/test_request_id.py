@@ -1,9 +1,13 @@
 """Tests for Request ID middleware."""
 
+import asyncio
+
 from django.http import HttpResponse
 from django.test import RequestFactory
 
 import pytest
+import structlog
+from asgiref.sync import iscoroutinefunction
 
 from portfolio.middleware import RequestIDMiddleware
 
@@ -79,3 +83,24 @@ class TestRequestIDMiddleware:
         id2 = response2["X-Request-ID"]
 
         assert id1 != id2
+
+    def test_async_get_response(self):
+        """With an async handler the middleware is awaitable and keeps the ID bound."""
+        request = RequestFactory().get("/", HTTP_X_REQUEST_ID="lb-123")
+        seen = {}
+
+        async def get_response(req):
+            seen.update(structlog.contextvars.get_contextvars())
+            return HttpResponse()
+
+        middleware = RequestIDMiddleware(get_response)
+        response = asyncio.run(middleware(request))
+
+        assert iscoroutinefunction(middleware)
+        assert seen["request_id"] == "lb-123"
+        assert response["X-Request-ID"] == "lb-123"
+
+    def test_sync_get_response_is_not_coroutine(self):
+        middleware = RequestIDMiddleware(lambda req: HttpResponse())
+
+        assert not iscoroutinefunction(middleware)
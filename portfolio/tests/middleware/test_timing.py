@@ -1,8 +1,10 @@
+import asyncio
 import time
 
 from django.http import HttpResponse
 
 import pytest
+from asgiref.sync import iscoroutinefunction
 
 from portfolio.middleware.timing import PerformanceTimingMiddleware
 
@@ -62,8 +64,9 @@ class TestPerformanceTimingMiddleware:
         monkeypatch.setattr(
             timing.PerformanceTimingMiddleware,
             "__init__",
-            lambda self, get_response: setattr(self, "get_response", get_response)
-            or setattr(self, "slow_threshold", 0.01),
+            lambda self, get_response: (
+                setattr(self, "get_response", get_response) or setattr(self, "slow_threshold", 0.01)
+            ),
         )
 
         def slow_response(request):
@@ -78,3 +81,16 @@ class TestPerformanceTimingMiddleware:
         assert log_calls[0][0] == "slow_request_detected"
         assert log_calls[0][1]["path"] == "/test-slow/"
         assert log_calls[0][1]["duration"] >= 0.02
+
+    def test_async_get_response(self, rf):
+        """With an async handler the middleware is awaitable and still times it."""
+
+        async def get_response(request):
+            await asyncio.sleep(0.01)
+            return HttpResponse("OK")
+
+        middleware = PerformanceTimingMiddleware(get_response)
+        response = asyncio.run(middleware(rf.get("/test/")))
+
+        assert iscoroutinefunction(middleware)
+        assert float(response["X-Request-Duration"].rstrip("s")) >= 0.01
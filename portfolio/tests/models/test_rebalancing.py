@@ -4,14 +4,44 @@ Tests for rebalancing logic.
 Tests: portfolio/models/rebalancing.py
 """
 
+from datetime import timedelta
+
+from django.utils import timezone
+
 import pytest
 
+from portfolio.models import RebalancingJob
+
 
 @pytest.mark.models
 @pytest.mark.integration
-class TestRebalancingRecommendation:
-    """TODO: Add tests for portfolio/models/rebalancing.py."""
+@pytest.mark.django_db
+class TestRebalancingJob:
+    def test_defaults_to_pending(self, roth_account) -> None:
+        job = RebalancingJob.objects.create(account=roth_account, data_version="v1")
+
+        assert job.status == RebalancingJob.PENDING
+        assert job.progress == 0
+        assert not job.is_finished
+        assert job.duration_seconds is None
+
+    def test_duration_of_finished_job(self, roth_account) -> None:
+        started = timezone.now()
+        job = RebalancingJob.objects.create(
+            account=roth_account,
+            data_version="v1",
+            status=RebalancingJob.SUCCEEDED,
+            started_at=started,
+            finished_at=started + timedelta(seconds=3),
+        )
+
+        assert job.is_finished
+        assert job.duration_seconds == pytest.approx(3.0)
+
+    def test_newest_jobs_first(self, roth_account) -> None:
+        older = RebalancingJob.objects.create(
+            account=roth_account, data_version="v1", created_at=timezone.now() - timedelta(hours=1)
+        )
+        newer = RebalancingJob.objects.create(account=roth_account, data_version="v2")
 
-    def test_placeholder(self) -> None:
-        """Placeholder test."""
-        pytest.skip("TODO: Implement tests for rebalancing")
+        assert list(roth_account.rebalancing_jobs.all()) == [newer, older]
@@ -297,3 +297,92 @@ class TestAllocationStrategyValidation:
         # Verify they sum to 100.00 exactly in DB (or close to it)
         total = sum(ta.target_percent for ta in strategy.target_allocations.all())
         assert abs(total - Decimal("100.00")) <= Decimal("0.02")
+
+
+@pytest.mark.models
+@pytest.mark.integration
+class TestSaveAllocationsBulkWrite:
+    """save_allocations() writes in bulk and validates once at commit."""
+
+    @pytest.fixture
+    def allocations(self, base_system_data: Any) -> dict[int, Decimal]:
+        system = base_system_data
+        return {
+            system.asset_class_us_equities.id: Decimal("40.00"),
+            system.asset_class_intl_developed.id: Decimal("20.00"),
+            system.asset_class_intl_emerging.id: Decimal("10.00"),
+            system.asset_class_treasuries_short.id: Decimal("10.00"),
+            system.asset_class_treasuries_interm.id: Decimal("10.00"),
+        }
+
+    def test_validates_once_on_commit(
+        self,
+        strategy: AllocationStrategy,
+        allocations: dict[int, Decimal],
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        from unittest.mock import patch
+
+        strategy.save_allocations(allocations)  # existing rows to replace
+
+        with (
+            patch.object(
+                AllocationStrategy, "validate_allocations", autospec=True, return_value=(True, "")
+            ) as validate,
+            django_capture_on_commit_callbacks(execute=True) as callbacks,
+        ):
+            strategy.save_allocations(allocations)
+
+        assert len(callbacks) == 1
+        # One defensive check before writing, one against the stored rows
+        assert validate.call_count == 2
+        assert strategy.target_allocations.count() == len(allocations) + 1  # plus cash
+
+    def test_query_count_independent_of_row_count(
+        self,
+        strategy: AllocationStrategy,
+        allocations: dict[int, Decimal],
+        base_system_data: Any,
+    ) -> None:
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        system = base_system_data
+        strategy.save_allocations({system.asset_class_us_equities.id: Decimal("50.00")})
+        with CaptureQueriesContext(connection) as few:
+            strategy.save_allocations({system.asset_class_us_equities.id: Decimal("50.00")})
+
+        strategy.save_allocations(allocations)
+        with CaptureQueriesContext(connection) as many:
+            strategy.save_allocations(allocations)
+
+        assert len(many) == len(few)
+
+    def test_bumps_portfolio_version_once(
+        self, test_portfolio: Any, allocations: dict[int, Decimal]
+    ) -> None:
+        from portfolio.models import Portfolio
+
+        strategy = AllocationStrategy.objects.create(user=test_portfolio["user"], name="Bulk")
+        portfolio = test_portfolio["portfolio"]
+        before = Portfolio.objects.get(id=portfolio.id).version
+
+        strategy.save_allocations(allocations)
+
+        assert Portfolio.objects.get(id=portfolio.id).version == before + 1
+
+    def test_single_row_saves_still_send_signals(
+        self, test_portfolio: Any, base_system_data: Any
+    ) -> None:
+        from portfolio.models import Portfolio
+
+        strategy = AllocationStrategy.objects.create(user=test_portfolio["user"], name="Single")
+        before = Portfolio.objects.get(id=test_portfolio["portfolio"].id).version
+
+        TargetAllocation.objects.create(
+            strategy=strategy,
+            asset_class=base_system_data.asset_class_us_equities,
+            target_percent=Decimal("100.00"),
+        )
+
+        assert Portfolio.objects.get(id=test_portfolio["portfolio"].id).version > before
@@ -0,0 +1,52 @@
+"""Tests for calculator backend selection."""
+
+import sys
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+import pytest
+
+from portfolio.services.allocations import AllocationEngine, BatchAllocationEngine
+from portfolio.services.allocations.backends import make_calculator
+from portfolio.services.allocations.calculations import AllocationCalculator
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestMakeCalculator:
+    def test_pandas_is_default(self) -> None:
+        assert type(make_calculator()) is AllocationCalculator
+
+    def test_explicit_backend_overrides_setting(self, settings: Any) -> None:
+        settings.ALLOCATION_CALCULATOR = "polars"
+        assert type(make_calculator("pandas")) is AllocationCalculator
+
+    def test_polars_backend(self, settings: Any) -> None:
+        pytest.importorskip("polars")
+        from portfolio.services.allocations.polars_calculations import (
+            PolarsAllocationCalculator,
+        )
+
+        settings.ALLOCATION_CALCULATOR = "Polars"
+        assert isinstance(make_calculator(), PolarsAllocationCalculator)
+        assert isinstance(AllocationEngine().calculator, PolarsAllocationCalculator)
+        assert isinstance(BatchAllocationEngine().calculator, PolarsAllocationCalculator)
+
+    def test_polars_not_installed(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setitem(sys.modules, "polars", None)
+        monkeypatch.delitem(
+            sys.modules, "portfolio.services.allocations.polars_calculations", raising=False
+        )
+
+        with pytest.raises(ImproperlyConfigured, match="requires the polars package"):
+            make_calculator("polars")
+
+    def test_unknown_backend(self) -> None:
+        with pytest.raises(ImproperlyConfigured, match="Unknown ALLOCATION_CALCULATOR 'numpy'"):
+            make_calculator("numpy")
+
+    def test_injected_calculator_wins(self, settings: Any) -> None:
+        settings.ALLOCATION_CALCULATOR = "unknown"
+        calculator = AllocationCalculator()
+        assert AllocationEngine(calculator=calculator).calculator is calculator
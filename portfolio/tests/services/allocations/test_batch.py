@@ -0,0 +1,154 @@
+"""Tests for the multi-user batch allocation engine."""
+
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from typing import Any
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from portfolio.models import (
+    Account,
+    AccountTypeStrategyAssignment,
+    AllocationStrategy,
+    Holding,
+    Portfolio,
+    PortfolioSnapshot,
+)
+from portfolio.services.allocations import AllocationEngine, BatchAllocationEngine
+from portfolio.services.portfolio_snapshots import rebuild_user, rebuild_users
+
+
+@pytest.fixture
+def several_users(multi_account_holdings: dict[str, Any], test_user_with_name: Any) -> Any:
+    """
+    Three users exercising every level of the target hierarchy.
+
+    - testuser: 60/40 portfolio strategy; taxable accounts assigned all-bonds
+    - other: one Roth holding VTI with no strategies
+    - empty: a portfolio without accounts
+    """
+    system = multi_account_holdings["system"]
+    user = multi_account_holdings["user"]
+    bonds_id = system.bnd.asset_class_id
+
+    policy = AllocationStrategy.objects.create(user=user, name="60/40")
+    policy.save_allocations(
+        {system.asset_class_us_equities.id: Decimal("60"), bonds_id: Decimal("40")}
+    )
+    all_bonds = AllocationStrategy.objects.create(user=user, name="All Bonds")
+    all_bonds.save_allocations({bonds_id: Decimal("100")})
+    portfolio = multi_account_holdings["portfolio"]
+    portfolio.allocation_strategy = policy
+    portfolio.save()
+    AccountTypeStrategyAssignment.objects.create(
+        user=user, account_type=system.type_taxable, allocation_strategy=all_bonds
+    )
+
+    other = test_user_with_name("other")
+    other_account = Account.objects.create(
+        user=other,
+        name="Other Roth",
+        portfolio=Portfolio.objects.create(user=other, name="Other"),
+        account_type=system.type_roth,
+        institution=system.institution,
+    )
+    Holding.objects.create(account=other_account, security=system.vti, shares=Decimal("3"))
+
+    empty = test_user_with_name("empty")
+    Portfolio.objects.create(user=empty, name="Empty")
+
+    return [user, other, empty]
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestBatchPresentationRows:
+    def test_matches_per_user_engine(self, several_users: list[Any]) -> None:
+        rows = BatchAllocationEngine().get_presentation_rows([u.id for u in several_users])
+
+        for user in several_users:
+            assert rows[user.id] == AllocationEngine(use_snapshots=False).get_presentation_rows(
+                user
+            )
+        assert rows[several_users[0].id]
+        assert rows[several_users[2].id] == []
+
+    def test_query_count_independent_of_user_count(self, several_users: list[Any]) -> None:
+        engine = BatchAllocationEngine()
+        engine.get_presentation_rows([several_users[0].id])  # warm the reference data cache
+
+        with CaptureQueriesContext(connection) as one:
+            engine.get_presentation_rows([several_users[0].id])
+        with CaptureQueriesContext(connection) as all_users:
+            engine.get_presentation_rows([u.id for u in several_users])
+
+        assert len(all_users.captured_queries) == len(one.captured_queries)
+
+    def test_shards_give_same_result(self, several_users: list[Any]) -> None:
+        user_ids = [u.id for u in several_users]
+        engine = BatchAllocationEngine()
+
+        assert engine.get_presentation_rows(user_ids, shard_size=1) == (
+            engine.get_presentation_rows(user_ids)
+        )
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestBatchSnapshotRows:
+    @staticmethod
+    def _stored() -> set[tuple[Any, ...]]:
+        return set(
+            PortfolioSnapshot.objects.values_list(
+                "user_id",
+                "account_id",
+                "asset_class_id",
+                "held",
+                "actual_value",
+                "target_pct",
+                "variance",
+                "account_total",
+                "variance_pct",
+            )
+        )
+
+    def test_rows_carry_user_id(self, several_users: list[Any]) -> None:
+        user, other, _ = several_users
+
+        class_rows, account_rows = BatchAllocationEngine().get_snapshot_rows(
+            [u.id for u in several_users]
+        )
+
+        owners = dict(Account.objects.values_list("id", "user_id"))
+        assert set(account_rows["user_id"]) == {user.id, other.id}
+        assert (account_rows["account_id"].map(owners) == account_rows["user_id"]).all()
+        assert (class_rows["account_id"].map(owners) == class_rows["user_id"]).all()
+
+    def test_rebuild_users_matches_per_account_rebuild(self, several_users: list[Any]) -> None:
+        for user in several_users:
+            rebuild_user(user)
+        per_account = self._stored()
+
+        written = rebuild_users([u.id for u in several_users])
+
+        assert written == len(per_account)
+        assert self._stored() == per_account
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db(transaction=True)
+class TestBatchExecutor:
+    def test_executor_shards_match_inline(self, several_users: list[Any]) -> None:
+        user_ids = [u.id for u in several_users]
+        engine = BatchAllocationEngine()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            pooled = engine.get_presentation_rows(user_ids, executor=executor, shard_size=1)
+
+        assert pooled == engine.get_presentation_rows(user_ids)
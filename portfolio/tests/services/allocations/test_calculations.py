@@ -184,6 +184,22 @@ class TestPresentationCalculations:
         type_columns = [col for col in result.columns if col.endswith("_actual")]
         assert len(type_columns) > 0
 
+    def test_aggregate_actuals_skips_unheld_categories(self, calculator, presentation_data):
+        """Categorical account types only produce columns for the types held."""
+        holdings_df = presentation_data["holdings_df"]
+        held = set(holdings_df["account_type_code"].unique())
+        assert len(holdings_df["account_type_code"].cat.categories) > len(held)
+
+        result = calculator._aggregate_actuals_by_level(
+            presentation_data["asset_classes_df"].copy(),
+            holdings_df,
+            level="account_type",
+            level_column="account_type_code",
+        )
+
+        type_columns = {c.removesuffix("_actual") for c in result.columns if c.endswith("_actual")}
+        assert type_columns == held
+
     def test_calculate_variances(self, calculator, presentation_data):
         """Test variance calculations."""
         from decimal import Decimal
@@ -313,6 +329,27 @@ class TestPresentationCalculations:
         assert result.iloc[0]["Target_Value"] == 600.0
         assert result.iloc[0]["Value_Variance"] == 400.0
 
+    def test_calculate_holdings_with_targets_categorical(self, calculator):
+        """Categorical asset classes join targets, ignoring targets outside the categories."""
+        df = pd.DataFrame(
+            {
+                "Account_ID": [1, 1],
+                "Ticker": ["VTI", "BND"],
+                "Asset_Class": pd.Categorical(["US Equities", "Bonds"]),
+                "Value": [1000.0, 0.0],
+                "Shares": [10.0, 0.0],
+                "Price": [100.0, 50.0],
+                "Group_Sort_Order": [1, 2],
+                "Category_Sort_Order": [1, 1],
+            }
+        )
+
+        result = calculator.calculate_holdings_with_targets(
+            df, {1: {"US Equities": 60.0, "Bonds": 40.0, "Cash": 0.0}}
+        )
+
+        assert result["Target_Value"].tolist() == [600.0, 400.0]
+
     def test_aggregate_holdings_by_ticker(self, calculator):
         """Test aggregation across accounts."""
         df = pd.DataFrame(
@@ -340,3 +377,50 @@ class TestPresentationCalculations:
         assert result.iloc[0]["Value"] == 1500.0
         assert result.iloc[0]["Shares"] == 15.0
         assert result.iloc[0]["Account_ID"] == 0
+
+    def test_calculate_ticker_account_breakdown(self, calculator):
+        """Test per-account breakdown of a single ticker's position."""
+        df = pd.DataFrame(
+            [
+                {
+                    "account_id": 1,
+                    "account_name": "Roth",
+                    "account_type_id": 2,
+                    "account_type_label": "Roth IRA",
+                    "ticker": "VTI",
+                    "shares": 10.0,
+                    "value": 1000.0,
+                },
+                {
+                    "account_id": 1,
+                    "account_name": "Roth",
+                    "account_type_id": 2,
+                    "account_type_label": "Roth IRA",
+                    "ticker": "BND",
+                    "shares": 10.0,
+                    "value": 3000.0,
+                },
+                {
+                    "account_id": 2,
+                    "account_name": "Taxable",
+                    "account_type_id": 1,
+                    "account_type_label": "Taxable",
+                    "ticker": "VTI",
+                    "shares": 30.0,
+                    "value": 3000.0,
+                },
+            ]
+        )
+
+        result = calculator.calculate_ticker_account_breakdown(df, "VTI")
+
+        assert result["account_name"].tolist() == ["Taxable", "Roth"]
+        assert result["pct_of_account"].tolist() == [100.0, 25.0]
+        assert result["pct_of_position"].tolist() == [75.0, 25.0]
+
+    def test_calculate_ticker_account_breakdown_empty(self, calculator):
+        """Empty positions produce an empty breakdown with the expected columns."""
+        result = calculator.calculate_ticker_account_breakdown(pd.DataFrame(), "VTI")
+
+        assert result.empty
+        assert "pct_of_position" in result.columns
@@ -1,9 +1,18 @@
 """Tests for data providers."""
 
+import numpy as np
 import pandas as pd
 import pytest
 
-from portfolio.services.allocations.data_providers import DjangoDataProvider
+from portfolio.models import Holding, Security, SecurityPrice
+from portfolio.services.allocations.data_providers import (
+    DETAILED_LABEL_COLUMNS,
+    HOLDINGS_LABEL_COLUMNS,
+    DjangoDataProvider,
+    categorize_labels,
+)
+from portfolio.services.allocations.snapshot import HoldingsSnapshot
+from portfolio.services.reference_data import get_reference_data
 
 
 @pytest.mark.services
@@ -35,6 +44,50 @@ class TestDjangoDataProvider:
         assert list(df.columns) == expected_cols
         assert len(df) > 0
 
+    def test_get_holdings_df_label_columns_are_categorical(
+        self, provider, test_user, simple_holdings
+    ):
+        """Label columns are categoricals, with reference data categories where stable."""
+        df = provider.get_holdings_df(test_user)
+
+        for column in HOLDINGS_LABEL_COLUMNS:
+            assert isinstance(df[column].dtype, pd.CategoricalDtype), column
+        dtypes = get_reference_data().label_dtypes
+        assert df["asset_class"].dtype == dtypes["asset_class"]
+        assert df["account_type_code"].dtype == dtypes["account_type_code"]
+        assert list(df["ticker"].cat.categories) == sorted(df["ticker"].unique())
+
+    def test_get_holdings_snapshot_matches_frame(self, provider, test_user, multi_account_holdings):
+        """The snapshot holds the same rows as get_holdings_df(), keyed by security id."""
+        roth = multi_account_holdings["roth_account"]
+        # A holding without any price keeps a NaN value, as in the frame
+        unpriced = Security.objects.exclude(id__in=SecurityPrice.objects.values("security_id"))
+        Holding.objects.create(account=roth, security=unpriced.first(), shares=1)
+
+        snapshot = provider.get_holdings_snapshot(test_user)
+        expected = HoldingsSnapshot.from_dataframe(provider.get_holdings_df(test_user))
+
+        assert len(snapshot) == len(expected) == 3
+        assert set(snapshot.row_security_ids) == set(
+            Holding.objects.filter(account__user=test_user).values_list("security_id", flat=True)
+        )
+        np.testing.assert_array_equal(snapshot.values, expected.values)
+        assert snapshot.tickers == expected.tickers
+        assert snapshot.account_totals().equals(expected.account_totals())
+
+    def test_get_holdings_snapshot_empty(self, provider, test_user):
+        assert provider.get_holdings_snapshot(test_user).is_empty
+
+    def test_categorize_labels_keeps_unknown_labels(self, base_system_data):
+        """A label missing from (stale) reference data is kept, not turned into NaN."""
+        df = pd.DataFrame({"asset_class": ["US Equities", "Not Yet Loaded", None]})
+
+        categorize_labels(df, {"asset_class": "asset_class"})
+
+        assert isinstance(df["asset_class"].dtype, pd.CategoricalDtype)
+        assert df["asset_class"].tolist()[:2] == ["US Equities", "Not Yet Loaded"]
+        assert df["asset_class"].isna().tolist() == [False, False, True]
+
     def test_get_holdings_df_empty(self, provider, test_user):
         """Verify empty DataFrame for user with no holdings."""
         df = provider.get_holdings_df(test_user)
@@ -102,6 +155,8 @@ class TestDjangoDataProvider:
         assert "Account_Name" in df.columns
         assert "Value" in df.columns
         assert len(df) > 0
+        for column in DETAILED_LABEL_COLUMNS:
+            assert isinstance(df[column].dtype, pd.CategoricalDtype), column
 
     def test_get_holdings_df_detailed_with_account_id(
         self, provider, test_user, simple_holdings, roth_account
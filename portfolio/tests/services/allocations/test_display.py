@@ -0,0 +1,40 @@
+"""Tests for column-at-a-time display formatting."""
+
+import math
+
+import pytest
+
+from portfolio.services.allocations.display import (
+    format_money,
+    format_number,
+    format_percent,
+    variance_css_classes,
+)
+from portfolio.templatetags.allocation_tags import variance_css_class
+from portfolio.templatetags.portfolio_filters import money, number, percent
+
+VALUES = [0.0, -0.0, 0.4, -0.4, 0.5, -0.5, 1234.5678, -1234.5678, 1e9, -2.5e-7, math.nan]
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestDisplayFormatting:
+    """Each column formatter matches its template filter value for value."""
+
+    @pytest.mark.parametrize("decimals", [0, 1, 2, 4])
+    def test_matches_filters(self, decimals: int) -> None:
+        assert format_money(VALUES, decimals) == [money(v, decimals) for v in VALUES]
+        assert format_percent(VALUES, decimals) == [percent(v, decimals) for v in VALUES]
+        assert format_number(VALUES, decimals) == [number(v, decimals) for v in VALUES]
+
+    def test_default_decimals(self) -> None:
+        assert format_money([-1234.56]) == ["($1,235)"]
+        assert format_percent([12.345]) == ["12.3%"]
+        assert format_number([1234.56]) == ["1,235"]
+
+    def test_variance_css_classes(self) -> None:
+        assert variance_css_classes(VALUES) == [variance_css_class(v) for v in VALUES]
+
+    def test_empty(self) -> None:
+        assert format_money([]) == []
+        assert variance_css_classes([]) == []
@@ -130,7 +130,7 @@ class TestAllocationEngineIntegration:
         from unittest.mock import Mock
 
         mock_provider = Mock()
-        mock_provider.get_holdings_df.side_effect = Exception("DB Error")
+        mock_provider.get_holdings_snapshot.side_effect = Exception("DB Error")
 
         engine = AllocationEngine(data_provider=mock_provider)
         result = engine.get_sidebar_data(test_user)
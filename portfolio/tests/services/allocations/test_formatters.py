@@ -1,5 +1,8 @@
 """Tests for allocation formatters."""
 
+import math
+from decimal import Decimal
+
 import pandas as pd
 import pytest
 
@@ -128,3 +131,224 @@ class TestAllocationFormatter:
         # Check holdings (hierarchy_level == 999)
         holdings = [r for r in rows if r["hierarchy_level"] == 999]
         assert len(holdings) == 2
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestColumnarFormatting:
+    """The columnar row builders keep the per-row semantics of ``row.get``."""
+
+    @pytest.fixture
+    def formatter(self):
+        return AllocationFormatter()
+
+    @pytest.fixture
+    def accounts_by_type(self):
+        return {
+            1: [
+                {"id": 10, "name": "Roth 1", "type_code": "ROTH", "type_label": "Roth IRA"},
+                {"id": 11, "name": "Roth 2", "type_code": "ROTH", "type_label": "Roth IRA"},
+            ],
+            2: [],
+        }
+
+    def test_presentation_rows_values_and_key_order(self, formatter, accounts_by_type):
+        df = pd.DataFrame(
+            {
+                "asset_class_name": ["US Equities", "Bonds"],
+                "asset_class_id": [1, 2],
+                "is_cash": [False, False],
+                "hierarchy_level": [999, 999],
+                "portfolio_actual": [600.0, 400.0],
+                "ROTH_actual": [600.0, 400.0],
+                "ROTH_variance": [-5.0, 5.0],
+                "account_10_actual": [100.0, 0.0],
+                "account_10_policy_pct": [50.0, 50.0],
+                "account_11_target": [Decimal("250.5"), Decimal("0")],
+            }
+        )
+
+        rows = formatter.to_presentation_rows(
+            df,
+            accounts_by_type,
+            {"at_strategy_map": {1: 7}, "acc_strategy_map": {11: 8}},
+        )
+
+        row = rows[1]
+        assert row["asset_class_id"] == 2
+        assert row["group_code"] == ""
+        assert row["portfolio"]["actual"] == 400.0
+        assert row["portfolio"]["effective"] == 0.0
+        assert list(row["portfolio"]) == [
+            "actual",
+            "actual_pct",
+            "effective",
+            "effective_pct",
+            "explicit_target",
+            "explicit_target_pct",
+            "effective_variance",
+            "effective_variance_pct",
+            "policy_variance",
+            "policy_variance_pct",
+        ]
+
+        # Account types without accounts are skipped
+        assert len(row["account_types"]) == 1
+        roth = row["account_types"][0]
+        assert (roth["id"], roth["code"], roth["label"]) == (1, "ROTH", "Roth IRA")
+        assert roth["policy_variance"] == roth["effective_variance"] == 5.0
+        assert roth["active_strategy_id"] == 7
+        assert roth["active_accounts"] is roth["accounts"]
+        assert [a["name"] for a in roth["accounts"]] == ["Roth 1", "Roth 2"]
+        assert rows[0]["account_types"][0]["accounts"][0]["policy_pct"] == 50.0
+        assert list(roth)[-3:] == ["active_strategy_id", "active_accounts", "accounts"]
+
+        assert [a["id"] for a in row["accounts"]] == [10, 11]
+        assert rows[0]["accounts"][1] == {
+            "id": 11,
+            "name": "Roth 2",
+            "type_code": "ROTH",
+            "actual": 0.0,
+            "actual_pct": 0.0,
+            "target": 250.5,
+            "target_pct": 0.0,
+            "variance": 0.0,
+            "variance_pct": 0.0,
+            "allocation_strategy_id": 8,
+        }
+        assert type(rows[0]["accounts"][1]["target"]) is float
+
+    def test_presentation_rows_rows_do_not_share_dicts(self, formatter, accounts_by_type):
+        df = pd.DataFrame({"asset_class_name": ["A", "B"], "asset_class_id": [1, 2]})
+
+        rows = formatter.to_presentation_rows(df, accounts_by_type)
+
+        assert rows[0]["accounts"][0] is not rows[1]["accounts"][0]
+        rows[0]["portfolio"]["actual"] = 1.0
+        assert rows[1]["portfolio"]["actual"] == 0.0
+
+    def test_nan_passes_through(self, formatter):
+        df = pd.DataFrame({"ticker": ["VTI"], "value": [float("nan")]})
+
+        rows = formatter.to_holdings_rows(df)
+
+        assert math.isnan(rows[0]["value"])
+        assert rows[0]["shares"] == 0.0
+
+    def test_holding_dicts(self, formatter):
+        df = pd.DataFrame(
+            {
+                "Ticker": ["VTI", "BND"],
+                "Asset_Class": ["US Equities", "Bonds"],
+                "Category_Code": ["USEQ", "FI"],
+                "Account_ID": [3, 4],
+                "Shares": [0.0, 2.0],
+                "Value": [0.0, 150.0],
+                "holding_id": [None, 9],
+            }
+        )
+
+        rows = formatter._holdings_to_dicts(df)
+
+        assert rows[0]["name"] == "VTI"  # No Security_Name column
+        assert rows[0]["security_name"] == ""
+        assert rows[0]["is_zero_holding"] is True
+        assert rows[1]["is_zero_holding"] is False
+        assert rows[1]["account_id"] == 4
+        assert rows[1]["parent_id"] == "cat-FI"
+        assert rows[1]["row_id"] == "holding-BND"
+        assert rows[1]["value"] == 150.0
+
+    def test_aggregation_dicts_skip_unknown_levels(self, formatter):
+        df = pd.DataFrame(
+            {
+                "hierarchy_level": [1, 0, 999, -1],
+                "Asset_Category": ["US Large Cap", None, None, None],
+                "Asset_Group": [None, "Equities", None, None],
+                "Category_Code": ["USEQ", None, None, None],
+                "Group_Code": ["EQ", "EQ", None, None],
+                "Value": [10.0, 10.0, 10.0, 10.0],
+            }
+        )
+
+        rows = formatter._aggregation_df_to_dicts(df)
+
+        assert [r["row_id"] for r in rows] == ["cat-USEQ", "grp-EQ", "grand-total"]
+        assert rows[0]["name"] == "US Large Cap Total"
+        assert rows[0]["parent_id"] == "grp-EQ"
+        assert rows[2]["name"] == "Grand Total"
+        assert all(r["value"] == 10.0 and r["allocation"] == 0.0 for r in rows)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestDisplayStrings:
+    """``display=True`` adds pre-formatted strings matching the template filters."""
+
+    @pytest.fixture
+    def formatter(self):
+        return AllocationFormatter()
+
+    def test_presentation_rows(self, formatter):
+        df = pd.DataFrame(
+            {
+                "asset_class_name": ["US Equities"],
+                "asset_class_id": [1],
+                "portfolio_actual": [-1234.5],
+                "portfolio_actual_pct": [12.34],
+                "portfolio_variance": [-5.0],
+                "portfolio_variance_pct": [2.5],
+                "ROTH_actual": [600.0],
+            }
+        )
+        accounts_by_type = {1: [{"id": 10, "name": "Roth", "type_code": "ROTH"}]}
+
+        plain = formatter.to_presentation_rows(df, accounts_by_type)
+        rows = formatter.to_presentation_rows(df, accounts_by_type, display=True)
+
+        portfolio = rows[0]["portfolio"].pop("display")
+        assert portfolio["actual"] == "($1,234)"
+        assert portfolio["actual_pct"] == "12.3%"
+        assert portfolio["effective_variance"] == "($5)"
+        assert portfolio["effective_variance_css"] == "variance-negative"
+        assert portfolio["effective_variance_pct_css"] == "variance-positive"
+        assert portfolio["policy_variance_css"] == ""
+        assert rows[0]["account_types"][0].pop("display")["actual"] == "$600"
+        assert "display" not in plain[0]["portfolio"]
+        assert rows == plain
+
+    def test_holdings_rows(self, formatter):
+        df = pd.DataFrame(
+            {
+                "Ticker": ["VTI"],
+                "Asset_Class": ["US Equities"],
+                "Category_Code": ["USEQ"],
+                "Shares": [1.23456],
+                "Price": [99.999],
+                "Value": [123.456],
+                "Allocation_Pct": [-0.25],
+            }
+        )
+
+        (row,) = formatter._holdings_to_dicts(df, display=True)
+
+        assert row["display"] == {
+            "shares": "1.2346",
+            "price": "$100.00",
+            "value": "$123",
+            "allocation": "(0.2%)",
+        }
+        assert "display" not in formatter._holdings_to_dicts(df)[0]
+
+    def test_aggregation_rows(self, formatter):
+        df = pd.DataFrame(
+            {
+                "hierarchy_level": [5, -1],
+                "Value": [10.0, 1500.0],
+                "Allocation": [0.0, 100.0],
+            }
+        )
+
+        rows = formatter._aggregation_df_to_dicts(df, display=True)
+
+        assert [r["display"] for r in rows] == [{"value": "$1,500", "allocation": "100.0%"}]
@@ -0,0 +1,300 @@
+"""Tests for patching the presentation frame on single-holding changes."""
+
+from decimal import Decimal
+from typing import Any
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+
+import pandas as pd
+import pytest
+
+from portfolio.models import (
+    AccountTypeStrategyAssignment,
+    AllocationStrategy,
+    Holding,
+    SecurityPrice,
+)
+from portfolio.services.allocations import AllocationEngine, HoldingDelta
+from portfolio.services.allocations.calculations import AllocationCalculator
+from portfolio.services.allocations.engine import presentation_frame_key
+from portfolio.services.versioning import get_portfolio_version
+
+
+@pytest.fixture
+def strategy_portfolio(multi_account_holdings: dict[str, Any]) -> dict[str, Any]:
+    """
+    Roth $600 VTI / taxable $400 BND plus $200 VXUS in the Roth.
+
+    The portfolio follows 60/20/20 US/intl/bonds; taxable accounts are
+    assigned all-bonds, so both effective and policy targets are weighted.
+    """
+    system = multi_account_holdings["system"]
+    user = multi_account_holdings["user"]
+    SecurityPrice.objects.update_or_create(
+        security=system.vxus,
+        defaults={"price": Decimal("50"), "price_datetime": timezone.now(), "source": "manual"},
+    )
+    Holding.objects.create(
+        account=multi_account_holdings["roth_account"], security=system.vxus, shares=Decimal("4")
+    )
+
+    policy = AllocationStrategy.objects.create(user=user, name="60/20/20")
+    policy.save_allocations(
+        {
+            system.asset_class_us_equities.id: Decimal("60"),
+            system.vxus.asset_class_id: Decimal("20"),
+            system.bnd.asset_class_id: Decimal("20"),
+        }
+    )
+    all_bonds = AllocationStrategy.objects.create(user=user, name="All Bonds")
+    all_bonds.save_allocations({system.bnd.asset_class_id: Decimal("100")})
+    portfolio = multi_account_holdings["portfolio"]
+    portfolio.allocation_strategy = policy
+    portfolio.save()
+    AccountTypeStrategyAssignment.objects.create(
+        user=user, account_type=system.type_taxable, allocation_strategy=all_bonds
+    )
+    return multi_account_holdings
+
+
+def _frame(user: Any) -> pd.DataFrame:
+    presentation_df, _ = AllocationEngine(cache_frames=False)._calculate_presentation_df(user)
+    return presentation_df
+
+
+def _assert_same_frame(patched: pd.DataFrame, rebuilt: pd.DataFrame) -> None:
+    assert list(patched["asset_class_name"]) == list(rebuilt["asset_class_name"])
+    pd.testing.assert_frame_equal(
+        patched[rebuilt.columns], rebuilt, check_dtype=False, check_exact=False
+    )
+
+
+def _holding_delta(holding: Holding, shares: Decimal) -> HoldingDelta:
+    price = SecurityPrice.get_latest_prices_bulk([holding.security])[holding.security_id]
+    return HoldingDelta(
+        account_id=holding.account_id,
+        account_type_code=holding.account.account_type.code,
+        asset_class_id=holding.security.asset_class_id,
+        value=float(shares * price),
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.calculations
+@pytest.mark.django_db
+class TestApplyHoldingDelta:
+    @pytest.mark.parametrize(
+        ("holding_key", "shares"),
+        [("roth_holding", Decimal("9")), ("roth_holding", Decimal("1")), ("taxable_holding", 10)],
+    )
+    def test_matches_rebuild(
+        self, strategy_portfolio: dict[str, Any], holding_key: str, shares: Decimal
+    ) -> None:
+        user = strategy_portfolio["user"]
+        holding = strategy_portfolio[holding_key]
+        before = _frame(user)
+
+        delta = float((Decimal(shares) - holding.shares) * 100)
+        holding.shares = Decimal(shares)
+        holding.save()
+
+        patched = AllocationCalculator().apply_holding_delta(
+            before,
+            account_id=holding.account_id,
+            account_type_code=holding.account.account_type.code,
+            asset_class_id=holding.security.asset_class_id,
+            delta=delta,
+        )
+
+        assert patched is not None
+        _assert_same_frame(patched, _frame(user))
+
+    def test_new_asset_class_in_account(self, strategy_portfolio: dict[str, Any]) -> None:
+        user = strategy_portfolio["user"]
+        system = strategy_portfolio["system"]
+        taxable = strategy_portfolio["taxable_account"]
+        before = _frame(user)
+
+        Holding.objects.create(account=taxable, security=system.vxus, shares=Decimal("30"))
+
+        patched = AllocationCalculator().apply_holding_delta(
+            before,
+            account_id=taxable.id,
+            account_type_code=taxable.account_type.code,
+            asset_class_id=system.vxus.asset_class_id,
+            delta=1500.0,
+        )
+
+        # VXUS now outweighs VTI in the effective targets, so rows re-sort
+        assert patched is not None
+        _assert_same_frame(patched, _frame(user))
+
+    def test_unknown_account_needs_rebuild(self, strategy_portfolio: dict[str, Any]) -> None:
+        system = strategy_portfolio["system"]
+        roth = strategy_portfolio["roth_account"]
+
+        patched = AllocationCalculator().apply_holding_delta(
+            _frame(strategy_portfolio["user"]),
+            account_id=roth.id + 1000,
+            account_type_code=roth.account_type.code,
+            asset_class_id=system.vti.asset_class_id,
+            delta=100.0,
+        )
+
+        assert patched is None
+
+    def test_emptied_account_needs_rebuild(self, strategy_portfolio: dict[str, Any]) -> None:
+        taxable = strategy_portfolio["taxable_account"]
+
+        patched = AllocationCalculator().apply_holding_delta(
+            _frame(strategy_portfolio["user"]),
+            account_id=taxable.id,
+            account_type_code=taxable.account_type.code,
+            asset_class_id=strategy_portfolio["system"].bnd.asset_class_id,
+            delta=-400.0,
+        )
+
+        assert patched is None
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestPresentationFrameCache:
+    @pytest.fixture(autouse=True)
+    def enable_frame_cache(self, settings: Any) -> Any:
+        settings.PRESENTATION_FRAME_CACHE = True
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_frame_cached_per_version(self, strategy_portfolio: dict[str, Any]) -> None:
+        user = strategy_portfolio["user"]
+
+        rows = AllocationEngine().get_presentation_rows(user)
+
+        assert rows == AllocationEngine(cache_frames=False).get_presentation_rows(user)
+        assert cache.get(presentation_frame_key(get_portfolio_version(user).key)) is not None
+
+    def test_apply_without_cached_frame(self, strategy_portfolio: dict[str, Any]) -> None:
+        user = strategy_portfolio["user"]
+        roth = strategy_portfolio["roth_account"]
+
+        applied = AllocationEngine().apply_holding_changes(
+            user,
+            get_portfolio_version(user),
+            [HoldingDelta(roth.id, roth.account_type.code, 1, 100.0)],
+        )
+
+        assert not applied
+
+    def test_apply_after_own_write(
+        self, strategy_portfolio: dict[str, Any], django_capture_on_commit_callbacks: Any
+    ) -> None:
+        user = strategy_portfolio["user"]
+        holding = strategy_portfolio["roth_holding"]
+        AllocationEngine().get_presentation_rows(user)
+
+        before = get_portfolio_version(user)
+        holding.shares += 2
+        holding.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            applied = AllocationEngine().apply_holding_changes(
+                user, before, [_holding_delta(holding, Decimal("2"))]
+            )
+
+        assert applied
+        _assert_same_frame(
+            cache.get(presentation_frame_key(get_portfolio_version(user).key)), _frame(user)
+        )
+
+    @pytest.mark.parametrize("interleaved", ["holding_edit", "price_insert"])
+    def test_interleaved_change_skips_patch(
+        self,
+        strategy_portfolio: dict[str, Any],
+        django_capture_on_commit_callbacks: Any,
+        interleaved: str,
+    ) -> None:
+        """A change committed between the version read and the write is not lost."""
+        user = strategy_portfolio["user"]
+        system = strategy_portfolio["system"]
+        holding = strategy_portfolio["roth_holding"]
+        AllocationEngine().get_presentation_rows(user)
+
+        # Request A reads the version it will patch from ...
+        before = get_portfolio_version(user)
+        # ... request B commits its own change ...
+        if interleaved == "holding_edit":
+            other = strategy_portfolio["taxable_holding"]
+            other.shares += 5
+            other.save()
+        else:
+            SecurityPrice.objects.create(
+                security=system.bnd,
+                price=Decimal("90"),
+                price_datetime=timezone.now(),
+                source="manual",
+            )
+        # ... then request A writes and patches
+        holding.shares += 2
+        holding.save()
+        with django_capture_on_commit_callbacks(execute=True):
+            applied = AllocationEngine().apply_holding_changes(
+                user, before, [_holding_delta(holding, Decimal("2"))]
+            )
+
+        assert not applied
+        assert cache.get(presentation_frame_key(get_portfolio_version(user).key)) is None
+        # The next read rebuilds with both changes
+        rows = AllocationEngine().get_presentation_rows(user)
+        assert rows == AllocationEngine(cache_frames=False).get_presentation_rows(user)
+
+    def test_bulk_update_view_patches_frame(
+        self,
+        client: Any,
+        strategy_portfolio: dict[str, Any],
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        user = strategy_portfolio["user"]
+        roth = strategy_portfolio["roth_account"]
+        holding = strategy_portfolio["roth_holding"]
+        AllocationEngine().get_presentation_rows(user)
+        client.force_login(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("portfolio:account_holdings", args=[roth.id]),
+                {
+                    "form_action": "bulk_update",
+                    "holding_ids": [holding.id],
+                    f"shares_{holding.id}": "12",
+                },
+            )
+
+        patched = cache.get(presentation_frame_key(get_portfolio_version(user).key))
+        assert patched is not None
+        _assert_same_frame(patched, _frame(user))
+
+    def test_delete_view_patches_frame(
+        self,
+        client: Any,
+        strategy_portfolio: dict[str, Any],
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        user = strategy_portfolio["user"]
+        roth = strategy_portfolio["roth_account"]
+        vxus_holding = Holding.objects.get(account=roth, security=strategy_portfolio["system"].vxus)
+        AllocationEngine().get_presentation_rows(user)
+        client.force_login(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("portfolio:account_holdings", args=[roth.id]),
+                {"delete_holding_id": vxus_holding.id},
+            )
+
+        patched = cache.get(presentation_frame_key(get_portfolio_version(user).key))
+        assert patched is not None
+        _assert_same_frame(patched, _frame(user))
@@ -0,0 +1,119 @@
+"""Tests for the tax-aware asset location optimizer."""
+
+import time
+from decimal import Decimal
+
+from django.utils import timezone
+
+import numpy as np
+import pytest
+
+from portfolio.models import AllocationStrategy, Holding, SecurityPrice
+from portfolio.services.allocations import AllocationEngine
+from portfolio.services.allocations.location import (
+    AssetLocationDataProvider,
+    AssetLocationOptimizer,
+    solve_asset_location,
+)
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestSolveAssetLocation:
+    def test_highest_return_goes_to_lowest_drag(self):
+        allocation = solve_asset_location(
+            account_totals=np.array([1000.0, 1000.0]),
+            class_weights=np.array([0.5, 0.5]),
+            expected_returns=np.array([0.08, 0.03]),
+            tax_drag=np.array([0.0, 0.25]),
+        )
+
+        np.testing.assert_allclose(allocation, [[1000, 0], [0, 1000]], atol=1e-3)
+
+    def test_respects_account_and_class_totals(self):
+        rng = np.random.default_rng(7)
+        totals = rng.uniform(1_000, 100_000, 6)
+        weights = rng.uniform(0, 1, 9)
+        weights /= weights.sum()
+
+        allocation = solve_asset_location(
+            totals, weights, rng.uniform(0.01, 0.1, 9), rng.choice([0.0, 0.15, 0.25], 6)
+        )
+
+        assert (allocation >= 0).all()
+        np.testing.assert_allclose(allocation.sum(axis=1), totals, rtol=1e-6)
+        np.testing.assert_allclose(allocation.sum(axis=0), weights * totals.sum(), rtol=1e-6)
+
+    @pytest.mark.performance
+    def test_twenty_accounts_by_twenty_five_classes_under_a_second(self):
+        rng = np.random.default_rng(0)
+        weights = rng.uniform(0, 1, 25)
+        weights /= weights.sum()
+        args = (
+            rng.uniform(1_000, 1_000_000, 20),
+            weights,
+            rng.uniform(0.01, 0.1, 25),
+            rng.choice([0.0, 0.15, 0.25], 20),
+        )
+        solve_asset_location(*args)  # warm up cvxpy's canonicalization caches
+
+        start = time.perf_counter()
+        solve_asset_location(*args)
+
+        assert time.perf_counter() - start < 1.0
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestAssetLocationOptimizer:
+    @pytest.fixture
+    def two_accounts(self, test_portfolio, roth_account, taxable_account):
+        """$1000 in a Roth and a taxable account; 50/50 equities/bonds policy."""
+        system = test_portfolio["system"]
+        bonds = system.bnd.asset_class
+        for security in (system.vti, system.bnd):
+            SecurityPrice.objects.create(
+                security=security,
+                price=Decimal("100"),
+                price_datetime=timezone.now(),
+                source="manual",
+            )
+        Holding.objects.create(account=roth_account, security=system.bnd, shares=Decimal("10"))
+        Holding.objects.create(account=taxable_account, security=system.vti, shares=Decimal("10"))
+
+        strategy = AllocationStrategy.objects.create(user=test_portfolio["user"], name="Policy")
+        strategy.save_allocations(
+            {system.asset_class_us_equities.id: Decimal("50"), bonds.id: Decimal("50")}
+        )
+        portfolio = test_portfolio["portfolio"]
+        portfolio.allocation_strategy = strategy
+        portfolio.save()
+
+        return {
+            **test_portfolio,
+            "roth": roth_account,
+            "taxable": taxable_account,
+            "bonds": bonds,
+        }
+
+    def test_places_growth_in_tax_free_account(self, two_accounts):
+        equities = two_accounts["system"].asset_class_us_equities.name
+        bonds = two_accounts["bonds"].name
+
+        targets = AssetLocationOptimizer().get_targets_map(two_accounts["user"])
+
+        assert targets[two_accounts["roth"].id] == {equities: Decimal("100.00")}
+        assert targets[two_accounts["taxable"].id] == {bonds: Decimal("100.00")}
+
+    def test_no_policy_targets_returns_empty_map(self, simple_holdings):
+        assert AssetLocationOptimizer().get_targets_map(simple_holdings["user"]) == {}
+
+    def test_data_provider_plugs_into_engine(self, two_accounts):
+        engine = AllocationEngine(data_provider=AssetLocationDataProvider())
+
+        targets = engine.data_provider.get_targets_map(two_accounts["user"])
+        rows = engine.get_presentation_rows(two_accounts["user"])
+
+        assert set(targets) == {two_accounts["roth"].id, two_accounts["taxable"].id}
+        assert rows
@@ -0,0 +1,148 @@
+"""Tests for the Polars calculator backend against the pandas calculator."""
+
+from decimal import Decimal
+from typing import Any
+
+from django.contrib.auth import get_user_model
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio.services.allocations.calculations import AllocationCalculator
+from portfolio.services.allocations.data_providers import DjangoDataProvider
+from portfolio.services.allocations.types import HierarchyLevel
+
+pytest.importorskip("polars")
+
+from portfolio.services.allocations.polars_calculations import (  # noqa: E402
+    PolarsAllocationCalculator,
+)
+
+
+def presentation_inputs(provider: DjangoDataProvider, user: Any) -> dict[str, Any]:
+    """Keyword arguments of ``build_presentation_dataframe`` for a user."""
+    holdings_df = provider.get_holdings_df(user)
+    totals = holdings_df.groupby("account_id")["value"].sum()
+    return {
+        "holdings_df": holdings_df,
+        "asset_classes_df": provider.get_asset_classes_df(user),
+        "targets_map": provider.get_targets_map(user),
+        "account_totals": {k: Decimal(str(v)) for k, v in totals.items()},
+        "policy_targets": provider.get_policy_targets(user),
+    }
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestPolarsAllocationCalculator:
+    @pytest.fixture
+    def presentation_data(self, test_user: Any, simple_holdings: Any) -> dict[str, Any]:
+        provider = DjangoDataProvider()
+        return {
+            "holdings_df": provider.get_holdings_df(test_user),
+            "asset_classes_df": provider.get_asset_classes_df(test_user),
+        }
+
+    @pytest.fixture
+    def holdings_with_targets(self) -> pd.DataFrame:
+        """Holdings with targets; one row lacks a sort order, one lacks a category."""
+        return pd.DataFrame(
+            {
+                "Asset_Group": pd.Categorical(["Equities", "Equities", "Equities", "Bonds"]),
+                "Group_Code": pd.Categorical(["EQ", "EQ", "EQ", "FI"]),
+                "Group_Sort_Order": [1, 1, 1, 2],
+                "Asset_Category": pd.Categorical(["US", "US", None, "Treasuries"]),
+                "Category_Code": pd.Categorical(["US", "US", "INTL", "TSY"]),
+                "Category_Sort_Order": [np.nan, 1.0, 2.0, 3.0],
+                "Value": [1000.0, 500.0, 250.0, np.nan],
+                "Target_Value": [900.0, 600.0, 0.0, 250.0],
+                "Value_Variance": [100.0, -100.0, 250.0, -250.0],
+                "Shares": [10.0, 5.0, 2.0, 0.0],
+            }
+        )
+
+    @pytest.mark.parametrize(
+        ("level", "level_column"),
+        [("portfolio", None), ("account_type", "account_type_code"), ("account", "account_id")],
+    )
+    def test_aggregate_actuals_by_level_matches_pandas(
+        self, presentation_data: dict[str, Any], level: str, level_column: str | None
+    ) -> None:
+        args = (presentation_data["asset_classes_df"], presentation_data["holdings_df"], level)
+
+        result = PolarsAllocationCalculator()._aggregate_actuals_by_level(
+            *args, level_column=level_column
+        )
+
+        expected = AllocationCalculator()._aggregate_actuals_by_level(
+            *args, level_column=level_column
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_aggregate_actuals_zero_value_account(self) -> None:
+        """An account with no value gets 0% rather than NaN, as in pandas."""
+        asset_classes_df = pd.DataFrame({"asset_class_id": [1, 2], "asset_class_name": ["A", "B"]})
+        holdings_df = pd.DataFrame(
+            {"account_id": [1, 1, 2], "asset_class_id": [1, 2, 1], "value": [300.0, 100.0, 0.0]}
+        )
+
+        result = PolarsAllocationCalculator()._aggregate_actuals_by_level(
+            asset_classes_df, holdings_df, level="account", level_column="account_id"
+        )
+
+        assert result["account_1_actual_pct"].tolist() == [75.0, 25.0]
+        assert result["account_2_actual_pct"].tolist() == [0.0, 0.0]
+        expected = AllocationCalculator()._aggregate_actuals_by_level(
+            asset_classes_df, holdings_df, level="account", level_column="account_id"
+        )
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_holdings_aggregations_match_pandas(self, holdings_with_targets: pd.DataFrame) -> None:
+        result = PolarsAllocationCalculator().calculate_holdings_aggregations(holdings_with_targets)
+
+        expected = AllocationCalculator().calculate_holdings_aggregations(holdings_with_targets)
+        assert result.keys() == expected.keys()
+        for level, frame in expected.items():
+            pd.testing.assert_frame_equal(result[level], frame)
+
+    def test_category_subtotals(self, holdings_with_targets: pd.DataFrame) -> None:
+        """Rows without a category are dropped; sort order is the first non-null."""
+        subtotals = PolarsAllocationCalculator().calculate_holdings_aggregations(
+            holdings_with_targets
+        )["subtotals"]
+
+        assert subtotals["Asset_Category"].tolist() == ["Treasuries", "US"]
+        assert subtotals["Value"].tolist() == [0.0, 1500.0]
+        assert subtotals["Category_Sort_Order"].tolist() == [3.0, 1.0]
+        assert (subtotals["hierarchy_level"] == HierarchyLevel.CATEGORY_SUBTOTAL).all()
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestPolarsCalculatorParity:
+    def test_synthetic_portfolios_match_pandas(self, synthetic_portfolios: Any) -> None:
+        """Presentation and holdings frames agree with pandas on generated portfolios."""
+        run = synthetic_portfolios(
+            users=2, accounts_per_user=6, holdings_per_account=12, securities=30, price_years=0.02
+        )
+        provider = DjangoDataProvider()
+        pandas_calculator = AllocationCalculator()
+        polars_calculator = PolarsAllocationCalculator()
+
+        for user in get_user_model().objects.filter(id__in=run.user_ids):
+            inputs = presentation_inputs(provider, user)
+            pd.testing.assert_frame_equal(
+                polars_calculator.build_presentation_dataframe(**inputs),
+                pandas_calculator.build_presentation_dataframe(**inputs),
+                check_exact=False,
+            )
+
+            with_targets = pandas_calculator.calculate_holdings_with_targets(
+                provider.get_holdings_df_detailed(user), inputs["targets_map"]
+            )
+            result = polars_calculator.calculate_holdings_aggregations(with_targets)
+            expected = pandas_calculator.calculate_holdings_aggregations(with_targets)
+            for level, frame in expected.items():
+                pd.testing.assert_frame_equal(result[level], frame, check_exact=False)
@@ -0,0 +1,93 @@
+"""Tests for the array-backed HoldingsSnapshot."""
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio.services.allocations.calculations import AllocationCalculator
+from portfolio.services.allocations.data_providers import HOLDINGS_LABEL_COLUMNS
+from portfolio.services.allocations.snapshot import HoldingsSnapshot
+
+
+@pytest.fixture
+def holdings_df():
+    """Long-format holdings in the get_holdings_df() schema."""
+    return pd.DataFrame(
+        {
+            "account_id": [1, 1, 2, 2],
+            "account_name": ["Roth", "Roth", "Taxable", "Taxable"],
+            "account_type_code": ["ROTH_IRA", "ROTH_IRA", "TAXABLE", "TAXABLE"],
+            "asset_class": ["US Equities", "US Bonds", "US Equities", "US Equities"],
+            "asset_class_id": [10, 20, 10, 10],
+            "category_code": ["US_EQ", "BONDS", "US_EQ", "US_EQ"],
+            "ticker": ["VTI", "BND", "VTI", "VOO"],
+            "shares": [10.0, 20.0, 5.0, 2.0],
+            "price": [100.0, 50.0, 100.0, 200.0],
+            "value": [1000.0, 1000.0, 500.0, 400.0],
+        }
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestHoldingsSnapshot:
+    """Test HoldingsSnapshot construction and aggregations."""
+
+    def test_lookup_tables_store_each_entity_once(self, holdings_df):
+        snapshot = HoldingsSnapshot.from_dataframe(holdings_df)
+
+        assert len(snapshot) == 4
+        assert snapshot.account_ids.tolist() == [1, 2]
+        assert snapshot.asset_class_names == ("US Equities", "US Bonds")
+        assert snapshot.tickers == ("VTI", "BND", "VOO")
+        assert snapshot.account_codes.dtype == np.int32
+
+    def test_round_trips_to_dataframe(self, holdings_df):
+        snapshot = HoldingsSnapshot.from_dataframe(holdings_df)
+
+        # Label columns come back categorical, with sorted categories
+        expected = holdings_df.astype(dict.fromkeys(HOLDINGS_LABEL_COLUMNS, "category"))
+        pd.testing.assert_frame_equal(snapshot.to_dataframe(), expected, check_dtype=False)
+
+    def test_aggregations(self, holdings_df):
+        snapshot = HoldingsSnapshot.from_dataframe(holdings_df)
+
+        assert snapshot.account_totals().to_dict() == {1: 2000.0, 2: 900.0}
+        assert snapshot.asset_class_totals().tolist() == [1900.0, 1000.0]
+
+    def test_target_matrix(self, holdings_df):
+        snapshot = HoldingsSnapshot.from_dataframe(holdings_df)
+
+        matrix = snapshot.target_matrix({1: {"US Equities": 60, "US Bonds": 40}})
+
+        assert matrix.tolist() == [[60.0, 40.0], [0.0, 0.0]]
+
+    def test_empty(self):
+        snapshot = HoldingsSnapshot.from_dataframe(pd.DataFrame())
+
+        assert snapshot.is_empty
+        assert snapshot.to_dataframe().empty
+
+    def test_pickles_smaller_than_dataframe(self, holdings_df):
+        big_df = pd.concat([holdings_df] * 250, ignore_index=True)
+        snapshot = HoldingsSnapshot.from_dataframe(big_df)
+
+        restored = pickle.loads(pickle.dumps(snapshot))
+
+        assert restored.values.tolist() == snapshot.values.tolist()
+        assert len(pickle.dumps(snapshot)) < len(pickle.dumps(big_df))
+
+    def test_sidebar_metrics_match_dataframe_path(self, holdings_df):
+        calculator = AllocationCalculator()
+        targets_map = {1: {"US Equities": 60.0, "US Bonds": 40.0}, 2: {"US Equities": 100.0}}
+
+        from_df = calculator.calculate_sidebar_metrics(holdings_df, targets_map)
+        from_snapshot = calculator.calculate_sidebar_metrics(
+            HoldingsSnapshot.from_dataframe(holdings_df), targets_map
+        )
+
+        assert from_snapshot["account_totals"] == from_df["account_totals"]
+        assert from_snapshot["grand_total"] == from_df["grand_total"]
+        assert from_snapshot["account_variances"] == pytest.approx(from_df["account_variances"])
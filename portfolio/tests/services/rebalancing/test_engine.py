@@ -13,6 +13,7 @@ from portfolio.models import (
     TargetAllocation,
 )
 from portfolio.services.rebalancing import RebalancingEngine
+from portfolio.services.rebalancing.solver import get_solver_executor, shutdown_solver_executor
 
 
 @pytest.mark.integration
@@ -105,6 +106,25 @@ class TestRebalancingEngineIntegration:
         assert plan.generated_at is not None
         assert plan.method_used in ["optimization", "proportional"]
 
+    @pytest.mark.slow
+    def test_generate_plan_in_solver_pool(self, account_with_holdings_and_targets, settings):
+        """A solve in the shared (spawned) process pool gives the inline plan."""
+        account = account_with_holdings_and_targets["account"]
+        settings.REBALANCING_SOLVER_PROCESSES = 1
+
+        try:
+            pooled = RebalancingEngine(
+                account, solver_executor=get_solver_executor()
+            ).generate_plan()
+        finally:
+            shutdown_solver_executor()
+        inline = RebalancingEngine(account).generate_plan()
+
+        assert pooled.method_used == inline.method_used
+        assert [(o.security, o.action, o.shares) for o in pooled.orders] == [
+            (o.security, o.action, o.shares) for o in inline.orders
+        ]
+
     def test_generate_plan_produces_orders(self, account_with_holdings_and_targets):
         """Test that plan produces rebalancing orders."""
         account = account_with_holdings_and_targets["account"]
@@ -0,0 +1,316 @@
+"""Tests for the rebalancing job queue and its worker command."""
+
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.utils import timezone
+
+import pytest
+
+from portfolio.models import (
+    AllocationStrategy,
+    Holding,
+    Portfolio,
+    RebalancingJob,
+    RebalancingRecommendation,
+    SecurityPrice,
+    TargetAllocation,
+)
+from portfolio.services.rebalancing.jobs import (
+    MAX_ATTEMPTS,
+    claim_next_job,
+    current_data_version,
+    enqueue_plan,
+    get_saved_plan,
+    plan_from_job,
+    prune_finished_jobs,
+    requeue_stale_jobs,
+    run_job,
+)
+
+
+@pytest.fixture
+def queued_account(simple_holdings):
+    """Roth account holding VTI with a 60/40 US equities/bonds target."""
+    system = simple_holdings["system"]
+    account = simple_holdings["account"]
+    strategy = AllocationStrategy.objects.create(user=simple_holdings["user"], name="Job Strategy")
+    TargetAllocation.objects.create(
+        strategy=strategy,
+        asset_class=system.asset_class_us_equities,
+        target_percent=Decimal("60.00"),
+    )
+    account.allocation_strategy = strategy
+    account.save()
+    return account
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestEnqueuePlan:
+    def test_reuses_job_for_current_data(self, queued_account):
+        first = enqueue_plan(queued_account)
+        second = enqueue_plan(queued_account)
+
+        assert first == second
+        assert first.status == RebalancingJob.PENDING
+        assert RebalancingJob.objects.count() == 1
+
+    def test_new_job_after_data_changes(self, queued_account):
+        first = enqueue_plan(queued_account)
+        Portfolio.objects.filter(user=queued_account.user).bump_version()
+
+        second = enqueue_plan(queued_account)
+
+        assert second != first
+        assert second.data_version != first.data_version
+
+    def test_new_job_after_held_price_changes(self, queued_account, simple_holdings):
+        first = enqueue_plan(queued_account)
+        SecurityPrice.objects.create(
+            security=simple_holdings["system"].vti,
+            price=Decimal("101"),
+            price_datetime=timezone.now(),
+            source="manual",
+        )
+
+        assert enqueue_plan(queued_account) != first
+
+    def test_unheld_price_does_not_requeue(self, queued_account, simple_holdings):
+        first = enqueue_plan(queued_account)
+        SecurityPrice.objects.create(
+            security=simple_holdings["system"].bnd,
+            price=Decimal("70"),
+            price_datetime=timezone.now(),
+            source="manual",
+        )
+
+        assert current_data_version(queued_account) == first.data_version
+        assert enqueue_plan(queued_account) == first
+
+    def test_failed_job_replaced_only_on_retry(self, queued_account):
+        failed = enqueue_plan(queued_account)
+        failed.status = RebalancingJob.FAILED
+        failed.save()
+
+        assert enqueue_plan(queued_account) == failed
+        retried = enqueue_plan(queued_account, retry=True)
+
+        assert retried != failed
+        assert retried.status == RebalancingJob.PENDING
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestClaimAndRecover:
+    def test_claims_oldest_pending_job(self, queued_account):
+        job = enqueue_plan(queued_account)
+
+        claimed = claim_next_job()
+
+        assert claimed == job
+        assert claimed.status == RebalancingJob.RUNNING
+        assert claimed.attempts == 1
+        assert claimed.started_at is not None
+        assert claim_next_job() is None
+
+    def test_requeues_stale_running_jobs(self, queued_account):
+        job = enqueue_plan(queued_account)
+        claim_next_job()
+        RebalancingJob.objects.filter(id=job.id).update(
+            started_at=timezone.now() - timedelta(hours=1)
+        )
+
+        assert requeue_stale_jobs(timedelta(minutes=10)) == 1
+        job.refresh_from_db()
+        assert job.status == RebalancingJob.PENDING
+
+    def test_fails_stale_jobs_out_of_attempts(self, queued_account):
+        job = enqueue_plan(queued_account)
+        RebalancingJob.objects.filter(id=job.id).update(
+            status=RebalancingJob.RUNNING,
+            started_at=timezone.now() - timedelta(hours=1),
+            attempts=MAX_ATTEMPTS,
+        )
+
+        requeue_stale_jobs(timedelta(minutes=10))
+
+        job.refresh_from_db()
+        assert job.status == RebalancingJob.FAILED
+        assert job.error
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestRunJob:
+    def test_saves_plan_orders_and_timings(self, queued_account):
+        enqueue_plan(queued_account)
+
+        job = run_job(claim_next_job())
+
+        assert job.status == RebalancingJob.SUCCEEDED
+        assert job.progress == 100
+        assert job.finished_at is not None
+        assert {"targets", "optimization", "drift_analysis"} <= set(job.stage_timings)
+        assert job.result["account_id"] == queued_account.id
+        assert RebalancingRecommendation.objects.filter(job=job).count() == len(
+            job.result["orders"]
+        )
+
+    def test_saved_plan_matches_generated_plan(self, queued_account):
+        enqueue_plan(queued_account)
+        job = run_job(claim_next_job())
+
+        plan = get_saved_plan(queued_account)
+
+        assert plan is not None
+        assert plan.account == queued_account
+        assert len(plan.orders) == len(job.result["orders"])
+        assert plan.total_buy_amount == Decimal(str(job.result["total_buy_amount"]))
+        assert plan.proforma_holdings_rows == job.result["proforma_holdings_rows"]
+
+    def test_saved_plan_ignored_after_data_changes(self, queued_account):
+        enqueue_plan(queued_account)
+        run_job(claim_next_job())
+
+        Holding.objects.filter(account=queued_account).update(shares=Decimal("20"))
+        Portfolio.objects.filter(user=queued_account.user).bump_version()
+
+        assert get_saved_plan(queued_account) is None
+
+    def test_saved_plan_uses_stored_prices(self, queued_account):
+        enqueue_plan(queued_account)
+        job = run_job(claim_next_job())
+        RebalancingRecommendation.objects.create(
+            account=queued_account,
+            job=job,
+            security=queued_account.holdings.get().security,
+            action="SELL",
+            shares=Decimal("3"),
+            estimated_amount=Decimal("100.00"),
+            price_per_share=Decimal("33.3333"),
+        )
+
+        plan = plan_from_job(job)
+
+        assert plan.orders[-1].price_per_share == Decimal("33.3333")
+        saved = RebalancingRecommendation.objects.filter(job=job).exclude(shares=Decimal("3"))
+        assert all(rec.price_per_share is not None for rec in saved)
+
+    def test_engine_error_marks_job_failed(self, queued_account):
+        enqueue_plan(queued_account)
+
+        with patch(
+            "portfolio.services.rebalancing.jobs.RebalancingEngine.generate_plan",
+            side_effect=RuntimeError("solver exploded"),
+        ):
+            job = run_job(claim_next_job())
+
+        assert job.status == RebalancingJob.FAILED
+        assert job.error == "solver exploded"
+        assert not job.recommendations.exists()
+        assert get_saved_plan(queued_account) is None
+
+    def test_plan_from_job_without_orders(self, queued_account):
+        job = RebalancingJob.objects.create(
+            account=queued_account,
+            data_version="v",
+            status=RebalancingJob.SUCCEEDED,
+            result={"method_used": "proportional", "total_buy_amount": "0"},
+            finished_at=timezone.now(),
+        )
+
+        plan = plan_from_job(job)
+
+        assert plan.orders == []
+        assert plan.generated_at == job.finished_at
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestPruneFinishedJobs:
+    def finished_job(self, account, status, age, version):
+        job = RebalancingJob.objects.create(
+            account=account,
+            data_version=version,
+            status=status,
+            finished_at=timezone.now() - age,
+        )
+        RebalancingRecommendation.objects.create(
+            account=account,
+            job=job,
+            security=account.holdings.get().security,
+            action="BUY",
+            shares=Decimal("1"),
+            estimated_amount=Decimal("100.00"),
+        )
+        return job
+
+    def test_deletes_old_jobs_but_keeps_latest_plan(self, queued_account):
+        old = self.finished_job(queued_account, RebalancingJob.SUCCEEDED, timedelta(days=30), "a")
+        old_failed = self.finished_job(
+            queued_account, RebalancingJob.FAILED, timedelta(days=20), "b"
+        )
+        latest = self.finished_job(
+            queued_account, RebalancingJob.SUCCEEDED, timedelta(days=10), "c"
+        )
+        recent = self.finished_job(queued_account, RebalancingJob.FAILED, timedelta(hours=1), "d")
+        pending = enqueue_plan(queued_account)
+
+        assert prune_finished_jobs(timedelta(days=7)) == 2
+
+        remaining = set(RebalancingJob.objects.values_list("id", flat=True))
+        assert remaining == {latest.id, recent.id, pending.id}
+        assert not RebalancingRecommendation.objects.filter(job__in=[old.id, old_failed.id])
+        assert RebalancingRecommendation.objects.filter(job=latest).exists()
+
+    def test_nothing_to_prune(self, queued_account):
+        enqueue_plan(queued_account)
+
+        assert prune_finished_jobs() == 0
+        assert RebalancingJob.objects.count() == 1
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestRebalancingWorkerCommand:
+    def test_once_processes_queue_and_exits(self, queued_account):
+        job = enqueue_plan(queued_account)
+        out = StringIO()
+
+        call_command("run_rebalancing_worker", "--once", stdout=out)
+
+        job.refresh_from_db()
+        assert job.status == RebalancingJob.SUCCEEDED
+        assert "stopped after 1 jobs" in out.getvalue()
+
+    def test_max_jobs_limits_processing(self, queued_account, simple_holdings):
+        enqueue_plan(queued_account)
+        Portfolio.objects.filter(user=queued_account.user).bump_version()
+        enqueue_plan(queued_account)
+
+        call_command("run_rebalancing_worker", "--once", "--max-jobs", "1", stdout=StringIO())
+
+        assert RebalancingJob.objects.filter(status=RebalancingJob.PENDING).count() == 1
+
+    def test_prunes_finished_jobs(self, queued_account):
+        RebalancingJob.objects.create(
+            account=queued_account,
+            data_version="old",
+            status=RebalancingJob.FAILED,
+            finished_at=timezone.now() - timedelta(days=2),
+        )
+
+        call_command(
+            "run_rebalancing_worker", "--once", "--keep-finished", "3600", stdout=StringIO()
+        )
+
+        assert not RebalancingJob.objects.filter(data_version="old").exists()
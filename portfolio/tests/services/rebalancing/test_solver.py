@@ -0,0 +1,95 @@
+"""Tests for the rebalancing solver and its process pool."""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+import cvxpy as cp
+import numpy as np
+import pytest
+
+from portfolio.services.rebalancing.solver import (
+    get_solver_executor,
+    run_solver,
+    shutdown_solver_executor,
+    solve_share_changes,
+)
+
+SHARES = np.array([100.0, 0.0])
+PRICES = np.array([100.0, 50.0])
+ASSET_CLASS_IDS = np.array([1, 2])
+TARGETS = {1: 0.5, 2: 0.5}
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestSolveShareChanges:
+    def test_returns_whole_share_changes_or_raises(self):
+        # The ratio objective is not DCP for every solver; callers fall back
+        # to proportional orders on any error (see RebalancingCalculator)
+        try:
+            changes = solve_share_changes(SHARES, PRICES, ASSET_CLASS_IDS, TARGETS)
+        except (ValueError, cp.error.DCPError):
+            return
+
+        assert changes is None or changes.dtype.kind == "i"
+
+    def test_zero_value_returns_none(self):
+        assert solve_share_changes(np.zeros(2), PRICES, ASSET_CLASS_IDS, TARGETS) is None
+
+    def test_no_matching_targets_returns_none(self):
+        assert solve_share_changes(SHARES, PRICES, ASSET_CLASS_IDS, {99: 1.0}) is None
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestSolverExecutor:
+    def test_disabled_pool_returns_none(self, settings):
+        settings.REBALANCING_SOLVER_PROCESSES = 0
+
+        assert get_solver_executor() is None
+
+    def test_shared_pool_is_reused(self, settings):
+        settings.REBALANCING_SOLVER_PROCESSES = 1
+        try:
+            assert get_solver_executor() is get_solver_executor()
+        finally:
+            shutdown_solver_executor()
+
+    @pytest.mark.slow
+    def test_process_pool_matches_inline_solve(self):
+        def outcome(executor):
+            try:
+                return run_solver(executor, SHARES, PRICES, ASSET_CLASS_IDS, TARGETS)
+            except Exception as e:
+                return type(e)
+
+        with ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=django.setup,
+        ) as executor:
+            pooled = outcome(executor)
+            empty = run_solver(executor, SHARES, PRICES, ASSET_CLASS_IDS, {99: 1.0})
+
+        inline = outcome(None)
+        if isinstance(inline, np.ndarray):
+            np.testing.assert_array_equal(pooled, inline)
+        else:
+            assert pooled is inline
+        assert empty is None
+
+    @pytest.mark.slow
+    def test_shared_pool_runs_solve(self, settings):
+        """The configured pool spawns a worker that sets up Django and solves."""
+        settings.REBALANCING_SOLVER_PROCESSES = 1
+        try:
+            executor = get_solver_executor()
+            empty = run_solver(executor, SHARES, PRICES, ASSET_CLASS_IDS, {99: 1.0})
+            zero = run_solver(executor, np.zeros(2), PRICES, ASSET_CLASS_IDS, TARGETS)
+        finally:
+            shutdown_solver_executor()
+
+        assert empty is None
+        assert zero is None
@@ -0,0 +1,98 @@
+"""Tests for streaming export serializers."""
+
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+
+from portfolio.services.exports import ORDER_COLUMNS, ExportColumn, stream_csv, stream_parquet
+
+COLUMNS = [
+    ExportColumn("Ticker", lambda r: r["ticker"]),
+    ExportColumn("Value", lambda r: r["value"], "float"),
+]
+
+
+def order(price: str, amount: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        action="BUY",
+        security=SimpleNamespace(ticker="VTI", name="Total Stock Market"),
+        asset_class=SimpleNamespace(name="US Equities"),
+        shares=3,
+        price_per_share=Decimal(price),
+        estimated_amount=Decimal(amount),
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestStreamingSerializers:
+    """Test lazy CSV and Parquet serialization."""
+
+    def test_stream_csv_yields_one_line_per_row(self):
+        rows = [{"ticker": "VTI", "value": 1.5}, {"ticker": "BND", "value": 2.0}]
+
+        chunks = list(stream_csv(COLUMNS, rows))
+
+        assert chunks == ["Ticker,Value\r\n", "VTI,1.5\r\n", "BND,2.0\r\n"]
+
+    def test_stream_csv_is_lazy(self):
+        def rows():
+            yield {"ticker": "VTI", "value": 1.0}
+            raise AssertionError("consumed too far")
+
+        stream = stream_csv(COLUMNS, rows())
+
+        assert next(stream) == "Ticker,Value\r\n"
+        assert next(stream) == "VTI,1.0\r\n"
+
+    def test_stream_parquet_round_trip(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        import io
+
+        rows = [{"ticker": f"T{i}", "value": float(i)} for i in range(25)]
+
+        data = b"".join(stream_parquet(COLUMNS, rows, row_group_size=10))
+        table = pq.read_table(io.BytesIO(data))
+
+        assert table.num_rows == 25
+        assert pq.ParquetFile(io.BytesIO(data)).num_row_groups == 3
+        assert table.column("Value").to_pylist()[-1] == 24.0
+
+    def test_csv_formats_fixed_decimals(self):
+        chunks = list(stream_csv(ORDER_COLUMNS, [order("101.2345", "303.70")]))
+
+        assert chunks[1] == "BUY,VTI,Total Stock Market,US Equities,3,101.23,303.70\r\n"
+
+    def test_order_columns_are_numeric(self):
+        row = order("101.2345", "303.70")
+
+        values = {c.header: c.getter(row) for c in ORDER_COLUMNS}
+
+        assert values["Price"] == Decimal("101.2345")
+        assert values["Estimated Amount"] == Decimal("303.70")
+
+    def test_stream_parquet_uses_column_types(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        import io
+
+        import pyarrow as pa
+
+        data = b"".join(stream_parquet(ORDER_COLUMNS, [order("101.2345", "303.70")]))
+        table = pq.read_table(io.BytesIO(data))
+
+        assert table.schema.field("Shares").type == pa.int64()
+        assert table.schema.field("Price").type == pa.float64()
+        assert table.column("Price").to_pylist() == [101.2345]
+
+    def test_stream_parquet_empty_keeps_schema(self):
+        pq = pytest.importorskip("pyarrow.parquet")
+        import io
+
+        import pyarrow as pa
+
+        data = b"".join(stream_parquet(COLUMNS, []))
+        table = pq.read_table(io.BytesIO(data))
+
+        assert table.num_rows == 0
+        assert table.schema.field("Value").type == pa.float64()
@@ -0,0 +1,157 @@
+"""Tests for the bulk holdings import pipeline."""
+
+import io
+from decimal import Decimal
+
+import pytest
+
+from portfolio.models import Holding
+from portfolio.services.holdings_import import (
+    HoldingsImporter,
+    detect_format,
+    parse_csv,
+    parse_ofx,
+)
+from portfolio.utils.security import InvalidInputError
+
+OFX_STATEMENT = """OFXHEADER:100
+DATA:OFXSGML
+
+<OFX>
+<INVSTMTMSGSRSV1><INVSTMTTRNRS><INVSTMTRS>
+<INVPOSLIST>
+<POSMF><INVPOS><SECID><UNIQUEID>922908769<UNIQUEIDTYPE>CUSIP</SECID>
+<UNITS>12.5<UNITPRICE>100</INVPOS></POSMF>
+<POSSTOCK><INVPOS><SECID><UNIQUEID>921937835<UNIQUEIDTYPE>CUSIP</SECID>
+<UNITS>4<UNITPRICE>72</INVPOS></POSSTOCK>
+<POSSTOCK><INVPOS><SECID><UNIQUEID>000000000<UNIQUEIDTYPE>CUSIP</SECID>
+<UNITS>1</INVPOS></POSSTOCK>
+</INVPOSLIST>
+</INVSTMTRS></INVSTMTTRNRS></INVSTMTMSGSRSV1>
+<SECLISTMSGSRSV1><SECLIST>
+<MFINFO><SECINFO><SECID><UNIQUEID>922908769<UNIQUEIDTYPE>CUSIP</SECID>
+<SECNAME>Vanguard Total Stock Market<TICKER>VTI</SECINFO></MFINFO>
+<STOCKINFO><SECINFO><SECID><UNIQUEID>921937835<UNIQUEIDTYPE>CUSIP</SECID>
+<SECNAME>Vanguard Total Bond<TICKER>bnd</SECINFO></STOCKINFO>
+</SECLIST></SECLISTMSGSRSV1>
+</OFX>
+"""
+
+
+def _csv(text: str) -> io.BytesIO:
+    return io.BytesIO(text.encode("utf-8"))
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestParsing:
+    """Test CSV and OFX position parsing."""
+
+    def test_parse_csv_header_aliases_and_errors(self):
+        errors: list[str] = []
+        lines = ["Symbol,Quantity,Price\n", "vti,10,100\n", "BND,abc,70\n", ",5,1\n", "VXUS,-1,1\n"]
+
+        positions = list(parse_csv(lines, errors))
+
+        assert [(p.ticker, p.shares) for p in positions] == [("VTI", Decimal("10"))]
+        assert len(errors) == 2
+        assert errors[0].startswith("Line 3")
+
+    def test_parse_csv_missing_columns(self):
+        with pytest.raises(InvalidInputError):
+            list(parse_csv(["Name,Value\n", "x,1\n"], []))
+
+    def test_parse_ofx_resolves_tickers_from_seclist(self):
+        errors: list[str] = []
+
+        positions = list(parse_ofx(OFX_STATEMENT.splitlines(keepends=True), errors))
+
+        assert [(p.ticker, p.shares) for p in positions] == [
+            ("VTI", Decimal("12.5")),
+            ("BND", Decimal("4")),
+        ]
+        assert len(errors) == 1
+        assert "000000000" in errors[0]
+
+    def test_detect_format(self):
+        assert detect_format("positions.CSV") == "csv"
+        assert detect_format("statement.qfx") == "ofx"
+        with pytest.raises(InvalidInputError):
+            detect_format("holdings.xlsx")
+
+
+@pytest.mark.integration
+@pytest.mark.services
+class TestHoldingsImporter:
+    """Test diffing and bulk application of imports."""
+
+    def test_import_creates_updates_and_skips_unknown(self, simple_holdings):
+        account = simple_holdings["account"]
+        data = _csv("Ticker,Shares\nVTI,15\nBND,20\nBND,5\nZZZZ,1\n")
+
+        result = HoldingsImporter(account).import_file(data, "csv")
+
+        assert (result.created, result.updated, result.deleted) == (1, 1, 0)
+        assert result.unknown_tickers == ["ZZZZ"]
+        shares = dict(account.holdings.values_list("security__ticker", "shares"))
+        assert shares == {"VTI": Decimal("15"), "BND": Decimal("25")}
+
+    def test_zero_shares_removes_holding(self, simple_holdings):
+        account = simple_holdings["account"]
+
+        result = HoldingsImporter(account).import_file(_csv("Ticker,Shares\nVTI,0\n"), "csv")
+
+        assert result.deleted == 1
+        assert not account.holdings.exists()
+
+    def test_replace_removes_missing_holdings(self, simple_holdings):
+        account = simple_holdings["account"]
+
+        result = HoldingsImporter(account, replace=True).import_file(
+            _csv("Ticker,Shares\nBND,3\n"), "csv"
+        )
+
+        assert (result.created, result.deleted) == (1, 1)
+        assert list(account.holdings.values_list("security__ticker", flat=True)) == ["BND"]
+
+    @pytest.mark.parametrize("shares", ["N/A", "-5"])
+    def test_replace_with_malformed_row_keeps_holdings(self, simple_holdings, shares):
+        account = simple_holdings["account"]
+
+        with pytest.raises(InvalidInputError, match="Import cancelled"):
+            HoldingsImporter(account, replace=True).import_file(
+                _csv(f"Ticker,Shares\nVTI,{shares}\nBND,3\n"), "csv"
+            )
+
+        shares_by_ticker = dict(account.holdings.values_list("security__ticker", "shares"))
+        assert shares_by_ticker == {"VTI": Decimal("10")}
+
+    def test_replace_with_unresolved_ofx_security_keeps_holdings(self, simple_holdings):
+        account = simple_holdings["account"]
+
+        with pytest.raises(InvalidInputError, match="no ticker in statement"):
+            HoldingsImporter(account, replace=True).import_file(
+                io.BytesIO(OFX_STATEMENT.encode()), "ofx"
+            )
+
+        assert list(account.holdings.values_list("security__ticker", flat=True)) == ["VTI"]
+
+    def test_unchanged_positions_are_not_written(self, simple_holdings):
+        account = simple_holdings["account"]
+
+        result = HoldingsImporter(account).import_file(_csv("Ticker,Shares\nVTI,10\n"), "csv")
+
+        assert (result.created, result.updated, result.unchanged) == (0, 0, 1)
+
+    def test_query_count_independent_of_positions(
+        self, simple_holdings, base_system_data, django_assert_max_num_queries
+    ):
+        account = simple_holdings["account"]
+        rows = "".join(f"{t},{i + 1}\n" for i, t in enumerate(["VTI", "VXUS", "BND", "VGSH"]))
+
+        # security lookup, existing holdings, savepoint, bulk insert, bulk update,
+        # version bump, release
+        with django_assert_max_num_queries(7):
+            HoldingsImporter(account).import_file(_csv("Ticker,Shares\n" + rows), "csv")
+
+        assert Holding.objects.filter(account=account).count() == 4
@@ -0,0 +1,161 @@
+"""Tests for the HTTP load-test harness."""
+
+import random
+from io import StringIO
+from typing import Any
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+import pytest
+
+from portfolio.services.load_test import (
+    LoadTest,
+    LoadTestError,
+    LoadTestReport,
+    LoadTestUser,
+    PageMix,
+    RequestSample,
+    load_users,
+    parse_duration,
+    parse_mix,
+    percentiles,
+)
+
+PASSWORD = "load-test-pass"
+
+SHAPE = {
+    "users": 2,
+    "accounts_per_user": 2,
+    "holdings_per_account": 3,
+    "securities": 6,
+    "price_years": 0.02,
+    "password": PASSWORD,
+}
+
+
+@pytest.mark.unit
+class TestParsing:
+    def test_parse_mix(self) -> None:
+        assert parse_mix("dashboard=3, holdings=1,") == {"dashboard": 3, "holdings": 1}
+
+    @pytest.mark.parametrize(
+        "spec", ["dashboard", "unknown=1", "dashboard=x", "dashboard=-1", "dashboard=0"]
+    )
+    def test_parse_mix_invalid(self, spec: str) -> None:
+        with pytest.raises(LoadTestError):
+            parse_mix(spec)
+
+    def test_parse_duration(self) -> None:
+        assert parse_duration("0.125s") == 0.125
+        assert parse_duration(None) is None
+        assert parse_duration("garbage") is None
+
+    def test_percentiles(self) -> None:
+        result = percentiles([float(v) for v in range(1, 101)])
+
+        assert result[50] == pytest.approx(50.5)
+        assert result[99] == pytest.approx(99.01)
+        assert percentiles([]) == {}
+        assert percentiles([7.0]) == {50: 7.0, 90: 7.0, 95: 7.0, 99: 7.0}
+
+    def test_report(self) -> None:
+        report = LoadTestReport(
+            samples=[
+                RequestSample("dashboard", 200, 0.1, 0.05),
+                RequestSample("dashboard", 500, 0.3, None),
+                RequestSample("targets", 0, 1.0, None),
+            ],
+            elapsed=2.0,
+        )
+
+        assert report.overall.requests == 3
+        assert report.overall.errors == 2
+        assert report.overall.requests_per_second == 1.5
+        assert [p.page for p in report.pages] == ["dashboard", "targets"]
+        assert report.pages[0].server_ms == dict.fromkeys((50, 90, 95, 99), 50.0)
+        assert report.as_dict()["pages"]["targets"]["server_ms"] == {}
+
+
+@pytest.mark.unit
+class TestPageMix:
+    def test_draw_follows_weights(self) -> None:
+        mix = PageMix({"targets": 1, "dashboard": 0})
+        user = LoadTestUser("u", account_ids=(1,), tickers=("VTI",))
+
+        pages = {mix.draw(user, random.Random(i))[0] for i in range(20)}
+
+        assert pages == {"targets"}
+
+    def test_pages_without_data_fall_back_to_dashboard(self) -> None:
+        mix = PageMix({"rebalancing": 1, "ticker_details": 1})
+        user = LoadTestUser("u", account_ids=(), tickers=())
+
+        assert mix.draw(user, random.Random(0)) == ("dashboard", "/")
+
+    def test_paths(self) -> None:
+        mix = PageMix({"rebalancing": 1})
+        user = LoadTestUser("u", account_ids=(7,), tickers=())
+
+        assert mix.draw(user, random.Random(0)) == ("rebalancing", "/account/7/rebalance/")
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db(transaction=True)
+class TestLoadTest:
+    def test_load_users(self, synthetic_portfolios: Any) -> None:
+        synthetic_portfolios(**SHAPE)
+
+        users = load_users("synthetic_")
+
+        assert [u.username for u in users] == ["synthetic_00000", "synthetic_00001"]
+        assert all(len(u.account_ids) == 2 for u in users)
+        assert all(u.tickers for u in users)
+        assert len(load_users("synthetic_", limit=1)) == 1
+
+    def test_replays_mix_against_live_server(
+        self, live_server: Any, synthetic_portfolios: Any
+    ) -> None:
+        synthetic_portfolios(**SHAPE)
+
+        report = LoadTest(
+            live_server.url,
+            load_users("synthetic_"),
+            PASSWORD,
+            concurrency=1,
+            duration=None,
+            requests=15,
+        ).run()
+
+        assert report.overall.requests == 15
+        assert report.overall.errors == 0
+        assert report.overall.server_ms
+        assert sum(p.requests for p in report.pages) == 15
+
+    def test_wrong_password(self, live_server: Any, synthetic_portfolios: Any) -> None:
+        synthetic_portfolios(**SHAPE)
+
+        with pytest.raises(LoadTestError, match="rejected"):
+            LoadTest(live_server.url, load_users("synthetic_"), "wrong", requests=1).run()
+
+    def test_command(self, live_server: Any, synthetic_portfolios: Any) -> None:
+        synthetic_portfolios(**SHAPE)
+        out = StringIO()
+
+        call_command(
+            "load_test",
+            f"--url={live_server.url}",
+            f"--password={PASSWORD}",
+            "--concurrency=1",
+            "--requests=5",
+            "--mix=dashboard=1,targets=1",
+            stdout=out,
+        )
+
+        assert "5 requests" in out.getvalue()
+        assert "All requests succeeded" in out.getvalue()
+
+    def test_command_without_users(self) -> None:
+        with pytest.raises(CommandError, match="No users"):
+            call_command("load_test", "--password=x", "--prefix=nobody_", stdout=StringIO())
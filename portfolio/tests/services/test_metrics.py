@@ -0,0 +1,125 @@
+"""Tests for the in-process metrics registry."""
+
+import json
+import os
+
+import pytest
+
+from portfolio.services.metrics import DEAD_PROCESSES_FILE, MetricsRegistry, _Metric
+
+# A pid that is not running (above the default pid_max)
+DEAD_PID = 4194305
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestMetricsRegistry:
+    """Test counters, histograms and Prometheus rendering."""
+
+    def test_counter_renders_with_labels(self):
+        registry = MetricsRegistry()
+        hits = registry.counter("cache_total", "Cache lookups.", labelnames=("result",))
+        hits.inc(result="hit")
+        hits.inc(2, result="hit")
+        hits.inc(result="miss")
+
+        output = registry.render()
+
+        assert "# TYPE cache_total counter" in output
+        assert 'cache_total{result="hit"} 3' in output
+        assert 'cache_total{result="miss"} 1' in output
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5.0)
+
+        output = registry.render()
+
+        assert 'latency_seconds_bucket{le="0.1"} 1' in output
+        assert 'latency_seconds_bucket{le="1"} 2' in output
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in output
+        assert "latency_seconds_count 3" in output
+        assert "latency_seconds_sum 5.55" in output
+
+    def test_time_context_manager_records_observation(self):
+        registry = MetricsRegistry()
+        stage = registry.histogram("stage_seconds", "Stage.", labelnames=("stage",))
+
+        with stage.time(stage="load"):
+            pass
+
+        assert stage.get_count(stage="load") == 1
+
+    def test_wrong_labels_rejected(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("errors_total", "Errors.", labelnames=("kind",))
+
+        with pytest.raises(ValueError):
+            counter.inc(other="x")
+
+    def test_register_returns_existing_metric(self):
+        registry = MetricsRegistry()
+        first = registry.counter("dup_total", "Dup.")
+        assert registry.counter("dup_total", "Dup.") is first
+
+        with pytest.raises(ValueError):
+            registry.histogram("dup_total", "Dup.")
+
+    def test_multiprocess_mode_sums_process_files(self, tmp_path):
+        registry = MetricsRegistry(multiproc_dir=tmp_path)
+        counter = registry.counter("requests_total", "Requests.")
+        counter.inc(3)
+
+        # Simulate a second worker process having flushed its own samples
+        (tmp_path / "metrics-999999.json").write_text('{"requests_total": {"[]": 4.0}}')
+
+        output = registry.render()
+
+        assert "requests_total 7" in output
+        assert list(tmp_path.glob(".metrics-*.tmp")) == []
+
+    def test_metric_base_is_abstract(self):
+        with pytest.raises(TypeError):
+            _Metric("base", "Base.")  # type: ignore[abstract]
+
+    def test_dead_process_files_are_merged(self, tmp_path):
+        registry = MetricsRegistry(multiproc_dir=tmp_path)
+        counter = registry.counter("requests_total", "Requests.")
+        counter.inc(3)
+        (tmp_path / f"metrics-{DEAD_PID}.json").write_text('{"requests_total": {"[]": 4.0}}')
+        (tmp_path / DEAD_PROCESSES_FILE).write_text('{"requests_total": {"[]": 10.0}}')
+
+        first = registry.render()
+        second = registry.render()
+
+        assert "requests_total 17" in first
+        assert "requests_total 17" in second
+        assert not (tmp_path / f"metrics-{DEAD_PID}.json").exists()
+        dead = json.loads((tmp_path / DEAD_PROCESSES_FILE).read_text())
+        assert dead == {"requests_total": {"[]": 14.0}}
+
+    def test_reused_pid_keeps_previous_samples(self, tmp_path):
+        # A file left under this pid by an exited process
+        (tmp_path / f"metrics-{os.getpid()}.json").write_text('{"requests_total": {"[]": 5.0}}')
+        registry = MetricsRegistry(multiproc_dir=tmp_path)
+        counter = registry.counter("requests_total", "Requests.")
+        counter.inc(1)
+
+        registry.flush(force=True)
+        registry.flush(force=True)
+
+        assert "requests_total 6" in registry.render()
+
+    def test_mismatched_buckets_file_is_skipped(self, tmp_path):
+        registry = MetricsRegistry(multiproc_dir=tmp_path)
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+        latency.observe(0.5)
+        # Written by a process with a different bucket layout
+        (tmp_path / "metrics-1.json").write_text('{"latency_seconds": {"[]": [1, 1, 1, 0.5, 1]}}')
+
+        output = registry.render()
+
+        assert "latency_seconds_count 1" in output
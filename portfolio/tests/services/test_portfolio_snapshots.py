@@ -0,0 +1,290 @@
+"""Tests for the precomputed portfolio snapshot table."""
+
+from decimal import Decimal
+from io import StringIO
+from typing import Any
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import pandas as pd
+import pytest
+
+from portfolio.models import AllocationStrategy, Holding, PortfolioSnapshot, SecurityPrice
+from portfolio.services import portfolio_snapshots
+from portfolio.services.allocations import AllocationEngine
+from portfolio.services.allocations.calculations import AllocationCalculator
+from portfolio.services.allocations.data_providers import DjangoDataProvider
+from portfolio.services.portfolio_snapshots import (
+    accounts_using_strategy,
+    load_portfolio_snapshot,
+    rebuild_user,
+    schedule_refresh,
+)
+
+
+@pytest.fixture
+def snapshot_portfolio(multi_account_holdings: dict[str, Any]) -> dict[str, Any]:
+    """Roth $600 VTI / taxable $400 BND under a 60/40 portfolio strategy."""
+    system = multi_account_holdings["system"]
+    strategy = AllocationStrategy.objects.create(user=multi_account_holdings["user"], name="60/40")
+    strategy.save_allocations(
+        {
+            system.asset_class_us_equities.id: Decimal("60"),
+            system.bnd.asset_class_id: Decimal("40"),
+        }
+    )
+    portfolio = multi_account_holdings["portfolio"]
+    portfolio.allocation_strategy = strategy
+    portfolio.save()
+    return {**multi_account_holdings, "strategy": strategy}
+
+
+def _built_at(account: Any) -> Any:
+    return PortfolioSnapshot.objects.get(account=account, asset_class__isnull=True).built_at
+
+
+@pytest.mark.unit
+@pytest.mark.services
+class TestCalculateAccountSnapshot:
+    def test_rows_for_held_and_targeted_classes(self) -> None:
+        holdings_df = pd.DataFrame(
+            {
+                "account_id": [1, 1],
+                "account_name": ["Roth", "Roth"],
+                "account_type_code": ["ROTH_IRA", "ROTH_IRA"],
+                "asset_class": ["US Equities", "US Equities"],
+                "asset_class_id": [10, 10],
+                "category_code": ["US_EQUITIES", "US_EQUITIES"],
+                "ticker": ["VTI", "VOO"],
+                "shares": [5.0, 1.0],
+                "price": [100.0, 200.0],
+                "value": [500.0, 200.0],
+            }
+        )
+        targets_map = {1: {"US Equities": Decimal("50"), "Bonds": Decimal("50")}}
+
+        class_rows, account_rows = AllocationCalculator().calculate_account_snapshot(
+            holdings_df, targets_map, [1, 2]
+        )
+
+        rows = class_rows.set_index("asset_class")
+        assert rows.loc["US Equities", "actual"] == pytest.approx(700.0)
+        assert rows.loc["US Equities", "variance"] == pytest.approx(350.0)
+        assert not rows.loc["Bonds", "held"]
+        assert rows.loc["Bonds", "variance_pct"] == pytest.approx(-50.0)
+        assert account_rows["account_id"].tolist() == [1, 2]
+        assert account_rows["held"].tolist() == [True, False]
+        assert account_rows["total"].tolist() == [pytest.approx(700.0), 0.0]
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestSnapshotReads:
+    def test_sidebar_matches_live_engine(self, snapshot_portfolio: dict[str, Any]) -> None:
+        user = snapshot_portfolio["user"]
+        rebuild_user(user)
+
+        live = AllocationEngine(use_snapshots=False).get_sidebar_data(user)
+        cached = AllocationEngine(use_snapshots=True).get_sidebar_data(user)
+
+        assert cached["grand_total"] == live["grand_total"]
+        assert cached["account_totals"] == live["account_totals"]
+        assert cached["account_variances"] == pytest.approx(live["account_variances"])
+        assert cached["accounts_by_group"] == live["accounts_by_group"]
+
+    def test_presentation_rows_match_live_engine(self, snapshot_portfolio: dict[str, Any]) -> None:
+        user = snapshot_portfolio["user"]
+        rebuild_user(user)
+
+        live = AllocationEngine(use_snapshots=False).get_presentation_rows(user)
+        cached = AllocationEngine(use_snapshots=True).get_presentation_rows(user)
+
+        assert live
+        assert cached == live
+
+    def test_read_is_one_query(self, snapshot_portfolio: dict[str, Any]) -> None:
+        user = snapshot_portfolio["user"]
+        rebuild_user(user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            snapshot = load_portfolio_snapshot(user)
+
+        assert len(ctx.captured_queries) == 1
+        assert snapshot.grand_total == Decimal("1000")
+        assert {a["id"] for a in snapshot.accounts} == {
+            snapshot_portfolio["roth_account"].id,
+            snapshot_portfolio["taxable_account"].id,
+        }
+
+    def test_missing_snapshot_is_built_on_read(self, snapshot_portfolio: dict[str, Any]) -> None:
+        PortfolioSnapshot.objects.all().delete()
+
+        snapshot = load_portfolio_snapshot(snapshot_portfolio["user"])
+
+        assert snapshot.grand_total == Decimal("1000")
+        assert PortfolioSnapshot.objects.exists()
+
+    def test_custom_data_provider_disables_snapshots(self, settings: Any) -> None:
+        settings.PORTFOLIO_SNAPSHOTS = True
+
+        assert AllocationEngine().use_snapshots
+        assert not AllocationEngine(data_provider=DjangoDataProvider()).use_snapshots
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestSnapshotRefresh:
+    @pytest.fixture(autouse=True)
+    def enable_snapshots(self, settings: Any, snapshot_portfolio: dict[str, Any]) -> Any:
+        # Enabled after the fixture data exists: its writes never commit, so
+        # refreshes scheduled for them would otherwise stay pending
+        settings.PORTFOLIO_SNAPSHOTS = True
+        yield
+        portfolio_snapshots._pending.account_ids = set()
+
+    def test_holding_change_rebuilds_only_its_account(
+        self, snapshot_portfolio: dict[str, Any], django_capture_on_commit_callbacks: Any
+    ) -> None:
+        roth, taxable = snapshot_portfolio["roth_account"], snapshot_portfolio["taxable_account"]
+        rebuild_user(snapshot_portfolio["user"])
+        taxable_built_at = _built_at(taxable)
+
+        holding = snapshot_portfolio["roth_holding"]
+        holding.shares = Decimal("8")
+        with django_capture_on_commit_callbacks(execute=True):
+            holding.save()
+
+        assert PortfolioSnapshot.objects.get(
+            account=roth, asset_class__isnull=True
+        ).account_total == pytest.approx(800.0)
+        assert _built_at(taxable) == taxable_built_at
+
+    def test_price_change_rebuilds_holders(
+        self, snapshot_portfolio: dict[str, Any], django_capture_on_commit_callbacks: Any
+    ) -> None:
+        system = snapshot_portfolio["system"]
+        rebuild_user(snapshot_portfolio["user"])
+        roth_built_at = _built_at(snapshot_portfolio["roth_account"])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            SecurityPrice.objects.create(
+                security=system.bnd,
+                price=Decimal("150"),
+                price_datetime=timezone.now(),
+                source="manual",
+            )
+
+        snapshot = load_portfolio_snapshot(snapshot_portfolio["user"])
+        assert snapshot.account_totals[snapshot_portfolio["taxable_account"].id] == Decimal("600")
+        assert _built_at(snapshot_portfolio["roth_account"]) == roth_built_at
+
+    def test_security_asset_class_change_rebuilds_holders(
+        self, snapshot_portfolio: dict[str, Any], django_capture_on_commit_callbacks: Any
+    ) -> None:
+        system = snapshot_portfolio["system"]
+        taxable = snapshot_portfolio["taxable_account"]
+        rebuild_user(snapshot_portfolio["user"])
+        roth_built_at = _built_at(snapshot_portfolio["roth_account"])
+
+        bnd = system.bnd
+        bnd.asset_class = system.asset_class_us_equities
+        with django_capture_on_commit_callbacks(execute=True):
+            bnd.save()
+
+        assert PortfolioSnapshot.objects.get(
+            account=taxable, asset_class=system.asset_class_us_equities
+        ).actual_value == pytest.approx(400.0)
+        assert _built_at(snapshot_portfolio["roth_account"]) == roth_built_at
+
+    def test_strategy_save_refreshes_accounts_using_it(
+        self, snapshot_portfolio: dict[str, Any], django_capture_on_commit_callbacks: Any
+    ) -> None:
+        system = snapshot_portfolio["system"]
+        user = snapshot_portfolio["user"]
+        rebuild_user(user)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            snapshot_portfolio["strategy"].save_allocations(
+                {system.asset_class_us_equities.id: Decimal("100")}
+            )
+
+        assert load_portfolio_snapshot(user).targets_map == {
+            snapshot_portfolio["roth_account"].id: {"US Equities": Decimal("100")},
+            snapshot_portfolio["taxable_account"].id: {"US Equities": Decimal("100")},
+        }
+
+    def test_accounts_using_strategy_follows_precedence(
+        self, snapshot_portfolio: dict[str, Any]
+    ) -> None:
+        roth, taxable = snapshot_portfolio["roth_account"], snapshot_portfolio["taxable_account"]
+        override = AllocationStrategy.objects.create(user=snapshot_portfolio["user"], name="Own")
+        roth.allocation_strategy = override
+        roth.save()
+
+        assert set(accounts_using_strategy(snapshot_portfolio["strategy"].id)) == {taxable.id}
+        assert set(accounts_using_strategy(override.id)) == {roth.id}
+
+    def test_holdings_bulk_update_view_refreshes(
+        self,
+        client: Any,
+        snapshot_portfolio: dict[str, Any],
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        roth = snapshot_portfolio["roth_account"]
+        holding = snapshot_portfolio["roth_holding"]
+        rebuild_user(snapshot_portfolio["user"])
+        client.force_login(snapshot_portfolio["user"])
+
+        with django_capture_on_commit_callbacks(execute=True):
+            client.post(
+                reverse("portfolio:account_holdings", args=[roth.id]),
+                {
+                    "form_action": "bulk_update",
+                    "holding_ids": [holding.id],
+                    f"shares_{holding.id}": "12",
+                },
+            )
+
+        assert Holding.objects.get(id=holding.id).shares == Decimal("12")
+        assert PortfolioSnapshot.objects.get(
+            account=roth, asset_class__isnull=True
+        ).account_total == pytest.approx(1200.0)
+
+    def test_disabled_setting_schedules_nothing(
+        self,
+        settings: Any,
+        snapshot_portfolio: dict[str, Any],
+        django_capture_on_commit_callbacks: Any,
+    ) -> None:
+        settings.PORTFOLIO_SNAPSHOTS = False
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            schedule_refresh([snapshot_portfolio["roth_account"].id])
+
+        assert callbacks == []
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestRebuildPortfolioSnapshotsCommand:
+    def test_rebuilds_all_accounts(self, snapshot_portfolio: dict[str, Any]) -> None:
+        out = StringIO()
+
+        call_command("rebuild_portfolio_snapshots", stdout=out)
+
+        # Per account: the held and the targeted asset class plus a total row
+        assert PortfolioSnapshot.objects.count() == 6
+        assert "for 1 users" in out.getvalue()
+
+    def test_unknown_user(self, db: Any) -> None:
+        from django.core.management.base import CommandError
+
+        with pytest.raises(CommandError):
+            call_command("rebuild_portfolio_snapshots", "--user", "nobody")
@@ -0,0 +1,127 @@
+"""Tests for the process-wide reference data cache."""
+
+from typing import Any
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from portfolio.models import AccountGroup, AssetClass, Portfolio
+from portfolio.services.allocations.data_providers import DjangoDataProvider
+from portfolio.services.reference_data import get_reference_data, invalidate_reference_data
+
+
+@pytest.mark.services
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestReferenceData:
+    def test_snapshot_is_reused_without_queries(self, base_system_data: Any) -> None:
+        first = get_reference_data()
+
+        with CaptureQueriesContext(connection) as ctx:
+            second = get_reference_data()
+
+        assert second is first
+        assert len(ctx.captured_queries) == 0
+
+    def test_lookups(self, base_system_data: Any) -> None:
+        system = base_system_data
+
+        data = get_reference_data()
+
+        assert data.cash == system.asset_class_cash
+        assert data.asset_classes_by_name["US Equities"] == system.asset_class_us_equities
+        assert data.account_types_by_code["ROTH_IRA"] == system.type_roth
+        assert data.primary_securities[system.asset_class_us_equities.id] == system.vti
+        assert [g.name for g in data.account_groups] == list(
+            AccountGroup.objects.order_by("sort_order", "name").values_list("name", flat=True)
+        )
+
+    def test_saving_asset_class_invalidates(self, base_system_data: Any) -> None:
+        before = get_reference_data()
+
+        AssetClass.objects.create(name="Frontier Markets", category=base_system_data.cat_intl_eq)
+
+        after = get_reference_data()
+        assert after.version > before.version
+        assert "Frontier Markets" in after.asset_classes_by_name
+
+    def test_change_bumps_portfolio_versions_on_commit(
+        self, base_system_data: Any, test_portfolio: Any, django_capture_on_commit_callbacks: Any
+    ) -> None:
+        version = Portfolio.objects.get(id=test_portfolio["portfolio"].id).version
+
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            AssetClass.objects.create(
+                name="Frontier Markets", category=base_system_data.cat_intl_eq
+            )
+            # Loaded by another request before the write commits
+            loaded_before_commit = get_reference_data()
+
+        assert Portfolio.objects.get(id=test_portfolio["portfolio"].id).version == version
+        for callback in callbacks:
+            callback()
+
+        assert Portfolio.objects.get(id=test_portfolio["portfolio"].id).version == version + 1
+        assert get_reference_data() is not loaded_before_commit
+
+    def test_expires_after_ttl(self, base_system_data: Any, settings: Any) -> None:
+        first = get_reference_data()
+        settings.REFERENCE_DATA_TTL = 0
+
+        assert get_reference_data() is not first
+
+    def test_invalidation_during_load_is_not_cached(self, base_system_data: Any) -> None:
+        from unittest.mock import patch
+
+        from portfolio.services import reference_data
+
+        real_load = reference_data._load
+
+        def load_then_invalidate(version: int) -> Any:
+            snapshot = real_load(version)
+            invalidate_reference_data()
+            return snapshot
+
+        with patch.object(reference_data, "_load", side_effect=load_then_invalidate):
+            stale = get_reference_data()
+
+        assert get_reference_data() is not stale
+
+    def test_get_cash_uses_cache(self, base_system_data: Any) -> None:
+        AssetClass.get_cash()
+
+        with CaptureQueriesContext(connection) as ctx:
+            cash = AssetClass.get_cash()
+
+        assert cash == base_system_data.asset_class_cash
+        assert len(ctx.captured_queries) == 0
+
+    def test_get_cash_sees_renamed_cash(self, base_system_data: Any) -> None:
+        assert AssetClass.get_cash() is not None
+        cash = base_system_data.asset_class_cash
+        cash.name = "Money Market"
+        cash.save()
+
+        assert AssetClass.get_cash() is None
+
+    def test_asset_classes_df_matches_provider_contract(self, base_system_data: Any) -> None:
+        df = DjangoDataProvider().get_asset_classes_df(None)
+
+        assert list(df.columns) == [
+            "asset_class_id",
+            "asset_class_name",
+            "group_code",
+            "group_label",
+            "group_sort_order",
+            "category_code",
+            "category_label",
+            "category_sort_order",
+            "is_cash",
+            "row_type",
+        ]
+        assert df.loc[df["asset_class_name"] == "Cash", "is_cash"].all()
+        # Callers get their own copy
+        df["row_type"] = "changed"
+        assert (get_reference_data().asset_classes_df["row_type"] == "asset_class").all()
@@ -0,0 +1,144 @@
+"""Tests for the synthetic benchmark data generator."""
+
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from typing import Any
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+
+import pytest
+
+from portfolio.models import (
+    Account,
+    Holding,
+    Portfolio,
+    Security,
+    SecurityPrice,
+    TargetAllocation,
+)
+from portfolio.services.allocations import AllocationEngine
+from portfolio.services.synthetic_data import SyntheticDataGenerator, SyntheticShape
+
+SMALL = {
+    "users": 3,
+    "accounts_per_user": 2,
+    "holdings_per_account": 4,
+    "securities": 10,
+    "price_years": 0.05,
+    "price_end": date(2026, 6, 30),
+}
+
+
+def _dataset() -> dict[str, Any]:
+    return {
+        "holdings": sorted(
+            Holding.objects.values_list(
+                "account__user__username", "account__name", "security__ticker", "shares"
+            )
+        ),
+        "prices": sorted(
+            SecurityPrice.objects.filter(security__ticker__startswith="SYN").values_list(
+                "security__ticker", "price_datetime", "price"
+            )
+        ),
+    }
+
+
+@pytest.mark.integration
+@pytest.mark.services
+@pytest.mark.django_db
+class TestSyntheticDataGenerator:
+    def test_creates_requested_shape(self, synthetic_portfolios: Any) -> None:
+        shape = SyntheticShape(**SMALL)
+
+        result = synthetic_portfolios(**SMALL)
+
+        assert len(result.user_ids) == 3
+        assert Portfolio.objects.filter(user_id__in=result.user_ids).count() == 3
+        assert Account.objects.filter(user_id__in=result.user_ids).count() == 6
+        assert result.holdings == Holding.objects.count() == shape.total_holdings
+        assert result.prices == shape.total_prices == 10 * 13
+        assert SecurityPrice.objects.filter(price_datetime__date=date(2026, 6, 30)).count() == 10
+
+    def test_strategies_sum_to_100(self, synthetic_portfolios: Any) -> None:
+        synthetic_portfolios(**SMALL)
+
+        totals = TargetAllocation.objects.values("strategy").annotate(total=Sum("target_percent"))
+
+        assert {t["total"] for t in totals} == {Decimal("100")}
+
+    def test_same_seed_same_data(self, synthetic_portfolios: Any) -> None:
+        synthetic_portfolios(**SMALL)
+        first = _dataset()
+        Holding.objects.all().delete()
+        Security.objects.filter(ticker__startswith="SYN").delete()
+
+        synthetic_portfolios(**SMALL, username_prefix="again_")
+        second = _dataset()
+
+        assert [h[1:] for h in second["holdings"]] == [h[1:] for h in first["holdings"]]
+        assert second["prices"] == first["prices"]
+
+    def test_existing_prefix_rejected(self, synthetic_portfolios: Any) -> None:
+        synthetic_portfolios(**SMALL)
+
+        with pytest.raises(ValueError, match="already exist"):
+            synthetic_portfolios(**SMALL)
+
+    def test_security_universe_reused(self, synthetic_portfolios: Any) -> None:
+        synthetic_portfolios(**SMALL)
+
+        result = synthetic_portfolios(**SMALL, username_prefix="second_")
+
+        assert result.securities == 0
+        assert result.prices == 0
+        assert Holding.objects.count() == 2 * SyntheticShape(**SMALL).total_holdings
+
+    def test_bulk_inserts(self, base_system_data: Any) -> None:
+        shape = SyntheticShape(users=20, **{k: v for k, v in SMALL.items() if k != "users"})
+
+        with CaptureQueriesContext(connection) as ctx:
+            SyntheticDataGenerator(shape).run()
+
+        assert len(ctx.captured_queries) < 50
+
+    def test_engine_reads_generated_portfolio(self, synthetic_portfolios: Any) -> None:
+        result = synthetic_portfolios(**SMALL)
+        user = Portfolio.objects.get(user_id=result.user_ids[0]).user
+
+        assert AllocationEngine().get_presentation_rows(user)
+
+    def test_holdings_per_account_bounded_by_universe(self) -> None:
+        with pytest.raises(ValueError, match="exceeds"):
+            SyntheticDataGenerator(SyntheticShape(holdings_per_account=20, securities=10))
+
+
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestGenerateSyntheticDataCommand:
+    def test_generates(self, base_system_data: Any) -> None:
+        out = StringIO()
+
+        call_command(
+            "generate_synthetic_data",
+            "--users=2",
+            "--holdings=3",
+            "--securities=5",
+            "--years=0.02",
+            stdout=out,
+        )
+
+        assert Holding.objects.count() == 2 * 4 * 3
+        assert "Synthetic data ready" in out.getvalue()
+
+    def test_duplicate_prefix(self, base_system_data: Any) -> None:
+        args = ["generate_synthetic_data", "--users=1", "--securities=10", "--years=0"]
+        call_command(*args, stdout=StringIO())
+
+        with pytest.raises(CommandError):
+            call_command(*args, stdout=StringIO())
@@ -0,0 +1,122 @@
+"""Tests for portfolio data versions."""
+
+from decimal import Decimal
+
+from django.utils import timezone
+
+import pytest
+
+from portfolio.models import Holding, SecurityPrice, TargetAllocation
+from portfolio.services.versioning import get_portfolio_version
+
+
+@pytest.mark.integration
+@pytest.mark.services
+class TestPortfolioVersion:
+    """Test that data changes bump the version."""
+
+    def test_holding_change_bumps_version(self, simple_holdings):
+        user = simple_holdings["user"]
+        before = get_portfolio_version(user)
+
+        holding = simple_holdings["holding"]
+        holding.shares = Decimal("11")
+        holding.save()
+
+        after = get_portfolio_version(user)
+        assert after.portfolio_version > before.portfolio_version
+        assert after.etag("x") != before.etag("x")
+
+    def test_holding_delete_bumps_version(self, simple_holdings):
+        user = simple_holdings["user"]
+        before = get_portfolio_version(user).key
+
+        simple_holdings["holding"].delete()
+
+        assert get_portfolio_version(user).key != before
+
+    def test_new_price_bumps_version(self, simple_holdings):
+        user = simple_holdings["user"]
+        before = get_portfolio_version(user).key
+
+        SecurityPrice.objects.create(
+            security=simple_holdings["system"].vti,
+            price=Decimal("101"),
+            price_datetime=timezone.now(),
+            source="manual",
+        )
+
+        assert get_portfolio_version(user).key != before
+
+    def test_price_correction_bumps_version(self, simple_holdings):
+        """Rewriting a price for the same market timestamp changes the version."""
+        user = simple_holdings["user"]
+        price = SecurityPrice.objects.filter(security=simple_holdings["system"].vti).latest("id")
+        before = get_portfolio_version(user)
+
+        SecurityPrice.objects.update_or_create(
+            security=price.security,
+            price_datetime=price.price_datetime,
+            defaults={"price": price.price + 1, "source": "manual"},
+        )
+
+        after = get_portfolio_version(user)
+        assert after.price_version == before.price_version
+        assert after.key != before.key
+
+    def test_price_of_unheld_security_does_not_affect_version(self, simple_holdings):
+        user = simple_holdings["user"]
+        before = get_portfolio_version(user).key
+
+        SecurityPrice.objects.create(
+            security=simple_holdings["system"].bnd,
+            price=Decimal("72"),
+            price_datetime=timezone.now(),
+            source="manual",
+        )
+
+        assert get_portfolio_version(user).key == before
+        bnd_scoped = get_portfolio_version(
+            user, include_securities=[simple_holdings["system"].bnd.id]
+        )
+        assert bnd_scoped.key != before
+
+    def test_target_change_bumps_version(self, test_portfolio):
+        from portfolio.models import AllocationStrategy
+
+        user = test_portfolio["user"]
+        strategy = AllocationStrategy.objects.create(user=user, name="Versioned")
+        before = get_portfolio_version(user).key
+
+        TargetAllocation.objects.create(
+            strategy=strategy,
+            asset_class=test_portfolio["system"].asset_class_us_equities,
+            target_percent=Decimal("60"),
+        )
+
+        assert get_portfolio_version(user).key != before
+
+    def test_other_users_changes_do_not_affect_version(self, simple_holdings, django_user_model):
+        user = simple_holdings["user"]
+        before = get_portfolio_version(user).key
+
+        other = django_user_model.objects.create_user(username="versionother", password="x")
+        from portfolio.models import AllocationStrategy
+
+        AllocationStrategy.objects.create(user=other, name="Other")
+
+        assert get_portfolio_version(user).key == before
+
+    def test_bulk_edit_bumps_version(self, simple_holdings):
+        from portfolio.models import Portfolio
+
+        user = simple_holdings["user"]
+        before = get_portfolio_version(user).portfolio_version
+
+        holding = simple_holdings["holding"]
+        holding.shares = Decimal("30")
+        Holding.objects.bulk_update([holding], ["shares"])
+        assert get_portfolio_version(user).portfolio_version == before
+
+        Portfolio.objects.for_user(user).bump_version()
+        assert get_portfolio_version(user).portfolio_version == before + 1
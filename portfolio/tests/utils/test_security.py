@@ -11,6 +11,7 @@ from portfolio.models import Account, AllocationStrategy, Holding, Portfolio
 from portfolio.utils.security import (
     AccessControlError,
     InvalidInputError,
+    get_user_owned_holdings,
     handle_holding_operation,
     sanitize_integer_input,
     validate_target_mode,
@@ -151,6 +152,32 @@ class TestOwnershipValidation:
         with pytest.raises(AccessControlError, match="do not have permission"):
             validate_user_owns_holding(test_user, holding.id)
 
+    def test_get_user_owned_holdings_filters_other_users(
+        self, test_user, other_user, base_system_data, django_assert_num_queries
+    ):
+        """Test set-based ownership check returns only the user's holdings."""
+        accounts = []
+        for user in (test_user, other_user):
+            portfolio = Portfolio.objects.create(user=user, name=f"{user.username} portfolio")
+            accounts.append(
+                Account.objects.create(
+                    user=user,
+                    portfolio=portfolio,
+                    name="Account",
+                    account_type=base_system_data.type_taxable,
+                    institution=base_system_data.institution,
+                )
+            )
+        mine = Holding.objects.create(account=accounts[0], security=base_system_data.vti, shares=1)
+        theirs = Holding.objects.create(
+            account=accounts[1], security=base_system_data.vti, shares=1
+        )
+
+        with django_assert_num_queries(1):
+            result = get_user_owned_holdings(test_user, [mine.id, theirs.id, 99999])
+
+        assert result == {mine.id: mine}
+
     def test_validate_user_owns_strategy_success(self, test_user):
         """Test successful strategy ownership validation."""
         strategy = AllocationStrategy.objects.create(user=test_user, name="Test Strategy")
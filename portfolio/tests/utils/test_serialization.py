@@ -0,0 +1,50 @@
+"""Tests for API JSON serialization."""
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from portfolio.services.allocations.types import HierarchyLevel
+from portfolio.utils.serialization import dumps
+
+
+@pytest.mark.unit
+class TestDumps:
+    """Test conversion of engine output types."""
+
+    def test_engine_types(self):
+        payload = {
+            "decimal": Decimal("1.25"),
+            "np_float": np.float64(2.5),
+            "np_int": np.int64(3),
+            "array": np.array([1, 2]),
+            "level": HierarchyLevel.GRAND_TOTAL,
+            "date": date(2026, 1, 2),
+            "timestamp": pd.Timestamp("2026-01-02T03:04:05"),
+            "datetime": datetime(2026, 1, 2, 3, 4, 5),
+            1: "int key",
+        }
+
+        data = json.loads(dumps(payload))
+
+        assert data["decimal"] == 1.25
+        assert data["np_float"] == 2.5
+        assert data["np_int"] == 3
+        assert data["array"] == [1, 2]
+        assert data["level"] == int(HierarchyLevel.GRAND_TOTAL)
+        assert data["date"] == "2026-01-02"
+        assert data["timestamp"].startswith("2026-01-02T03:04:05")
+        assert data["datetime"] == "2026-01-02T03:04:05"
+        assert data["1"] == "int key"
+
+    def test_non_finite_values_become_null(self):
+        data = json.loads(dumps([float("nan"), np.float64("inf"), Decimal("NaN")]))
+        assert data == [None, None, None]
+
+    def test_unsupported_type_raises(self):
+        with pytest.raises(TypeError):
+            dumps({"obj": object()})
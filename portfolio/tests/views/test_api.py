@@ -0,0 +1,118 @@
+"""
+Tests for the read-only JSON API.
+
+Tests: portfolio/views/api.py
+"""
+
+import json
+from decimal import Decimal
+
+from django.urls import reverse
+
+import pytest
+
+from portfolio.models import Holding
+
+
+@pytest.mark.views
+@pytest.mark.integration
+class TestPortfolioAPI:
+    """Test JSON endpoints and conditional GET support."""
+
+    @pytest.mark.parametrize("url_name", ["api_allocations", "api_holdings", "api_sidebar"])
+    def test_endpoints_return_json(self, client, simple_holdings, url_name):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse(f"portfolio:{url_name}"))
+
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/json"
+        assert response["ETag"]
+        assert response["Last-Modified"]
+        assert "private" in response["Cache-Control"]
+        json.loads(response.content)
+
+    def test_sidebar_values_are_numbers(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+
+        data = json.loads(client.get(reverse("portfolio:api_sidebar")).content)
+
+        assert data["grand_total"] == pytest.approx(1000.0)
+        account_id = str(simple_holdings["account"].id)
+        assert data["account_totals"][account_id] == pytest.approx(1000.0)
+
+    def test_account_holdings_and_rebalancing(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+        kwargs = {"account_id": simple_holdings["account"].id}
+
+        holdings = client.get(reverse("portfolio:api_account_holdings", kwargs=kwargs))
+        plan = client.get(reverse("portfolio:api_rebalancing", kwargs=kwargs))
+
+        assert holdings.status_code == 200
+        assert any(row.get("ticker") == "VTI" for row in json.loads(holdings.content)["rows"])
+        assert plan.status_code == 200
+        assert "orders" in json.loads(plan.content)
+
+    def test_etag_returns_not_modified(
+        self, client, simple_holdings, django_assert_max_num_queries
+    ):
+        client.force_login(simple_holdings["user"])
+        url = reverse("portfolio:api_allocations")
+        etag = client.get(url)["ETag"]
+
+        # Session/user plus the two version queries; no engine work
+        with django_assert_max_num_queries(4):
+            response = client.get(url, headers={"if-none-match": etag})
+
+        assert response.status_code == 304
+        assert response["ETag"] == etag
+
+    def test_etag_changes_when_holdings_change(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+        url = reverse("portfolio:api_holdings")
+        etag = client.get(url)["ETag"]
+
+        holding = simple_holdings["holding"]
+        holding.shares = Decimal("20")
+        holding.save()
+
+        response = client.get(url, headers={"if-none-match": etag})
+        assert response.status_code == 200
+        assert response["ETag"] != etag
+
+    def test_etag_varies_by_query(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+        url = reverse("portfolio:api_holdings")
+
+        effective = client.get(url, {"target": "effective"})["ETag"]
+        policy = client.get(url, {"target": "policy"})["ETag"]
+
+        assert effective != policy
+
+    def test_invalid_target_mode(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse("portfolio:api_holdings"), {"target": "bogus"})
+
+        assert response.status_code == 400
+        assert "error" in json.loads(response.content)
+
+    def test_other_users_account_forbidden(self, client, simple_holdings, django_user_model):
+        other = django_user_model.objects.create_user(username="apiother", password="x")
+        client.force_login(other)
+        kwargs = {"account_id": simple_holdings["account"].id}
+
+        response = client.get(reverse("portfolio:api_rebalancing", kwargs=kwargs))
+
+        assert response.status_code == 403
+        assert Holding.objects.filter(account_id=kwargs["account_id"]).exists()
+
+    def test_anonymous_forbidden(self, client):
+        response = client.get(reverse("portfolio:api_sidebar"))
+        assert response.status_code == 403
+
+    def test_base_view_is_abstract(self):
+        from portfolio.views.api import PortfolioAPIView
+
+        with pytest.raises(TypeError, match="get_data"):
+            PortfolioAPIView()
@@ -0,0 +1,169 @@
+"""
+Tests for the async dashboard, holdings and rebalancing pages.
+
+Tests: AsyncDashboardView, AsyncHoldingsView, AsyncRebalancingView
+
+Loaders run in worker threads with their own database connections, so these
+tests use committed (transactional) data.
+"""
+
+import importlib
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.urls import clear_url_caches, reverse
+from django.utils import timezone
+from django.utils.functional import empty
+
+import pytest
+
+from portfolio.models import (
+    AllocationStrategy,
+    Holding,
+    RebalancingJob,
+    SecurityPrice,
+    TargetAllocation,
+)
+from portfolio.services.rebalancing.jobs import current_data_version
+
+
+def _reload_urls() -> None:
+    import config.urls
+    import portfolio.urls
+
+    clear_url_caches()
+    importlib.reload(portfolio.urls)
+    importlib.reload(config.urls)
+
+
+@pytest.fixture
+def async_pages(settings):
+    """Route the pages to their async variants (as with ASYNC_VIEWS=True)."""
+    settings.ASYNC_VIEWS = True
+    settings.REBALANCING_SOLVER_PROCESSES = 0
+    _reload_urls()
+    cache.clear()
+    yield
+    settings.ASYNC_VIEWS = False
+    _reload_urls()
+    cache.clear()
+
+
+@pytest.mark.views
+@pytest.mark.integration
+@pytest.mark.django_db(transaction=True)
+class TestAsyncPages:
+    def test_dashboard_renders(self, client, simple_holdings, async_pages):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse("portfolio:dashboard"))
+
+        assert response.status_code == 200
+        assert response.resolver_match.func.view_class.__name__ == "AsyncDashboardView"
+        assert response.context["sidebar_data"]["grand_total"] == Decimal("1000")
+        assert response.context["allocation_rows_money"]
+
+    def test_dashboard_requires_login(self, client, db, async_pages):
+        response = client.get(reverse("portfolio:dashboard"))
+
+        assert response.status_code == 302
+        assert "login" in response.url
+
+    def test_holdings_renders_aggregated_and_account(self, client, simple_holdings, async_pages):
+        client.force_login(simple_holdings["user"])
+        account = simple_holdings["account"]
+
+        aggregated = client.get(reverse("portfolio:holdings"))
+        single = client.get(reverse("portfolio:account_holdings", args=[account.id]))
+
+        assert aggregated.status_code == 200
+        assert aggregated.context["is_aggregated"] is True
+        assert single.status_code == 200
+        assert single.context["account"] == account
+        assert b"VTI" in single.content
+
+    def test_holdings_rejects_other_users_account(
+        self, client, simple_holdings, test_user_with_name, async_pages
+    ):
+        client.force_login(test_user_with_name("intruder"))
+        account = simple_holdings["account"]
+
+        response = client.get(reverse("portfolio:account_holdings", args=[account.id]))
+
+        assert response.status_code == 302
+        assert response.url == reverse("portfolio:holdings")
+
+    def test_holdings_post_delegates_to_sync_view(self, client, simple_holdings, async_pages):
+        client.force_login(simple_holdings["user"])
+        account = simple_holdings["account"]
+        holding = Holding.objects.get(account=account)
+
+        response = client.post(
+            reverse("portfolio:account_holdings", args=[account.id]),
+            {"holding_ids": [holding.id], f"shares_{holding.id}": "25"},
+        )
+
+        assert response.status_code == 302
+        holding.refresh_from_db()
+        assert holding.shares == Decimal("25")
+
+    def test_cached_fragments_skip_loaders(self, client, simple_holdings, async_pages):
+        client.force_login(simple_holdings["user"])
+        url = reverse("portfolio:dashboard")
+        client.get(url)
+
+        response = client.get(url)
+
+        # Cached fragments leave their (lazy) data unevaluated
+        assert response.status_code == 200
+        assert response.context["sidebar_data"]._wrapped is empty
+        assert response.context["allocation_rows_money"]._wrapped is empty
+
+    @pytest.fixture
+    def strategy_account(self, client, simple_holdings):
+        """The holdings account with a strategy assigned, its user logged in."""
+        user = simple_holdings["user"]
+        account = simple_holdings["account"]
+        strategy = AllocationStrategy.objects.create(user=user, name="Async Strategy")
+        TargetAllocation.objects.create(
+            strategy=strategy,
+            asset_class=simple_holdings["system"].asset_class_us_equities,
+            target_percent=Decimal("100.00"),
+        )
+        account.allocation_strategy = strategy
+        account.save()
+        client.force_login(user)
+        return account
+
+    def test_rebalancing_renders_plan(self, client, simple_holdings, strategy_account, async_pages):
+        system = simple_holdings["system"]
+
+        response = client.get(reverse("portfolio:rebalancing", args=[strategy_account.id]))
+
+        assert response.status_code == 200
+        assert response.context["plan"].account == strategy_account
+        assert system.asset_class_us_equities in response.context["target_allocations"]
+
+    def test_rebalancing_queues_job_after_price_refresh(
+        self, client, simple_holdings, strategy_account, async_pages, settings
+    ):
+        """With the job queue on, the page queues a job keyed to the refreshed prices."""
+        settings.REBALANCING_JOB_QUEUE = True
+
+        def refresh(user):
+            SecurityPrice.objects.create(
+                security=simple_holdings["system"].vti,
+                price=Decimal("105"),
+                price_datetime=timezone.now(),
+                source="manual",
+            )
+
+        with patch("portfolio.views.mixins.refresh_stale_prices", side_effect=refresh):
+            response = client.get(reverse("portfolio:rebalancing", args=[strategy_account.id]))
+
+        job = RebalancingJob.objects.get(account=strategy_account)
+        assert response.status_code == 200
+        assert response.context["plan"] is None
+        assert response.context["job"] == job
+        assert job.data_version == current_data_version(strategy_account)
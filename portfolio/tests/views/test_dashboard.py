@@ -260,3 +260,35 @@ def test_dashboard_has_sidebar_context(client: Any, test_user: Any) -> None:
 
     assert response.status_code == 200
     assert "sidebar_data" in response.context
+
+
+@pytest.mark.views
+@pytest.mark.integration
+def test_dashboard_preformatted_tables_match_filters(
+    client: Any, settings: Any, synthetic_portfolios: Any, mock_market_prices: Any
+) -> None:
+    """Pre-formatted display strings render the same tables as the filters."""
+    import re
+
+    from django.core.cache import cache
+
+    mock_market_prices({})
+    result = synthetic_portfolios(
+        users=1, accounts_per_user=3, holdings_per_account=4, securities=8, price_years=0.02
+    )
+    client.force_login(User.objects.get(id=result.user_ids[0]))
+    url = reverse("portfolio:dashboard")
+
+    pages = {}
+    for preformat in (False, True):
+        settings.DISPLAY_PREFORMAT = preformat
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        # Only the per-request CSRF token may differ
+        pages[preformat] = re.sub(
+            r'name="csrfmiddlewaretoken" value="\w+"', "", response.content.decode()
+        )
+
+    assert 'data-testid="allocation-table-percent"' in pages[True]
+    assert pages[True] == pages[False]
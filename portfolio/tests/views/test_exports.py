@@ -0,0 +1,102 @@
+"""
+Tests for streaming export views.
+
+Tests: portfolio/views/exports.py
+"""
+
+import csv
+import io
+from typing import Any
+
+from django.http import StreamingHttpResponse
+from django.urls import reverse
+
+import pytest
+
+
+def _read_csv(response: Any) -> list[list[str]]:
+    content = b"".join(response.streaming_content).decode("utf-8")
+    return list(csv.reader(io.StringIO(content)))
+
+
+@pytest.mark.views
+@pytest.mark.integration
+class TestExportViews:
+    """Test holdings and allocation export endpoints."""
+
+    def test_holdings_export_streams_csv(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse("portfolio:holdings_export"))
+
+        assert response.status_code == 200
+        assert isinstance(response, StreamingHttpResponse)
+        assert response["Content-Type"] == "text/csv"
+        assert "holdings_effective_" in response["Content-Disposition"]
+        rows = _read_csv(response)
+        assert rows[0][:2] == ["Account", "Ticker"]
+        assert any(row[1] == "VTI" for row in rows[1:])
+
+    def test_account_holdings_export(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+        account = simple_holdings["account"]
+
+        url = reverse("portfolio:account_holdings_export", kwargs={"account_id": account.id})
+        response = client.get(url)
+
+        assert response.status_code == 200
+        rows = _read_csv(response)
+        vti_rows = [row for row in rows[1:] if row[1] == "VTI"]
+        assert len(vti_rows) == 1
+        assert float(vti_rows[0][8]) == pytest.approx(1000.0)
+
+    def test_account_holdings_export_filename_is_encoded(self, client, simple_holdings):
+        """Quotes and non-ASCII characters in the account name stay in a valid header."""
+        client.force_login(simple_holdings["user"])
+        account = simple_holdings["account"]
+        account.name = 'Café "Joint"'
+        account.save()
+
+        url = reverse("portfolio:account_holdings_export", kwargs={"account_id": account.id})
+        response = client.get(url)
+
+        disposition = response["Content-Disposition"]
+        assert disposition.startswith(
+            "attachment; filename*=utf-8''holdings_Caf%C3%A9_%22Joint%22_"
+        )
+        assert disposition.endswith(".csv")
+
+    def test_account_holdings_export_other_user_denied(
+        self, client, simple_holdings, django_user_model
+    ):
+        other = django_user_model.objects.create_user(username="other", password="pw-123456789")
+        client.force_login(other)
+        account = simple_holdings["account"]
+
+        url = reverse("portfolio:account_holdings_export", kwargs={"account_id": account.id})
+        response = client.get(url)
+
+        assert response.status_code == 302
+
+    def test_allocation_export_has_account_type_columns(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse("portfolio:allocations_export"))
+
+        assert response.status_code == 200
+        rows = _read_csv(response)
+        header = rows[0]
+        assert header[:4] == ["Row Type", "Group", "Category", "Asset Class"]
+        assert "Portfolio Actual" in header
+        assert rows[-1][0] == "Grand Total"
+
+    def test_unsupported_format_rejected(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse("portfolio:holdings_export"), {"format": "xlsx"})
+
+        assert response.status_code == 400
+
+    def test_export_requires_login(self, client):
+        response = client.get(reverse("portfolio:holdings_export"))
+        assert response.status_code == 302
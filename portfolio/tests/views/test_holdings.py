@@ -177,6 +177,63 @@ class TestHoldingsViewPost:
         assert h1.shares == Decimal("7.5")
         assert h2.shares == Decimal("12.0")
 
+    def test_bulk_update_query_count_independent_of_rows(
+        self, setup_view, django_assert_max_num_queries
+    ):
+        """Ownership check and writes are set-based, not one query per row."""
+        setup = setup_view
+        system = setup["system"]
+        securities = [system.vti, system.vxus, system.bnd, system.vgsh]
+        holdings = [
+            Holding.objects.create(account=setup["account"], security=s, shares=1)
+            for s in securities
+        ]
+
+        url = reverse("portfolio:account_holdings", args=[setup["account"].id])
+        data: dict[str, Any] = {"holding_ids": [h.id for h in holdings]}
+        data.update({f"shares_{h.id}": "3" for h in holdings})
+
+        # session/user, account check, ownership check, bulk update (+ savepoints)
+        with django_assert_max_num_queries(8):
+            setup["client"].post(url, data)
+
+        assert all(
+            h.shares == Decimal("3") for h in Holding.objects.filter(id__in=data["holding_ids"])
+        )
+
+    def test_bulk_update_skips_invalid_and_foreign_rows(self, setup_view, django_user_model):
+        """Per-row failures are skipped while valid rows are still saved."""
+        from portfolio.models import Portfolio as PortfolioModel
+
+        setup = setup_view
+        system = setup["system"]
+        mine = Holding.objects.create(account=setup["account"], security=system.vti, shares=5)
+
+        other_user = django_user_model.objects.create_user(username="bulkother", password="x")
+        other_account = Account.objects.create(
+            user=other_user,
+            portfolio=PortfolioModel.objects.create(user=other_user, name="Other"),
+            name="Other",
+            account_type=system.type_taxable,
+            institution=system.institution,
+        )
+        theirs = Holding.objects.create(account=other_account, security=system.vti, shares=5)
+
+        url = reverse("portfolio:account_holdings", args=[setup["account"].id])
+        data = {
+            "holding_ids": [mine.id, theirs.id, "abc", 99999],
+            f"shares_{mine.id}": "6",
+            f"shares_{theirs.id}": "50",
+            "shares_99999": "1",
+        }
+        response = setup["client"].post(url, data, follow=True)
+
+        assert "Updated 1 holdings" in response.content.decode()
+        mine.refresh_from_db()
+        theirs.refresh_from_db()
+        assert mine.shares == Decimal("6")
+        assert theirs.shares == Decimal("5")
+
 
 @pytest.mark.views
 @pytest.mark.integration
@@ -326,6 +383,20 @@ class TestTickerAccountDetailsView:
         # Check subtotals (grouping by account type)
         assert f"{setup['accounts'][0].account_type.label} Subtotal" in content
 
+    def test_ticker_details_query_count_independent_of_accounts(
+        self, setup_details, django_assert_max_num_queries
+    ):
+        """Account breakdown comes from a single holdings query, not per account."""
+        setup = setup_details
+        url = reverse("portfolio:ticker_details", args=[setup["security"].ticker])
+
+        # Session + user lookups plus one holdings query
+        with django_assert_max_num_queries(4):
+            response = setup["client"].get(url)
+
+        assert response.status_code == 200
+        assert "30.0000" in response.content.decode()
+
     def test_ticker_details_requires_login(self, client):
         url = reverse("portfolio:ticker_details", args=["VTI"])
         response = client.get(url)
@@ -342,3 +413,74 @@ class TestTickerAccountDetailsView:
         assert "Total" in content
         # Should show 0 totals
         assert "0.0000" in content
+
+
+@pytest.mark.views
+@pytest.mark.integration
+class TestHoldingsImportView:
+    """Test the holdings file import endpoint."""
+
+    def test_import_csv_upload(self, client, simple_holdings):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        client.force_login(simple_holdings["user"])
+        account = simple_holdings["account"]
+        upload = SimpleUploadedFile("positions.csv", b"Ticker,Shares\nVTI,12\nBND,4\n")
+
+        url = reverse("portfolio:account_holdings_import", kwargs={"account_id": account.id})
+        response = client.post(url, {"file": upload}, follow=True)
+
+        assert response.status_code == 200
+        shares = dict(account.holdings.values_list("security__ticker", "shares"))
+        assert shares == {"VTI": Decimal("12"), "BND": Decimal("4")}
+        assert any("1 added, 1 updated" in str(m) for m in response.context["messages"])
+
+    def test_import_unsupported_file_type(self, client, simple_holdings):
+        from django.core.files.uploadedfile import SimpleUploadedFile
+
+        client.force_login(simple_holdings["user"])
+        account = simple_holdings["account"]
+        upload = SimpleUploadedFile("positions.xlsx", b"binary")
+
+        url = reverse("portfolio:account_holdings_import", kwargs={"account_id": account.id})
+        response = client.post(url, {"file": upload}, follow=True)
+
+        assert any("Unsupported" in str(m) for m in response.context["messages"])
+        assert account.holdings.get().shares == Decimal("10")
+
+
+@pytest.mark.views
+@pytest.mark.integration
+class TestHoldingsPreformatted:
+    """Pre-formatted display strings render the same table as the filters."""
+
+    def render(self, client: Any, settings: Any, url: str, preformat: bool) -> str:
+        import re
+
+        from django.core.cache import cache
+
+        settings.DISPLAY_PREFORMAT = preformat
+        cache.clear()
+        response = client.get(url)
+        assert response.status_code == 200
+        # Only the per-request CSRF token may differ
+        return re.sub(r'name="csrfmiddlewaretoken" value="\w+"', "", response.content.decode())
+
+    def test_holdings_tables_match_filters(
+        self, client: Any, settings: Any, synthetic_portfolios: Any, mock_market_prices: Any
+    ) -> None:
+        mock_market_prices({})
+        result = synthetic_portfolios(
+            users=1, accounts_per_user=2, holdings_per_account=4, securities=6, price_years=0.02
+        )
+        user = User.objects.get(id=result.user_ids[0])
+        client.force_login(user)
+        account = Account.objects.filter(user=user).first()
+
+        for url in (
+            reverse("portfolio:holdings"),
+            reverse("portfolio:account_holdings", args=[account.id]),
+        ):
+            html = self.render(client, settings, url, preformat=True)
+            assert 'data-testid="holdings-table"' in html
+            assert html == self.render(client, settings, url, preformat=False)
@@ -0,0 +1,53 @@
+"""Tests for the Prometheus metrics endpoint."""
+
+from django.urls import reverse
+
+import pytest
+
+
+@pytest.mark.views
+@pytest.mark.integration
+@pytest.mark.django_db
+def test_metrics_endpoint_returns_prometheus_text(client):
+    """Metrics endpoint should serve the Prometheus text format."""
+    client.get(reverse("health"))
+
+    response = client.get(reverse("metrics"))
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = response.content.decode()
+    assert "# TYPE portfolio_request_duration_seconds histogram" in body
+    assert 'view="health"' in body
+
+
+@pytest.mark.views
+@pytest.mark.integration
+@pytest.mark.django_db
+class TestMetricsAccess:
+    REMOTE = "203.0.113.7"
+
+    def test_other_address_forbidden(self, client):
+        response = client.get(reverse("metrics"), REMOTE_ADDR=self.REMOTE)
+
+        assert response.status_code == 403
+
+    def test_allowed_network(self, client, settings):
+        settings.METRICS_ALLOWED_IPS = ["203.0.113.0/24"]
+
+        response = client.get(reverse("metrics"), REMOTE_ADDR=self.REMOTE)
+
+        assert response.status_code == 200
+
+    def test_token_grants_access(self, client, settings):
+        settings.METRICS_TOKEN = "s3cret"
+
+        allowed = client.get(
+            reverse("metrics"), REMOTE_ADDR=self.REMOTE, HTTP_AUTHORIZATION="Bearer s3cret"
+        )
+        denied = client.get(
+            reverse("metrics"), REMOTE_ADDR=self.REMOTE, HTTP_AUTHORIZATION="Bearer wrong"
+        )
+
+        assert allowed.status_code == 200
+        assert denied.status_code == 403
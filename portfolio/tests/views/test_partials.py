@@ -0,0 +1,125 @@
+"""
+Tests for HTMX partial endpoints and version-keyed fragment caching.
+
+Tests: portfolio/views/partials.py
+"""
+
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import pytest
+
+from portfolio.models import Holding
+
+
+@pytest.fixture(autouse=True)
+def clear_fragment_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def _query_count(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return response, len(ctx.captured_queries)
+
+
+@pytest.mark.views
+@pytest.mark.integration
+class TestPartialViews:
+    """Test the fragment endpoints render and reuse cached fragments."""
+
+    @pytest.mark.parametrize(
+        "url_name", ["sidebar_partial", "allocation_tables_partial", "holdings_table_partial"]
+    )
+    def test_partial_renders_fragment(self, client, simple_holdings, url_name):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse(f"portfolio:{url_name}"))
+
+        assert response.status_code == 200
+        assert b"<html" not in response.content.lower()
+
+    def test_account_holdings_partial(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+        url = reverse(
+            "portfolio:account_holdings_table_partial",
+            kwargs={"account_id": simple_holdings["account"].id},
+        )
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert b"VTI" in response.content
+
+    def test_account_partial_rejects_other_users_account(
+        self, client, simple_holdings, test_user_with_name
+    ):
+        client.force_login(test_user_with_name("intruder"))
+        url = reverse(
+            "portfolio:account_holdings_table_partial",
+            kwargs={"account_id": simple_holdings["account"].id},
+        )
+
+        response = client.get(url)
+
+        assert response.status_code == 302
+
+    def test_invalid_target_mode_returns_400(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+
+        response = client.get(reverse("portfolio:holdings_table_partial") + "?target=bogus")
+
+        assert response.status_code == 400
+
+    def test_requires_login(self, client, db):
+        response = client.get(reverse("portfolio:allocation_tables_partial"))
+
+        assert response.status_code == 302
+
+    @pytest.mark.parametrize("url_name", ["allocation_tables_partial", "holdings_table_partial"])
+    def test_cached_fragment_skips_computation(self, client, simple_holdings, url_name):
+        client.force_login(simple_holdings["user"])
+        url = reverse(f"portfolio:{url_name}")
+
+        first, first_queries = _query_count(client, url)
+        second, second_queries = _query_count(client, url)
+
+        assert second.content == first.content
+        assert second_queries < first_queries
+
+    def test_holding_change_invalidates_fragment(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+        url = reverse("portfolio:holdings_table_partial")
+        client.get(url)
+
+        holding = Holding.objects.get(account=simple_holdings["account"])
+        holding.shares = Decimal("20")
+        holding.save()
+
+        _, queries_after_change = _query_count(client, url)
+        _, queries_cached = _query_count(client, url)
+
+        assert queries_cached < queries_after_change
+
+
+@pytest.mark.views
+@pytest.mark.integration
+class TestPagesUseCachedFragments:
+    """Full pages share the cached fragments with the partial endpoints."""
+
+    def test_dashboard_reuses_cached_tables(self, client, simple_holdings):
+        client.force_login(simple_holdings["user"])
+        url = reverse("portfolio:dashboard")
+
+        first, first_queries = _query_count(client, url)
+        _, second_queries = _query_count(client, url)
+
+        assert "sidebar_data" in first.context
+        assert second_queries < first_queries
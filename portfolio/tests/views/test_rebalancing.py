@@ -1,6 +1,7 @@
 """Tests for rebalancing views."""
 
 from decimal import Decimal
+from unittest.mock import patch
 
 from django.urls import reverse
 from django.utils import timezone
@@ -8,11 +9,14 @@ from django.utils import timezone
 import pytest
 
 from portfolio.models import (
+    Account,
     AllocationStrategy,
     Holding,
+    RebalancingJob,
     SecurityPrice,
     TargetAllocation,
 )
+from portfolio.services.rebalancing.jobs import claim_next_job, current_data_version, run_job
 
 
 @pytest.mark.django_db
@@ -229,7 +233,7 @@ class TestRebalancingExportView:
         url = reverse("portfolio:rebalancing_export", kwargs={"account_id": account.id})
         response = client.get(url)
 
-        content = response.content.decode("utf-8")
+        content = b"".join(response.streaming_content).decode("utf-8")
         lines = content.strip().split("\n")
 
         assert len(lines) >= 1
@@ -262,3 +266,116 @@ class TestRebalancingExportView:
 
         # Should redirect with error
         assert response.status_code == 302
+
+
+@pytest.mark.django_db
+class TestRebalancingJobQueue:
+    """Tests for the rebalancing page with REBALANCING_JOB_QUEUE enabled."""
+
+    @pytest.fixture
+    def queued_setup(self, simple_holdings, client, settings):
+        settings.REBALANCING_JOB_QUEUE = True
+        system = simple_holdings["system"]
+        account = simple_holdings["account"]
+        strategy = AllocationStrategy.objects.create(
+            user=simple_holdings["user"], name="Queued Strategy"
+        )
+        TargetAllocation.objects.create(
+            strategy=strategy,
+            asset_class=system.asset_class_us_equities,
+            target_percent=Decimal("60.00"),
+        )
+        account.allocation_strategy = strategy
+        account.save()
+        client.force_login(simple_holdings["user"])
+        return {"account": account, "client": client}
+
+    def test_page_queues_job_and_shows_progress(self, queued_setup):
+        client = queued_setup["client"]
+        account = queued_setup["account"]
+
+        response = client.get(reverse("portfolio:rebalancing", args=[account.id]))
+
+        job = RebalancingJob.objects.get(account=account)
+        assert response.status_code == 200
+        assert response.context["plan"] is None
+        assert response.context["job"] == job
+        assert reverse("portfolio:rebalancing_job_status", args=[account.id, job.id]) in (
+            response.content.decode()
+        )
+
+    def test_job_keyed_after_price_refresh(self, queued_setup, simple_holdings):
+        """Prices refreshed by the page load are part of the queued job's version."""
+        client = queued_setup["client"]
+        account = queued_setup["account"]
+
+        def refresh(user):
+            SecurityPrice.objects.create(
+                security=simple_holdings["system"].vti,
+                price=Decimal("105"),
+                price_datetime=timezone.now(),
+                source="manual",
+            )
+
+        with patch("portfolio.views.mixins.refresh_stale_prices", side_effect=refresh):
+            response = client.get(reverse("portfolio:rebalancing", args=[account.id]))
+
+        assert response.context["job"].data_version == current_data_version(account)
+
+    def test_page_shows_plan_once_job_finished(self, queued_setup):
+        client = queued_setup["client"]
+        account = queued_setup["account"]
+        url = reverse("portfolio:rebalancing", args=[account.id])
+        client.get(url)
+        run_job(claim_next_job())
+
+        response = client.get(url)
+
+        assert response.status_code == 200
+        assert response.context["plan"].account == account
+        assert "job" not in response.context
+        assert RebalancingJob.objects.filter(account=account).count() == 1
+
+    def test_status_polls_until_finished(self, queued_setup):
+        client = queued_setup["client"]
+        account = queued_setup["account"]
+        client.get(reverse("portfolio:rebalancing", args=[account.id]))
+        job = RebalancingJob.objects.get(account=account)
+        url = reverse("portfolio:rebalancing_job_status", args=[account.id, job.id])
+
+        pending = client.get(url)
+        run_job(claim_next_job())
+        finished = client.get(url)
+
+        assert pending.status_code == 200
+        assert "HX-Refresh" not in pending
+        assert 'hx-trigger="every 2s"' in pending.content.decode()
+        assert finished["HX-Refresh"] == "true"
+
+    def test_status_of_other_accounts_job_is_404(self, queued_setup, roth_account, test_portfolio):
+        client = queued_setup["client"]
+        account = queued_setup["account"]
+        job = RebalancingJob.objects.create(account=account, data_version="v")
+        other = Account.objects.create(
+            user=test_portfolio["user"],
+            name="Other Roth",
+            portfolio=account.portfolio,
+            account_type=account.account_type,
+            institution=account.institution,
+        )
+
+        response = client.get(reverse("portfolio:rebalancing_job_status", args=[other.id, job.id]))
+
+        assert response.status_code == 404
+
+    def test_export_uses_saved_plan(self, queued_setup):
+        client = queued_setup["client"]
+        account = queued_setup["account"]
+        client.get(reverse("portfolio:rebalancing", args=[account.id]))
+        run_job(claim_next_job())
+
+        with patch("portfolio.views.rebalancing.RebalancingEngine") as engine:
+            response = client.get(reverse("portfolio:rebalancing_export", args=[account.id]))
+
+        assert response.status_code == 200
+        engine.assert_not_called()
@@ -480,3 +480,102 @@ class TestTargetAllocationViewCoverage:
         # Should redirect to login
         assert response.status_code == 302
         assert "/accounts/login/" in response.url
+
+
+@pytest.mark.views
+@pytest.mark.integration
+class TestTargetAllocationSaveQueries:
+    """Strategy assignments are saved with set-based queries."""
+
+    def _post_overrides(self, client: Any, setup: dict[str, Any], strategy_id: int) -> Any:
+        user = setup["user"]
+        data = {
+            f"strategy_acc_{account.id}": str(strategy_id)
+            for account in Account.objects.filter(user=user)
+        }
+        data[f"strategy_at_{setup['system'].type_roth.id}"] = str(strategy_id)
+        return client.post(reverse("portfolio:target_allocations"), data)
+
+    def test_query_count_independent_of_account_count(
+        self, client: Any, targets_view_setup: dict[str, Any]
+    ) -> None:
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        setup = targets_view_setup
+        client.force_login(setup["user"])
+
+        with CaptureQueriesContext(connection) as few:
+            self._post_overrides(client, setup, setup["strategy_conservative"].id)
+
+        for i in range(10):
+            Account.objects.create(
+                user=setup["user"],
+                name=f"Extra {i}",
+                portfolio=setup["acc_roth"].portfolio,
+                account_type=setup["system"].type_roth,
+                institution=setup["acc_roth"].institution,
+            )
+        with CaptureQueriesContext(connection) as many:
+            self._post_overrides(client, setup, setup["strategy_aggressive"].id)
+
+        assert len(many) == len(few)
+        assert set(
+            Account.objects.filter(user=setup["user"]).values_list(
+                "allocation_strategy_id", flat=True
+            )
+        ) == {setup["strategy_aggressive"].id}
+
+    def test_unchanged_assignments_are_not_written(
+        self, client: Any, targets_view_setup: dict[str, Any]
+    ) -> None:
+        from portfolio.models import Portfolio
+
+        setup = targets_view_setup
+        client.force_login(setup["user"])
+        self._post_overrides(client, setup, setup["strategy_conservative"].id)
+        version = Portfolio.objects.get(user=setup["user"]).version
+
+        response = self._post_overrides(client, setup, setup["strategy_conservative"].id)
+
+        assert response.status_code == 302
+        assert Portfolio.objects.get(user=setup["user"]).version == version
+
+    def test_changes_bump_portfolio_version(
+        self, client: Any, targets_view_setup: dict[str, Any]
+    ) -> None:
+        from portfolio.models import Portfolio
+
+        setup = targets_view_setup
+        client.force_login(setup["user"])
+        version = Portfolio.objects.get(user=setup["user"]).version
+
+        self._post_overrides(client, setup, setup["strategy_aggressive"].id)
+
+        assert Portfolio.objects.get(user=setup["user"]).version > version
+        assignment = AccountTypeStrategyAssignment.objects.get(
+            user=setup["user"], account_type=setup["system"].type_roth
+        )
+        assert assignment.allocation_strategy == setup["strategy_aggressive"]
+
+    def test_other_users_strategy_is_ignored(
+        self, client: Any, targets_view_setup: dict[str, Any]
+    ) -> None:
+        setup = targets_view_setup
+        client.force_login(setup["user"])
+        other = get_user_model().objects.create_user(username="other", password="password")
+        foreign = AllocationStrategy.objects.create(user=other, name="Foreign")
+        setup["acc_roth"].allocation_strategy = setup["strategy_conservative"]
+        setup["acc_roth"].save()
+
+        response = client.post(
+            reverse("portfolio:target_allocations"),
+            {
+                f"strategy_acc_{setup['acc_roth'].id}": str(foreign.id),
+                f"strategy_acc_{setup['acc_taxable'].id}": "not-an-id",
+            },
+        )
+
+        assert response.status_code == 302
+        setup["acc_roth"].refresh_from_db()
+        assert setup["acc_roth"].allocation_strategy == setup["strategy_conservative"]
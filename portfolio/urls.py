@@ -1,22 +1,45 @@
+from django.conf import settings
 from django.urls import path
 
 from portfolio import views
 
 app_name = "portfolio"
 
+# Async page variants for ASGI deployments (config/asgi.py)
+if settings.ASYNC_VIEWS:
+    dashboard_view = views.AsyncDashboardView.as_view()
+    holdings_view = views.AsyncHoldingsView.as_view()
+    rebalancing_view = views.AsyncRebalancingView.as_view()
+else:
+    dashboard_view = views.DashboardView.as_view()
+    holdings_view = views.HoldingsView.as_view()
+    rebalancing_view = views.RebalancingView.as_view()
+
 urlpatterns = [
-    path("", views.DashboardView.as_view(), name="dashboard"),
-    path("holdings/", views.HoldingsView.as_view(), name="holdings"),
+    path("", dashboard_view, name="dashboard"),
+    path("holdings/", holdings_view, name="holdings"),
+    path("holdings/export/", views.HoldingsExportView.as_view(), name="holdings_export"),
     path(
         "holdings/ticker/<str:ticker>/details/",
         views.TickerAccountDetailsView.as_view(),
         name="ticker_details",
     ),
     path("targets/", views.TargetAllocationView.as_view(), name="target_allocations"),
-    path("account/<int:account_id>/", views.HoldingsView.as_view(), name="account_holdings"),
+    path("allocations/export/", views.AllocationExportView.as_view(), name="allocations_export"),
+    path("account/<int:account_id>/", holdings_view, name="account_holdings"),
+    path(
+        "account/<int:account_id>/export/",
+        views.AccountHoldingsExportView.as_view(),
+        name="account_holdings_export",
+    ),
+    path(
+        "account/<int:account_id>/import/",
+        views.HoldingsImportView.as_view(),
+        name="account_holdings_import",
+    ),
     path(
         "account/<int:account_id>/rebalance/",
-        views.RebalancingView.as_view(),
+        rebalancing_view,
         name="rebalancing",
     ),
     path(
@@ -24,10 +47,46 @@ urlpatterns = [
         views.RebalancingExportView.as_view(),
         name="rebalancing_export",
     ),
+    path(
+        "account/<int:account_id>/rebalance/jobs/<int:job_id>/",
+        views.RebalancingJobStatusView.as_view(),
+        name="rebalancing_job_status",
+    ),
     path("strategies/new/", views.AllocationStrategyCreateView.as_view(), name="strategy_create"),
     path(
         "strategies/<int:pk>/edit/",
         views.AllocationStrategyUpdateView.as_view(),
         name="strategy_update",
     ),
+    # HTMX partials (cached fragments)
+    path("partials/sidebar/", views.SidebarPartialView.as_view(), name="sidebar_partial"),
+    path(
+        "partials/allocations/",
+        views.AllocationTablesPartialView.as_view(),
+        name="allocation_tables_partial",
+    ),
+    path(
+        "partials/holdings/",
+        views.HoldingsTablePartialView.as_view(),
+        name="holdings_table_partial",
+    ),
+    path(
+        "account/<int:account_id>/partials/holdings/",
+        views.HoldingsTablePartialView.as_view(),
+        name="account_holdings_table_partial",
+    ),
+    # Read-only JSON API
+    path("api/allocations/", views.AllocationsAPIView.as_view(), name="api_allocations"),
+    path("api/holdings/", views.HoldingsAPIView.as_view(), name="api_holdings"),
+    path("api/sidebar/", views.SidebarAPIView.as_view(), name="api_sidebar"),
+    path(
+        "api/accounts/<int:account_id>/holdings/",
+        views.AccountHoldingsAPIView.as_view(),
+        name="api_account_holdings",
+    ),
+    path(
+        "api/accounts/<int:account_id>/rebalancing/",
+        views.RebalancingAPIView.as_view(),
+        name="api_rebalancing",
+    ),
 ]
@@ -1,6 +1,6 @@
 """Security utilities for input validation and access control."""
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator
 from contextlib import contextmanager
 from typing import Any, cast
 
@@ -101,6 +101,35 @@ def validate_user_owns_holding(user: Any, holding_id: int) -> Holding:
     return cast(Holding, holding)
 
 
+def get_user_owned_holdings(user: Any, holding_ids: Iterable[int]) -> dict[int, Holding]:
+    """
+    Set-based ownership check for many holdings in one query.
+
+    Args:
+        user: User object
+        holding_ids: Holding IDs to validate
+
+    Returns:
+        Dict of holding_id -> Holding for the IDs the user owns. IDs that don't
+        exist or belong to another user are absent from the result.
+    """
+    ids = set(holding_ids)
+    holdings = {
+        h.id: h
+        for h in Holding.objects.select_related("security").filter(id__in=ids, account__user=user)
+    }
+
+    denied = ids - holdings.keys()
+    if denied:
+        logger.warning(
+            "unauthorized_holding_access_attempt",
+            user_id=user.id,
+            holding_ids=sorted(denied),
+        )
+
+    return holdings
+
+
 def validate_user_owns_strategy(user: Any, strategy_id: int) -> AllocationStrategy:
     """
     Validate that user owns the specified allocation strategy.
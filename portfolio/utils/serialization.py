@@ -0,0 +1,88 @@
+"""
+Fast JSON serialization for API responses.
+
+Handles the types produced by the allocation and rebalancing engines:
+Decimal, numpy scalars/arrays, pandas timestamps, enums, dates and
+non-string dict keys. NaN and infinity are emitted as ``null``.
+
+Uses ``orjson`` when installed (``pip install portfolio-management[api]``)
+and falls back to the standard library otherwise; both produce the same JSON.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from types import ModuleType
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+_orjson: ModuleType | None
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    _orjson = None
+else:
+    _orjson = orjson
+
+
+def _default(obj: Any) -> Any:
+    """Convert non-native types to JSON-compatible values."""
+    if isinstance(obj, Decimal):
+        return float(obj) if obj.is_finite() else None
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, pd.Timestamp):
+        return None if pd.isna(obj) else obj.isoformat()
+    if isinstance(obj, datetime | date | time):
+        return obj.isoformat()
+    if isinstance(obj, set | frozenset):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _to_builtin(obj: Any) -> Any:
+    """Recursively convert to builtin JSON types (stdlib fallback path)."""
+    if obj is None or isinstance(obj, str | bool):
+        return obj
+    if isinstance(obj, Enum):
+        return _to_builtin(obj.value)
+    if isinstance(obj, int):
+        return obj
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {_key(k): _to_builtin(v) for k, v in obj.items()}
+    if isinstance(obj, list | tuple):
+        return [_to_builtin(v) for v in obj]
+    return _to_builtin(_default(obj))
+
+
+def _key(key: Any) -> str:
+    if isinstance(key, str):
+        return key
+    value = _to_builtin(key)
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to UTF-8 encoded JSON bytes."""
+    if _orjson is not None:
+        encoded: bytes = _orjson.dumps(
+            obj,
+            default=_default,
+            option=_orjson.OPT_SERIALIZE_NUMPY | _orjson.OPT_NON_STR_KEYS,
+        )
+        return encoded
+    return json.dumps(_to_builtin(obj), separators=(",", ":"), allow_nan=False).encode()
@@ -1,20 +1,57 @@
 from __future__ import annotations
 
-from .dashboard import DashboardView
+from .api import (
+    AccountHoldingsAPIView,
+    AllocationsAPIView,
+    HoldingsAPIView,
+    RebalancingAPIView,
+    SidebarAPIView,
+)
+from .dashboard import AsyncDashboardView, DashboardView
+from .exports import AccountHoldingsExportView, AllocationExportView, HoldingsExportView
 from .health import HealthCheckView
-from .holdings import HoldingsView, TickerAccountDetailsView
-from .rebalancing import RebalancingExportView, RebalancingView
+from .holdings import (
+    AsyncHoldingsView,
+    HoldingsImportView,
+    HoldingsView,
+    TickerAccountDetailsView,
+)
+from .metrics import MetricsView
+from .partials import AllocationTablesPartialView, HoldingsTablePartialView, SidebarPartialView
+from .rebalancing import (
+    AsyncRebalancingView,
+    RebalancingExportView,
+    RebalancingJobStatusView,
+    RebalancingView,
+)
 from .strategies import AllocationStrategyCreateView, AllocationStrategyUpdateView
 from .targets import TargetAllocationView
 
 __all__ = [
+    "AccountHoldingsAPIView",
+    "AccountHoldingsExportView",
+    "AllocationExportView",
+    "AllocationsAPIView",
     "AllocationStrategyCreateView",
     "AllocationStrategyUpdateView",
+    "AllocationTablesPartialView",
+    "AsyncDashboardView",
+    "AsyncHoldingsView",
+    "AsyncRebalancingView",
     "DashboardView",
     "HealthCheckView",
+    "HoldingsAPIView",
+    "HoldingsExportView",
+    "HoldingsImportView",
+    "HoldingsTablePartialView",
     "HoldingsView",
+    "MetricsView",
+    "RebalancingAPIView",
     "RebalancingExportView",
+    "RebalancingJobStatusView",
     "RebalancingView",
+    "SidebarAPIView",
+    "SidebarPartialView",
     "TargetAllocationView",
     "TickerAccountDetailsView",
 ]
@@ -0,0 +1,148 @@
+"""
+Read-only JSON API over the allocation and rebalancing engines.
+
+Every endpoint supports conditional GET: the ETag and ``Last-Modified``
+headers are derived from the user's portfolio data version, which is read
+without computing the payload. Unchanged resources are answered with
+``304 Not Modified`` before any engine work runs.
+"""
+
+from __future__ import annotations
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Any
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from django.views import View
+
+from portfolio.models import Account
+from portfolio.services.allocations import AllocationEngine
+from portfolio.services.rebalancing import RebalancingEngine
+from portfolio.services.versioning import PortfolioVersion, get_portfolio_version
+from portfolio.utils.security import (
+    AccessControlError,
+    InvalidInputError,
+    validate_target_mode,
+    validate_user_owns_account,
+)
+from portfolio.utils.serialization import dumps
+
+logger = logging.getLogger(__name__)
+
+JSON_CONTENT_TYPE = "application/json"
+
+
+class PortfolioAPIView(LoginRequiredMixin, View, ABC):
+    """
+    Base class for versioned, read-only JSON endpoints.
+
+    Subclasses set ``resource`` and implement ``get_data()``; input and
+    ownership checks go in ``prepare()``, which runs before the conditional
+    check. Query parameters and URL kwargs are part of the ETag, so each
+    variant is validated independently.
+    """
+
+    raise_exception = True  # 403 instead of a login redirect
+    http_method_names = ["get", "head", "options"]
+    resource = ""
+
+    def prepare(self) -> None:
+        """Validate inputs (raise InvalidInputError / AccessControlError)."""
+
+    @abstractmethod
+    def get_data(self) -> Any:
+        """JSON-serializable payload, computed only when the ETag does not match."""
+
+    def get_etag(self, version: PortfolioVersion) -> str:
+        params = sorted(self.request.GET.items())
+        return quote_etag(version.etag(self.resource, sorted(self.kwargs.items()), params))
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        try:
+            self.prepare()
+        except InvalidInputError as e:
+            return JsonResponse({"error": e.messages[0]}, status=400)
+        except AccessControlError as e:
+            return JsonResponse({"error": str(e)}, status=403)
+
+        version = get_portfolio_version(request.user)
+        etag = self.get_etag(version)
+        last_modified = int(version.modified_at.timestamp()) if version.modified_at else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = HttpResponse(dumps(self.get_data()), content_type=JSON_CONTENT_TYPE)
+
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # Per-user data: never share, always revalidate
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+
+class AccountAPIMixin:
+    """Validates ownership of the ``account_id`` URL kwarg in ``prepare()``."""
+
+    request: HttpRequest
+    kwargs: dict[str, Any]
+    account: Account
+
+    def prepare(self) -> None:
+        self.account = validate_user_owns_account(self.request.user, self.kwargs["account_id"])
+
+
+class AllocationsAPIView(PortfolioAPIView):
+    """Allocation presentation rows (dashboard/targets table)."""
+
+    resource = "allocations"
+
+    def get_data(self) -> Any:
+        return {"rows": AllocationEngine().get_presentation_rows(self.request.user)}
+
+
+class HoldingsAPIView(PortfolioAPIView):
+    """Holdings aggregated by ticker across all accounts."""
+
+    resource = "holdings"
+    target_mode = "effective"
+
+    def prepare(self) -> None:
+        self.target_mode = validate_target_mode(self.request.GET.get("target"))
+
+    def get_data(self) -> Any:
+        rows = AllocationEngine().get_aggregated_holdings_rows(self.request.user, self.target_mode)
+        return {"target_mode": self.target_mode, "rows": rows}
+
+
+class AccountHoldingsAPIView(AccountAPIMixin, PortfolioAPIView):
+    """Holdings rows for one account."""
+
+    resource = "account_holdings"
+
+    def get_data(self) -> Any:
+        rows = AllocationEngine().get_holdings_rows(self.request.user, account_id=self.account.id)
+        return {"account_id": self.account.id, "rows": rows}
+
+
+class SidebarAPIView(PortfolioAPIView):
+    """Sidebar totals and account groups."""
+
+    resource = "sidebar"
+
+    def get_data(self) -> Any:
+        data = AllocationEngine().get_sidebar_data(self.request.user)
+        return {key: value for key, value in data.items() if key != "query_count"}
+
+
+class RebalancingAPIView(AccountAPIMixin, PortfolioAPIView):
+    """Rebalancing plan for one account."""
+
+    resource = "rebalancing"
+
+    def get_data(self) -> Any:
+        return RebalancingEngine(self.account).generate_plan().to_dict()
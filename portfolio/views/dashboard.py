@@ -1,12 +1,20 @@
+from functools import partial
 from typing import Any, cast
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpRequest, HttpResponse
+from django.utils.functional import SimpleLazyObject
 from django.views.generic import TemplateView
 
 import structlog
 
 from portfolio.services.allocations import get_presentation_rows
-from portfolio.views.mixins import PortfolioContextMixin
+from portfolio.views.mixins import (
+    AsyncLoginRequiredMixin,
+    AsyncPortfolioContextMixin,
+    PortfolioContextMixin,
+)
 
 logger = structlog.get_logger(__name__)
 
@@ -21,15 +29,57 @@ class DashboardView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
         if not user.is_authenticated:
             return context  # Should be unreachable due to LoginRequiredMixin
 
-        # Single clean API call using new allocations module
-        allocation_rows = get_presentation_rows(user=user)
+        context.update(allocation_tables_context(user))
+        return context
 
-        # Template handles money vs percent formatting
-        context["allocation_rows_money"] = allocation_rows
-        context["allocation_rows_percent"] = allocation_rows
 
-        # Extract account types for column structure (required by index.html)
-        if allocation_rows:
-            context["account_types"] = allocation_rows[0].get("account_types", [])
+def allocation_tables_context(
+    user: Any, allocation_rows: list[dict[str, Any]] | None = None
+) -> dict[str, Any]:
+    """
+    Context for the dashboard allocation tables.
 
-        return context
+    Unless ``allocation_rows`` were already loaded, values are lazy so the
+    presentation rows are only computed when the cached table fragment is
+    missing.
+    """
+    # Single clean API call using new allocations module
+    rows: Any = allocation_rows
+    if rows is None:
+        rows = SimpleLazyObject(
+            lambda: get_presentation_rows(user=user, display=settings.DISPLAY_PREFORMAT)
+        )
+
+    # Template handles money vs percent formatting
+    return {
+        "allocation_rows_money": rows,
+        "allocation_rows_percent": rows,
+        # Account types for column structure (required by the allocation tables)
+        "account_types": SimpleLazyObject(lambda: rows[0].get("account_types", []) if rows else []),
+    }
+
+
+class AsyncDashboardView(AsyncLoginRequiredMixin, AsyncPortfolioContextMixin, TemplateView):
+    """Async variant of DashboardView (served with ``ASYNC_VIEWS`` under ASGI)."""
+
+    template_name = "portfolio/index.html"
+
+    # Async handler; see AsyncLoginRequiredMixin
+    async def get(  # type: ignore[override]
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        user = request.user
+        logger.info("dashboard_accessed", user_id=user.id)
+
+        context = self.get_context_data(**kwargs)
+        context.update(await self.aget_fragment_cache_context())
+
+        loaders = {}
+        if not await self.fragment_is_cached("allocation_tables", context["portfolio_version"]):
+            loaders["allocation_rows"] = partial(
+                get_presentation_rows, user=user, display=settings.DISPLAY_PREFORMAT
+            )
+        await self.aload_portfolio_context(context, loaders)
+
+        context.update(allocation_tables_context(user, context.pop("allocation_rows", None)))
+        return self.render_to_response(context)
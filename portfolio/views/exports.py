@@ -0,0 +1,109 @@
+"""Streaming CSV/Parquet export views for holdings and allocations."""
+
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+from django.views import View
+
+from portfolio.services.allocations import AllocationEngine
+from portfolio.services.exports import (
+    HOLDINGS_COLUMNS,
+    ExportColumn,
+    holding_level_rows,
+    parquet_available,
+    presentation_columns,
+    stream_csv,
+    stream_parquet,
+)
+from portfolio.utils.security import InvalidInputError, validate_target_mode
+from portfolio.views.mixins import AccountOwnershipMixin
+
+logger = logging.getLogger(__name__)
+
+PARQUET_CONTENT_TYPE = "application/vnd.apache.parquet"
+
+
+class StreamingExportMixin:
+    """
+    Build streaming download responses in the format requested by ``?format=``.
+
+    Supported formats: ``csv`` (default) and ``parquet`` (requires pyarrow).
+    """
+
+    request: HttpRequest
+
+    def export_response(
+        self, columns: list[ExportColumn], rows: Iterable[Any], filename_stem: str
+    ) -> HttpResponse | StreamingHttpResponse:
+        """Return a streaming attachment response for the given rows."""
+        export_format = self.request.GET.get("format", "csv").lower()
+        stamp = f"{timezone.now():%Y%m%d}"
+
+        if export_format == "csv":
+            response = StreamingHttpResponse(stream_csv(columns, rows), content_type="text/csv")
+            filename = f"{filename_stem}_{stamp}.csv"
+        elif export_format == "parquet":
+            if not parquet_available():
+                return HttpResponseBadRequest("Parquet export requires the pyarrow package.")
+            response = StreamingHttpResponse(
+                stream_parquet(columns, rows), content_type=PARQUET_CONTENT_TYPE
+            )
+            filename = f"{filename_stem}_{stamp}.parquet"
+        else:
+            return HttpResponseBadRequest(f"Unsupported export format: {export_format}")
+
+        # Escapes quotes and encodes non-ASCII names (RFC 6266 filename*)
+        response["Content-Disposition"] = content_disposition_header(True, filename)
+        return response
+
+
+class HoldingsExportView(LoginRequiredMixin, StreamingExportMixin, View):
+    """Export holdings aggregated by ticker across all accounts."""
+
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse | StreamingHttpResponse:
+        try:
+            target_mode = validate_target_mode(request.GET.get("target"))
+        except InvalidInputError as e:
+            return HttpResponseBadRequest(str(e))
+
+        rows = AllocationEngine().get_aggregated_holdings_rows(request.user, target_mode)
+        return self.export_response(
+            HOLDINGS_COLUMNS, holding_level_rows(rows), f"holdings_{target_mode}"
+        )
+
+
+class AccountHoldingsExportView(
+    LoginRequiredMixin, AccountOwnershipMixin, StreamingExportMixin, View
+):
+    """Export holdings for a single account."""
+
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse | StreamingHttpResponse:
+        if not self.validate_account_ownership():
+            return self.get_redirect_response()
+
+        account = self.get_validated_account()
+        rows = AllocationEngine().get_holdings_rows(request.user, account_id=account.id)
+        return self.export_response(
+            HOLDINGS_COLUMNS,
+            holding_level_rows(rows),
+            f"holdings_{account.name.replace(' ', '_')}",
+        )
+
+
+class AllocationExportView(LoginRequiredMixin, StreamingExportMixin, View):
+    """Export the allocation presentation table (dashboard/targets)."""
+
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse | StreamingHttpResponse:
+        rows = AllocationEngine().get_presentation_rows(request.user)
+        return self.export_response(presentation_columns(rows), rows, "allocations")
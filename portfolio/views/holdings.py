@@ -1,21 +1,31 @@
 import logging
+from collections.abc import Iterable
 from decimal import Decimal, DecimalException
-from itertools import groupby
-from operator import itemgetter
+from functools import partial
 from typing import Any
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.http import Http404, HttpRequest, HttpResponse
 from django.shortcuts import redirect, render
+from django.utils.functional import SimpleLazyObject
 from django.views import View
 from django.views.generic import TemplateView
 
-from portfolio.models import Account, Holding, Security
-from portfolio.services.allocations import AllocationEngine
+from asgiref.sync import sync_to_async
+
+from portfolio.forms import HoldingsImportForm
+from portfolio.models import Account, Holding, Portfolio, Security, SecurityPrice
+from portfolio.services.allocations import AllocationEngine, HoldingDelta
+from portfolio.services.holdings_import import HoldingsImporter, detect_format
+from portfolio.services.portfolio_snapshots import schedule_refresh
+from portfolio.services.versioning import PortfolioVersion, get_portfolio_version
 from portfolio.utils.security import (
     AccessControlError,
     InvalidInputError,
+    get_user_owned_holdings,
     handle_holding_operation,
     sanitize_integer_input,
     validate_target_mode,
@@ -23,7 +33,12 @@ from portfolio.utils.security import (
     validate_user_owns_holding,
     validate_view_mode,
 )
-from portfolio.views.mixins import PortfolioContextMixin
+from portfolio.views.mixins import (
+    AccountOwnershipMixin,
+    AsyncLoginRequiredMixin,
+    AsyncPortfolioContextMixin,
+    PortfolioContextMixin,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -35,37 +50,9 @@ class HoldingsView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
         """Handle GET requests with validation."""
-        user = request.user
-
-        # SECURITY: Validate account_id if provided
-        account_id_raw = kwargs.get("account_id")
-        if account_id_raw is not None:
-            try:
-                # Sanitize and validate integer input
-                account_id = sanitize_integer_input(account_id_raw, "account_id", min_val=1)
-                # Verify user owns this account
-                validate_user_owns_account(user, account_id)
-            except (InvalidInputError, AccessControlError) as e:
-                logger.warning(
-                    "Account validation failed: user=%s, account_id=%s, error=%s",
-                    user.id,
-                    account_id_raw,
-                    str(e),
-                )
-                messages.error(request, str(e))
-                return redirect("portfolio:holdings")
-            except Http404:
-                # Let 404 bubble up for non-existent IDs
-                raise
-
-        # SECURITY: Validate query parameters
-        try:
-            validate_view_mode(request.GET.get("view"))
-            validate_target_mode(request.GET.get("target"))
-        except InvalidInputError as e:
-            logger.warning("Invalid query parameter: user=%s, error=%s", user.id, str(e))
-            messages.warning(request, str(e))
-            # Parameters will be defaulted in get_context_data
+        response = validate_holdings_request(request, kwargs.get("account_id"))
+        if response is not None:
+            return response
 
         return super().get(request, *args, **kwargs)
 
@@ -98,16 +85,14 @@ class HoldingsView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
 
         # Fetch holdings data
         # Default to aggregated unless account is specified
-        if account_id_raw:
-            context["holdings_rows"] = engine.get_holdings_rows(
-                user=user, account_id=kwargs.get("account_id")
-            )
-            context["is_aggregated"] = False
-        else:
-            context["holdings_rows"] = engine.get_aggregated_holdings_rows(
-                user=user, target_mode=target_mode
+        context.update(
+            holdings_table_context(
+                engine,
+                user,
+                account_id=int(account_id_raw) if account_id_raw else None,
+                target_mode=target_mode,
             )
-            context["is_aggregated"] = True
+        )
 
         # Add sidebar context
         context.update(self.get_sidebar_context())
@@ -176,9 +161,14 @@ class HoldingsView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
                 raise InvalidInputError("Shares must be greater than zero")
 
             # Create holding
+            frame_version = _frame_version(request.user, [security])
             holding, created = Holding.objects.get_or_create(
                 account=account, security=security, defaults={"shares": shares}
             )
+            if created:
+                _patch_presentation_frame(
+                    request.user, frame_version, account, [(security, shares)]
+                )
 
             if not created:
                 messages.warning(
@@ -193,91 +183,99 @@ class HoldingsView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
 
         return redirect("portfolio:account_holdings", account_id=account.id)
 
-    def _update_single_holding(
-        self,
-        request: HttpRequest,
-        account: Account,
-        holding_id_raw: str,
-    ) -> bool:
+    def _parse_share_updates(self, request: HttpRequest) -> dict[int, Decimal]:
         """
-        Update a single holding's shares.
+        Parse and validate the submitted share values.
 
-        Args:
-            request: HTTP request
-            account: Account containing the holding
-            holding_id_raw: Raw holding ID from POST data
+        Invalid rows are logged and skipped; empty or non-positive share
+        values are ignored.
 
         Returns:
-            True if holding was updated, False if skipped
-
-        Raises:
-            InvalidInputError: For validation failures
-            AccessControlError: For permission failures
+            Dict of holding_id -> new share count
         """
-        holding_id = sanitize_integer_input(holding_id_raw, "holding_id", min_val=1)
-        shares_str = request.POST.get(f"shares_{holding_id}", "").strip()
-
-        if not shares_str:
-            return False  # Skip empty entries
+        updates: dict[int, Decimal] = {}
 
-        shares = Decimal(shares_str)
-        if shares <= 0:
-            return False  # Skip invalid shares
+        for holding_id_raw in request.POST.getlist("holding_ids"):
+            try:
+                holding_id = sanitize_integer_input(holding_id_raw, "holding_id", min_val=1)
+                shares_str = request.POST.get(f"shares_{holding_id}", "").strip()
 
-        # SECURITY: Validate ownership
-        holding = validate_user_owns_holding(request.user, holding_id)
+                if not shares_str:
+                    continue  # Skip empty entries
 
-        # Cross-check: Ensure holding belongs to the account from URL
-        if holding.account_id != account.id:
-            logger.warning(
-                "Account mismatch in bulk update: holding=%s, expected_account=%s, actual_account=%s",
-                holding_id,
-                account.id,
-                holding.account_id,
-            )
-            return False
+                shares = Decimal(shares_str)
+                if shares <= 0:
+                    continue  # Skip invalid shares
 
-        # Only update if changed
-        if holding.shares != shares:
-            holding.shares = shares
-            holding.save(update_fields=["shares"])
-            return True
+                updates[holding_id] = shares
+            except (InvalidInputError, ValueError, TypeError, DecimalException) as e:
+                # Log but continue processing other holdings
+                logger.warning(
+                    "Skipping holding update due to validation error: id=%s, error=%s",
+                    holding_id_raw,
+                    str(e),
+                )
 
-        return False
+        return updates
 
     def _handle_bulk_update(self, request: HttpRequest, account: Account) -> HttpResponse:
-        """Handle bulk update of holdings with security validation."""
+        """
+        Handle bulk update of holdings with security validation.
+
+        Ownership is checked for all submitted holdings in one query and the
+        changed rows are written with a single bulk_update.
+        """
         with handle_holding_operation(
             request,
             account,
             "bulk_update_holdings",
             log_context={"form_action": "bulk_update"},
         ):
-            updates_count = 0
-            holding_ids = request.POST.getlist("holding_ids")
-
-            for holding_id_raw in holding_ids:
-                try:
-                    if self._update_single_holding(request, account, holding_id_raw):
-                        updates_count += 1
-                except (
-                    InvalidInputError,
-                    AccessControlError,
-                    ValueError,
-                    TypeError,
-                    DecimalException,
-                ) as e:
-                    # Log but continue processing other holdings
+            updates = self._parse_share_updates(request)
+
+            # SECURITY: Validate ownership of every holding in one query
+            owned = get_user_owned_holdings(request.user, updates)
+
+            frame_version = _frame_version(request.user)
+            changed: list[Holding] = []
+            share_changes: list[tuple[Security, Decimal]] = []
+            for holding_id, shares in updates.items():
+                holding = owned.get(holding_id)
+                if holding is None:
                     logger.warning(
                         "Skipping holding update due to validation error: id=%s, error=%s",
-                        holding_id_raw,
-                        str(e),
+                        holding_id,
+                        "You do not have permission to access this holding",
+                    )
+                    continue
+
+                # Cross-check: Ensure holding belongs to the account from URL
+                if holding.account_id != account.id:
+                    logger.warning(
+                        "Account mismatch in bulk update: holding=%s, expected_account=%s, "
+                        "actual_account=%s",
+                        holding_id,
+                        account.id,
+                        holding.account_id,
                     )
                     continue
 
+                # Only update if changed
+                if holding.shares != shares:
+                    share_changes.append((holding.security, shares - holding.shares))
+                    holding.shares = shares
+                    changed.append(holding)
+
+            if changed:
+                Holding.objects.bulk_update(changed, ["shares"])
+                # bulk_update sends no signals; bump the data version explicitly
+                Portfolio.objects.filter(id=account.portfolio_id).bump_version()
+                schedule_refresh([account.id])
+                _patch_presentation_frame(request.user, frame_version, account, share_changes)
+
             # Show appropriate message based on results
-            if updates_count > 0:
-                messages.success(request, f"Updated {updates_count} holdings.")
+            if changed:
+                messages.success(request, f"Updated {len(changed)} holdings.")
             else:
                 messages.info(request, "No changes saved.")
 
@@ -304,7 +302,11 @@ class HoldingsView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
             # Delete holding
             security_ticker = holding.security.ticker
             shares_str = f"{holding.shares.normalize():f}"
+            frame_version = _frame_version(request.user, [holding.security])
             holding.delete()
+            _patch_presentation_frame(
+                request.user, frame_version, account, [(holding.security, -holding.shares)]
+            )
 
             messages.success(
                 request,
@@ -314,78 +316,253 @@ class HoldingsView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
         return redirect("portfolio:account_holdings", account_id=account.id)
 
 
-class TickerAccountDetailsView(LoginRequiredMixin, View):
-    """Return HTML fragment with account-level holdings for a specific ticker."""
+def _frame_version(user: Any, securities: Iterable[Security] = ()) -> PortfolioVersion | None:
+    """
+    Data version to patch the cached presentation frame from, if enabled.
+
+    Args:
+        securities: Securities the write may add to or remove from the user's
+            holdings, so their prices are covered before and after the write.
+            (Adding a security the user did not hold can then miss the cached
+            frame; the next read rebuilds it.)
+    """
+    if not settings.PRESENTATION_FRAME_CACHE:
+        return None
+    return get_portfolio_version(user, include_securities=[s.id for s in securities])
+
+
+def _patch_presentation_frame(
+    user: Any,
+    version: PortfolioVersion | None,
+    account: Account,
+    share_changes: list[tuple[Security, Decimal]],
+) -> None:
+    """
+    Carry the cached presentation frame over a change in the account's shares.
+
+    Args:
+        version: From ``_frame_version()`` before the write
+        share_changes: (security, change in shares) pairs
+    """
+    if version is None or not share_changes:
+        return
+
+    prices = SecurityPrice.get_latest_prices_bulk([security for security, _ in share_changes])
+    AllocationEngine().apply_holding_changes(
+        user,
+        version,
+        [
+            # Unpriced holdings have no value either side of the change
+            HoldingDelta(
+                account_id=account.id,
+                account_type_code=account.account_type.code,
+                asset_class_id=security.asset_class_id,
+                value=float(shares * prices[security.id]),
+            )
+            for security, shares in share_changes
+            if security.id in prices
+        ],
+        security_ids=[security.id for security, _ in share_changes],
+    )
 
-    def get(self, request: HttpRequest, ticker: str) -> HttpResponse:
-        # Get all accounts for the user
-        accounts = Account.objects.filter(user=request.user).select_related("account_type")
 
-        # Get holdings for this ticker across all accounts
-        holdings_data = []
-        total_value = Decimal("0")
-        total_shares = Decimal("0")
+def validate_holdings_request(request: HttpRequest, account_id_raw: Any) -> HttpResponse | None:
+    """
+    Validate the account and query parameters of a holdings page request.
+
+    Returns:
+        A redirect if the account is invalid or not owned, otherwise None
+        (invalid query parameters only add a warning and fall back to defaults)
+    """
+    user = request.user
+
+    # SECURITY: Validate account_id if provided
+    if account_id_raw is not None:
+        try:
+            # Sanitize and validate integer input
+            account_id = sanitize_integer_input(account_id_raw, "account_id", min_val=1)
+            # Verify user owns this account
+            validate_user_owns_account(user, account_id)
+        except (InvalidInputError, AccessControlError) as e:
+            logger.warning(
+                "Account validation failed: user=%s, account_id=%s, error=%s",
+                user.id,
+                account_id_raw,
+                str(e),
+            )
+            messages.error(request, str(e))
+            return redirect("portfolio:holdings")
+        except Http404:
+            # Let 404 bubble up for non-existent IDs
+            raise
+
+    # SECURITY: Validate query parameters
+    try:
+        validate_view_mode(request.GET.get("view"))
+        validate_target_mode(request.GET.get("target"))
+    except InvalidInputError as e:
+        logger.warning("Invalid query parameter: user=%s, error=%s", user.id, str(e))
+        messages.warning(request, str(e))
+        # Parameters will be defaulted in get_context_data
+
+    return None
+
+
+def holdings_table_context(
+    engine: AllocationEngine,
+    user: Any,
+    account_id: int | None,
+    target_mode: str,
+    holdings_rows: list[dict[str, Any]] | None = None,
+) -> dict[str, Any]:
+    """
+    Context for the holdings table.
+
+    Unless ``holdings_rows`` were already loaded, rows are lazy so they are
+    only computed when the cached table fragment is missing.
+    """
+    rows: Any = holdings_rows
+    if rows is None:
+        rows = SimpleLazyObject(
+            lambda: load_holdings_rows(engine, user, account_id=account_id, target_mode=target_mode)
+        )
+    return {"holdings_rows": rows, "is_aggregated": account_id is None}
+
+
+def load_holdings_rows(
+    engine: AllocationEngine, user: Any, account_id: int | None, target_mode: str
+) -> list[dict[str, Any]]:
+    """Holdings rows for one account, or aggregated across accounts."""
+    display = settings.DISPLAY_PREFORMAT
+    if account_id is not None:
+        return engine.get_holdings_rows(user=user, account_id=account_id, display=display)
+    return engine.get_aggregated_holdings_rows(user=user, target_mode=target_mode, display=display)
+
+
+class AsyncHoldingsView(AsyncLoginRequiredMixin, AsyncPortfolioContextMixin, TemplateView):
+    """
+    Async variant of HoldingsView (served with ``ASYNC_VIEWS`` under ASGI).
+
+    GET loads the holdings table, securities and sidebar concurrently. POST
+    (holding edits) is handled by the sync view inside a transaction.
+    """
 
-        for account in accounts:
-            # We want the holding for this specific ticker
-            account_holding = account.holdings.filter(security__ticker=ticker).first()
+    template_name = "portfolio/holdings.html"
 
-            if account_holding:
-                value = account_holding.market_value
-                shares = account_holding.shares
+    # Async handler; see AsyncLoginRequiredMixin
+    async def get(  # type: ignore[override]
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        account_id_raw = kwargs.get("account_id")
+        response = await sync_to_async(validate_holdings_request)(request, account_id_raw)
+        if response is not None:
+            return response
 
-                total_value += value
-                total_shares += shares
+        user = request.user
+        try:
+            target_mode = validate_target_mode(request.GET.get("target"))
+        except InvalidInputError:
+            target_mode = "effective"
+        account_id = int(account_id_raw) if account_id_raw else None
+        engine = AllocationEngine()
 
-                account_total = account.total_value()
-                pct_of_account = (
-                    (value / account_total * 100) if account_total > 0 else Decimal("0")
-                )
+        context = self.get_context_data(**kwargs)
+        context["target_mode"] = target_mode
+        context.update(await self.aget_fragment_cache_context())
+
+        loaders: dict[str, Any] = {}
+        if account_id is not None:
+            loaders["account"] = partial(Account.objects.get, id=account_id)
+            loaders["securities"] = lambda: list(Security.objects.all().order_by("ticker"))
+        # Vary-on values must match the {% cache %} tag in holdings_table.html
+        if not await self.fragment_is_cached(
+            "holdings_table", context["portfolio_version"], account_id or "", target_mode
+        ):
+            loaders["holdings_rows"] = partial(
+                load_holdings_rows, engine, user, account_id=account_id, target_mode=target_mode
+            )
+        await self.aload_portfolio_context(context, loaders)
+
+        context.update(
+            holdings_table_context(
+                engine, user, account_id, target_mode, context.pop("holdings_rows", None)
+            )
+        )
+        return self.render_to_response(context)
+
+    async def post(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        # Keep the per-request transaction the sync view gets from ATOMIC_REQUESTS
+        handler = transaction.atomic(HoldingsView.as_view())
+        return await sync_to_async(handler)(request, *args, **kwargs)
 
-                holdings_data.append(
-                    {
-                        "account_name": account.name,
-                        "account_type": account.account_type.label,
-                        "account_type_id": account.account_type.id,
-                        "shares": shares,
-                        "value": value,
-                        "pct_of_account": pct_of_account,
-                        "pct_of_position": Decimal("0"),  # Calculate after we have total
-                    }
+
+class HoldingsImportView(LoginRequiredMixin, AccountOwnershipMixin, View):
+    """Bulk import holdings for an account from a CSV or OFX statement upload."""
+
+    def post(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if not self.validate_account_ownership():
+            return self.get_redirect_response()
+
+        account = self.get_validated_account()
+        form = HoldingsImportForm(request.POST, request.FILES)
+        if not form.is_valid():
+            messages.error(request, "Please choose a file to import.")
+            return redirect("portfolio:account_holdings", account_id=account.id)
+
+        upload = form.cleaned_data["file"]
+        with handle_holding_operation(
+            request,
+            account,
+            "import_holdings",
+            log_context={"file_name": upload.name, "replace": form.cleaned_data["replace"]},
+        ):
+            importer = HoldingsImporter(account, replace=form.cleaned_data["replace"])
+            result = importer.import_file(upload, detect_format(upload.name))
+
+            messages.success(request, result.summary())
+            if result.unknown_tickers:
+                messages.warning(
+                    request,
+                    f"Skipped unknown tickers: {', '.join(result.unknown_tickers)}",
                 )
+            for error in result.errors:
+                messages.warning(request, error)
 
-        # Recalculate pct_of_position now that we have total_value
-        for h in holdings_data:
-            h["pct_of_position"] = (
-                (h["value"] / total_value * 100) if total_value > 0 else Decimal("0")
-            )
+        return redirect("portfolio:account_holdings", account_id=account.id)
 
-        # Group by account type
-        holdings_data.sort(key=itemgetter("account_type_id"))
-        grouped = []
 
-        for account_type, group in groupby(holdings_data, key=itemgetter("account_type")):
-            group_list = list(group)
-            group_total_value = sum(h["value"] for h in group_list)
-            group_total_shares = sum(h["shares"] for h in group_list)
-            group_pct_of_position = sum(h["pct_of_position"] for h in group_list)
+class TickerAccountDetailsView(LoginRequiredMixin, View):
+    """Return HTML fragment with account-level holdings for a specific ticker."""
+
+    def get(self, request: HttpRequest, ticker: str) -> HttpResponse:
+        # One query for every holding in the accounts that hold this ticker;
+        # account totals and percentages are computed with pandas groupby.
+        engine = AllocationEngine()
+        positions_df = engine.data_provider.get_ticker_positions_df(request.user, ticker)
+        breakdown_df = engine.calculator.calculate_ticker_account_breakdown(positions_df, ticker)
 
+        grouped = []
+        for account_type, group_df in breakdown_df.groupby("account_type_label", sort=False):
+            holdings_list = [
+                {**row, "account_type": account_type}
+                for row in group_df.drop(columns="account_type_label").to_dict("records")
+            ]
             grouped.append(
                 {
                     "account_type": account_type,
                     "subtotal": {
-                        "shares": group_total_shares,
-                        "value": group_total_value,
-                        "pct_of_position": group_pct_of_position,
+                        "shares": group_df["shares"].sum(),
+                        "value": group_df["value"].sum(),
+                        "pct_of_position": group_df["pct_of_position"].sum(),
                     },
-                    "holdings": group_list,
+                    "holdings": holdings_list,
                 }
             )
 
         context = {
             "ticker": ticker,
-            "total_shares": total_shares,
-            "total_value": total_value,
+            "total_shares": breakdown_df["shares"].sum(),
+            "total_value": breakdown_df["value"].sum(),
             "grouped_holdings": grouped,
         }
 
@@ -0,0 +1,56 @@
+"""
+Prometheus metrics endpoint.
+
+Exposes the in-process metrics registry (request latency, engine stages,
+optimizer solve times, price fetches, cache hit/miss counts) in the
+Prometheus text exposition format for scraping.
+
+Access is limited to the addresses in ``METRICS_ALLOWED_IPS`` (localhost by
+default) and to requests carrying ``Authorization: Bearer <METRICS_TOKEN>``.
+"""
+
+import hmac
+import ipaddress
+from typing import Any
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.cache import never_cache
+
+from portfolio.services.metrics import CONTENT_TYPE, registry
+
+
+def scrape_allowed(request: HttpRequest) -> bool:
+    """Whether the request carries the metrics token or comes from an allowed address."""
+    token = settings.METRICS_TOKEN
+    if token:
+        supplied = request.headers.get("Authorization", "").encode()
+        if hmac.compare_digest(supplied, f"Bearer {token}".encode()):
+            return True
+
+    try:
+        address = ipaddress.ip_address(request.META.get("REMOTE_ADDR", ""))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(allowed, strict=False)
+        for allowed in settings.METRICS_ALLOWED_IPS
+    )
+
+
+@method_decorator(never_cache, name="dispatch")
+class MetricsView(View):
+    """
+    Prometheus scrape endpoint.
+
+    In multi-process deployments (METRICS_MULTIPROC_DIR set) the response
+    aggregates samples from every worker process sharing the directory.
+    """
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """Return all registered metrics in Prometheus text format."""
+        if not scrape_allowed(request):
+            return HttpResponseForbidden("Metrics are not available to this client.")
+        return HttpResponse(registry.render(), content_type=CONTENT_TYPE)
@@ -1,12 +1,23 @@
+import asyncio
 import logging
+from collections.abc import Callable, Mapping
 from decimal import Decimal
+from functools import partial
 from typing import Any
 
+from django.conf import settings
 from django.contrib import messages
-from django.http import HttpRequest, HttpResponse
+from django.contrib.auth.mixins import AccessMixin
+from django.core.cache import cache
+from django.core.cache.utils import make_template_fragment_key
+from django.db import close_old_connections, transaction
+from django.http import HttpRequest, HttpResponse, HttpResponseBase
 from django.shortcuts import redirect
+from django.utils.functional import SimpleLazyObject
+from django.views import View
 
 import structlog
+from asgiref.sync import sync_to_async
 
 from portfolio.models import Account
 from portfolio.utils.security import (
@@ -20,7 +31,28 @@ logger = structlog.get_logger(__name__)
 validation_logger = logging.getLogger(__name__)
 
 
-class PortfolioContextMixin:
+class FragmentCacheMixin:
+    """
+    Provides the keys for template fragment caching.
+
+    Templates wrap expensive blocks in ``{% cache fragment_cache_timeout name
+    portfolio_version ... %}``. The version changes whenever the user's data
+    does, so cached fragments never go stale. Pass the fragment's data to the
+    template lazily (``SimpleLazyObject``) so it is only computed on a miss.
+    """
+
+    request: HttpRequest
+
+    def get_fragment_cache_context(self) -> dict[str, Any]:
+        from portfolio.services.versioning import get_portfolio_version
+
+        return {
+            "portfolio_version": get_portfolio_version(self.request.user).key,
+            "fragment_cache_timeout": settings.FRAGMENT_CACHE_TIMEOUT,
+        }
+
+
+class PortfolioContextMixin(FragmentCacheMixin):
     """Provides common portfolio context data for portfolio views."""
 
     request: HttpRequest
@@ -40,54 +72,177 @@ class PortfolioContextMixin:
 
         Automatically updates prices from market data on each request.
 
+        The sidebar data itself is lazy: it is only built when the sidebar
+        fragment is not already cached for the current portfolio version.
+
         Returns:
-            dict with 'sidebar_data' containing grand_total and groups
+            dict with 'sidebar_data' containing grand_total and groups, plus
+            the fragment cache keys
         """
         user = self.request.user
         if not user.is_authenticated:
             return {"sidebar_data": {"grand_total": Decimal("0.00"), "groups": {}}}
 
-        from portfolio.services.allocations import get_sidebar_data
-        from portfolio.services.pricing import PricingService
-
         # Auto-update prices on each page load if they are stale (>5 mins)
-        pricing_service = PricingService()
-        try:
-            result = pricing_service.update_holdings_prices_if_stale(user)
-
-            # Log results for monitoring
-            if result["updated_count"] > 0:
-                logger.info(
-                    "prices_refreshed",
-                    user_id=user.id,
-                    updated=result["updated_count"],
-                    skipped=result["skipped_count"],
-                )
-
-            if result["errors"]:
-                logger.warning(
-                    "price_update_errors", user_id=user.id, failed_tickers=result["errors"]
-                )
-        except Exception as e:
-            # Log error but don't break the page if price fetch fails
-            logger.error("price_service_error", user_id=user.id, error=str(e))
-
-        # OPTIMIZED: Single consolidated call for all sidebar data
-        sidebar_data = get_sidebar_data(user)
-
-        # Log query count for monitoring (helps identify regressions)
-        if sidebar_data["query_count"] > 10:
-            logger.warning(
-                "high_sidebar_query_count", user_id=user.id, queries=sidebar_data["query_count"]
+        refresh_stale_prices(user)
+
+        return {**sidebar_context(user), **self.get_fragment_cache_context()}
+
+
+def refresh_stale_prices(user: Any) -> None:
+    """Refresh the user's holding prices if stale, never failing the page."""
+    from portfolio.services.pricing import PricingService
+
+    pricing_service = PricingService()
+    try:
+        result = pricing_service.update_holdings_prices_if_stale(user)
+
+        # Log results for monitoring
+        if result["updated_count"] > 0:
+            logger.info(
+                "prices_refreshed",
+                user_id=user.id,
+                updated=result["updated_count"],
+                skipped=result["skipped_count"],
             )
 
-        # Format for template
-        return {
-            "sidebar_data": {
-                "grand_total": sidebar_data["grand_total"],
-                "groups": sidebar_data["accounts_by_group"],
-            }
-        }
+        if result["errors"]:
+            logger.warning("price_update_errors", user_id=user.id, failed_tickers=result["errors"])
+    except Exception as e:
+        # Log error but don't break the page if price fetch fails
+        logger.error("price_service_error", user_id=user.id, error=str(e))
+
+
+def build_sidebar_data(user: Any) -> dict[str, Any]:
+    """Sidebar totals and account groups, formatted for the template."""
+    from portfolio.services.allocations import get_sidebar_data
+
+    # OPTIMIZED: Single consolidated call for all sidebar data
+    sidebar_data = get_sidebar_data(user)
+
+    # Log query count for monitoring (helps identify regressions)
+    if sidebar_data["query_count"] > 10:
+        logger.warning(
+            "high_sidebar_query_count", user_id=user.id, queries=sidebar_data["query_count"]
+        )
+
+    # Format for template
+    return {
+        "grand_total": sidebar_data["grand_total"],
+        "groups": sidebar_data["accounts_by_group"],
+    }
+
+
+def sidebar_context(user: Any, sidebar_data: dict[str, Any] | None = None) -> dict[str, Any]:
+    """
+    Sidebar template context.
+
+    Uses ``sidebar_data`` when already loaded; otherwise the data is lazy and
+    only built if the sidebar fragment is not cached for the current version.
+    """
+    if sidebar_data is None:
+        return {"sidebar_data": SimpleLazyObject(lambda: build_sidebar_data(user))}
+    return {"sidebar_data": sidebar_data}
+
+
+async def load_concurrently(loaders: Mapping[str, Callable[[], Any]]) -> dict[str, Any]:
+    """
+    Run blocking loaders concurrently, each in its own worker thread.
+
+    Each thread uses its own database connection, which is released per
+    ``CONN_MAX_AGE`` when the loader finishes.
+
+    Args:
+        loaders: Context key -> callable returning the value
+
+    Returns:
+        Loaded values by context key
+    """
+
+    def in_thread(loader: Callable[[], Any]) -> Callable[[], Any]:
+        def run() -> Any:
+            try:
+                return loader()
+            finally:
+                close_old_connections()
+
+        return sync_to_async(run, thread_sensitive=False)
+
+    results = await asyncio.gather(*(in_thread(loader)() for loader in loaders.values()))
+    return dict(zip(loaders, results, strict=True))
+
+
+class AsyncLoginRequiredMixin(AccessMixin, View):
+    """
+    LoginRequiredMixin for async views.
+
+    The user is resolved with ``request.auser()`` so the session and user
+    lookups don't block the event loop. Async views opt out of
+    ``ATOMIC_REQUESTS`` (Django does not support it for async views); writes
+    they delegate to sync code open their own transaction.
+
+    Handlers of views using it are ``async def``. The View stubs type them
+    (and ``dispatch``) as sync, so those overrides carry ``type: ignore[override]``.
+    """
+
+    # Async override of View.dispatch; Django awaits it for async views
+    @transaction.non_atomic_requests
+    async def dispatch(  # type: ignore[override]
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponseBase:
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        # The handler it dispatches to is async, so the sync-typed result is awaitable
+        return await super().dispatch(request, *args, **kwargs)  # type: ignore[misc]
+
+
+class AsyncPortfolioContextMixin(FragmentCacheMixin):
+    """
+    Async counterpart of PortfolioContextMixin.
+
+    Views build a dict of loaders for the data their uncached fragments need
+    (see ``fragment_is_cached``) and pass it to ``aload_portfolio_context``,
+    which adds the sidebar and runs everything concurrently.
+    """
+
+    request: HttpRequest
+
+    async def aget_fragment_cache_context(self) -> dict[str, Any]:
+        """Refresh stale prices, then read the fragment cache keys."""
+
+        def prepare() -> dict[str, Any]:
+            refresh_stale_prices(self.request.user)
+            return self.get_fragment_cache_context()
+
+        return await sync_to_async(prepare)()
+
+    async def fragment_is_cached(self, fragment_name: str, *vary_on: Any) -> bool:
+        """Whether ``{% cache ... fragment_name vary_on %}`` would be a hit."""
+        return await cache.ahas_key(make_template_fragment_key(fragment_name, vary_on))
+
+    async def aload_portfolio_context(
+        self, context: dict[str, Any], loaders: Mapping[str, Callable[[], Any]]
+    ) -> dict[str, Any]:
+        """
+        Load the sidebar and the page's data concurrently into ``context``.
+
+        Args:
+            context: Context with the fragment cache keys
+            loaders: Context key -> blocking callable for the page's own data
+
+        Returns:
+            The updated context
+        """
+        user = self.request.user
+        pending = dict(loaders)
+        if not await self.fragment_is_cached("sidebar", context["portfolio_version"]):
+            pending["sidebar_data"] = partial(build_sidebar_data, user)
+
+        loaded = await load_concurrently(pending)
+        context.update(sidebar_context(user, loaded.pop("sidebar_data", None)))
+        context.update(loaded)
+        return context
 
 
 class AccountOwnershipMixin:
@@ -0,0 +1,76 @@
+"""
+HTMX partial endpoints for independently loaded page fragments.
+
+Each endpoint renders a single fragment (sidebar, dashboard allocation tables,
+holdings table) through the same cached template used by the full pages, so a
+fragment is only recomputed when the user's portfolio version changes.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest
+from django.views.generic import TemplateView
+
+from portfolio.services.allocations import AllocationEngine
+from portfolio.utils.security import InvalidInputError, validate_target_mode
+from portfolio.views.dashboard import allocation_tables_context
+from portfolio.views.holdings import holdings_table_context
+from portfolio.views.mixins import AccountOwnershipMixin, FragmentCacheMixin, PortfolioContextMixin
+
+
+class SidebarPartialView(LoginRequiredMixin, PortfolioContextMixin, TemplateView):
+    """Sidebar fragment."""
+
+    template_name = "portfolio/sidebar.html"
+
+
+class AllocationTablesPartialView(LoginRequiredMixin, FragmentCacheMixin, TemplateView):
+    """Dashboard allocation tables fragment (dollar and percent)."""
+
+    template_name = "portfolio/partials/allocation_tables.html"
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context.update(allocation_tables_context(self.request.user))
+        context.update(self.get_fragment_cache_context())
+        return context
+
+
+class HoldingsTablePartialView(
+    LoginRequiredMixin, AccountOwnershipMixin, FragmentCacheMixin, TemplateView
+):
+    """Holdings table fragment, aggregated or for one account (``?target=``)."""
+
+    template_name = "portfolio/partials/holdings_table.html"
+    target_mode = "effective"
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if "account_id" in kwargs and not self.validate_account_ownership():
+            return self.get_redirect_response()
+
+        try:
+            self.target_mode = validate_target_mode(request.GET.get("target"))
+        except InvalidInputError as e:
+            return HttpResponseBadRequest(e.messages[0])
+
+        return super().get(request, *args, **kwargs)
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        account = self.account if "account_id" in self.kwargs else None
+
+        context["account"] = account
+        context["target_mode"] = self.target_mode
+        context.update(
+            holdings_table_context(
+                AllocationEngine(),
+                self.request.user,
+                account_id=account.id if account else None,
+                target_mode=self.target_mode,
+            )
+        )
+        context.update(self.get_fragment_cache_context())
+        return context
@@ -1,16 +1,32 @@
 """Views for portfolio rebalancing functionality."""
 
-import csv
 import logging
-from io import StringIO
+from concurrent.futures import Executor
+from decimal import Decimal
+from functools import partial
 from typing import Any
 
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.views import View
 from django.views.generic import TemplateView
 
+from asgiref.sync import sync_to_async
+
+from portfolio.models import Account, AssetClass, RebalancingJob
+from portfolio.services.exports import ORDER_COLUMNS, rebalancing_orders
 from portfolio.services.rebalancing import RebalancingEngine
-from portfolio.views.mixins import AccountOwnershipMixin, PortfolioContextMixin
+from portfolio.services.rebalancing.jobs import enqueue_plan, get_saved_plan
+from portfolio.services.rebalancing.solver import get_solver_executor
+from portfolio.views.exports import StreamingExportMixin
+from portfolio.views.mixins import (
+    AccountOwnershipMixin,
+    AsyncLoginRequiredMixin,
+    AsyncPortfolioContextMixin,
+    PortfolioContextMixin,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -36,78 +52,134 @@ class RebalancingView(
         # Account already validated and loaded by mixin
         account = self.get_validated_account()
 
-        # Generate rebalancing plan
-        engine = RebalancingEngine(account)
-        plan = engine.generate_plan()
-
         context["account"] = account
-        context["plan"] = plan
 
-        # Get target allocations for display
-        strategy = account.get_effective_allocation_strategy()
-        if strategy:
-            context["target_allocations"] = {
-                ta.asset_class: ta.target_percent
-                for ta in strategy.target_allocations.select_related("asset_class")
-            }
-        else:
-            context["target_allocations"] = {}
-
-        # Add sidebar context
+        # Sidebar first: it refreshes stale prices, which the plan must be keyed to
         context.update(self.get_sidebar_context())
+        context.update(get_plan_context(account, retry=self.request.GET.get("retry") == "1"))
+
+        # Get target allocations for display
+        context["target_allocations"] = get_target_allocation_map(account)
 
         return context
 
 
-class RebalancingExportView(LoginRequiredMixin, AccountOwnershipMixin, TemplateView):
-    """Export rebalancing orders as CSV."""
+class AsyncRebalancingView(
+    AsyncLoginRequiredMixin, AccountOwnershipMixin, AsyncPortfolioContextMixin, TemplateView
+):
+    """
+    Async variant of RebalancingView (served with ``ASYNC_VIEWS`` under ASGI).
 
-    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
-        """Generate and return CSV file."""
+    Stale prices are refreshed and the sidebar and target allocations load
+    concurrently before the plan, which is keyed to those prices. With
+    ``REBALANCING_JOB_QUEUE`` the plan comes from the job queue as in the
+    sync view; otherwise the optimization solve runs in the shared solver
+    process pool.
+    """
+
+    template_name = "portfolio/rebalancing.html"
+
+    # Async handler; see AsyncLoginRequiredMixin
+    async def get(  # type: ignore[override]
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        if not await sync_to_async(self.validate_account_ownership)():
+            return self.get_redirect_response()
+
+        account = self.get_validated_account()
+
+        context = self.get_context_data(**kwargs)
+        context["account"] = account
+        context.update(await self.aget_fragment_cache_context())
+        await self.aload_portfolio_context(
+            context, {"target_allocations": partial(get_target_allocation_map, account)}
+        )
+        context.update(
+            await sync_to_async(get_plan_context)(
+                account,
+                retry=request.GET.get("retry") == "1",
+                solver_executor=get_solver_executor(),
+            )
+        )
+        return self.render_to_response(context)
+
+
+def get_plan_context(
+    account: Account, *, retry: bool = False, solver_executor: Executor | None = None
+) -> dict[str, Any]:
+    """
+    The rebalancing plan for the page, generated inline or via the job queue.
+
+    With ``REBALANCING_JOB_QUEUE`` the stored plan for the account's current
+    data is shown, or a job is queued (``plan`` is None and ``job`` is set) for
+    the page to poll. Call it after stale prices are refreshed.
+    """
+    if settings.REBALANCING_JOB_QUEUE:
+        plan = get_saved_plan(account)
+        if plan is None:
+            return {"plan": None, "job": enqueue_plan(account, retry=retry)}
+        return {"plan": plan}
+
+    engine = RebalancingEngine(account, solver_executor=solver_executor)
+    return {"plan": engine.generate_plan()}
+
+
+def get_target_allocation_map(account: Account) -> dict[AssetClass, Decimal]:
+    """Target percentages by asset class from the account's effective strategy."""
+    strategy = account.get_effective_allocation_strategy()
+    if not strategy:
+        return {}
+    return {
+        ta.asset_class: ta.target_percent
+        for ta in strategy.target_allocations.select_related("asset_class")
+    }
+
+
+class RebalancingExportView(LoginRequiredMixin, AccountOwnershipMixin, StreamingExportMixin, View):
+    """Export rebalancing orders as a streamed CSV (or Parquet) download."""
+
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse | StreamingHttpResponse:
+        """Generate the plan and stream its orders."""
         if not self.validate_account_ownership():
             return self.get_redirect_response()
 
         # Account already validated and loaded by mixin
         account = self.get_validated_account()
 
-        # Generate rebalancing plan
-        engine = RebalancingEngine(account)
-        plan = engine.generate_plan()
-
-        # Create CSV
-        output = StringIO()
-        writer = csv.writer(output)
-
-        # Header
-        writer.writerow(
-            [
-                "Action",
-                "Ticker",
-                "Security Name",
-                "Asset Class",
-                "Shares",
-                "Price",
-                "Estimated Amount",
-            ]
+        # Reuse a plan generated in the background for the current data
+        plan = get_saved_plan(account) if settings.REBALANCING_JOB_QUEUE else None
+        if plan is None:
+            # Generate rebalancing plan
+            engine = RebalancingEngine(account)
+            plan = engine.generate_plan()
+
+        return self.export_response(
+            ORDER_COLUMNS,
+            rebalancing_orders(plan),
+            f"rebalancing_{account.name.replace(' ', '_')}",
         )
 
-        # Orders
-        for order in plan.orders:
-            writer.writerow(
-                [
-                    order.action,
-                    order.security.ticker,
-                    order.security.name,
-                    order.asset_class.name,
-                    order.shares,
-                    f"{order.price_per_share:.2f}",
-                    f"{order.estimated_amount:.2f}",
-                ]
-            )
 
-        # Create response
-        response = HttpResponse(output.getvalue(), content_type="text/csv")
-        filename = f"rebalancing_{account.name.replace(' ', '_')}_{plan.generated_at:%Y%m%d}.csv"
-        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+class RebalancingJobStatusView(LoginRequiredMixin, AccountOwnershipMixin, TemplateView):
+    """
+    Progress of a background rebalancing job (polled by the rebalancing page).
+
+    Renders the status fragment while the job runs. Once it has succeeded the
+    response carries ``HX-Refresh`` so the page reloads and shows the plan.
+    """
+
+    template_name = "portfolio/partials/rebalancing_job_status.html"
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        if not self.validate_account_ownership():
+            return self.get_redirect_response()
+
+        account = self.get_validated_account()
+        job = get_object_or_404(RebalancingJob, id=kwargs["job_id"], account=account)
 
+        response = self.render_to_response({"account": account, "job": job})
+        if job.status == RebalancingJob.SUCCEEDED:
+            response["HX-Refresh"] = "true"
         return response
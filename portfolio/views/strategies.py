@@ -13,6 +13,7 @@ from django.views.generic import CreateView, UpdateView
 from portfolio.exceptions import AllocationError
 from portfolio.forms.strategies import AllocationStrategyForm
 from portfolio.models import AllocationStrategy, AssetClass
+from portfolio.services.reference_data import get_reference_data
 from portfolio.utils.security import (
     AccessControlError,
     InvalidInputError,
@@ -40,7 +41,7 @@ class AllocationStrategyCreateView(LoginRequiredMixin, PortfolioContextMixin, Cr
 
             # 2. Collect allocations from form (including optional cash)
             allocations = {}
-            asset_classes = AssetClass.objects.all()
+            asset_classes = get_reference_data().asset_classes
 
             for ac in asset_classes:
                 field_name = f"target_{ac.id}"
@@ -130,7 +131,7 @@ class AllocationStrategyUpdateView(LoginRequiredMixin, PortfolioContextMixin, Up
 
             # Collect allocations (including optional cash)
             allocations = {}
-            asset_classes = AssetClass.objects.all()
+            asset_classes = get_reference_data().asset_classes
 
             for ac in asset_classes:
                 field_name = f"target_{ac.id}"
@@ -13,7 +13,9 @@ from portfolio.models import (
     AccountType,
     AccountTypeStrategyAssignment,
     AllocationStrategy,
+    Portfolio,
 )
+from portfolio.services.portfolio_snapshots import schedule_refresh
 from portfolio.views.mixins import PortfolioContextMixin
 
 logger = structlog.get_logger(__name__)
@@ -84,7 +86,9 @@ class TargetAllocationView(LoginRequiredMixin, PortfolioContextMixin, TemplateVi
         1. Account type level: strategy_at_{type_id}
         2. Individual account overrides: strategy_acc_{account_id}
 
-        Empty string values clear the assignment.
+        Empty string values clear the assignment. Submitted strategy ids are
+        validated in one query and only changed assignments are written, so
+        saving costs the same number of queries however many accounts exist.
         """
         user = request.user
         if not user.is_authenticated:
@@ -94,63 +98,104 @@ class TargetAllocationView(LoginRequiredMixin, PortfolioContextMixin, TemplateVi
         user = cast(Any, user)
 
         try:
-            # Get user's account types and accounts
-            account_types = AccountType.objects.filter(accounts__user=user).distinct()
-            accounts = Account.objects.filter(user=user)
+            # Current assignments for the user's account types and accounts
+            account_type_ids = list(
+                AccountType.objects.filter(accounts__user=user)
+                .distinct()
+                .values_list("id", flat=True)
+            )
+            accounts = list(
+                Account.objects.filter(user=user).only("id", "portfolio_id", "allocation_strategy")
+            )
+            current_at = dict(
+                AccountTypeStrategyAssignment.objects.filter(user=user).values_list(
+                    "account_type_id", "allocation_strategy_id"
+                )
+            )
 
-            with transaction.atomic():
-                # 1. Process account type assignments
-                for account_type in account_types:
-                    key = f"strategy_at_{account_type.id}"
-                    strategy_id = request.POST.get(key, "").strip()
-
-                    if strategy_id == "":
-                        # Empty string = remove assignment
-                        AccountTypeStrategyAssignment.objects.filter(
-                            user=user, account_type=account_type
-                        ).delete()
-                    elif strategy_id:
-                        # Validate strategy belongs to user
-                        try:
-                            strategy = AllocationStrategy.objects.get(id=strategy_id, user=user)
-                            AccountTypeStrategyAssignment.objects.update_or_create(
-                                user=user,
-                                account_type=account_type,
-                                defaults={"allocation_strategy": strategy},
-                            )
-                        except AllocationStrategy.DoesNotExist:
-                            # Invalid strategy ID - log but continue
-                            logger.warning(
-                                "invalid_strategy_id_in_post",
-                                user_id=user.id,
-                                strategy_id=strategy_id,
-                                key=key,
-                            )
-
-                # 2. Process individual account overrides
-                for account in accounts:
-                    key = f"strategy_acc_{account.id}"
-                    strategy_id = request.POST.get(key, "").strip()
-
-                    if strategy_id == "":
-                        # Empty string = clear override
-                        account.allocation_strategy = None
-                        account.save(update_fields=["allocation_strategy"])
-                    elif strategy_id:
-                        # Validate strategy belongs to user
-                        try:
-                            strategy = AllocationStrategy.objects.get(id=strategy_id, user=user)
-                            account.allocation_strategy = strategy
-                            account.save(update_fields=["allocation_strategy"])
-                        except AllocationStrategy.DoesNotExist:
-                            # Invalid strategy ID - log but continue
-                            logger.warning(
-                                "invalid_strategy_id_in_post",
-                                user_id=user.id,
-                                strategy_id=strategy_id,
-                                key=key,
-                            )
+            # Submitted values; a missing or empty value clears the assignment
+            submitted_at = {f"strategy_at_{type_id}": type_id for type_id in account_type_ids}
+            submitted_acc = {f"strategy_acc_{account.id}": account for account in accounts}
+            raw = {
+                key: request.POST.get(key, "").strip() for key in [*submitted_at, *submitted_acc]
+            }
 
+            # Validate every referenced strategy belongs to the user in one query
+            requested = {int(value) for value in raw.values() if value.isdigit()}
+            valid_ids = set(
+                AllocationStrategy.objects.filter(user=user, id__in=requested).values_list(
+                    "id", flat=True
+                )
+            )
+
+            def resolve(key: str) -> int | None | bool:
+                """Strategy id for a key, None to clear, or False if invalid."""
+                value = raw[key]
+                if value == "":
+                    return None
+                if value.isdigit() and int(value) in valid_ids:
+                    return int(value)
+                # Invalid strategy ID - log but continue
+                logger.warning(
+                    "invalid_strategy_id_in_post",
+                    user_id=user.id,
+                    strategy_id=value,
+                    key=key,
+                )
+                return False
+
+            # 1. Diff account type assignments
+            clear_types: list[int] = []
+            upserts: list[AccountTypeStrategyAssignment] = []
+            for key, type_id in submitted_at.items():
+                strategy_id = resolve(key)
+                if strategy_id is False or strategy_id == current_at.get(type_id):
+                    continue
+                if strategy_id is None:
+                    clear_types.append(type_id)
+                else:
+                    upserts.append(
+                        AccountTypeStrategyAssignment(
+                            user=user, account_type_id=type_id, allocation_strategy_id=strategy_id
+                        )
+                    )
+
+            # 2. Diff individual account overrides
+            changed_accounts: list[Account] = []
+            for key, account in submitted_acc.items():
+                strategy_id = resolve(key)
+                if strategy_id is False or strategy_id == account.allocation_strategy_id:
+                    continue
+                account.allocation_strategy_id = strategy_id
+                changed_accounts.append(account)
+
+            # Write only the changes
+            with transaction.atomic():
+                if clear_types:
+                    AccountTypeStrategyAssignment.objects.filter(
+                        user=user, account_type_id__in=clear_types
+                    ).delete()
+                if upserts:
+                    AccountTypeStrategyAssignment.objects.bulk_create(
+                        upserts,
+                        update_conflicts=True,
+                        unique_fields=["user", "account_type"],
+                        update_fields=["allocation_strategy"],
+                    )
+                if changed_accounts:
+                    Account.objects.bulk_update(changed_accounts, ["allocation_strategy"])
+                if upserts or changed_accounts:
+                    # Bulk writes send no signals; bump the data version explicitly
+                    Portfolio.objects.filter(user=user).bump_version()
+                    schedule_refresh(Account.objects.filter(user=user).values_list("id", flat=True))
+
+            logger.info(
+                "strategy_assignments_saved",
+                user_id=user.id,
+                account_types_cleared=len(clear_types),
+                account_types_assigned=len(upserts),
+                accounts_changed=len(changed_accounts),
+            )
             messages.success(request, "Allocations updated.")
             return redirect("portfolio:target_allocations")
 